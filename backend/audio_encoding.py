@@ -0,0 +1,410 @@
+"""
+Audio encoding helpers for serving TTS output.
+
+Converts float audio from the TTS model into 16-bit PCM and builds WAV
+headers, including the "unknown length" header used when audio is streamed
+to the client before the total duration is known.
+
+Also provides the compressed output layer: format negotiation from a request
+field or Accept header, polyphase resampling, and an incremental encoder for
+WAV, FLAC, Opus (in OGG) and MP3 built on libsndfile.
+"""
+import io
+import struct
+from math import gcd
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import soundfile as sf
+
+PCM16_SAMPLE_WIDTH = 2  # bytes per sample
+PCM16_SCALE = 32767.0
+WAV_HEADER_SIZE = 44
+STREAMING_DATA_SIZE = 0xFFFFFFFF  # Placeholder size for streamed WAV data
+CONVERT_BLOCK_SAMPLES = 1 << 16  # Float temporaries stay this small during conversion
+
+# Output formats served by the TTS endpoints.
+# "streamable" formats never rewrite earlier bytes, so encoded data can be sent
+# as soon as it is produced; the others patch their header when closed.
+OUTPUT_FORMATS: Dict[str, Dict] = {
+    "wav": {
+        "container": "WAV",
+        "subtypes": {16: "PCM_16", 24: "PCM_24"},
+        "media_type": "audio/wav",
+        "extension": "wav",
+        "sample_rates": None,
+        "streamable": False,
+    },
+    "flac": {
+        "container": "FLAC",
+        "subtypes": {16: "PCM_16", 24: "PCM_24"},
+        "media_type": "audio/flac",
+        "extension": "flac",
+        "sample_rates": None,
+        "streamable": False,
+    },
+    "opus": {
+        "container": "OGG",
+        "subtypes": {None: "OPUS"},
+        "media_type": "audio/ogg; codecs=opus",
+        "extension": "ogg",
+        "sample_rates": (8000, 12000, 16000, 24000, 48000),
+        "streamable": True,
+    },
+    "mp3": {
+        "container": "MP3",
+        "subtypes": {None: "MPEG_LAYER_III"},
+        "media_type": "audio/mpeg",
+        "extension": "mp3",
+        "sample_rates": (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000),
+        "streamable": False,
+    },
+}
+
+# Accept header media types -> output format
+ACCEPT_MEDIA_TYPES: Dict[str, str] = {
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+}
+
+
+def float_to_pcm16(audio: np.ndarray) -> bytes:
+    """
+    Convert float audio in [-1.0, 1.0] to little-endian 16-bit PCM bytes.
+
+    Args:
+        audio: Float audio samples (values outside [-1, 1] are clipped)
+
+    Returns:
+        Raw PCM16 bytes
+    """
+    return to_pcm16(audio).tobytes()
+
+
+def to_pcm16(audio: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert float audio in [-1.0, 1.0] to little-endian int16 samples.
+
+    Conversion runs block by block, so long audio never needs a second
+    full-length float temporary.
+
+    Args:
+        audio: Float audio samples (values outside [-1, 1] are clipped)
+        out: Optional int16 array of the same length to write into
+
+    Returns:
+        The int16 samples (``out`` when given)
+    """
+    audio = np.asarray(audio)
+    if out is None:
+        out = np.empty(len(audio), dtype="<i2")
+    if audio.dtype == np.int16:
+        out[:] = audio
+        return out
+    for start in range(0, len(audio), CONVERT_BLOCK_SAMPLES):
+        block = np.clip(audio[start:start + CONVERT_BLOCK_SAMPLES], -1.0, 1.0)
+        np.multiply(block, PCM16_SCALE, out=out[start:start + len(block)], casting="unsafe")
+    return out
+
+
+def assemble_wav(segments: Sequence[np.ndarray], sample_rate: int, pause_samples: int = 0) -> memoryview:
+    """
+    Build a complete 16-bit PCM WAV file in a single pre-sized buffer.
+
+    Segments (float or int16) are written in place after the header with
+    ``pause_samples`` of silence between consecutive segments. The buffer is
+    zero-filled on allocation, so the pauses cost nothing to write.
+
+    Returns:
+        memoryview over the WAV bytes, which can be sent without another copy
+    """
+    total_samples = sum(len(segment) for segment in segments)
+    total_samples += pause_samples * max(0, len(segments) - 1)
+    data_size = total_samples * PCM16_SAMPLE_WIDTH
+
+    buffer = bytearray(WAV_HEADER_SIZE + data_size)
+    buffer[:WAV_HEADER_SIZE] = wav_header(sample_rate, data_size)
+    pcm = np.frombuffer(buffer, dtype="<i2", offset=WAV_HEADER_SIZE)
+
+    position = 0
+    for segment in segments:
+        to_pcm16(segment, out=pcm[position:position + len(segment)])
+        position += len(segment) + pause_samples
+    del pcm  # Release the export so the buffer is no longer pinned by numpy
+    return memoryview(buffer)
+
+
+def wav_header(sample_rate: int, data_size: Optional[int] = None, channels: int = 1) -> bytes:
+    """
+    Build a 44-byte RIFF/WAVE header for 16-bit PCM audio.
+
+    Args:
+        sample_rate: Sample rate in Hz
+        data_size: Size of the PCM data in bytes. If None, the header is
+            marked as streaming (maximum sizes), which browsers and most
+            decoders accept as "read until end of stream".
+        channels: Number of audio channels
+
+    Returns:
+        WAV header bytes
+    """
+    block_align = channels * PCM16_SAMPLE_WIDTH
+    byte_rate = sample_rate * block_align
+    if data_size is None:
+        data_size = STREAMING_DATA_SIZE - 36
+        riff_size = STREAMING_DATA_SIZE
+    else:
+        riff_size = 36 + data_size
+
+    return (
+        b"RIFF"
+        + struct.pack("<I", riff_size)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, 16)
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+def resample(audio: np.ndarray, orig_sample_rate: int, target_sample_rate: int) -> np.ndarray:
+    """
+    Resample audio with a polyphase filter.
+
+    Much cheaper than FFT resampling for the integer ratios between common
+    speech rates (e.g. 24 kHz -> 16 kHz is 2/3), and free of the wrap-around
+    artefacts FFT resampling introduces at segment edges.
+
+    Args:
+        audio: Float audio samples
+        orig_sample_rate: Sample rate of the input
+        target_sample_rate: Desired sample rate
+
+    Returns:
+        Resampled float32 audio
+    """
+    if orig_sample_rate == target_sample_rate or len(audio) == 0:
+        return audio
+    from scipy import signal
+
+    divisor = gcd(int(orig_sample_rate), int(target_sample_rate))
+    up = int(target_sample_rate) // divisor
+    down = int(orig_sample_rate) // divisor
+    return signal.resample_poly(audio, up, down).astype(np.float32, copy=False)
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str], default: str = "wav") -> str:
+    """
+    Pick the output format for a request.
+
+    An explicit format always wins. Otherwise the highest-weighted supported
+    media type in the Accept header is used, falling back to the default for
+    wildcards or headers that list no supported audio type.
+
+    Raises:
+        ValueError: If an explicitly requested format is not supported
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in OUTPUT_FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(OUTPUT_FORMATS)}")
+        return requested
+
+    best_format, best_quality = None, 0.0
+    for position, part in enumerate((accept or "").split(",")):
+        params = [p.strip() for p in part.split(";")]
+        media_type = params[0].lower()
+        quality = 1.0
+        codecs = None
+        for param in params[1:]:
+            name, _, value = param.partition("=")
+            name = name.strip().lower()
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+            elif name == "codecs":
+                codecs = value.strip().strip('"').lower()
+
+        fmt = ACCEPT_MEDIA_TYPES.get(media_type)
+        if media_type == "audio/ogg" and codecs and codecs != "opus":
+            fmt = None
+        # Earlier entries win ties, as in the header's own ordering
+        if fmt and quality > best_quality:
+            best_format, best_quality = fmt, quality
+
+    return best_format or default
+
+
+def validate_output_options(fmt: str, sample_rate: Optional[int], bit_depth: Optional[int]):
+    """
+    Check that a sample rate and bit depth are supported by a format.
+
+    Raises:
+        ValueError: If the combination cannot be encoded
+    """
+    spec = OUTPUT_FORMATS[fmt]
+    if sample_rate is not None and spec["sample_rates"] and sample_rate not in spec["sample_rates"]:
+        rates = ", ".join(str(rate) for rate in spec["sample_rates"])
+        raise ValueError(f"Sample rate for {fmt} must be one of: {rates}")
+    if bit_depth is not None and bit_depth not in spec["subtypes"]:
+        if None in spec["subtypes"]:
+            raise ValueError(f"Bit depth cannot be set for lossy format {fmt}")
+        depths = ", ".join(str(depth) for depth in spec["subtypes"])
+        raise ValueError(f"Bit depth for {fmt} must be one of: {depths}")
+
+
+class _EncoderSink(io.RawIOBase):
+    """
+    Write-only file object that hands encoded bytes out as they are produced.
+
+    libsndfile may seek back to patch a header when the file is closed. Bytes
+    that were already handed out cannot change, so the sink keeps everything
+    until drained and callers only drain streamable formats early.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._base = 0  # Absolute offset of _buffer[0]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = self._base + len(self._buffer) + offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        # libsndfile only reads back when opening existing files
+        return 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        start = self._position - self._base
+        if start < 0:
+            raise IOError("Encoder tried to rewrite audio that was already sent")
+        end = start + len(data)
+        if start > len(self._buffer):
+            self._buffer.extend(b"\x00" * (start - len(self._buffer)))
+        self._buffer[start:end] = data
+        self._position += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far"""
+        data = bytes(self._buffer)
+        self._base += len(data)
+        self._buffer = bytearray()
+        return data
+
+
+class AudioEncoder:
+    """
+    Incremental encoder for one audio response.
+
+    Feed float segments with write() as they are rendered and call close() at
+    the end. For streamable formats write() returns encoded bytes ready to
+    send; for the others the full file is returned by close(), because the
+    container header is only final once all audio has been seen.
+    """
+
+    def __init__(
+        self,
+        fmt: str,
+        source_sample_rate: int,
+        sample_rate: Optional[int] = None,
+        bit_depth: Optional[int] = None
+    ):
+        """
+        Args:
+            fmt: Output format (a key of OUTPUT_FORMATS)
+            source_sample_rate: Sample rate of the audio passed to write()
+            sample_rate: Output sample rate (None = keep the source rate)
+            bit_depth: PCM bit depth for wav/flac (None = 16)
+        """
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(OUTPUT_FORMATS)}")
+        validate_output_options(fmt, sample_rate, bit_depth)
+
+        spec = OUTPUT_FORMATS[fmt]
+        subtypes = spec["subtypes"]
+        subtype = subtypes.get(bit_depth or 16, subtypes.get(None))
+
+        self.format = fmt
+        self.media_type = spec["media_type"]
+        self.streamable = spec["streamable"]
+        self.source_sample_rate = source_sample_rate
+        self.sample_rate = sample_rate or source_sample_rate
+        self._sink = _EncoderSink()
+        self._file = sf.SoundFile(
+            self._sink, mode="w", samplerate=self.sample_rate, channels=1,
+            format=spec["container"], subtype=subtype
+        )
+        self.closed = False
+
+    def write(self, audio: np.ndarray) -> bytes:
+        """Encode a segment; returns bytes that can be sent now (may be empty)"""
+        audio = np.asarray(audio, dtype=np.float32)
+        audio = resample(audio, self.source_sample_rate, self.sample_rate)
+        if len(audio):
+            self._file.write(audio)
+        return self._sink.drain() if self.streamable else b""
+
+    def close(self) -> bytes:
+        """Flush the encoder; returns the remaining encoded bytes"""
+        if self.closed:
+            return b""
+        self.closed = True
+        self._file.close()
+        return self._sink.drain()
+
+
+def encode_audio(
+    audio: np.ndarray,
+    source_sample_rate: int,
+    fmt: str = "wav",
+    sample_rate: Optional[int] = None,
+    bit_depth: Optional[int] = None
+) -> Union[bytes, memoryview]:
+    """
+    Encode a complete clip in the requested format.
+
+    16-bit WAV is assembled directly into its output buffer; everything else
+    goes through libsndfile.
+
+    Returns:
+        Encoded file bytes (a memoryview for 16-bit WAV)
+    """
+    if fmt == "wav" and (bit_depth or 16) == 16:
+        validate_output_options(fmt, sample_rate, bit_depth)
+        if sample_rate:
+            audio = resample(audio, source_sample_rate, sample_rate)
+        return assemble_wav([audio], sample_rate or source_sample_rate)
+
+    encoder = AudioEncoder(fmt, source_sample_rate, sample_rate, bit_depth)
+    return encoder.write(audio) + encoder.close()
+
@@ -0,0 +1,267 @@
+"""
+Content-addressed cache for rendered TTS chunks.
+
+Long texts are rendered chunk by chunk, so caching at chunk granularity lets
+an edited text reuse the audio of every chunk that did not change. Entries are
+keyed by a hash of the normalized chunk text, voice, speed and model version,
+held in a byte-bounded in-memory LRU and optionally persisted to disk as
+compressed .npz files so they survive restarts. Disk entries expire after a
+TTL and are bounded by a byte quota with least-recently-used eviction, both
+tracked in a SQLite index (cache_index.py) and applied by sweep(), which
+CleanupScheduler runs periodically.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from cache_index import CacheIndex
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class AudioSegmentCache:
+    """Byte-bounded LRU of (audio, sample_rate) segments with an optional disk tier"""
+
+    # Namespace of the disk entries in the index
+    NAMESPACE = "tts_chunks"
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: Optional[int] = None,
+        ttl: Optional[int] = None
+    ):
+        """
+        Args:
+            max_memory_bytes: Byte budget of the in-memory tier
+            cache_dir: Directory of the disk tier (None = memory only)
+            max_disk_bytes: Quota of the disk tier; least recently used
+                entries are evicted beyond it (None = unbounded)
+            ttl: Seconds a disk entry stays valid (None = until evicted)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+        self.disk_expirations = 0
+        # Held by the one thread evicting beyond the disk quota
+        self._quota_lock = threading.Lock()
+        self.index: Optional[CacheIndex] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.index = CacheIndex(os.path.join(cache_dir, "index.db"))
+            if self.index.is_empty():
+                self._reindex()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace so formatting-only edits still hit the cache"""
+        return _WHITESPACE_RE.sub(" ", text).strip()
+
+    def make_key(self, text: str, voice: str, speed: float, model_version: str) -> str:
+        """Build the content address for a chunk"""
+        key_data = "\x1f".join([self.normalize_text(text), str(voice), f"{float(speed):.4f}", model_version])
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Get a cached segment, checking memory first and then disk"""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.cache_dir:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._remember(key, entry)
+                with self.lock:
+                    self.hits += 1
+                return entry
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, audio: np.ndarray, sample_rate: int):
+        """Store a rendered segment"""
+        audio = np.asarray(audio)
+        entry = (audio, int(sample_rate))
+        self._remember(key, entry)
+
+        if self.cache_dir:
+            self._write_disk(key, audio, int(sample_rate))
+
+    def _read_disk(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """Load a disk entry, or None if it is missing, expired or unreadable"""
+        path = self._disk_path(key)
+        now = time.time()
+        try:
+            if self.ttl and os.path.getmtime(path) + self.ttl <= now:
+                self._remove_entries([key])
+                with self.lock:
+                    self.disk_expirations += 1
+                return None
+            with np.load(path) as data:
+                entry = (data["audio"], int(data["sample_rate"]))
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError):
+            self._remove_entries([key])
+            return None
+        self.index.touch(key, now)
+        return entry
+
+    def _write_disk(self, key: str, audio: np.ndarray, sample_rate: int):
+        """Write a compressed disk entry atomically, then apply the quota"""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, audio=audio, sample_rate=np.int64(sample_rate))
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            # If disk write fails, at least we have memory cache
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        now = time.time()
+        self.index.record(key, self.NAMESPACE, size, now, now + self.ttl if self.ttl else float("inf"))
+        self._enforce_quota()
+
+    def _remove_entries(self, keys: List[str]):
+        """Delete disk entries and their index rows"""
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+        if keys:
+            self.index.remove(keys)
+
+    def _enforce_quota(self) -> int:
+        """
+        Evict least recently used disk entries beyond the disk quota.
+
+        Returns:
+            Number of evicted entries (0 if another thread is already evicting)
+        """
+        if not self.max_disk_bytes or self.index is None:
+            return 0
+        if not self._quota_lock.acquire(blocking=False):
+            return 0
+        try:
+            excess = self.index.total_bytes() - self.max_disk_bytes
+            if excess <= 0:
+                return 0
+            victims = self.index.least_recently_used(excess)
+            self._remove_entries(victims)
+        finally:
+            self._quota_lock.release()
+        with self.lock:
+            self.disk_evictions += len(victims)
+        return len(victims)
+
+    def sweep(self, limit: int = 1000) -> Dict[str, int]:
+        """
+        Remove expired disk entries and enforce the disk quota.
+
+        Args:
+            limit: Maximum number of expired entries removed per call
+
+        Returns:
+            dict: Number of expired and evicted entries
+        """
+        if self.index is None:
+            return {"expired": 0, "evicted": 0}
+        expired = self.index.expired(time.time(), limit)
+        self._remove_entries(expired)
+        with self.lock:
+            self.disk_expirations += len(expired)
+        return {"expired": len(expired), "evicted": self._enforce_quota()}
+
+    def _reindex(self):
+        """Index disk entries written before the index existed"""
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith(".npz"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                expires_at = stat.st_mtime + self.ttl if self.ttl else float("inf")
+                self.index.record(filename[:-len(".npz")], self.NAMESPACE, stat.st_size, stat.st_mtime, expires_at)
+
+    def _remember(self, key: str, entry: Tuple[np.ndarray, int]):
+        """Insert into the memory tier, evicting least recently used entries"""
+        size = entry[0].nbytes
+        if size > self.max_memory_bytes:
+            return
+        with self.lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0].nbytes
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_memory_bytes and self._entries:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self):
+        """Clear the memory tier and remove all files from the disk tier"""
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.index is not None:
+            self.index.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    if filename.endswith(".npz"):
+                        try:
+                            os.remove(os.path.join(root, filename))
+                        except OSError:
+                            pass
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        disk_entries, disk_bytes = 0, 0
+        if self.index is not None:
+            disk_entries, disk_bytes = self.index.namespace_usage().get(self.NAMESPACE, (0, 0))
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "cache_dir": self.cache_dir,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "disk_evictions": self.disk_evictions,
+                "disk_expirations": self.disk_expirations,
+            }
@@ -0,0 +1,234 @@
+"""
+Shared cache backends for CacheManager.
+
+A backend is a key/value store that every worker (and every node) can reach,
+sitting behind CacheManager's per-worker memory tier and per-host disk tier.
+Values are stored as bytes with a one-byte type tag, so audio is stored raw
+and other values as JSON, zstd-compressed when a codec is given, the key's
+namespace is not set to "raw" and the JSON is large enough to benefit. A
+backend that stops answering is skipped for a short cool-down; CacheManager
+then keeps serving from its local tiers.
+"""
+import json
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Any, Iterable, List, Optional, Tuple
+
+from cache_codecs import RAW, CacheCodec
+from cache_index import namespace_of
+from logger_config import logger
+
+# Try to import redis library (optional)
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    redis = None
+    HAS_REDIS = False
+
+_BINARY_TAG = b"B"
+_JSON_TAG = b"J"
+_COMPRESSED_JSON_TAG = b"Z"
+
+
+def encode_value(value: Any, codec: Optional[CacheCodec] = None, namespace: str = "") -> bytes:
+    """Serialize a cache value with its type tag, compressed as the namespace's codec says"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _BINARY_TAG + bytes(value)
+    data = json.dumps(value).encode("utf-8")
+    if codec is not None and codec.codec_for(namespace) != RAW:
+        compressed = codec.compress(data)
+        if compressed is not None:
+            return _COMPRESSED_JSON_TAG + compressed
+    return _JSON_TAG + data
+
+
+def decode_value(data: bytes, codec: Optional[CacheCodec] = None) -> Any:
+    """Inverse of encode_value()"""
+    tag, payload = data[:1], data[1:]
+    if tag == _BINARY_TAG:
+        return payload
+    if tag == _JSON_TAG:
+        return json.loads(payload.decode("utf-8"))
+    if tag == _COMPRESSED_JSON_TAG and codec is not None:
+        return json.loads(codec.decompress(payload).decode("utf-8"))
+    raise ValueError("Unknown cache value type")
+
+
+class CacheBackend(ABC):
+    """Interface of a shared cache backend"""
+
+    name = "backend"
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[Tuple[Any, float]]]:
+        """Get several (value, remaining_ttl_seconds) entries in one round trip (None for misses)"""
+
+    @abstractmethod
+    def set_many(self, items: Iterable[Tuple[str, Any, float]]):
+        """Store several (key, value, ttl_seconds) entries in one round trip"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove one key"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every key of this backend"""
+
+    def get(self, key: str) -> Optional[Any]:
+        found = self.get_many([key])[0]
+        return found[0] if found is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        self.set_many([(key, value, ttl)])
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def get_stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache backend for any server speaking the Redis protocol"""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "natural_speech:cache:",
+        client=None,
+        socket_timeout: float = 0.5,
+        retry_interval: float = 30.0,
+        codec: Optional[CacheCodec] = None
+    ):
+        """
+        Args:
+            url: Server URL (ignored when a client is given)
+            prefix: Namespace prepended to every key
+            client: Existing redis-py compatible client (e.g. fakeredis in tests)
+            socket_timeout: Seconds before a command is treated as failed
+            retry_interval: Seconds to skip the backend after a failure
+            codec: Optional zstd compression of large JSON values
+
+        Raises:
+            ImportError: If no client is given and the redis package is not installed
+        """
+        if client is None:
+            if not HAS_REDIS:
+                raise ImportError("The redis package is required for the Redis cache backend")
+            client = redis.Redis.from_url(
+                url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout
+            )
+        self.client = client
+        self.url = url
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self.codec = codec
+        self.lock = threading.Lock()
+        self._retry_at = 0.0
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, operation: str, error: Exception):
+        with self.lock:
+            self.errors += 1
+            first = self._retry_at <= time.monotonic()
+            self._retry_at = time.monotonic() + self.retry_interval
+        if first:
+            logger.warning(
+                f"Cache backend {self.url} unavailable ({operation}: {error}); "
+                f"using local cache for {self.retry_interval:.0f}s"
+            )
+
+    def get_many(self, keys: List[str]) -> List[Optional[Tuple[Any, float]]]:
+        if not keys or not self.available:
+            return [None] * len(keys)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(self.prefix + key)
+                pipe.pttl(self.prefix + key)
+            replies = pipe.execute()
+        except Exception as e:
+            self._failed("get", e)
+            return [None] * len(keys)
+
+        values = []
+        for raw, ttl_ms in zip(replies[::2], replies[1::2]):
+            # A key that expired between GET and PTTL reports a negative TTL
+            if raw is None or ttl_ms is None or ttl_ms <= 0:
+                values.append(None)
+                continue
+            try:
+                values.append((decode_value(raw, self.codec), ttl_ms / 1000.0))
+            except (ValueError, UnicodeDecodeError):
+                values.append(None)
+        with self.lock:
+            hits = sum(1 for value in values if value is not None)
+            self.hits += hits
+            self.misses += len(values) - hits
+        return values
+
+    def set_many(self, items: Iterable[Tuple[str, Any, float]]):
+        if not self.available:
+            return
+        encoded = []
+        for key, value, ttl in items:
+            try:
+                encoded.append((self.prefix + key, encode_value(value, self.codec, namespace_of(key)), max(1, int(ttl * 1000))))
+            except (TypeError, ValueError):
+                # Not serializable: the entry stays in the local tiers only
+                continue
+        if not encoded:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, data, ttl_ms in encoded:
+                pipe.set(key, data, px=ttl_ms)
+            pipe.execute()
+        except Exception as e:
+            self._failed("set", e)
+
+    def delete(self, key: str):
+        if not self.available:
+            return
+        try:
+            self.client.delete(self.prefix + key)
+        except Exception as e:
+            self._failed("delete", e)
+
+    def clear(self):
+        """Remove every key under this backend's prefix"""
+        if not self.available:
+            return
+        try:
+            batch = []
+            for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self.client.delete(*batch)
+                    batch = []
+            if batch:
+                self.client.delete(*batch)
+        except Exception as e:
+            self._failed("clear", e)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "backend": self.name,
+                "available": self.available,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+            }
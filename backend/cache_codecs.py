@@ -0,0 +1,299 @@
+"""
+Compression codecs for cached values.
+
+LLM output (speeches, prompt lists) and JSON listings compress well, so
+CacheManager passes the serialized bytes of non-audio values through a
+CacheCodec before they reach disk or the shared backend:
+
+- values of at least min_size bytes are compressed with zstd;
+- smaller values use a zstd dictionary trained per namespace from the first
+  few hundred values stored in it (plain zstd gains little on short JSON);
+- audio is stored raw: it hardly compresses, and raw files can be served
+  straight from disk.
+
+The codec is chosen per namespace ("zstd" or "raw"). Trained dictionaries
+are saved next to the cache, so entries written by one worker (or before a
+restart) can be decoded by any other.
+"""
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from logger_config import logger
+
+# Try to import zstandard library (optional)
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAS_ZSTD = False
+
+RAW = "raw"
+ZSTD = "zstd"
+ZSTD_DICT = "zstd-dict"
+
+
+def parse_namespace_codecs(spec: str) -> Dict[str, str]:
+    """Parse "tts=raw,speeches=zstd" into {namespace: codec}"""
+    codecs = {}
+    for item in spec.split(","):
+        if "=" in item:
+            namespace, codec = item.split("=", 1)
+            codecs[namespace.strip()] = codec.strip()
+    return codecs
+
+
+class _NamespaceStats:
+    __slots__ = ("values", "raw_bytes", "stored_bytes", "encode_seconds", "decodes", "decode_seconds")
+
+    def __init__(self):
+        self.values = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.encode_seconds = 0.0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+
+
+class CacheCodec:
+    """Per-namespace compression of serialized cache values"""
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        level: int = 3,
+        namespace_codecs: Optional[Dict[str, str]] = None,
+        default_codec: str = ZSTD,
+        dictionary_dir: Optional[str] = None,
+        dictionary_size: int = 16 * 1024,
+        dictionary_samples: int = 256
+    ):
+        """
+        Args:
+            min_size: Values of at least this many bytes are compressed with
+                plain zstd; smaller ones use the namespace's dictionary
+            level: zstd compression level
+            namespace_codecs: Codec per namespace ("zstd" or "raw")
+            default_codec: Codec of namespaces not listed
+            dictionary_dir: Where trained dictionaries are kept (None = no dictionaries)
+            dictionary_size: Target size of a trained dictionary in bytes
+            dictionary_samples: Small values collected before training
+        """
+        if not HAS_ZSTD and default_codec != RAW:
+            logger.warning("zstandard not installed; cached values are stored uncompressed")
+        self.min_size = min_size
+        self.level = level
+        self.namespace_codecs = dict(namespace_codecs or {})
+        self.default_codec = default_codec
+        self.dictionary_dir = dictionary_dir
+        self.dictionary_size = dictionary_size
+        self.dictionary_samples = dictionary_samples
+        self.lock = threading.Lock()
+        # dict_id -> zstandard.ZstdCompressionDict
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        # namespace -> dict_id of the dictionary used for new values
+        self._namespace_dictionary: Dict[str, int] = {}
+        self._samples: Dict[str, List[bytes]] = {}
+        self._stats: Dict[str, _NamespaceStats] = {}
+        # Compressors and decompressors are not thread-safe; keep one set per thread
+        self._local = threading.local()
+        if dictionary_dir and HAS_ZSTD:
+            os.makedirs(dictionary_dir, exist_ok=True)
+            self._load_dictionaries()
+
+    def codec_for(self, namespace: str) -> str:
+        codec = self.namespace_codecs.get(namespace, self.default_codec)
+        return codec if HAS_ZSTD else RAW
+
+    def encode(self, namespace: str, data: bytes) -> Tuple[str, Optional[int], bytes]:
+        """
+        Compress serialized value bytes for a namespace.
+
+        Returns:
+            (codec name, dictionary id or None, stored bytes)
+        """
+        if self.codec_for(namespace) == RAW:
+            return RAW, None, data
+        start = time.perf_counter()
+        codec, dict_id, payload = RAW, None, data
+        if len(data) >= self.min_size:
+            codec, payload = ZSTD, self._compressor(None).compress(data)
+        elif self.dictionary_dir:
+            with self.lock:
+                dict_id = self._namespace_dictionary.get(namespace)
+            if dict_id is not None:
+                codec, payload = ZSTD_DICT, self._compressor(dict_id).compress(data)
+            else:
+                self._collect_sample(namespace, data)
+        if len(payload) >= len(data):
+            # Not worth it (e.g. already random-looking data)
+            codec, dict_id, payload = RAW, None, data
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            stats = self._stats.setdefault(namespace, _NamespaceStats())
+            stats.values += 1
+            stats.raw_bytes += len(data)
+            stats.stored_bytes += len(payload)
+            stats.encode_seconds += elapsed
+        return codec, dict_id if codec == ZSTD_DICT else None, payload
+
+    def decode(self, namespace: str, codec: str, dict_id: Optional[int], payload: bytes) -> bytes:
+        """
+        Inverse of encode().
+
+        Raises:
+            ValueError: If the codec or dictionary is unavailable or the data is corrupt
+        """
+        if codec == RAW:
+            return payload
+        if not HAS_ZSTD:
+            raise ValueError(f"Cannot decode {codec} values without zstandard")
+        if codec not in (ZSTD, ZSTD_DICT):
+            raise ValueError(f"Unknown codec {codec}")
+        start = time.perf_counter()
+        try:
+            data = self._decompressor(dict_id if codec == ZSTD_DICT else None).decompress(payload)
+        except zstandard.ZstdError as e:
+            raise ValueError(str(e))
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            stats = self._stats.setdefault(namespace, _NamespaceStats())
+            stats.decodes += 1
+            stats.decode_seconds += elapsed
+        return data
+
+    def compress(self, data: bytes) -> Optional[bytes]:
+        """Plain zstd for values of at least min_size (None when not worth compressing)"""
+        if not HAS_ZSTD or len(data) < self.min_size:
+            return None
+        payload = self._compressor(None).compress(data)
+        return payload if len(payload) < len(data) else None
+
+    def decompress(self, payload: bytes) -> bytes:
+        return self.decode("", ZSTD, None, payload)
+
+    def _compressor(self, dict_id: Optional[int]):
+        compressors = getattr(self._local, "compressors", None)
+        if compressors is None:
+            compressors = self._local.compressors = {}
+        compressor = compressors.get(dict_id)
+        if compressor is None:
+            if dict_id is None:
+                compressor = zstandard.ZstdCompressor(level=self.level)
+            else:
+                compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._dictionary(dict_id))
+            compressors[dict_id] = compressor
+        return compressor
+
+    def _decompressor(self, dict_id: Optional[int]):
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id is None:
+                decompressor = zstandard.ZstdDecompressor()
+            else:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionary(dict_id))
+            decompressors[dict_id] = decompressor
+        return decompressor
+
+    def _dictionary(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        """A dictionary by id, loading one trained by another worker if needed"""
+        with self.lock:
+            dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            self._load_dictionaries()
+            with self.lock:
+                dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            raise ValueError(f"Unknown compression dictionary {dict_id}")
+        return dictionary
+
+    def _collect_sample(self, namespace: str, data: bytes):
+        """Keep a small value as training data; train once enough are collected"""
+        with self.lock:
+            if namespace in self._namespace_dictionary:
+                return
+            samples = self._samples.setdefault(namespace, [])
+            samples.append(data)
+            if len(samples) < self.dictionary_samples:
+                return
+            del self._samples[namespace]
+        self._train(namespace, samples)
+
+    def _train(self, namespace: str, samples: List[bytes]):
+        try:
+            dictionary = zstandard.train_dictionary(self.dictionary_size, samples, level=self.level)
+        except zstandard.ZstdError as e:
+            # Too little variety to train on; small values stay raw
+            logger.debug(f"Could not train a compression dictionary for {namespace}: {e}")
+            return
+        dict_id = dictionary.dict_id()
+        path = os.path.join(self.dictionary_dir, f"{namespace}-{dict_id}.dict")
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(dictionary.as_bytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # A dictionary other workers cannot load must not be used
+            logger.warning(f"Could not save compression dictionary for {namespace}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self.lock:
+            self._dictionaries[dict_id] = dictionary
+            self._namespace_dictionary[namespace] = dict_id
+        logger.info(f"Trained a {len(dictionary.as_bytes())} byte compression dictionary for {namespace}")
+
+    def _load_dictionaries(self):
+        """Load dictionaries from disk; the newest per namespace is used for new values"""
+        if not self.dictionary_dir or not os.path.isdir(self.dictionary_dir):
+            return
+        newest: Dict[str, Tuple[float, int]] = {}
+        for filename in os.listdir(self.dictionary_dir):
+            if not filename.endswith(".dict"):
+                continue
+            namespace, _, dict_id = filename[:-len(".dict")].rpartition("-")
+            path = os.path.join(self.dictionary_dir, filename)
+            try:
+                dict_id = int(dict_id)
+                with open(path, "rb") as f:
+                    dictionary = zstandard.ZstdCompressionDict(f.read())
+                mtime = os.path.getmtime(path)
+            except (OSError, ValueError):
+                continue
+            with self.lock:
+                self._dictionaries.setdefault(dict_id, dictionary)
+            if namespace not in newest or mtime > newest[namespace][0]:
+                newest[namespace] = (mtime, dict_id)
+        with self.lock:
+            for namespace, (_, dict_id) in newest.items():
+                self._namespace_dictionary.setdefault(namespace, dict_id)
+
+    def get_stats(self) -> dict:
+        """Compression ratio and CPU cost per namespace"""
+        with self.lock:
+            namespaces = {}
+            for namespace, stats in sorted(self._stats.items()):
+                namespaces[namespace] = {
+                    "codec": self.codec_for(namespace),
+                    "dictionary": namespace in self._namespace_dictionary,
+                    "values": stats.values,
+                    "raw_bytes": stats.raw_bytes,
+                    "stored_bytes": stats.stored_bytes,
+                    "ratio": stats.raw_bytes / stats.stored_bytes if stats.stored_bytes else 1.0,
+                    "encode_ms": stats.encode_seconds * 1000,
+                    "decode_ms": stats.decode_seconds * 1000,
+                    "decodes": stats.decodes,
+                }
+            return {
+                "available": HAS_ZSTD,
+                "min_size": self.min_size,
+                "level": self.level,
+                "namespaces": namespaces,
+            }
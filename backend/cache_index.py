@@ -0,0 +1,164 @@
+"""
+SQLite index of CacheManager's disk tier.
+
+One row per disk entry (hashed key, namespace, size, created, expiry, last
+access), shared by every worker on the host through one SQLite file. It lets
+the cache enforce a disk byte quota by evicting the least recently used
+entries, sweep expired entries without walking the cache directory, and
+report disk usage per namespace.
+
+The index is usually created at import time, before gunicorn forks its
+preloaded workers, and an SQLite connection must not be shared across a
+fork. Each process therefore opens its own connection on first use.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def namespace_of(key: str) -> str:
+    """Namespace of a cache key: "tts:..." -> "tts", "voices_list" -> "voices" """
+    if ":" in key:
+        return key.split(":", 1)[0]
+    return key.split("_", 1)[0]
+
+
+class CacheIndex:
+    """Index of disk cache entries with LRU and expiry queries"""
+
+    # Last-access updates are buffered and written in batches of this size
+    TOUCH_BATCH = 64
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self._touches: Dict[str, float] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._inherited: List[sqlite3.Connection] = []
+        # Create the schema on a short-lived connection, so none is inherited by forks
+        db = self._connect()
+        try:
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    digest TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires_at ON entries (expires_at)")
+            db.commit()
+        finally:
+            db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use after a fork (lock held)"""
+        pid = os.getpid()
+        if self._pid != pid:
+            if self._db is not None:
+                # Closing the parent's connection here could checkpoint or
+                # delete its WAL under it; keep it referenced and unused
+                self._inherited.append(self._db)
+            self._db = self._connect()
+            self._pid = pid
+        return self._db
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+
+    def record(self, digest: str, namespace: str, size: int, created_at: float, expires_at: float):
+        """Add or replace the row for a written entry"""
+        with self.lock:
+            self._touches.pop(digest, None)
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, namespace, size, created_at, expires_at, created_at)
+            )
+            self.db.commit()
+
+    def touch(self, digest: str, now: Optional[float] = None):
+        """Note an access; written to SQLite in batches"""
+        with self.lock:
+            self._touches[digest] = now or time.time()
+            if len(self._touches) >= self.TOUCH_BATCH:
+                self._flush_touches()
+
+    def _flush_touches(self):
+        """Write buffered accesses (lock held)"""
+        if not self._touches:
+            return
+        self.db.executemany(
+            "UPDATE entries SET last_access = ? WHERE digest = ? AND last_access < ?",
+            [(ts, digest, ts) for digest, ts in self._touches.items()]
+        )
+        self.db.commit()
+        self._touches.clear()
+
+    def remove(self, digests: List[str]):
+        with self.lock:
+            for digest in digests:
+                self._touches.pop(digest, None)
+            self.db.executemany("DELETE FROM entries WHERE digest = ?", [(d,) for d in digests])
+            self.db.commit()
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def least_recently_used(self, bytes_to_free: int) -> List[str]:
+        """Oldest-accessed entries whose sizes add up to at least bytes_to_free"""
+        digests = []
+        freed = 0
+        with self.lock:
+            self._flush_touches()
+            cursor = self.db.execute("SELECT digest, size FROM entries ORDER BY last_access")
+            for digest, size in cursor:
+                if freed >= bytes_to_free:
+                    break
+                digests.append(digest)
+                freed += size
+        return digests
+
+    def expired(self, now: float, limit: int = 1000) -> List[str]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT digest FROM entries WHERE expires_at <= ? LIMIT ?", (now, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def all_digests(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT digest FROM entries")]
+
+    def namespace_usage(self) -> Dict[str, Tuple[int, int]]:
+        """Disk usage per namespace as {namespace: (entries, bytes)}"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace"
+            ).fetchall()
+        return {namespace: (entries, size) for namespace, entries, size in rows}
+
+    def clear(self):
+        with self.lock:
+            self._touches.clear()
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
@@ -1,124 +1,701 @@
 """
 Caching system for voices list and audio generations.
-Uses in-memory cache with optional Redis support.
+Uses a byte-bounded in-memory LRU in front of a content-addressed disk cache,
+optionally backed by a shared backend (see cache_backends.py) so that all
+workers and nodes see each other's results.
+
+Disk entries are addressed by a hash of the key and sharded into
+subdirectories. Each entry is a raw blob (the audio file itself, or the JSON
+encoding of other values) plus a small JSON header with its kind, size and
+expiry. Both are written to a temporary file and renamed into place, so
+readers in any worker see either the old entry or the complete new one.
+Cached audio can be served straight from disk (get_file() / FileResponse or
+an mmap from get()), and audio that reached disk is not duplicated in each
+worker's memory tier: the OS page cache already shares it. A SQLite index of
+the disk entries (cache_index.py) enforces the disk quota, drives the
+background sweep of expired entries and reports usage per namespace.
+
+The memory tier is split into stripes selected by key hash, each with its
+own lock, LRU and byte budget, and the locks only guard dictionary updates:
+disk and backend I/O happen outside them. Writes to the keys of a stripe are
+ordered by a separate per-stripe write lock that lookups never take.
+Concurrent misses for the same key share one disk/backend lookup, and with
+get_or_set() one computation of the value.
+
+Non-audio values can be compressed on disk by a CacheCodec (cache_codecs.py),
+chosen per namespace; the header records the codec so any worker can decode.
 """
 import hashlib
 import json
+import mmap
 import os
+import sys
 import time
-from typing import Optional, Dict, Any
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional, Any, Callable, Dict, List, Tuple
 from functools import wraps
 import threading
 
+from cache_backends import CacheBackend
+from cache_codecs import RAW, CacheCodec
+from cache_index import CacheIndex, namespace_of
+
+_MISS = object()
+
+# Smallest byte budget worth a stripe of its own; small caches keep one exact LRU
+_MIN_STRIPE_BYTES = 1024 * 1024
+
+
+class _MemoryStripe:
+    """One shard of the memory tier: an LRU with its own byte budget, counters and locks"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # Guards everything below; never held during I/O
+        self.lock = threading.Lock()
+        # Orders writes and invalidations of this stripe's keys, including their disk I/O
+        self.write_lock = threading.Lock()
+        # key -> (value, expires_at, size_bytes), least recently used first
+        self.entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.bytes = 0
+        # Bumped by every write, so a lookup racing with one does not cache stale data
+        self.generation = 0
+        # In-flight lookups and computations, keyed by (operation, key)
+        self.inflight: Dict[Tuple[str, str], Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        # namespace -> [hits, misses]
+        self.namespace_stats: Dict[str, List[int]] = {}
+    
+    def remember(self, key: str, value: Any, expires_at: float, size: int):
+        """Insert an entry and evict down to the byte budget (lock held)"""
+        self.forget(key)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, expires_at, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and self.entries:
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+    
+    def forget(self, key: str):
+        """Drop an entry, keeping the byte count in step (lock held)"""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+    
+    def record(self, key: str, hit: bool):
+        """Count a lookup in the totals and its namespace (lock held)"""
+        counts = self.namespace_stats.setdefault(namespace_of(key), [0, 0])
+        if hit:
+            self.hits += 1
+            counts[0] += 1
+        else:
+            self.misses += 1
+            counts[1] += 1
+
+
 class CacheManager:
     """Manages caching for API responses and generated content"""
     
-    def __init__(self, cache_dir: str = "cache", ttl: int = 3600):
+    def __init__(
+        self,
+        cache_dir: str = "cache",
+        ttl: int = 3600,
+        max_memory_bytes: int = 128 * 1024 * 1024,
+        backend: Optional[CacheBackend] = None,
+        max_disk_bytes: Optional[int] = None,
+        memory_stripes: Optional[int] = None,
+        codec: Optional[CacheCodec] = None
+    ):
+        """
+        Args:
+            cache_dir: Directory for the file cache
+            ttl: Default time to live in seconds
+            max_memory_bytes: Byte budget of the in-memory tier; least
+                recently used entries are evicted beyond it
+            backend: Optional shared backend consulted after the local tiers.
+                While it is unavailable, only the local tiers are used.
+            max_disk_bytes: Quota of the disk tier; least recently used
+                entries are evicted beyond it (None = unbounded)
+            memory_stripes: Number of independently locked shards of the
+                memory tier, each with an equal part of the byte budget
+                (default: up to 16, at least 1 MB each)
+            codec: Optional compression of non-audio values on disk
+        """
         self.cache_dir = cache_dir
-        self.ttl = ttl  # Time to live in seconds
-        self.memory_cache: Dict[str, tuple] = {}  # key -> (value, timestamp)
+        self.ttl = ttl  # Default time to live in seconds
+        self.max_memory_bytes = max_memory_bytes
+        if memory_stripes is None:
+            memory_stripes = max(1, min(16, max_memory_bytes // _MIN_STRIPE_BYTES))
+        self._stripes = [
+            _MemoryStripe(max_memory_bytes // memory_stripes) for _ in range(memory_stripes)
+        ]
+        self.max_disk_bytes = max_disk_bytes
+        self.backend = backend
+        self.codec = codec
+        # Guards the disk-wide counters below
         self.lock = threading.Lock()
+        self.disk_evictions = 0
+        self.disk_expirations = 0
+        # Held by the one thread evicting beyond the disk quota
+        self._quota_lock = threading.Lock()
         os.makedirs(cache_dir, exist_ok=True)
+        self.index = CacheIndex(os.path.join(cache_dir, "index.db"))
+        if self.index.is_empty():
+            self._reindex()
+    
+    def _stripe(self, key: str) -> _MemoryStripe:
+        return self._stripes[hash(key) % len(self._stripes)]
+    
+    @property
+    def memory_cache(self) -> Dict[str, Tuple[Any, float, int]]:
+        """Snapshot of the memory tier across stripes"""
+        snapshot = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                snapshot.update(stripe.entries)
+        return snapshot
+    
+    @staticmethod
+    def _sizeof(value: Any) -> int:
+        """Approximate the memory held by a cached value"""
+        if isinstance(value, memoryview):
+            return value.nbytes
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, str):
+            return len(value.encode("utf-8"))
+        try:
+            return len(json.dumps(value))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+    
+    def _remember(self, key: str, value: Any, expires_at: float):
+        """Insert into the memory tier, evicting down to the stripe's byte budget"""
+        size = self._sizeof(value)
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.remember(key, value, expires_at, size)
+    
+    def _record(self, key: str, hit: bool):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.record(key, hit)
+    
+    def _coalesced(self, operation: str, key: str, func: Callable, *args) -> Tuple[Any, bool]:
+        """
+        Run func(*args) once for all concurrent callers with the same
+        operation and key; the others wait for its result (or exception).
+        
+        Returns:
+            (result, True if this caller ran func)
+        """
+        stripe = self._stripe(key)
+        flight_key = (operation, key)
+        with stripe.lock:
+            future = stripe.inflight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = stripe.inflight[flight_key] = Future()
+            else:
+                stripe.coalesced += 1
+        if not leader:
+            return future.result(), False
+        try:
+            result = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            with stripe.lock:
+                stripe.inflight.pop(flight_key, None)
     
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate a cache key from arguments"""
         key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True)
         return hashlib.md5(key_data.encode()).hexdigest()
     
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    def _entry_paths(self, digest: str) -> Tuple[str, str]:
+        """Blob and header paths of an entry: <cache_dir>/<digest[:2]>/<digest>.bin|.meta"""
+        base = os.path.join(self.cache_dir, digest[:2], digest)
+        return f"{base}.bin", f"{base}.meta"
+    
+    def _disk_paths(self, key: str) -> Tuple[str, str]:
+        return self._entry_paths(self._digest(key))
+    
+    def _remove_entries(self, digests: List[str]):
+        """Delete disk entries and their index rows, header first"""
+        for digest in digests:
+            blob_path, meta_path = self._entry_paths(digest)
+            self._remove_files(meta_path, blob_path)
+        if digests:
+            self.index.remove(digests)
+    
+    @staticmethod
+    def _write_atomically(path: str, data):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    @staticmethod
+    def _remove_files(*paths: str):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _read_header(self, key: str, now: float, count_expiry: bool = True) -> Optional[dict]:
+        """
+        Read a disk entry's header, or None if it is missing, expired or
+        inconsistent with its blob (expired and broken entries are removed).
+        """
+        digest = self._digest(key)
+        blob_path, meta_path = self._entry_paths(digest)
+        try:
+            with open(meta_path, "r") as f:
+                header = json.load(f)
+            if header["key"] != key:
+                return None
+            if now >= header["expires_at"]:
+                self._remove_entries([digest])
+                if count_expiry:
+                    stripe = self._stripe(key)
+                    with stripe.lock:
+                        stripe.expirations += 1
+                return None
+            if os.path.getsize(blob_path) != header["size"]:
+                # Blob replaced by a concurrent write whose header is not in place yet
+                return None
+            self.index.touch(digest, now)
+            return header
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, TypeError, OSError):
+            self._remove_entries([digest])
+            return None
+    
+    def _read_blob(self, key: str, path: str, header: dict) -> Any:
+        """Load a blob: JSON values are decoded, binary values are memory-mapped"""
+        with open(path, "rb") as f:
+            if header["kind"] == "json":
+                data = f.read()
+                codec = header.get("codec", RAW)
+                if codec != RAW:
+                    if self.codec is None:
+                        raise ValueError(f"No codec configured to decode {codec} entries")
+                    data = self.codec.decode(namespace_of(key), codec, header.get("dict_id"), data)
+                return json.loads(data)
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            # The mapping stays valid after the file is replaced or removed
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
     def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired"""
-        with self.lock:
-            # Check memory cache first
-            if key in self.memory_cache:
-                value, timestamp = self.memory_cache[key]
-                if time.time() - timestamp < self.ttl:
-                    return value
-                else:
-                    # Expired, remove it
-                    del self.memory_cache[key]
-            
-            # Check file cache
-            cache_file = os.path.join(self.cache_dir, f"{key}.cache")
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, 'r') as f:
-                        data = json.load(f)
-                        if time.time() - data['timestamp'] < self.ttl:
-                            # Also store in memory cache
-                            self.memory_cache[key] = (data['value'], data['timestamp'])
-                            return data['value']
-                        else:
-                            # Expired, remove file
-                            os.remove(cache_file)
-                except (json.JSONDecodeError, KeyError, IOError):
-                    # Corrupted cache file, remove it
-                    if os.path.exists(cache_file):
-                        os.remove(cache_file)
+        """
+        Get value from cache if not expired.
         
+        Binary values found on disk are returned as a read-only memoryview
+        over a memory map of the cached file. Values found only in the shared
+        backend are copied into the local tiers. Concurrent misses for the
+        same key share one disk and backend lookup.
+        """
+        now = time.time()
+        value, generation, memory_expired = self._get_memory(key, now)
+        if value is not _MISS:
+            return value
+        value, leader = self._coalesced("get", key, self._load, key, now, generation, memory_expired)
+        if not leader:
+            self._record(key, value is not None)
+        return value
+    
+    def _load(self, key: str, now: float, generation: int, memory_expired: bool) -> Optional[Any]:
+        """Look a memory miss up on disk, then in the backend (the miss is counted here)"""
+        value = self._get_disk(key, now, generation, count_expiry=not memory_expired)
+        if value is not _MISS:
+            return value
+        if self.backend is not None:
+            found = self.backend.get_many([key])[0]
+            if found is not None:
+                return self._adopt(key, *found)
+        self._record(key, False)
         return None
     
-    def set(self, key: str, value: Any):
-        """Store value in cache"""
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values, fetching all local misses from the shared
+        backend in one round trip.
+        
+        Returns:
+            Dict of the keys that were found
+        """
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            value = self._get_local(key)
+            if value is _MISS:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing and self.backend is not None:
+            for key, result in zip(missing, self.backend.get_many(missing)):
+                if result is not None:
+                    found[key] = self._adopt(key, *result)
+        for key in missing:
+            if key not in found:
+                self._record(key, False)
+        return found
+    
+    def _adopt(self, key: str, value: Any, ttl: float) -> Any:
+        """Copy a backend hit into the local tiers and return it as get() would"""
+        self._record(key, True)
+        self._store_local(key, value, time.time(), time.time() + ttl)
+        return value
+    
+    def _get_local(self, key: str) -> Any:
+        """Look a key up in the memory and disk tiers (_MISS if absent; misses are not counted)"""
+        now = time.time()
+        value, generation, memory_expired = self._get_memory(key, now)
+        if value is _MISS:
+            value = self._get_disk(key, now, generation, count_expiry=not memory_expired)
+        return value
+    
+    def _get_memory(self, key: str, now: float) -> Tuple[Any, int, bool]:
+        """
+        Look a key up in the memory tier.
+        
+        Returns:
+            (value or _MISS, the stripe's write generation, whether an expired entry was dropped)
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is None:
+                return _MISS, stripe.generation, False
+            if now < entry[1]:
+                stripe.entries.move_to_end(key)
+                stripe.record(key, True)
+                return entry[0], stripe.generation, False
+            # Expired, remove it
+            stripe.forget(key)
+            stripe.expirations += 1
+            return _MISS, stripe.generation, True
+    
+    def _get_disk(self, key: str, now: float, generation: int, count_expiry: bool = True) -> Any:
+        """
+        Look a key up in the disk tier without holding any lock (_MISS if absent).
+        
+        JSON values are copied into memory unless a write to the stripe
+        happened since `generation`, which could make the value read stale.
+        """
+        header = self._read_header(key, now, count_expiry=count_expiry)
+        if header is None:
+            return _MISS
+        blob_path, _ = self._disk_paths(key)
+        try:
+            value = self._read_blob(key, blob_path, header)
+        except (OSError, ValueError):
+            self._remove_entries([self._digest(key)])
+            return _MISS
+        size = self._sizeof(value) if header["kind"] == "json" else 0
+        stripe = self._stripe(key)
+        with stripe.lock:
+            if header["kind"] == "json" and stripe.generation == generation:
+                stripe.remember(key, value, header["expires_at"], size)
+            stripe.record(key, True)
+        return value
+    
+    def get_file(self, key: str) -> Optional[str]:
+        """
+        Get the path of a cached binary value on disk, for serving it with
+        FileResponse without reading it into memory.
+        
+        Returns:
+            Path of the blob, or None if the key has no fresh binary disk entry
+        """
+        header = self._read_header(key, time.time())
+        if header is None or header["kind"] != "bytes":
+            return None
+        self._record(key, True)
+        return self._disk_paths(key)[0]
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """
+        Store value in cache.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time to live in seconds for this entry (default: the cache's ttl)
+        """
         timestamp = time.time()
+        ttl = ttl or self.ttl
         
-        with self.lock:
-            # Store in memory cache
-            self.memory_cache[key] = (value, timestamp)
-            
-            # Store in file cache
-            cache_file = os.path.join(self.cache_dir, f"{key}.cache")
-            try:
-                with open(cache_file, 'w') as f:
-                    json.dump({"value": value, "timestamp": timestamp}, f)
-            except IOError:
-                # If file write fails, at least we have memory cache
-                pass
+        self._store_local(key, value, timestamp, timestamp + ttl)
+        
+        if self.backend is not None:
+            self.backend.set(key, value, ttl)
+    
+    def get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        Get a value, computing and storing it with loader() on a miss.
+        
+        Concurrent misses for the same key wait for a single loader() call
+        instead of each computing the value. None results are not stored.
+        
+        Args:
+            key: Cache key
+            loader: Computes the value
+            ttl: Time to live in seconds for a computed entry
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        def load():
+            # A caller that just finished loading may have stored it meanwhile
+            cached = self._get_local(key)
+            if cached is not _MISS:
+                return cached
+            result = loader()
+            if result is not None:
+                self.set(key, result, ttl=ttl)
+            return result
+        
+        return self._coalesced("load", key, load)[0]
+    
+    def _store_local(self, key: str, value: Any, timestamp: float, expires_at: float):
+        """Store a value in the disk and memory tiers"""
+        binary = isinstance(value, (bytes, bytearray, memoryview))
+        size = self._sizeof(value)
+        stripe = self._stripe(key)
+        with stripe.write_lock:
+            written = self._write_entry(key, value, binary, timestamp, expires_at)
+            # Store in memory cache; audio on disk is shared through the page cache instead
+            with stripe.lock:
+                stripe.generation += 1
+                if binary and written:
+                    stripe.forget(key)
+                else:
+                    stripe.remember(key, value, expires_at, size)
+        if written:
+            self._enforce_quota()
+    
+    def _write_entry(self, key: str, value: Any, binary: bool, timestamp: float, expires_at: float) -> bool:
+        """Write a disk entry and its index row; blob first, so a visible header always has its blob"""
+        digest = self._digest(key)
+        blob_path, meta_path = self._entry_paths(digest)
+        try:
+            codec, dict_id = RAW, None
+            if binary:
+                blob = value
+            else:
+                blob = json.dumps(value).encode("utf-8")
+                if self.codec is not None:
+                    codec, dict_id, blob = self.codec.encode(namespace_of(key), blob)
+            header = {
+                "key": key,
+                "kind": "bytes" if binary else "json",
+                "size": memoryview(blob).nbytes,
+                "created_at": timestamp,
+                "expires_at": expires_at,
+            }
+            if codec != RAW:
+                header["codec"] = codec
+                if dict_id is not None:
+                    header["dict_id"] = dict_id
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            self._write_atomically(blob_path, blob)
+            self._write_atomically(meta_path, json.dumps(header).encode("utf-8"))
+        except (OSError, TypeError, ValueError):
+            # If disk write fails, at least we have memory cache
+            return False
+        self.index.record(digest, namespace_of(key), header["size"], timestamp, expires_at)
+        return True
     
     def invalidate(self, key: str):
         """Remove a specific cache entry"""
-        with self.lock:
-            # Remove from memory
-            if key in self.memory_cache:
-                del self.memory_cache[key]
-            
-            # Remove from file
-            cache_file = os.path.join(self.cache_dir, f"{key}.cache")
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+        stripe = self._stripe(key)
+        with stripe.write_lock:
+            # Remove from disk (header first), then from memory
+            self._remove_entries([self._digest(key)])
+            with stripe.lock:
+                stripe.generation += 1
+                stripe.forget(key)
+        
+        if self.backend is not None:
+            self.backend.delete(key)
     
     def clear(self):
         """Clear all cache"""
-        with self.lock:
-            self.memory_cache.clear()
-            
-            # Remove all cache files
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.cache'):
-                    os.remove(os.path.join(self.cache_dir, filename))
+        self.index.clear()
+        
+        # Remove all cache files (including the flat files of the old layout).
+        # Entries are replaced atomically, so this needs no lock.
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if filename.endswith(('.bin', '.meta', '.cache')):
+                    self._remove_files(os.path.join(root, filename))
+        
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.generation += 1
+                stripe.entries.clear()
+                stripe.bytes = 0
+        
+        if self.backend is not None:
+            self.backend.clear()
     
     def cache_result(self, ttl: Optional[int] = None):
-        """Decorator to cache function results"""
+        """Decorator to cache function results; concurrent misses compute once"""
         def decorator(func):
             @wraps(func)
             def wrapper(*args, **kwargs):
                 cache_ttl = ttl or self.ttl
                 key = f"{func.__name__}:{self._generate_key(*args, **kwargs)}"
-                
-                # Try to get from cache
-                cached = self.get(key)
-                if cached is not None:
-                    return cached
-                
-                # Compute result
-                result = func(*args, **kwargs)
-                
-                # Store in cache
-                original_ttl = self.ttl
-                self.ttl = cache_ttl
-                self.set(key, result)
-                self.ttl = original_ttl
-                
-                return result
+                return self.get_or_set(key, lambda: func(*args, **kwargs), ttl=cache_ttl)
             return wrapper
         return decorator
-
+    
+    def _enforce_quota(self) -> int:
+        """
+        Evict least recently used disk entries beyond the disk quota.
+        
+        Returns:
+            Number of evicted entries (0 if another thread is already evicting)
+        """
+        if not self.max_disk_bytes:
+            return 0
+        if not self._quota_lock.acquire(blocking=False):
+            return 0
+        try:
+            excess = self.index.total_bytes() - self.max_disk_bytes
+            if excess <= 0:
+                return 0
+            victims = self.index.least_recently_used(excess)
+            self._remove_entries(victims)
+        finally:
+            self._quota_lock.release()
+        with self.lock:
+            self.disk_evictions += len(victims)
+        return len(victims)
+    
+    def sweep(self, limit: int = 1000) -> Dict[str, int]:
+        """
+        Remove expired entries from both tiers and enforce the disk quota.
+        
+        Called periodically by CleanupScheduler, so expired entries do not
+        wait for a lookup of their key.
+        
+        Args:
+            limit: Maximum number of expired disk entries removed per call
+            
+        Returns:
+            dict: Number of expired and evicted entries
+        """
+        now = time.time()
+        memory_expired = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                expired_keys = [key for key, entry in stripe.entries.items() if now >= entry[1]]
+                for key in expired_keys:
+                    stripe.forget(key)
+                stripe.expirations += len(expired_keys)
+            memory_expired += len(expired_keys)
+        expired = self.index.expired(now, limit)
+        self._remove_entries(expired)
+        with self.lock:
+            self.disk_expirations += len(expired)
+        return {
+            "expired": memory_expired + len(expired),
+            "evicted": self._enforce_quota(),
+        }
+    
+    def _reindex(self):
+        """Index disk entries written before the index existed"""
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith(".meta"):
+                    continue
+                try:
+                    with open(os.path.join(root, filename), "r") as f:
+                        header = json.load(f)
+                    self.index.record(
+                        filename[:-len(".meta")], namespace_of(header["key"]), header["size"],
+                        header["created_at"], header["expires_at"]
+                    )
+                except (OSError, json.JSONDecodeError, KeyError, TypeError):
+                    continue
+    
+    def get_stats(self) -> dict:
+        """Get cache statistics, overall and per namespace"""
+        usage = self.index.namespace_usage()
+        totals = {"entries": 0, "bytes": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "coalesced": 0}
+        namespace_stats: Dict[str, List[int]] = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                totals["entries"] += len(stripe.entries)
+                totals["bytes"] += stripe.bytes
+                totals["hits"] += stripe.hits
+                totals["misses"] += stripe.misses
+                totals["evictions"] += stripe.evictions
+                totals["expirations"] += stripe.expirations
+                totals["coalesced"] += stripe.coalesced
+                for namespace, (hits, misses) in stripe.namespace_stats.items():
+                    counts = namespace_stats.setdefault(namespace, [0, 0])
+                    counts[0] += hits
+                    counts[1] += misses
+        with self.lock:
+            disk_evictions = self.disk_evictions
+            totals["expirations"] += self.disk_expirations
+        
+        namespaces = {}
+        for namespace in sorted(set(namespace_stats) | set(usage)):
+            hits, misses = namespace_stats.get(namespace, (0, 0))
+            disk_entries, disk_bytes = usage.get(namespace, (0, 0))
+            namespaces[namespace] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "memory_entries": totals["entries"],
+            "memory_bytes": totals["bytes"],
+            "max_memory_bytes": self.max_memory_bytes,
+            "memory_stripes": len(self._stripes),
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "hit_ratio": totals["hits"] / lookups if lookups else 0.0,
+            "coalesced": totals["coalesced"],
+            "evictions": totals["evictions"],
+            "expirations": totals["expirations"],
+            "disk_entries": sum(entries for entries, _ in usage.values()),
+            "disk_bytes": sum(size for _, size in usage.values()),
+            "max_disk_bytes": self.max_disk_bytes,
+            "disk_evictions": disk_evictions,
+            "namespaces": namespaces,
+            "compression": self.codec.get_stats() if self.codec is not None else None,
+            "backend": self.backend.get_stats() if self.backend is not None else None,
+        }
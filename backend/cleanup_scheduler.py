@@ -7,7 +7,9 @@ import time
 from typing import Optional
 from job_tracker import JobTracker
 from cache_manager import CacheManager
+from audio_segment_cache import AudioSegmentCache
 from rate_limiter import RateLimiter
+from conversation_sessions import ConversationSessionStore
 
 class CleanupScheduler:
     """Schedules periodic cleanup tasks"""
@@ -18,13 +20,19 @@ class CleanupScheduler:
         cache_manager: CacheManager,
         rate_limiter: Optional[RateLimiter] = None,
         temp_dir: str = "temp",
-        cleanup_interval: int = 3600  # 1 hour
+        cleanup_interval: int = 3600,  # 1 hour
+        cache_sweep_interval: int = 300,  # 5 minutes
+        segment_cache: Optional[AudioSegmentCache] = None,
+        session_store: Optional[ConversationSessionStore] = None
     ):
         self.job_tracker = job_tracker
         self.cache_manager = cache_manager
         self.rate_limiter = rate_limiter
         self.temp_dir = temp_dir
         self.cleanup_interval = cleanup_interval
+        self.cache_sweep_interval = cache_sweep_interval
+        self.segment_cache = segment_cache
+        self.session_store = session_store
         self.running = False
         self.thread: Optional[threading.Thread] = None
         self.lock = threading.Lock()
@@ -48,28 +56,60 @@ class CleanupScheduler:
     
     def _run(self):
         """Main cleanup loop"""
+        next_cleanup = 0.0
+        next_sweep = 0.0
         while self.running:
+            now = time.time()
+            if now >= next_cleanup:
+                self._cleanup()
+                next_cleanup = now + self.cleanup_interval
+            if now >= next_sweep:
+                self._sweep_cache()
+                self._sweep_sessions()
+                next_sweep = now + self.cache_sweep_interval
+            time.sleep(1)
+    
+    def _cleanup(self):
+        """Remove old jobs, rate limiter buckets and temporary files"""
+        try:
+            # Cleanup old jobs (older than 7 days)
+            deleted_jobs = self.job_tracker.cleanup_old_jobs(days=7)
+            if deleted_jobs > 0:
+                print(f"Cleaned up {deleted_jobs} old jobs")
+            
+            # Cleanup rate limiter buckets
+            if self.rate_limiter:
+                self.rate_limiter.cleanup_old_buckets(max_age_seconds=3600)
+            
+            # Cleanup temporary files
+            self._cleanup_temp_files()
+            
+        except Exception as e:
+            print(f"Error during cleanup: {e}")
+    
+    def _sweep_cache(self):
+        """Remove expired cache entries and enforce the disk quotas"""
+        caches = [("Cache", self.cache_manager)]
+        if self.segment_cache:
+            caches.append(("TTS chunk cache", self.segment_cache))
+        for name, cache in caches:
             try:
-                # Cleanup old jobs (older than 7 days)
-                deleted_jobs = self.job_tracker.cleanup_old_jobs(days=7)
-                if deleted_jobs > 0:
-                    print(f"Cleaned up {deleted_jobs} old jobs")
-                
-                # Cleanup rate limiter buckets
-                if self.rate_limiter:
-                    self.rate_limiter.cleanup_old_buckets(max_age_seconds=3600)
-                
-                # Cleanup temporary files
-                self._cleanup_temp_files()
-                
+                result = cache.sweep()
+                if result["expired"] or result["evicted"]:
+                    print(f"{name} sweep removed {result['expired']} expired and {result['evicted']} evicted entries")
             except Exception as e:
-                print(f"Error during cleanup: {e}")
-            
-            # Sleep for cleanup interval
-            for _ in range(self.cleanup_interval):
-                if not self.running:
-                    break
-                time.sleep(1)
+                print(f"Error during {name.lower()} sweep: {e}")
+    
+    def _sweep_sessions(self):
+        """Remove conversation sessions that have been idle too long"""
+        if not self.session_store:
+            return
+        try:
+            removed = self.session_store.evict_idle()
+            if removed:
+                print(f"Session sweep removed {removed} idle conversation sessions")
+        except Exception as e:
+            print(f"Error during session sweep: {e}")
     
     def _cleanup_temp_files(self):
         """Clean up temporary files older than 1 hour"""
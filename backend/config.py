@@ -43,6 +43,58 @@ class Config:
         self.TTS_MODEL_PATH: str = os.getenv("TTS_MODEL_PATH", "kokoro-v0_19.onnx")
         self.VOICES_PATH: str = os.getenv("VOICES_PATH", "voices.json")
         
+        # Voice Registry (voice styles memory-mapped from a flat float32 file, built from VOICES_PATH)
+        self.VOICE_REGISTRY_ENABLED: bool = os.getenv("VOICE_REGISTRY_ENABLED", "True").lower() == "true"
+        self.VOICE_DATA_PATH: str = os.getenv("VOICE_DATA_PATH", "voices.f32")
+        self.VOICE_INDEX_PATH: str = os.getenv("VOICE_INDEX_PATH", "voices.index.json")
+        self.VOICE_RELOAD_INTERVAL: float = float(os.getenv("VOICE_RELOAD_INTERVAL", "5"))  # 0 = no hot reload
+        
+        # TTS Parallel Rendering (long texts are split into chunks rendered on a session pool)
+        self.TTS_PARALLEL_WORKERS: int = int(os.getenv("TTS_PARALLEL_WORKERS", "1"))  # 1 = disabled
+        
+        # ONNX Runtime Session Profile
+        self.TTS_INTRA_OP_THREADS: int = int(os.getenv("TTS_INTRA_OP_THREADS", "0"))  # 0 = cores / (WORKERS * sessions)
+        self.TTS_INTER_OP_THREADS: int = int(os.getenv("TTS_INTER_OP_THREADS", "0"))  # 0 = ONNX Runtime default
+        self.TTS_EXECUTION_MODE: str = os.getenv("TTS_EXECUTION_MODE", "sequential").lower()  # sequential, parallel
+        self.TTS_GRAPH_OPTIMIZATION: str = os.getenv("TTS_GRAPH_OPTIMIZATION", "all").lower()  # disable, basic, extended, all
+        self.TTS_OPTIMIZED_MODEL_DIR: str = os.getenv("TTS_OPTIMIZED_MODEL_DIR", "cache/onnx")  # Empty = no cache
+        self.TTS_CPU_MEM_ARENA: bool = os.getenv("TTS_CPU_MEM_ARENA", "True").lower() == "true"
+        self.TTS_MEM_PATTERN: bool = os.getenv("TTS_MEM_PATTERN", "True").lower() == "true"
+        
+        # TTS Inference Sidecar (one process owns the model and serves every worker)
+        self.TTS_SIDECAR_SOCKET: str = os.getenv("TTS_SIDECAR_SOCKET", "")  # Empty = load the model in each worker
+        self.TTS_SIDECAR_SESSIONS: int = int(os.getenv("TTS_SIDECAR_SESSIONS", "0"))  # 0 = physical cores
+        self.TTS_SIDECAR_TIMEOUT: float = float(os.getenv("TTS_SIDECAR_TIMEOUT", "300"))  # Seconds per render
+        self.TTS_SIDECAR_CONNECT_TIMEOUT: float = float(os.getenv("TTS_SIDECAR_CONNECT_TIMEOUT", "60"))  # Log a warning after each such wait
+        
+        # TTS Warmup (health reports "warming_up" until it finishes)
+        self.TTS_WARMUP_ENABLED: bool = os.getenv("TTS_WARMUP_ENABLED", "True").lower() == "true"
+        warmup_voices_str = os.getenv("TTS_WARMUP_VOICES", "")  # Empty = all voices
+        self.TTS_WARMUP_VOICES: List[str] = [v.strip() for v in warmup_voices_str.split(",") if v.strip()]
+        
+        # TTS Chunk Cache (per-chunk audio reuse when a text is edited)
+        self.TTS_CHUNK_CACHE_ENABLED: bool = os.getenv("TTS_CHUNK_CACHE_ENABLED", "True").lower() == "true"
+        self.TTS_CHUNK_CACHE_MEMORY_MB: int = int(os.getenv("TTS_CHUNK_CACHE_MEMORY_MB", "64"))
+        self.TTS_CHUNK_CACHE_DIR: str = os.getenv("TTS_CHUNK_CACHE_DIR", "cache/tts_chunks")  # Empty = memory only
+        self.TTS_CHUNK_CACHE_DISK_MB: int = int(os.getenv("TTS_CHUNK_CACHE_DISK_MB", "512"))  # 0 = unbounded
+        self.TTS_CHUNK_CACHE_TTL_SECONDS: int = int(os.getenv("TTS_CHUNK_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 0 = no expiry
+        
+        # TTS Phoneme Cache (repeated chunks skip grapheme-to-phoneme conversion)
+        self.TTS_G2P_CACHE_ENABLED: bool = os.getenv("TTS_G2P_CACHE_ENABLED", "True").lower() == "true"
+        self.TTS_G2P_CACHE_SIZE: int = int(os.getenv("TTS_G2P_CACHE_SIZE", "10000"))  # Sentences kept in memory
+        self.TTS_G2P_CACHE_PATH: str = os.getenv("TTS_G2P_CACHE_PATH", "cache/g2p.db")  # Empty = memory only
+        
+        # TTS Micro-batching (short concurrent requests are grouped by voice/speed;
+        # only used with more than one TTS session, see TTS_PARALLEL_WORKERS)
+        self.TTS_BATCHING_ENABLED: bool = os.getenv("TTS_BATCHING_ENABLED", "False").lower() == "true"
+        self.TTS_BATCH_WINDOW_MS: float = float(os.getenv("TTS_BATCH_WINDOW_MS", "5"))
+        self.TTS_MAX_BATCH_SIZE: int = int(os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+        
+        # TTS Output Format (used when neither the request nor its Accept header picks one)
+        self.TTS_DEFAULT_AUDIO_FORMAT: str = os.getenv("TTS_DEFAULT_AUDIO_FORMAT", "wav").lower()  # wav, flac, opus, mp3
+        self.TTS_CONVERSATION_AUDIO_FORMAT: str = os.getenv("TTS_CONVERSATION_AUDIO_FORMAT", "wav").lower()
+        self.TTS_CONVERSATION_AUDIO_TTL_SECONDS: int = int(os.getenv("TTS_CONVERSATION_AUDIO_TTL_SECONDS", "3600"))  # Reply audio served from /api/audio
+        
         # SadTalker Configuration
         self.SADTALKER_BASE_PATH: str = os.getenv("SADTALKER_BASE_PATH", "SadTalker")
         self.SADTALKER_CHECKPOINTS_DIR: str = os.getenv("SADTALKER_CHECKPOINTS_DIR", "SadTalker/checkpoints")
@@ -69,6 +121,10 @@ class Config:
         
         # Database
         self.DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./natural_speech.db")
+        # Used by the async handlers. Empty = DATABASE_URL with its async driver. On the
+        # default SQLite database this keeps the event loop responsive but lowers raw
+        # requests/s slightly (see database.py); use a server database for throughput.
+        self.DATABASE_URL_ASYNC: str = os.getenv("DATABASE_URL_ASYNC", "")
         
         # Monitoring
         self.ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "True").lower() == "true"
@@ -80,6 +136,19 @@ class Config:
         self.RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
         self.RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
         
+        # Response Cache (memory tier in front of the file cache)
+        self.CACHE_DIR: str = os.getenv("CACHE_DIR", "cache")
+        self.CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+        self.CACHE_MEMORY_MB: int = int(os.getenv("CACHE_MEMORY_MB", "128"))  # LRU eviction beyond this
+        self.CACHE_DISK_QUOTA_MB: int = int(os.getenv("CACHE_DISK_QUOTA_MB", "1024"))  # 0 = unbounded
+        self.CACHE_SWEEP_INTERVAL: int = int(os.getenv("CACHE_SWEEP_INTERVAL", "300"))  # Seconds between sweeps
+        self.CACHE_BACKEND_URL: str = os.getenv("CACHE_BACKEND_URL", "")  # redis://host:6379/0; empty = local only
+        self.CACHE_BACKEND_PREFIX: str = os.getenv("CACHE_BACKEND_PREFIX", "natural_speech:cache:")
+        self.CACHE_COMPRESSION_ENABLED: bool = os.getenv("CACHE_COMPRESSION_ENABLED", "True").lower() == "true"
+        self.CACHE_COMPRESSION_MIN_BYTES: int = int(os.getenv("CACHE_COMPRESSION_MIN_BYTES", "1024"))  # Smaller values use a trained dictionary
+        self.CACHE_COMPRESSION_LEVEL: int = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))  # zstd level
+        self.CACHE_COMPRESSION_CODECS: str = os.getenv("CACHE_COMPRESSION_CODECS", "tts=raw")  # Per namespace: "ns=zstd|raw,..."
+        
         # Logging
         self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
         self.LOG_FILE: str = os.getenv("LOG_FILE", "logs/app.log")
@@ -88,6 +157,25 @@ class Config:
         # OpenAI Configuration (for conversation practice)
         self.OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
         self.OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # OpenAI-compatible endpoint; empty = api.openai.com
+        self.LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Completions in flight per worker
+        self.LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        self.LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))  # Seconds
+        self.LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+        self.LLM_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+        self.LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "True").lower() == "true"  # Needs h2 installed
+        self.SPEECH_STAGE_CACHE_TTL_SECONDS: int = int(os.getenv("SPEECH_STAGE_CACHE_TTL_SECONDS", "86400"))  # Cached rounds per topic
+        self.SPEECH_JOB_STALE_SECONDS: int = int(os.getenv("SPEECH_JOB_STALE_SECONDS", "600"))  # No progress for this long = interrupted
+        self.CONVERSATION_SESSION_MAX: int = int(os.getenv("CONVERSATION_SESSION_MAX", "1000"))  # Sessions kept in memory per worker
+        self.CONVERSATION_SESSION_PATH: str = os.getenv("CONVERSATION_SESSION_PATH", "cache/sessions.db")  # Empty = memory only
+        self.CONVERSATION_SESSION_IDLE_SECONDS: int = int(os.getenv("CONVERSATION_SESSION_IDLE_SECONDS", "7200"))  # Idle sessions expire
+        self.CONVERSATION_SESSION_MAX_MESSAGES: int = int(os.getenv("CONVERSATION_SESSION_MAX_MESSAGES", "200"))
+        self.CONVERSATION_PROMPT_TOKEN_BUDGET: int = int(os.getenv("CONVERSATION_PROMPT_TOKEN_BUDGET", "3000"))  # Prompt tokens per turn
+        self.CONVERSATION_RECENT_MESSAGES: int = int(os.getenv("CONVERSATION_RECENT_MESSAGES", "6"))  # Always sent verbatim
+        self.CONVERSATION_SUMMARY_MAX_TOKENS: int = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", "300"))  # Rolling summary of older turns
+        self.CONVERSATION_SOCKET_IDLE_SECONDS: int = int(os.getenv("CONVERSATION_SOCKET_IDLE_SECONDS", "600"))  # /ws/conversation closes after this
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -7,7 +7,7 @@ to generate conversation prompts based on user topics.
 
 import os
 from typing import Optional, List, Dict
-from openai import OpenAI
+from llm_client import llm_client
 from loguru import logger
 from exceptions import ServiceNotAvailableException, ValidationException
 
@@ -15,17 +15,14 @@ class ConversationService:
     """Service for generating conversation practice prompts."""
     
     def __init__(self):
-        """Initialize the conversation service with OpenAI client."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        """Initialize the conversation service with the shared async LLM client."""
+        self.client = llm_client
+        if self.client is None:
             logger.warning("OPENAI_API_KEY not set. Conversation practice will be limited.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
         
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     
-    def generate_prompts(self, topic: str, count: int = 5) -> List[Dict[str, str]]:
+    async def generate_prompts(self, topic: str, count: int = 5) -> List[Dict[str, str]]:
         """
         Generate conversation practice prompts for a given topic.
         
@@ -75,7 +72,7 @@ Requirements:
 
 Format: Provide each prompt as a clear, engaging question or statement that immediately invites the user to share their thoughts."""
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
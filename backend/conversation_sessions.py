@@ -0,0 +1,384 @@
+"""
+Server-side sessions for interactive conversations.
+
+/api/conversation/interactive/start creates a session holding the topic and
+the messages so far; later turns send only the session id and the new user
+message instead of the whole history.
+
+Sessions live in a bounded in-memory LRU. With a SQLite path every update
+is also written there, so sessions pushed out of memory (spilled) or
+created by another worker are loaded back on demand, and survive restarts.
+Each update bumps the session's version and only succeeds if the stored
+version is the one the turn started from, so two turns racing on the same
+session cannot silently drop each other's messages. Sessions idle for
+longer than idle_ttl are treated as gone and removed by evict_idle().
+
+SessionSummarizer keeps a rolling summary of each session's older messages,
+updated in the background after a turn, so the next turn's prompt carries
+the summary and only the recent messages.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+# Fields stored in their own columns; everything else goes into "state"
+_COLUMNS = ("session_id", "topic", "version", "created_at", "updated_at")
+
+
+class ConversationSessionStore:
+    """Bounded LRU of conversation sessions with an optional SQLite tier"""
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        path: Optional[str] = None,
+        idle_ttl: int = 7200,
+        max_messages: int = 200
+    ):
+        """
+        Args:
+            max_sessions: Sessions kept in memory
+            path: SQLite file that holds all sessions, shared by workers
+                (None = memory only; sessions beyond max_sessions are lost)
+            idle_ttl: Seconds without a turn after which a session expires
+            max_messages: Messages kept per session; older ones are dropped
+        """
+        self.max_sessions = max_sessions
+        self.path = path
+        self.idle_ttl = idle_ttl
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Metrics
+        self.created = 0
+        self.hits = 0
+        self.loads = 0
+        self.misses = 0
+        self.spilled = 0
+        self.expired = 0
+        self.conflicts = 0
+        # Connections are per thread and per process: the store is built before
+        # gunicorn forks its workers, and a connection must not cross a fork
+        self._local = threading.local()
+        self._inherited: List[sqlite3.Connection] = []
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            try:
+                db.execute("""
+                    CREATE TABLE IF NOT EXISTS conversation_sessions (
+                        session_id TEXT PRIMARY KEY,
+                        topic TEXT NOT NULL,
+                        state TEXT NOT NULL,
+                        version INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                db.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_conversation_sessions_updated_at "
+                    "ON conversation_sessions(updated_at)"
+                )
+                db.commit()
+            finally:
+                db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection in this process, opened on first use"""
+        if not self.path:
+            return None
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            inherited = getattr(self._local, "db", None)
+            if inherited is not None:
+                # Closing the parent's connection could touch its WAL; keep it unused
+                with self.lock:
+                    self._inherited.append(inherited)
+            self._local.db = self._connect()
+            self._local.pid = pid
+        return self._local.db
+
+    @staticmethod
+    def _copy(session: Dict) -> Dict:
+        """A copy callers can change without touching the stored session"""
+        return {**session, "messages": list(session["messages"])}
+
+    def create(self, topic: str, messages: Optional[List[Dict[str, str]]] = None) -> Dict:
+        """
+        Start a session.
+
+        Args:
+            topic: The conversation topic
+            messages: Messages so far (e.g. the opening message)
+
+        Returns:
+            The session: session_id, topic, messages, message_offset (messages
+            dropped before messages[0]), version, created_at, updated_at
+        """
+        now = time.time()
+        messages = list(messages or [])
+        dropped = max(0, len(messages) - self.max_messages)
+        session = {
+            "session_id": uuid.uuid4().hex,
+            "topic": topic,
+            "messages": messages[dropped:],
+            "message_offset": dropped,
+            "version": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        db = self._connection()
+        if db is not None:
+            db.execute(
+                "INSERT INTO conversation_sessions (session_id, topic, state, version, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session["session_id"], topic, self._state(session), 1, now, now)
+            )
+            db.commit()
+        with self.lock:
+            self.created += 1
+            self._remember(session)
+        return self._copy(session)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """A session by id (None if unknown or expired)"""
+        cutoff = time.time() - self.idle_ttl
+        db = self._connection()
+        with self.lock:
+            session = self._sessions.get(session_id)
+        if session is not None and db is not None:
+            # Another worker may have taken a turn since
+            row = db.execute(
+                "SELECT version FROM conversation_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None or row[0] != session["version"]:
+                session = None
+        if session is not None:
+            with self.lock:
+                if session["updated_at"] >= cutoff:
+                    self._sessions.move_to_end(session_id)
+                    self.hits += 1
+                    return self._copy(session)
+                self._sessions.pop(session_id, None)
+                self.misses += 1
+                return None
+
+        row = None
+        if db is not None:
+            row = db.execute(
+                "SELECT session_id, topic, version, created_at, updated_at, state "
+                "FROM conversation_sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, cutoff)
+            ).fetchone()
+        with self.lock:
+            if row is None:
+                self._sessions.pop(session_id, None)
+                self.misses += 1
+                return None
+            session = dict(zip(_COLUMNS, row[:5]), **json.loads(row[5]))
+            self.loads += 1
+            self._remember(session)
+            return self._copy(session)
+
+    def update(self, session: Dict, **changes) -> Optional[Dict]:
+        """
+        Store changes to a session fetched with get() or create().
+
+        Args:
+            session: The session as fetched; its version must still be current
+            **changes: Fields to set (messages, or any extra state)
+
+        Returns:
+            The updated session, or None if it was changed elsewhere since it
+            was fetched, or has expired
+        """
+        updated = {**session, **changes}
+        messages = list(updated["messages"])
+        dropped = max(0, len(messages) - self.max_messages)
+        updated["messages"] = messages[dropped:]
+        updated["message_offset"] = updated.get("message_offset", 0) + dropped
+        updated["version"] = session["version"] + 1
+        updated["updated_at"] = time.time()
+        db = self._connection()
+        if db is not None:
+            cursor = db.execute(
+                "UPDATE conversation_sessions SET state = ?, version = ?, updated_at = ? "
+                "WHERE session_id = ? AND version = ?",
+                (self._state(updated), updated["version"], updated["updated_at"],
+                 session["session_id"], session["version"])
+            )
+            db.commit()
+            stored = cursor.rowcount == 1
+        with self.lock:
+            if db is None:
+                current = self._sessions.get(session["session_id"])
+                stored = current is not None and current["version"] == session["version"]
+            if not stored:
+                self.conflicts += 1
+                return None
+            self._remember(updated)
+        return self._copy(updated)
+
+    def append(self, session: Dict, messages: List[Dict[str, str]]) -> Optional[Dict]:
+        """
+        Add messages to a session; same result as update().
+
+        Changes made since the session was fetched that added no messages
+        (a new summary) do not conflict: the messages go on the current version.
+        """
+        updated = self.update(session, messages=session["messages"] + list(messages))
+        if updated is None:
+            current = self.get(session["session_id"])
+            if current is not None and self._message_count(current) == self._message_count(session):
+                updated = self.update(current, messages=current["messages"] + list(messages))
+        return updated
+
+    @staticmethod
+    def _message_count(session: Dict) -> int:
+        """Messages added to a session since it started, including trimmed ones"""
+        return session.get("message_offset", 0) + len(session["messages"])
+
+    def delete(self, session_id: str) -> bool:
+        """End a session; returns False if it did not exist"""
+        with self.lock:
+            deleted = self._sessions.pop(session_id, None) is not None
+        db = self._connection()
+        if db is not None:
+            cursor = db.execute("DELETE FROM conversation_sessions WHERE session_id = ?", (session_id,))
+            db.commit()
+            deleted = cursor.rowcount > 0
+        return deleted
+
+    def evict_idle(self) -> int:
+        """Remove sessions idle for longer than idle_ttl; returns how many"""
+        cutoff = time.time() - self.idle_ttl
+        with self.lock:
+            idle = [session_id for session_id, session in self._sessions.items() if session["updated_at"] < cutoff]
+            for session_id in idle:
+                del self._sessions[session_id]
+        removed = len(idle)
+        db = self._connection()
+        if db is not None:
+            cursor = db.execute("DELETE FROM conversation_sessions WHERE updated_at < ?", (cutoff,))
+            db.commit()
+            # Sessions in memory are in SQLite too
+            removed = cursor.rowcount
+        with self.lock:
+            self.expired += removed
+        return removed
+
+    def _state(self, session: Dict) -> str:
+        return json.dumps({key: value for key, value in session.items() if key not in _COLUMNS})
+
+    def _remember(self, session: Dict):
+        """Insert into the memory tier, spilling least recently used sessions (lock held)"""
+        self._sessions[session["session_id"]] = session
+        self._sessions.move_to_end(session["session_id"])
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.spilled += 1
+
+    def get_stats(self) -> dict:
+        """Get session statistics"""
+        with self.lock:
+            lookups = self.hits + self.loads + self.misses
+            return {
+                "sessions_in_memory": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "created": self.created,
+                "hits": self.hits,
+                "loads": self.loads,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "spilled": self.spilled,
+                "expired": self.expired,
+                "conflicts": self.conflicts,
+                "idle_ttl": self.idle_ttl,
+                "persistent": self.path is not None,
+            }
+
+
+class SessionSummarizer:
+    """Keeps a rolling summary of older messages per session, updated after each turn"""
+
+    def __init__(self, session_store: ConversationSessionStore, conversation_service):
+        """
+        Args:
+            session_store: Where sessions and their summaries are kept
+            conversation_service: Decides when to summarize and writes the
+                summaries (InteractiveConversationService)
+        """
+        self.session_store = session_store
+        self.conversation_service = conversation_service
+        # Summaries being written in this worker, by session
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Metrics
+        self.refreshed = 0
+        self.failed = 0
+
+    @staticmethod
+    def pending(session: Dict) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        A session's summary and the messages it does not cover yet.
+
+        "summarized" counts the messages the summary covers since the session
+        started; message_offset those trimmed from the front of "messages".
+        """
+        start = max(0, session.get("summarized", 0) - session.get("message_offset", 0))
+        return session.get("summary"), session["messages"][start:]
+
+    def schedule(self, session_id: str):
+        """Bring a session's summary up to date in the background (call after a turn)"""
+        if session_id in self._tasks:
+            return
+        task = asyncio.ensure_future(self._refresh(session_id))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session_id, None))
+
+    async def _refresh(self, session_id: str):
+        session = self.session_store.get(session_id)
+        if session is None:
+            return
+        summary, history = self.pending(session)
+        fold = self.conversation_service.summary_due(history, summary)
+        if not fold:
+            return
+        try:
+            summary = await self.conversation_service.summarize(session["topic"], summary, history[:fold])
+        except Exception as e:
+            # The next turn tries again; until then older messages fall out of the budget
+            self.failed += 1
+            logger.warning(f"Failed to summarize conversation session {session_id}: {e}")
+            return
+        # Messages covered from the start of the session
+        summarized = session.get("message_offset", 0) + len(session["messages"]) - len(history) + fold
+        # Turns taken meanwhile only add messages, so set the summary on the current version
+        for _ in range(3):
+            current = self.session_store.get(session_id)
+            if current is None or current.get("summarized", 0) != session.get("summarized", 0):
+                return
+            if self.session_store.update(current, summary=summary, summarized=summarized) is not None:
+                self.refreshed += 1
+                return
+
+    def get_stats(self) -> dict:
+        return {
+            "running": len(self._tasks),
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,310 @@
+"""
+Real-time conversation practice over one WebSocket per session.
+
+A connection carries a whole practice session, so a turn costs one frame in
+and a stream of frames out instead of a new HTTP request, and the reply can
+be interrupted as soon as the user starts speaking again (barge-in).
+
+Client frames (JSON text):
+
+- {"type": "start", ...}: the first frame; the fields of ConversationSocketStart.
+  With a topic a new session is created and its opening message streamed;
+  with a session_id an existing session is resumed.
+- {"type": "message", "text"}: the user's turn. A reply still in flight is
+  cancelled first, as with "cancel".
+- {"type": "cancel"}: stop the reply in flight. Its completion and any
+  synthesis still running are aborted; the text generated so far is kept in
+  the session so the conversation stays coherent.
+
+Server frames:
+
+- {"type": "session", "session_id", "topic"}
+- {"type": "text", "turn", "delta"} as the reply is generated
+- {"type": "audio", "turn", "index", "text", "format", "media_type", "size"}
+  for each sentence, immediately followed by a binary frame of `size` bytes
+  holding the encoded audio
+- {"type": "done", "turn", "message", "sentences", "time_to_first_token",
+  "time_to_first_audio"}
+- {"type": "cancelled", "turn"}
+- {"type": "error", "error_code", "message"} (with "turn" if a reply failed)
+
+Frames of a cancelled turn may still arrive after "cancelled" was requested;
+clients tell turns apart by their "turn" number.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from pydantic import ValidationError
+
+from audio_encoding import OUTPUT_FORMATS, encode_audio, negotiate_format, validate_output_options
+from conversation_sessions import ConversationSessionStore, SessionSummarizer
+from exceptions import ServiceNotAvailableException, ValidationException
+from models import ConversationSocketStart
+from spoken_reply import SpokenReplyStats, aclosing, stream_spoken_reply
+
+
+class ConversationSocket:
+    """Runs the protocol of one /ws/conversation connection"""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        conversation_service,
+        session_store: ConversationSessionStore,
+        synthesize: Optional[Callable[[str, str, float], Awaitable[Tuple[np.ndarray, int]]]],
+        default_format: str = "wav",
+        summarizer: Optional[SessionSummarizer] = None,
+        stats: Optional[SpokenReplyStats] = None,
+        idle_timeout: float = 600.0,
+        max_turns_per_minute: Optional[int] = None
+    ):
+        """
+        Args:
+            websocket: The connection, not yet accepted
+            conversation_service: Streams replies (InteractiveConversationService)
+            session_store: Where the conversation's history is kept
+            synthesize: Renders a sentence as (audio, sample_rate) from
+                (text, voice, speed) (None = text only)
+            default_format: Audio format when the start frame names none
+            summarizer: Updates session summaries after each turn
+            stats: Records the latency of each reply
+            idle_timeout: Seconds without a client frame before the
+                connection is closed
+            max_turns_per_minute: Turns accepted per minute (None = unlimited)
+        """
+        self.websocket = websocket
+        self.conversation_service = conversation_service
+        self.session_store = session_store
+        self.synthesize = synthesize
+        self.default_format = default_format
+        self.summarizer = summarizer
+        self.stats = stats
+        self.idle_timeout = idle_timeout
+        self.max_turns_per_minute = max_turns_per_minute
+        self.options: Optional[ConversationSocketStart] = None
+        self.audio_format = default_format
+        self.session_id: Optional[str] = None
+        self.topic: Optional[str] = None
+        self._turn: Optional[asyncio.Task] = None
+        self._turn_id = 0
+        self._turn_times: deque = deque()
+        # A JSON frame and the binary frame after it must not be split up
+        self._send_lock = asyncio.Lock()
+
+    async def run(self):
+        """Accept the connection and serve it until the client leaves or idles out"""
+        await self.websocket.accept()
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.websocket.receive(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    await self.websocket.close(code=1000, reason="Idle timeout")
+                    return
+                if message["type"] == "websocket.disconnect":
+                    return
+                await self._handle(message.get("text"))
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self._cancel_turn()
+
+    async def _handle(self, text: Optional[str]):
+        if text is None:
+            await self._error("INVALID_FRAME", "Send JSON text frames")
+            return
+        try:
+            frame = json.loads(text)
+        except json.JSONDecodeError:
+            await self._error("INVALID_FRAME", "Frame is not valid JSON")
+            return
+        kind = frame.get("type") if isinstance(frame, dict) else None
+        if kind == "start":
+            await self._start(frame)
+        elif kind == "message":
+            await self._message(frame)
+        elif kind == "cancel":
+            await self._cancel_turn(notify=True)
+        else:
+            await self._error("INVALID_FRAME", f"Unknown frame type: {kind}")
+
+    async def _start(self, frame: Dict):
+        if self.session_id is not None:
+            await self._error("ALREADY_STARTED", "The conversation has already started")
+            return
+        try:
+            options = ConversationSocketStart(**{k: v for k, v in frame.items() if k != "type"})
+            if not options.session_id and not options.topic:
+                raise ValidationException("Either session_id or topic is required", field="topic")
+            audio_format = negotiate_format(options.audio_format, None, self.default_format)
+            validate_output_options(audio_format, options.sample_rate, None)
+        except (ValidationError, ValidationException, ValueError) as e:
+            await self._error("VALIDATION_ERROR", str(e))
+            return
+
+        if options.session_id:
+            session = await run_in_threadpool(self.session_store.get, options.session_id)
+            if session is None:
+                await self._error("SESSION_NOT_FOUND", "Conversation session not found or expired")
+                return
+            deltas = None
+        else:
+            try:
+                deltas = self.conversation_service.stream_start_conversation(options.topic)
+            except (ServiceNotAvailableException, ValidationException) as e:
+                await self._error("CONVERSATION_UNAVAILABLE", str(e))
+                return
+            # Created up front, so the user can barge in on the opening message
+            session = await run_in_threadpool(self.session_store.create, options.topic, [])
+
+        self.options = options
+        self.audio_format = audio_format
+        self.session_id = session["session_id"]
+        self.topic = session["topic"]
+        await self._send({"type": "session", "session_id": self.session_id, "topic": self.topic})
+        if deltas is not None:
+            self._start_turn(session, None, deltas)
+
+    async def _message(self, frame: Dict):
+        if self.session_id is None:
+            await self._error("NOT_STARTED", "Send a start frame first")
+            return
+        user_message = frame.get("text")
+        if not isinstance(user_message, str) or not user_message.strip():
+            await self._error("VALIDATION_ERROR", "User message cannot be empty or only whitespace")
+            return
+        # Barge-in: the new message replaces the reply in flight
+        await self._cancel_turn(notify=True)
+        if not self._allow_turn():
+            await self._error("RATE_LIMITED", "Too many messages; wait a moment and try again")
+            return
+
+        session = await run_in_threadpool(self.session_store.get, self.session_id)
+        if session is None:
+            await self._error("SESSION_NOT_FOUND", "Conversation session not found or expired")
+            return
+        summary, history = SessionSummarizer.pending(session)
+        history = history + [{"role": "user", "content": user_message.strip()}]
+        try:
+            deltas = self.conversation_service.stream_continue_conversation(self.topic, history, summary=summary)
+        except (ServiceNotAvailableException, ValidationException) as e:
+            await self._error("CONVERSATION_UNAVAILABLE", str(e))
+            return
+        self._start_turn(session, user_message.strip(), deltas)
+
+    def _allow_turn(self) -> bool:
+        """Sliding one-minute window of turns, standing in for the HTTP rate limit"""
+        if not self.max_turns_per_minute:
+            return True
+        now = time.monotonic()
+        while self._turn_times and self._turn_times[0] <= now - 60:
+            self._turn_times.popleft()
+        if len(self._turn_times) >= self.max_turns_per_minute:
+            return False
+        self._turn_times.append(now)
+        return True
+
+    def _start_turn(self, session: Dict, user_message: Optional[str], deltas):
+        self._turn_id += 1
+        self._turn = asyncio.ensure_future(self._reply(self._turn_id, session, user_message, deltas))
+
+    async def _cancel_turn(self, notify: bool = False):
+        """Abort the reply in flight, if any, and wait until it has stopped"""
+        task, self._turn = self._turn, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if notify:
+            await self._send({"type": "cancelled", "turn": self._turn_id})
+
+    async def _reply(self, turn: int, session: Dict, user_message: Optional[str], deltas):
+        """Stream one reply's text and audio, then save the turn"""
+        options = self.options
+        output = OUTPUT_FORMATS[self.audio_format]
+        reply = []
+
+        async def synthesize(sentence: str) -> dict:
+            audio, sample_rate = await self.synthesize(sentence, options.voice, options.speed)
+            # Encoding (and resampling) a sentence is CPU-bound; keep it off the event loop
+            encoded = await run_in_threadpool(encode_audio, audio, sample_rate, self.audio_format, options.sample_rate)
+            return {"audio": encoded}
+
+        try:
+            events = stream_spoken_reply(deltas, synthesize if self.synthesize else None)
+            async with aclosing(events) as reply_events:
+                async for event, data in reply_events:
+                    if event == "text":
+                        reply.append(data["delta"])
+                        await self._send({"type": "text", "turn": turn, **data})
+                    elif event == "audio":
+                        audio = data.pop("audio")
+                        await self._send({
+                            "type": "audio",
+                            "turn": turn,
+                            **data,
+                            "format": self.audio_format,
+                            "media_type": output["media_type"],
+                            "size": len(audio),
+                        }, audio)
+                    else:
+                        if self.stats:
+                            self.stats.record(data)
+                        reply = []
+                        if not await self._save(session, user_message, data["message"]):
+                            await self._error(
+                                "SESSION_CONFLICT",
+                                "Conversation session changed during this turn; it was not saved",
+                                turn
+                            )
+                        await self._send({"type": "done", "turn": turn, **data})
+        except asyncio.CancelledError:
+            # Keep what was said before the user cut in
+            partial = "".join(reply).strip()
+            if partial:
+                await self._save(session, user_message, partial)
+            raise
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            if self.stats:
+                self.stats.record_error()
+            logger.error(f"Error streaming conversation reply over WebSocket: {e}", exc_info=True)
+            await self._error("CONVERSATION_ERROR", "Failed to generate reply", turn)
+
+    async def _save(self, session: Dict, user_message: Optional[str], ai_message: str) -> bool:
+        """Add a turn to the session and bring its summary up to date"""
+        messages = [{"role": "user", "content": user_message}] if user_message else []
+        messages.append({"role": "assistant", "content": ai_message})
+        try:
+            saved = await run_in_threadpool(self.session_store.append, session, messages)
+        except Exception as e:
+            logger.warning(f"Failed to save conversation turn of session {session['session_id']}: {e}", exc_info=True)
+            return False
+        if saved is None:
+            return False
+        if self.summarizer:
+            self.summarizer.schedule(session["session_id"])
+        return True
+
+    async def _send(self, frame: Dict, audio: Optional[bytes] = None):
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(frame))
+            if audio is not None:
+                await self.websocket.send_bytes(bytes(audio))
+
+    async def _error(self, error_code: str, message: str, turn: Optional[int] = None):
+        frame = {"type": "error", "error_code": error_code, "message": message}
+        if turn is not None:
+            frame["turn"] = turn
+        try:
+            await self._send(frame)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
@@ -1,11 +1,105 @@
+"""
+Convert Kokoro voice packs for the memory-mapped voice registry.
+
+Writes every voice style array from voices.json into one flat float32 file
+plus a JSON index with the offset, shape, language and gender of each voice
+(see voice_registry.py). Both files are replaced atomically, data first, so a
+running server picks up the new voices on its next reload check.
+
+Usage:
+    python convert_voices.py [voices.json] [--data voices.f32] [--index voices.index.json]
+"""
+import argparse
 import json
+import os
+import uuid
+from typing import Dict, Optional
+
 import numpy as np
 
-print("Loading voices.json...")
-with open("voices.json", "r") as f:
-    data = json.load(f)
+# Kokoro voice names start with a language letter and a gender letter, e.g. "af_bella"
+VOICE_LANGUAGES = {
+    "a": "en-us",
+    "b": "en-gb",
+    "f": "fr-fr",
+    "j": "ja",
+    "k": "ko",
+    "z": "cmn",
+}
+VOICE_GENDERS = {"f": "female", "m": "male"}
+
+
+def voice_metadata(name: str) -> Dict[str, Optional[str]]:
+    """Derive language and gender from a Kokoro voice name"""
+    prefix = name.split("_", 1)[0]
+    return {
+        "language": VOICE_LANGUAGES.get(prefix[:1]),
+        "gender": VOICE_GENDERS.get(prefix[1:2]),
+    }
+
+
+def _replace_atomically(path: str, write):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_voice_packs(voices: Dict[str, np.ndarray], data_path: str, index_path: str) -> Dict[str, Dict]:
+    """
+    Write voice style arrays as one flat float32 file plus an index.
+
+    The index is keyed by voice name, so it can also be given to Kokoro as
+    its voices file (Kokoro only reads the names from it).
+
+    Returns:
+        The index that was written
+    """
+    index: Dict[str, Dict] = {}
+    styles = []
+    offset = 0
+    for name, style in voices.items():
+        style = np.ascontiguousarray(style, dtype="<f4")
+        styles.append(style)
+        index[name] = {"offset": offset, "shape": list(style.shape), **voice_metadata(name)}
+        offset += style.size
+
+    def write_data(f):
+        for style in styles:
+            f.write(style.tobytes())
+
+    def write_index(f):
+        f.write(json.dumps(index, indent=1).encode("utf-8"))
+
+    _replace_atomically(data_path, write_data)
+    _replace_atomically(index_path, write_index)
+    return index
+
+
+def convert_voice_packs(
+    source_path: str = "voices.json",
+    data_path: str = "voices.f32",
+    index_path: str = "voices.index.json"
+) -> Dict[str, Dict]:
+    """Convert a Kokoro voices.json file for the voice registry"""
+    with open(source_path, "r") as f:
+        data = json.load(f)
+    voices = {name: np.asarray(style, dtype=np.float32) for name, style in data.items()}
+    return write_voice_packs(voices, data_path, index_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert Kokoro voice packs for the voice registry")
+    parser.add_argument("source", nargs="?", default="voices.json", help="Kokoro voices JSON file")
+    parser.add_argument("--data", default="voices.f32", help="Output float32 data file")
+    parser.add_argument("--index", default="voices.index.json", help="Output index file")
+    args = parser.parse_args()
 
-print(f"Loaded {len(data)} voices.")
-print("Saving to voices.bin...")
-np.save("voices.bin", data)
-print("Done.")
+    print(f"Loading {args.source}...")
+    index = convert_voice_packs(args.source, args.data, args.index)
+    print(f"Converted {len(index)} voices to {args.data} (index: {args.index}).")
+    print("Done.")
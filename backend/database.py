@@ -6,18 +6,51 @@ This module provides:
 - Error handling with detailed logging
 - Pipeline health tracking
 - Database connection management with retry logic
+- An async engine and session dependency (get_async_db) for FastAPI handlers,
+  so database I/O does not block the event loop
 - Comprehensive error context for debugging
+
+Both engines check pooled connections with pool_pre_ping when they are
+checked out, so sessions do not probe the database themselves. New
+connections that fail are retried with exponential backoff.
+
+Without SQLAlchemy's asyncio extension (it needs greenlet) or an async
+driver, get_async_db() falls back to a ThreadedSession: a sync session whose
+calls run in worker threads, so the async services and handlers work
+unchanged.
+
+The async path trades throughput for responsiveness. It does not serve more
+database requests per second: SQLite serializes writes, and every call pays
+for a hop to aiosqlite's (or the thread pool's) thread, so with the default
+SQLite database requests/s are somewhat lower than on the blocking path.
+What it buys is that the event loop keeps serving other requests (health
+checks, streamed replies, WebSockets) while queries run; see
+TestAsyncDatabaseThroughput in tests/test_async_database.py. A server
+database such as PostgreSQL with asyncpg is needed for a throughput gain.
 """
 from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, event, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError, OperationalError, IntegrityError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any
+import asyncio
+import functools
 import os
+import random
 import time
 import traceback
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+
+# Try to import SQLAlchemy's asyncio extension (optional, needs greenlet and an async driver such as aiosqlite)
+try:
+    import greenlet  # noqa: F401
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.util import await_only
+    HAS_ASYNC_SQLALCHEMY = True
+except ImportError:
+    AsyncSession = None
+    HAS_ASYNC_SQLALCHEMY = False
 
 from config import settings
 from logger_config import logger
@@ -26,7 +59,61 @@ Base = declarative_base()
 
 # Database connection retry configuration
 MAX_RETRIES = 3
-RETRY_DELAY = 1.0  # seconds
+RETRY_DELAY = 1.0  # seconds, doubled after each failed attempt
+
+# Async drivers for the sync drivers DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    """The URL of the same database with an async driver ("sqlite:///x.db" -> "sqlite+aiosqlite:///x.db")"""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def retry_delay(attempt: int) -> float:
+    """Backoff before retry number attempt (1-based): exponential, with jitter"""
+    return RETRY_DELAY * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+
+
+def retry_connections(engine, sleep=time.sleep):
+    """
+    Retry the engine's new connections with exponential backoff.
+    
+    Sessions connect lazily, on their first statement; this covers that
+    connect (and pool_pre_ping's reconnect of a stale connection) without a
+    probe per session.
+    
+    Args:
+        engine: Sync engine (for an async engine, its sync_engine)
+        sleep: Waits the given seconds between attempts
+    """
+    @event.listens_for(engine, "do_connect")
+    def connect_with_retry(dialect, connection_record, cargs, cparams):
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                connection = dialect.connect(*cargs, **cparams)
+            except Exception as e:
+                _db_health["status"] = "degraded"
+                _db_health["last_error"] = str(e)
+                _db_health["error_count"] += 1
+                if attempt >= MAX_RETRIES:
+                    logger.error(f"Database connection failed after {MAX_RETRIES} retries: {e}", exc_info=True)
+                    raise
+                logger.warning(f"Database connection failed (attempt {attempt}/{MAX_RETRIES}), retrying...")
+                sleep(retry_delay(attempt))
+                continue
+            _db_health["status"] = "healthy"
+            _db_health["last_successful_operation"] = datetime.utcnow().isoformat()
+            _db_health["error_count"] = 0
+            return connection
 
 # Create engine with connection pooling and error handling
 try:
@@ -42,9 +129,31 @@ except Exception as e:
     logger.error(f"Failed to create database engine: {e}", exc_info=True)
     raise
 
+retry_connections(engine)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database, for request handlers
+async_engine = None
+AsyncSessionLocal = None
+if HAS_ASYNC_SQLALCHEMY:
+    try:
+        async_engine = create_async_engine(
+            settings.DATABASE_URL_ASYNC or async_database_url(settings.DATABASE_URL),
+            echo=settings.DEBUG,
+            pool_pre_ping=True,  # Verify connections before using
+            pool_recycle=3600,   # Recycle connections after 1 hour
+        )
+        # Connects run inside SQLAlchemy's greenlet, so the backoff can await
+        retry_connections(async_engine.sync_engine, sleep=lambda seconds: await_only(asyncio.sleep(seconds)))
+        # Objects stay usable after commit, as responses are built from them
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    except Exception as e:
+        logger.error(f"Failed to create async database engine: {e}. Using threaded sync sessions.", exc_info=True)
+else:
+    logger.warning("sqlalchemy.ext.asyncio or greenlet not available. Using threaded sync sessions.")
+
 # Track database health
 _db_health = {
     "status": "healthy",
@@ -153,37 +262,8 @@ def get_db() -> Session:
         OperationalError: If database connection fails after retries
         SQLAlchemyError: For other database errors
     """
-    db = None
-    retry_count = 0
-    
-    while retry_count < MAX_RETRIES:
-        try:
-            db = SessionLocal()
-            # Test connection
-            db.execute("SELECT 1")
-            _db_health["status"] = "healthy"
-            _db_health["last_successful_operation"] = datetime.utcnow().isoformat()
-            _db_health["error_count"] = 0
-            break
-        except OperationalError as e:
-            retry_count += 1
-            _db_health["status"] = "degraded"
-            _db_health["last_error"] = str(e)
-            _db_health["error_count"] += 1
-            
-            if retry_count >= MAX_RETRIES:
-                logger.error(f"Database connection failed after {MAX_RETRIES} retries: {e}", exc_info=True)
-                if db:
-                    db.close()
-                raise
-            else:
-                logger.warning(f"Database connection failed (attempt {retry_count}/{MAX_RETRIES}), retrying...")
-                time.sleep(RETRY_DELAY * retry_count)
-        except Exception as e:
-            logger.error(f"Unexpected database error: {e}", exc_info=True)
-            if db:
-                db.close()
-            raise
+    # Connections are checked out on first use (see retry_connections())
+    db = SessionLocal()
     
     try:
         yield db
@@ -216,6 +296,121 @@ def get_db() -> Session:
                 logger.warning(f"Error closing database session: {e}")
 
 
+def _record_session_error(error_msg: str):
+    logger.error(error_msg, exc_info=True)
+    _db_health["last_error"] = error_msg
+    _db_health["error_count"] += 1
+
+
+class ThreadedSession:
+    """
+    A sync Session with the AsyncSession methods the async services use.
+    
+    Each call runs in a worker thread, so the event loop is not blocked;
+    results are buffered there, like AsyncSession's. Used by get_async_db()
+    when the asyncio extension or an async driver is unavailable.
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    async def __aenter__(self) -> "ThreadedSession":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(method, *args, **kwargs))
+    
+    def add(self, instance):
+        self.session.add(instance)
+    
+    async def execute(self, statement, *args, **kwargs):
+        frozen = await self._run(lambda: self.session.execute(statement, *args, **kwargs).freeze())
+        return frozen()
+    
+    async def scalars(self, statement, *args, **kwargs):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+    
+    async def scalar(self, statement, *args, **kwargs):
+        return await self._run(self.session.scalar, statement, *args, **kwargs)
+    
+    async def get(self, entity, ident, **kwargs):
+        return await self._run(self.session.get, entity, ident, **kwargs)
+    
+    async def delete(self, instance):
+        await self._run(self.session.delete, instance)
+    
+    async def refresh(self, instance, *args, **kwargs):
+        await self._run(self.session.refresh, instance, *args, **kwargs)
+    
+    async def commit(self):
+        await self._run(self.session.commit)
+    
+    async def rollback(self):
+        await self._run(self.session.rollback)
+    
+    async def close(self):
+        await self._run(self.session.close)
+
+
+if AsyncSession is None:
+    # Type of the sessions get_async_db() yields, for annotations
+    AsyncSession = ThreadedSession
+
+
+@asynccontextmanager
+async def async_db_session() -> AsyncIterator["AsyncSession"]:
+    """
+    Async database session (async with async_db_session() as db).
+    
+    The connection is checked out on first use; failed connects are retried
+    with backoff without blocking the event loop (see retry_connections()).
+    The session is rolled back if the handler raises, and always closed.
+    
+    Yields:
+        AsyncSession: Database session (a ThreadedSession without an async engine)
+        
+    Raises:
+        OperationalError: If database connection fails after retries
+    """
+    db = AsyncSessionLocal() if AsyncSessionLocal is not None else ThreadedSession(SessionLocal())
+    
+    try:
+        yield db
+    except IntegrityError as e:
+        await db.rollback()
+        _record_session_error(f"Database integrity error: {str(e)}")
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        _record_session_error(f"Database error: {str(e)}")
+        raise
+    except Exception:
+        # HTTPExceptions and the like end up here; nothing to log
+        await db.rollback()
+        raise
+    finally:
+        try:
+            await db.close()
+        except Exception as e:
+            logger.warning(f"Error closing database session: {e}")
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """
+    Async database session, as a FastAPI dependency (Depends(get_async_db)).
+    
+    See async_db_session(); handlers that only need the database after slow
+    work (e.g. LLM calls) should open a session there instead, so they do not
+    hold a pooled connection meanwhile.
+    """
+    async with async_db_session() as db:
+        yield db
+
+
 def get_db_health() -> Dict[str, Any]:
     """Get database health status."""
     try:
@@ -223,6 +418,8 @@ def get_db_health() -> Dict[str, Any]:
         pool = engine.pool
         _db_health["connection_pool_size"] = pool.size()
         _db_health["active_connections"] = pool.checkedout()
+        if async_engine is not None:
+            _db_health["async_active_connections"] = async_engine.pool.checkedout()
     except Exception as e:
         logger.warning(f"Could not get connection pool info: {e}")
     
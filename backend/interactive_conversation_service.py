@@ -4,30 +4,84 @@ Interactive Conversation Service
 This module provides interactive conversation practice functionality where users
 can have real-time conversations with an AI that responds with a "yes, and" attitude,
 keeping the conversation going naturally. The AI provides both text and voice responses.
+Replies can also be streamed token by token, so speech synthesis can start on
+the first sentence while the rest is still being generated.
+
+Long conversations are compacted to a token budget before each turn: the
+most recent messages are sent verbatim and older ones are represented by a
+rolling summary (see summarize()), so prompt size and time-to-first-token
+stay roughly flat however long the conversation gets.
 """
 
 import os
-from typing import Optional, List, Dict, Tuple
-from openai import OpenAI
+from typing import AsyncIterator, Optional, List, Dict, Tuple
+from config import settings
+from llm_client import llm_client
 from loguru import logger
 from exceptions import ServiceNotAvailableException, ValidationException
+from spoken_reply import aclosing
+from token_counter import TokenCounter
+
+
+SYSTEM_PROMPT = """You are an expert conversation practice partner with a "yes, and" improvisational approach. Your role is to facilitate authentic, engaging dialogue that helps users develop their speaking skills.
+
+Core Principles:
+1. **Active Listening & Building**: Acknowledge what the user says, then build upon it ("yes, and...") rather than simply agreeing or disagreeing
+2. **Natural Flow**: Maintain conversational rhythm with varied response lengths (1-4 sentences) that feel spontaneous, not scripted
+3. **Thoughtful Engagement**: Ask open-ended questions that invite deeper exploration, not just surface-level responses
+4. **Contextual Adaptation**: Match your tone and depth to the topic's nature—serious topics warrant thoughtful responses, lighter topics allow for playfulness
+5. **Encouraging Growth**: Provide constructive engagement that challenges users appropriately without overwhelming them
+6. **Authentic Interest**: Show genuine curiosity about the user's perspective, experiences, and ideas
+
+Response Guidelines:
+- Keep responses concise but meaningful (typically 2-3 sentences, occasionally 1 or 4)
+- Use natural transitions and conversational connectors
+- Avoid repetitive patterns or formulaic responses
+- Vary your question types (reflective, exploratory, hypothetical, personal)
+- Create moments of connection and understanding
+
+Remember: You're facilitating real conversation practice. Be human, be present, and help users find their voice."""
+
+START_MAX_TOKENS = 200
+CONTINUE_MAX_TOKENS = 250  # Keep responses concise for natural conversation flow
+
+SUMMARY_PROMPT = """You keep notes for a conversation practice partner. Maintain a concise summary of the conversation so far, so that it can continue naturally without the full transcript.
+
+Keep:
+- The points, opinions, examples and personal details the user shared
+- Questions that were asked and what was agreed or left open
+- How the discussion developed
+
+Write in the third person ("The user ...", "You ..."), as plain prose without headings. Only include what was actually said."""
+
+# Fold older messages into the summary once the unsummarized history takes
+# this fraction of the prompt budget
+SUMMARIZE_AT = 0.5
 
 
 class InteractiveConversationService:
     """Service for interactive conversation practice with GPT and TTS."""
     
     def __init__(self):
-        """Initialize the interactive conversation service with OpenAI client."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        """Initialize the interactive conversation service with the shared async LLM client."""
+        self.client = llm_client
+        if self.client is None:
             logger.warning("OPENAI_API_KEY not set. Interactive conversation will be limited.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
         
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        
+        # History compaction
+        self.token_counter = TokenCounter(self.model)
+        self.prompt_budget = settings.CONVERSATION_PROMPT_TOKEN_BUDGET
+        self.recent_messages = settings.CONVERSATION_RECENT_MESSAGES
+        self.summary_max_tokens = settings.CONVERSATION_SUMMARY_MAX_TOKENS
+        self.turns = 0
+        self.total_prompt_tokens = 0
+        self.max_prompt_tokens = 0
+        self.dropped_messages = 0
+        self.summaries = 0
     
-    def start_conversation(self, topic: str) -> Dict[str, str]:
+    async def start_conversation(self, topic: str) -> Dict[str, str]:
         """
         Start a new conversation on a given topic.
         
@@ -50,44 +104,11 @@ class InteractiveConversationService:
             )
         
         try:
-            system_prompt = """You are an expert conversation practice partner with a "yes, and" improvisational approach. Your role is to facilitate authentic, engaging dialogue that helps users develop their speaking skills.
-
-Core Principles:
-1. **Active Listening & Building**: Acknowledge what the user says, then build upon it ("yes, and...") rather than simply agreeing or disagreeing
-2. **Natural Flow**: Maintain conversational rhythm with varied response lengths (1-4 sentences) that feel spontaneous, not scripted
-3. **Thoughtful Engagement**: Ask open-ended questions that invite deeper exploration, not just surface-level responses
-4. **Contextual Adaptation**: Match your tone and depth to the topic's nature—serious topics warrant thoughtful responses, lighter topics allow for playfulness
-5. **Encouraging Growth**: Provide constructive engagement that challenges users appropriately without overwhelming them
-6. **Authentic Interest**: Show genuine curiosity about the user's perspective, experiences, and ideas
-
-Response Guidelines:
-- Keep responses concise but meaningful (typically 2-3 sentences, occasionally 1 or 4)
-- Use natural transitions and conversational connectors
-- Avoid repetitive patterns or formulaic responses
-- Vary your question types (reflective, exploratory, hypothetical, personal)
-- Create moments of connection and understanding
-
-Remember: You're facilitating real conversation practice. Be human, be present, and help users find their voice."""
-            
-            user_prompt = f"""Start a conversation about: "{topic}"
-
-Create an opening that:
-- Immediately engages the user with a thought-provoking question, intriguing observation, or relatable statement
-- Feels natural and conversational, not like a formal prompt
-- Invites the user to share their perspective, experience, or thoughts
-- Sets a tone appropriate for the topic's nature
-- Is concise (1-2 sentences) to get the conversation flowing naturally
-
-Make it feel like you're genuinely curious about discussing this topic with them, not just fulfilling a role."""
-            
-            response = self.client.chat.completions.create(
+            response = await self.client.chat_completion(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=self._start_messages(topic),
                 temperature=0.85,  # Higher for more natural variation
-                max_tokens=200,
+                max_tokens=START_MAX_TOKENS,
             )
             
             # Extract and validate response
@@ -115,17 +136,21 @@ Make it feel like you're genuinely curious about discussing this topic with them
             logger.error(f"Error starting conversation: {e}", exc_info=True)
             raise ServiceNotAvailableException(f"Failed to start conversation: {str(e)}")
     
-    def continue_conversation(
+    async def continue_conversation(
         self, 
         topic: str, 
-        conversation_history: List[Dict[str, str]]
+        conversation_history: List[Dict[str, str]],
+        summary: Optional[str] = None
     ) -> str:
         """
         Continue a conversation based on user input and history.
         
+        The history is compacted to the prompt budget first (see compact_history).
+        
         Args:
             topic: The topic being discussed
             conversation_history: List of message dicts with 'role' ('user' or 'assistant') and 'content'
+            summary: Summary of earlier messages not in conversation_history
             
         Returns:
             AI's response message as a string
@@ -146,46 +171,11 @@ Make it feel like you're genuinely curious about discussing this topic with them
             )
         
         try:
-            system_prompt = """You are an expert conversation practice partner with a "yes, and" improvisational approach. Your role is to facilitate authentic, engaging dialogue that helps users develop their speaking skills.
-
-Core Principles:
-1. **Active Listening & Building**: Acknowledge what the user says, then build upon it ("yes, and...") rather than simply agreeing or disagreeing
-2. **Natural Flow**: Maintain conversational rhythm with varied response lengths (1-4 sentences) that feel spontaneous, not scripted
-3. **Thoughtful Engagement**: Ask open-ended questions that invite deeper exploration, not just surface-level responses
-4. **Contextual Adaptation**: Match your tone and depth to the topic's nature—serious topics warrant thoughtful responses, lighter topics allow for playfulness
-5. **Encouraging Growth**: Provide constructive engagement that challenges users appropriately without overwhelming them
-6. **Authentic Interest**: Show genuine curiosity about the user's perspective, experiences, and ideas
-
-Response Guidelines:
-- Keep responses concise but meaningful (typically 2-3 sentences, occasionally 1 or 4)
-- Use natural transitions and conversational connectors
-- Avoid repetitive patterns or formulaic responses
-- Vary your question types (reflective, exploratory, hypothetical, personal)
-- Create moments of connection and understanding
-
-Remember: You're facilitating real conversation practice. Be human, be present, and help users find their voice."""
-            
-            # Format conversation history for OpenAI API
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add conversation history
-            for msg in conversation_history:
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                if role in ["user", "assistant"] and content:
-                    messages.append({"role": role, "content": content})
-            
-            # Add context about the topic to maintain focus
-            messages.append({
-                "role": "system",
-                "content": f"Context: The conversation is about '{topic}'. Keep responses relevant to this topic while allowing natural conversational flow. If the conversation naturally drifts, gently guide it back to the topic when appropriate."
-            })
-            
-            response = self.client.chat.completions.create(
+            response = await self.client.chat_completion(
                 model=self.model,
-                messages=messages,
+                messages=self._continue_messages(topic, conversation_history, summary),
                 temperature=0.85,  # Higher for more natural variation
-                max_tokens=250,  # Keep responses concise for natural conversation flow
+                max_tokens=CONTINUE_MAX_TOKENS,
             )
             
             # Extract and validate response
@@ -210,6 +200,292 @@ Remember: You're facilitating real conversation practice. Be human, be present,
             logger.error(f"Error continuing conversation: {e}", exc_info=True)
             raise ServiceNotAvailableException(f"Failed to continue conversation: {str(e)}")
     
+    def stream_start_conversation(self, topic: str) -> AsyncIterator[str]:
+        """
+        Stream the opening message of a conversation as it is generated.
+        
+        Inputs are checked when called, before anything is streamed.
+        
+        Args:
+            topic: The topic the user wants to practice discussing
+            
+        Returns:
+            Async iterator of text deltas
+            
+        Raises:
+            ServiceNotAvailableException: If OpenAI API is not configured (or,
+                while iterating, if the completion fails)
+            ValidationException: If topic is invalid
+        """
+        if not topic or not topic.strip():
+            raise ValidationException("Topic cannot be empty")
+        
+        if not self.client:
+            raise ServiceNotAvailableException(
+                "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+            )
+        
+        return self._stream_reply(self._start_messages(topic), START_MAX_TOKENS, "start")
+    
+    def stream_continue_conversation(
+        self,
+        topic: str,
+        conversation_history: List[Dict[str, str]],
+        summary: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the next reply of a conversation as it is generated.
+        
+        Inputs are checked when called, before anything is streamed.
+        
+        Args:
+            topic: The topic being discussed
+            conversation_history: List of message dicts with 'role' ('user' or 'assistant') and 'content'
+            summary: Summary of earlier messages not in conversation_history
+            
+        Returns:
+            Async iterator of text deltas
+            
+        Raises:
+            ServiceNotAvailableException: If OpenAI API is not configured (or,
+                while iterating, if the completion fails)
+            ValidationException: If inputs are invalid
+        """
+        if not topic or not topic.strip():
+            raise ValidationException("Topic cannot be empty")
+        
+        if not conversation_history:
+            raise ValidationException("Conversation history cannot be empty")
+        
+        if not self.client:
+            raise ServiceNotAvailableException(
+                "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+            )
+        
+        return self._stream_reply(
+            self._continue_messages(topic, conversation_history, summary), CONTINUE_MAX_TOKENS, "continue"
+        )
+    
+    async def _stream_reply(self, messages: List[Dict[str, str]], max_tokens: int, action: str) -> AsyncIterator[str]:
+        """Text deltas of a streamed reply; failures are raised as ServiceNotAvailableException."""
+        try:
+            async with aclosing(self.client.stream_chat_completion(
+                model=self.model,
+                messages=messages,
+                temperature=0.85,  # Higher for more natural variation
+                max_tokens=max_tokens,
+            )) as deltas:
+                async for delta in deltas:
+                    yield delta
+        except Exception as e:
+            logger.error(f"Error streaming conversation ({action}): {e}", exc_info=True)
+            raise ServiceNotAvailableException(f"Failed to {action} conversation: {str(e)}")
+    
+    def _start_messages(self, topic: str) -> List[Dict[str, str]]:
+        """Messages asking for the opening line of a conversation."""
+        user_prompt = f"""Start a conversation about: "{topic}"
+
+Create an opening that:
+- Immediately engages the user with a thought-provoking question, intriguing observation, or relatable statement
+- Feels natural and conversational, not like a formal prompt
+- Invites the user to share their perspective, experience, or thoughts
+- Sets a tone appropriate for the topic's nature
+- Is concise (1-2 sentences) to get the conversation flowing naturally
+
+Make it feel like you're genuinely curious about discussing this topic with them, not just fulfilling a role."""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _continue_messages(
+        self,
+        topic: str,
+        conversation_history: List[Dict[str, str]],
+        summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Messages asking for the next reply in a conversation, within the prompt budget."""
+        # Format conversation history for OpenAI API
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if summary:
+            messages.append({"role": "system", "content": self._summary_message(summary)})
+        
+        # Add conversation history
+        messages.extend(self.compact_history(topic, conversation_history, summary))
+        
+        # Add context about the topic to maintain focus
+        messages.append({"role": "system", "content": self._topic_context(topic)})
+        
+        prompt_tokens = self.token_counter.count_messages(messages)
+        self.turns += 1
+        self.total_prompt_tokens += prompt_tokens
+        self.max_prompt_tokens = max(self.max_prompt_tokens, prompt_tokens)
+        return messages
+    
+    @staticmethod
+    def _topic_context(topic: str) -> str:
+        return f"Context: The conversation is about '{topic}'. Keep responses relevant to this topic while allowing natural conversational flow. If the conversation naturally drifts, gently guide it back to the topic when appropriate."
+    
+    @staticmethod
+    def _summary_message(summary: str) -> str:
+        return f"Summary of the earlier conversation:\n{summary}"
+    
+    def compact_history(
+        self,
+        topic: str,
+        conversation_history: List[Dict[str, str]],
+        summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        The valid history messages that fit the prompt budget, oldest first.
+        
+        The last recent_messages messages are always kept verbatim; older ones
+        are kept while the whole prompt (system prompt, summary, topic context
+        and history) stays within prompt_budget. Messages left out should be
+        covered by the summary (see summary_due and summarize_overflow).
+        """
+        history = self._valid_messages(conversation_history)
+        kept, used = self._fitting(topic, history, summary)
+        if kept < len(history):
+            self.dropped_messages += len(history) - kept
+            logger.debug(f"Compacted conversation history: kept {kept} of {len(history)} messages ({used} tokens)")
+        return history[len(history) - kept:]
+    
+    @staticmethod
+    def _valid_messages(conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        return [
+            {"role": msg.get("role"), "content": msg.get("content")}
+            for msg in conversation_history
+            if msg.get("role") in ["user", "assistant"] and msg.get("content")
+        ]
+    
+    def _fitting(self, topic: str, history: List[Dict[str, str]], summary: Optional[str]) -> Tuple[int, int]:
+        """How many of the newest messages fit the prompt budget, and their tokens"""
+        available = self.prompt_budget - self.token_counter.count_messages([
+            {"content": SYSTEM_PROMPT},
+            {"content": self._topic_context(topic)},
+        ] + ([{"content": self._summary_message(summary)}] if summary else []))
+        kept = 0
+        used = 0
+        for msg in reversed(history):
+            cost = self.token_counter.count_message(msg)
+            if kept >= self.recent_messages and used + cost > available:
+                break
+            kept += 1
+            used += cost
+        return kept, used
+    
+    async def summarize_overflow(
+        self,
+        topic: str,
+        conversation_history: List[Dict[str, str]]
+    ) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        Summary and remaining history for a history sent whole by the client.
+        
+        Without a session there is no stored summary, so when the history does
+        not fit the prompt budget, all but the last recent_messages messages
+        are summarized for this turn instead of being dropped. If summarizing
+        fails the history is returned unchanged, and compact_history keeps
+        only what fits.
+        
+        Returns:
+            (summary or None, history to send verbatim)
+        """
+        history = self._valid_messages(conversation_history)
+        kept, _ = self._fitting(topic, history, None)
+        if kept == len(history):
+            return None, history
+        split = len(history) - self.recent_messages
+        try:
+            return await self.summarize(topic, None, history[:split]), history[split:]
+        except ServiceNotAvailableException as e:
+            logger.warning(f"Could not summarize conversation history, sending the most recent messages: {e}")
+            return None, history
+    
+    def summary_due(self, conversation_history: List[Dict[str, str]], summary: Optional[str] = None) -> int:
+        """
+        How many of the oldest history messages to fold into the summary now.
+        
+        Args:
+            conversation_history: Messages not yet covered by the summary
+            summary: The current summary
+            
+        Returns:
+            0 while the history is small; otherwise all but the last
+            recent_messages messages
+        """
+        foldable = len(conversation_history) - self.recent_messages
+        if foldable <= 0:
+            return 0
+        tokens = self.token_counter.count_messages(conversation_history)
+        if tokens < self.prompt_budget * SUMMARIZE_AT:
+            return 0
+        return foldable
+    
+    async def summarize(self, topic: str, summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+        """
+        Fold messages into the rolling summary of a conversation.
+        
+        Args:
+            topic: The topic being discussed
+            summary: The summary so far (None for the first one)
+            messages: The messages that follow what the summary covers
+            
+        Returns:
+            The updated summary
+            
+        Raises:
+            ServiceNotAvailableException: If OpenAI API is not configured or the call fails
+        """
+        if not self.client:
+            raise ServiceNotAvailableException(
+                "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+            )
+        
+        transcript = "\n".join(
+            f"{'User' if msg.get('role') == 'user' else 'You'}: {msg.get('content')}"
+            for msg in messages
+            if msg.get("role") in ["user", "assistant"] and msg.get("content")
+        )
+        prompt = (
+            f"Topic: {topic}\n\n"
+            f"Summary so far:\n{summary or '(none yet)'}\n\n"
+            f"Messages since:\n{transcript}\n\n"
+            f"Write the updated summary in at most {self.summary_max_tokens * 3 // 4} words."
+        )
+        try:
+            response = await self.client.chat_completion(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,  # Faithful rather than creative
+                max_tokens=self.summary_max_tokens,
+            )
+            if not response.choices or not response.choices[0].message or not response.choices[0].message.content:
+                raise ServiceNotAvailableException("Empty response from OpenAI API")
+            self.summaries += 1
+            return response.choices[0].message.content.strip()
+        except ServiceNotAvailableException:
+            raise
+        except Exception as e:
+            logger.error(f"Error summarizing conversation: {e}", exc_info=True)
+            raise ServiceNotAvailableException(f"Failed to summarize conversation: {str(e)}")
+    
+    def get_stats(self) -> dict:
+        """History compaction statistics"""
+        return {
+            "turns": self.turns,
+            "prompt_budget": self.prompt_budget,
+            "avg_prompt_tokens": self.total_prompt_tokens / self.turns if self.turns else 0.0,
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "dropped_messages": self.dropped_messages,
+            "summaries": self.summaries,
+            "exact_token_counts": self.token_counter.exact,
+        }
+    
     def is_available(self) -> bool:
         """Check if the interactive conversation service is available."""
         return self.client is not None
@@ -1,6 +1,7 @@
 """
-Job tracking system for async avatar generation tasks.
-Uses SQLite for lightweight job status tracking.
+Job tracking system for async tasks (avatar generation, speech generation).
+Uses SQLite for lightweight job status tracking; multi-stage jobs also
+checkpoint each completed stage's output so they can resume after a failure.
 """
 import sqlite3
 import json
@@ -45,6 +46,16 @@ class JobTracker:
                     metadata TEXT
                 )
             """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS job_stages (
+                    job_id TEXT NOT NULL,
+                    stage INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    completed_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (job_id, stage)
+                )
+            """)
             conn.commit()
             conn.close()
     
@@ -84,8 +95,9 @@ class JobTracker:
             updates = ["status = ?", "updated_at = ?"]
             values = [status.value, now]
             
-            if status == JobStatus.PROCESSING and not self.get_job(job_id).get("started_at"):
-                updates.append("started_at = ?")
+            if status == JobStatus.PROCESSING:
+                # Not get_job(): self.lock is already held
+                updates.append("started_at = COALESCE(started_at, ?)")
                 values.append(now)
             
             if status in [JobStatus.COMPLETED, JobStatus.FAILED]:
@@ -157,6 +169,58 @@ class JobTracker:
             
             return jobs
     
+    def claim_job(self, job_id: str, updated_at: str) -> bool:
+        """
+        Mark a job processing if it was not updated since updated_at.
+        
+        Returns True for exactly one of several workers racing to take over
+        the same interrupted job.
+        """
+        now = datetime.utcnow().isoformat()
+        
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ? AND updated_at = ?",
+                (JobStatus.PROCESSING.value, now, job_id, updated_at)
+            )
+            claimed = cursor.rowcount == 1
+            conn.commit()
+            conn.close()
+        
+        return claimed
+    
+    def save_stage(self, job_id: str, stage: int, name: str, output: str):
+        """Checkpoint the output of a completed stage"""
+        now = datetime.utcnow().isoformat()
+        
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO job_stages (job_id, stage, name, output, completed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (job_id, stage, name, output, now))
+            cursor.execute("UPDATE jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+            conn.commit()
+            conn.close()
+    
+    def get_stages(self, job_id: str) -> List[Dict]:
+        """Completed stages of a job, in order"""
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT stage, name, output, completed_at FROM job_stages WHERE job_id = ? ORDER BY stage",
+                (job_id,)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+        
+        return [dict(row) for row in rows]
+    
     def cleanup_old_jobs(self, days: int = 7):
         """Remove jobs older than specified days"""
         cutoff_date = datetime.utcnow().replace(
@@ -173,6 +237,7 @@ class JobTracker:
                 (cutoff_date.isoformat(),)
             )
             deleted = cursor.rowcount
+            cursor.execute("DELETE FROM job_stages WHERE job_id NOT IN (SELECT job_id FROM jobs)")
             conn.commit()
             conn.close()
         
@@ -0,0 +1,242 @@
+"""
+Shared async client for OpenAI-compatible chat completions.
+
+The LLM-backed services (speeches, conversation prompts, interactive
+conversation, rhetorical devices) await completions through one LLMClient
+per process instead of calling the blocking SDK from async handlers:
+
+- one pooled HTTP client with keep-alive (and HTTP/2 when h2 is installed),
+  so consecutive calls reuse warm TLS connections;
+- a concurrency limit, so bursts queue here instead of opening more
+  connections than the pool allows or tripping the provider's rate limits;
+- connect/read timeouts and SDK retries from config.
+
+OPENAI_BASE_URL points the client at any OpenAI-compatible server, e.g. a
+local mock in tests. httpx connection pools belong to an event loop, so the
+underlying client is created per running loop (one per worker in
+production).
+"""
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+
+from config import settings
+
+# Try to import h2 (optional, enables HTTP/2 in httpx)
+try:
+    import h2  # noqa: F401
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+class LLMClient:
+    """Pooled, concurrency-limited async chat completions client"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        max_concurrency: int = 8,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 2,
+        http2: bool = True
+    ):
+        """
+        Args:
+            api_key: OpenAI API key
+            base_url: OpenAI-compatible endpoint (None = api.openai.com)
+            max_connections: Connections in the pool
+            max_keepalive_connections: Idle connections kept open
+            keepalive_expiry: Seconds an idle connection is kept
+            max_concurrency: Completions in flight at once; more wait
+            timeout: Seconds to wait for a completion
+            connect_timeout: Seconds to wait for a connection
+            max_retries: SDK retries on connection errors, 429 and 5xx
+            http2: Use HTTP/2 if h2 is installed
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.http2 = http2 and HAS_H2
+        if http2 and not HAS_H2:
+            logger.debug("h2 not installed; LLM client uses HTTP/1.1")
+        self.lock = threading.Lock()
+        # event loop -> (AsyncOpenAI, Semaphore)
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[AsyncOpenAI, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Metrics
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.streams = 0
+        self.total_first_token_seconds = 0.0
+
+    def _client(self) -> Tuple[AsyncOpenAI, asyncio.Semaphore]:
+        """The client and concurrency limit of the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            entry = self._clients.get(loop)
+            if entry is None:
+                http_client = httpx.AsyncClient(
+                    http2=self.http2,
+                    limits=self.limits,
+                    timeout=self.timeout
+                )
+                entry = (
+                    AsyncOpenAI(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        max_retries=self.max_retries,
+                        timeout=self.timeout,
+                        http_client=http_client
+                    ),
+                    asyncio.Semaphore(self.max_concurrency)
+                )
+                self._clients[loop] = entry
+            return entry
+
+    @asynccontextmanager
+    async def _slot(self, semaphore: asyncio.Semaphore):
+        """Hold one of the max_concurrency slots, recording wait, latency and errors"""
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        start = time.perf_counter()
+        self.total_wait_seconds += start - queued
+        self.in_flight += 1
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.calls += 1
+            self.total_seconds += time.perf_counter() - start
+            semaphore.release()
+
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]], **kwargs: Any):
+        """
+        Create a chat completion, waiting for a free slot if the limit is reached.
+
+        Args:
+            model: Model name
+            messages: Chat messages
+            **kwargs: Further completion parameters (temperature, max_tokens, ...)
+
+        Returns:
+            The SDK's ChatCompletion
+
+        Raises:
+            openai.OpenAIError: If the request fails after retries
+        """
+        client, semaphore = self._client()
+        async with self._slot(semaphore):
+            return await client.chat.completions.create(model=model, messages=messages, **kwargs)
+
+    async def stream_chat_completion(
+        self, model: str, messages: List[Dict[str, str]], **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion's text as it is generated (stream=True).
+
+        The slot is held until the stream is exhausted or closed, so close the
+        iterator (aclose()) when abandoning it early.
+
+        Yields:
+            Content deltas, in order
+
+        Raises:
+            openai.OpenAIError: If the request fails after retries
+        """
+        client, semaphore = self._client()
+        async with self._slot(semaphore):
+            stream_start = time.perf_counter()
+            stream = await client.chat.completions.create(
+                model=model, messages=messages, stream=True, **kwargs
+            )
+            try:
+                first = True
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if first:
+                            self.streams += 1
+                            self.total_first_token_seconds += time.perf_counter() - stream_start
+                            first = False
+                        yield delta
+            finally:
+                await stream.close()
+
+    async def aclose(self):
+        """Close the connection pool of the running event loop"""
+        with self.lock:
+            entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].close()
+
+    def get_stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "http2": self.http2,
+            "avg_latency_ms": self.total_seconds / self.calls * 1000 if self.calls else 0.0,
+            "avg_wait_ms": self.total_wait_seconds / self.calls * 1000 if self.calls else 0.0,
+            "streams": self.streams,
+            "avg_time_to_first_token_ms": (
+                self.total_first_token_seconds / self.streams * 1000 if self.streams else 0.0
+            ),
+        }
+
+
+def create_llm_client() -> Optional[LLMClient]:
+    """Build the client from settings (None without an API key)"""
+    if not settings.OPENAI_API_KEY:
+        return None
+    return LLMClient(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL or None,
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+        max_retries=settings.LLM_MAX_RETRIES,
+        http2=settings.LLM_HTTP2
+    )
+
+
+# Create singleton instance, shared by all LLM-backed services
+llm_client = create_llm_client()
@@ -11,18 +11,23 @@ This module provides the main FastAPI application with:
 - Caching for improved performance
 """
 
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import Response, JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import os
-import soundfile as sf
-import io
+import asyncio
+import json
+import base64
+import hashlib
+import re
 import time
 import uuid
-from typing import Optional, List
+import threading
+from typing import BinaryIO, Iterator, Optional, List, Tuple
 from datetime import datetime
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -31,21 +36,39 @@ from slowapi.errors import RateLimitExceeded
 from config import settings
 from security import validate_text_input, validate_voice, validate_speed
 from tts_service import TTSService
+from audio_encoding import (
+    OUTPUT_FORMATS, AudioEncoder, encode_audio, float_to_pcm16, negotiate_format,
+    resample, validate_output_options, wav_header
+)
+from audio_segment_cache import AudioSegmentCache
+from tts_batcher import TTSMicroBatcher
+from session_profile import SessionProfile
+from voice_registry import VoiceRegistry
+from tts_sidecar import TTSSidecarClient
+from text_frontend import TextFrontend
+from single_flight import SingleFlight
+from spoken_reply import SpokenReplyStats, aclosing, stream_spoken_reply
+from llm_client import llm_client
 from cache_manager import CacheManager
+from cache_backends import RedisCacheBackend
+from cache_codecs import CacheCodec, parse_namespace_codecs
 from performance_monitor import PerformanceMonitor
 from rate_limiter import RateLimiter
 from job_tracker import JobTracker, JobStatus
 from cleanup_scheduler import CleanupScheduler
 from data_service import data_service
-from writings_service import writings_service
+from writings_service import async_writings_service
 from conversation_service import conversation_service
 from interactive_conversation_service import interactive_conversation_service
 from rhetorical_device_service import rhetorical_device_service
 from speech_service import speech_service
-from speeches_service import speeches_service
-from poems_service import poems_service
-from statistics_service import statistics_service
-from database import get_db, init_db, get_db_health, get_pipeline_stats
+from speech_jobs import SpeechJobRunner
+from conversation_sessions import ConversationSessionStore, SessionSummarizer
+from conversation_socket import ConversationSocket
+from speeches_service import speeches_service, async_speeches_service
+from poems_service import async_poems_service
+from statistics_service import statistics_service, async_statistics_service
+from database import AsyncSession, get_db, get_async_db, async_db_session, init_db, get_db_health, get_pipeline_stats
 from pipeline_health import (
     pipeline_health,
     ComponentStatus,
@@ -58,7 +81,7 @@ from exceptions import (
     AudioGenerationException
 )
 from models import (
-    ErrorResponse, HealthResponse, StatusResponse, VoicesResponse, TTSRequest,
+    ErrorResponse, HealthResponse, StatusResponse, VoicesResponse, TTSRequest, TTSStreamRequest,
     WritingCreate, WritingUpdate, WritingResponse, WritingsListResponse,
     ConversationPromptRequest, ConversationPromptsResponse, ConversationPrompt,
     InteractiveConversationStartRequest, InteractiveConversationContinueRequest,
@@ -125,17 +148,67 @@ def safe_load_context():
     finally:
         np.load = original_load
 
+# Initialize Voice Registry (converted from the voices file on first start)
+voice_registry = None
+if settings.VOICE_REGISTRY_ENABLED and (
+    os.path.exists(settings.VOICES_PATH) or os.path.exists(settings.VOICE_INDEX_PATH)
+):
+    try:
+        voice_registry = VoiceRegistry.from_settings(settings)
+        pipeline_health.record_component_check(
+            "voice_registry",
+            ComponentStatus.HEALTHY,
+            metadata=voice_registry.get_stats()
+        )
+    except Exception as e:
+        logger.warning(f"Voice registry unavailable, using {settings.VOICES_PATH} directly: {e}")
+        voice_registry = None
+        pipeline_health.record_component_check("voice_registry", ComponentStatus.UNAVAILABLE, error=str(e))
+
 # Initialize TTS Service
 try:
-    with safe_load_context():
-        voices_file = settings.VOICES_PATH if os.path.exists(settings.VOICES_PATH) else "voices.bin"
-        tts_service = TTSService(model_path=settings.MODEL_PATH, voices_path=voices_file)
+    segment_cache = AudioSegmentCache(
+        max_memory_bytes=settings.TTS_CHUNK_CACHE_MEMORY_MB * 1024 * 1024,
+        cache_dir=settings.TTS_CHUNK_CACHE_DIR or None,
+        max_disk_bytes=settings.TTS_CHUNK_CACHE_DISK_MB * 1024 * 1024 or None,
+        ttl=settings.TTS_CHUNK_CACHE_TTL_SECONDS or None
+    ) if settings.TTS_CHUNK_CACHE_ENABLED else None
+    if settings.TTS_SIDECAR_SOCKET:
+        # Client mode: the model lives in the shared inference sidecar
+        # The sidecar may still be starting; readiness is tracked by the warmup
+        # thread and /api/health rather than by failing initialization here
+        sidecar_client = TTSSidecarClient(settings.TTS_SIDECAR_SOCKET, timeout=settings.TTS_SIDECAR_TIMEOUT)
+        tts_service = TTSService.from_sidecar(sidecar_client, segment_cache=segment_cache)
+        logger.info(f"Using TTS sidecar at {settings.TTS_SIDECAR_SOCKET}")
+    else:
+        # Kokoro np.load()s its voices file, so it always gets the original one
+        # (under the np.load patch); styles and names come from the registry
+        with safe_load_context():
+            voices_file = settings.VOICES_PATH if os.path.exists(settings.VOICES_PATH) else "voices.bin"
+            tts_service = TTSService(
+                model_path=settings.MODEL_PATH,
+                voices_path=voices_file,
+                parallel_workers=settings.TTS_PARALLEL_WORKERS,
+                segment_cache=segment_cache,
+                session_profile=SessionProfile.from_settings(
+                    settings, sessions_per_process=settings.TTS_PARALLEL_WORKERS
+                ),
+                voice_registry=voice_registry,
+                text_frontend=TextFrontend.from_settings(settings)
+            )
     logger.info("TTS Service initialized successfully")
-    pipeline_health.record_component_check(
-        "tts_service",
-        ComponentStatus.HEALTHY,
-        metadata={"voices_available": len(tts_service.get_voices()) if tts_service else 0}
-    )
+    if tts_service.sidecar is not None and tts_service.model_version is None:
+        pipeline_health.record_component_check(
+            "tts_service",
+            ComponentStatus.DEGRADED,
+            metadata={"state": "waiting_for_sidecar"}
+        )
+    else:
+        pipeline_health.record_component_check(
+            "tts_service",
+            ComponentStatus.HEALTHY,
+            metadata={"voices_available": len(tts_service.get_voices())}
+        )
 except Exception as e:
     logger.error(f"Failed to initialize TTS Service: {e}", exc_info=True)
     tts_service = None
@@ -151,10 +224,301 @@ except Exception as e:
         traceback=str(e)
     )
 
+# TTS readiness: set once warmup has finished (or immediately if there is nothing to warm)
+tts_ready = threading.Event()
+
+
+def wait_for_sidecar() -> dict:
+    """Wait (indefinitely) for the TTS sidecar to finish starting, logging while it is not ready."""
+    while True:
+        try:
+            return tts_service.warmup(sidecar_timeout=settings.TTS_SIDECAR_CONNECT_TIMEOUT or None)
+        except ConnectionError as e:
+            logger.warning(f"{e}; still waiting")
+
+
+def warmup_tts_service():
+    """Warm every TTS session so the first real request doesn't pay setup costs."""
+    try:
+        pipeline_health.record_component_check("tts_service", ComponentStatus.DEGRADED, metadata={"state": "warming_up"})
+        if tts_service.sidecar is not None:
+            summary = wait_for_sidecar()
+        else:
+            summary = tts_service.warmup(voices=settings.TTS_WARMUP_VOICES or None)
+        logger.info(
+            f"TTS warmup complete: {summary['renders']} renders on {summary['sessions']} session(s) "
+            f"in {summary['duration_seconds']:.2f}s"
+        )
+        pipeline_health.record_component_check(
+            "tts_service",
+            ComponentStatus.HEALTHY,
+            response_time=summary["duration_seconds"],
+            metadata={"warmup": summary}
+        )
+    except Exception as e:
+        # A failed warmup only costs latency on the first requests
+        logger.error(f"TTS warmup failed: {e}", exc_info=True)
+        pipeline_health.record_error("tts_service", "WarmupError", str(e))
+        pipeline_health.record_component_check("tts_service", ComponentStatus.HEALTHY, metadata={"warmup": "failed"})
+    finally:
+        tts_ready.set()
+
+
+if not (tts_service and (settings.TTS_WARMUP_ENABLED or tts_service.sidecar is not None)):
+    tts_ready.set()
+
+
+# Initialize TTS micro-batcher for short utterances. With a single session
+# there is nothing to spread a batch over, so it would only add latency.
+tts_batcher = None
+if tts_service and settings.TTS_BATCHING_ENABLED and tts_service.parallel_workers <= 1:
+    logger.info("TTS batching skipped: it needs TTS_PARALLEL_WORKERS > 1")
+elif tts_service and settings.TTS_BATCHING_ENABLED:
+    try:
+        tts_batcher = TTSMicroBatcher(
+            tts_service,
+            batch_window_ms=settings.TTS_BATCH_WINDOW_MS,
+            max_batch_size=settings.TTS_MAX_BATCH_SIZE
+        )
+    except Exception as e:
+        logger.error(f"Failed to initialize TTS batcher: {e}", exc_info=True)
+        tts_batcher = None
+
+
+# Identical requests in flight at the same time share one computation
+tts_flights = SingleFlight("tts")
+prompt_flights = SingleFlight("prompts")
+
+# Time-to-first-token/audio of streamed conversation replies
+spoken_reply_stats = SpokenReplyStats()
+
+
+def normalize_topic(topic: str) -> str:
+    """Topic as used in single-flight keys: case and whitespace insensitive"""
+    return " ".join(topic.split()).casefold()
+
+
+async def synthesize_short(text: str, voice: str, speed: float):
+    """
+    Synthesize a short utterance without blocking the event loop.
+    
+    Texts that fit in a single chunk go through the micro-batcher; anything
+    else (or when batching is disabled) runs directly on the TTS service.
+    """
+    if tts_batcher and len(text) <= tts_service.OPTIMAL_CHUNK_SIZE:
+        return await tts_batcher.generate_audio(text, voice, speed)
+    return await run_in_threadpool(tts_service.generate_audio, text, voice, speed)
+
+
+def resolve_audio_format(
+    requested: Optional[str],
+    accept: Optional[str],
+    default: str,
+    sample_rate: Optional[int] = None,
+    bit_depth: Optional[int] = None
+) -> str:
+    """Negotiate the output format for a request and check its encoding options."""
+    try:
+        audio_format = negotiate_format(requested, accept, default)
+        validate_output_options(audio_format, sample_rate, bit_depth)
+    except ValueError as e:
+        raise ValidationException(str(e), field="format")
+    return audio_format
+
+
+def tts_cache_key(
+    text: str,
+    voice: str,
+    speed: float,
+    audio_format: str = "wav",
+    sample_rate: Optional[int] = None,
+    bit_depth: Optional[int] = None
+) -> str:
+    """
+    Cache key for an encoded TTS response.
+    
+    Each format/rate/depth variant is cached separately; the default WAV
+    keeps the original key so existing entries stay valid.
+    """
+    key = f"tts:{text}:{voice}:{speed}"
+    if audio_format == "wav" and sample_rate is None and bit_depth is None:
+        return key
+    return f"{key}:{audio_format}:{sample_rate or ''}:{bit_depth or ''}"
+
+
+def open_cached_file(cache_key: str) -> Optional[Tuple[BinaryIO, int]]:
+    """
+    Open the disk cache file of a binary entry, as (handle, size).
+    
+    The file is opened before the response is built, so quota eviction
+    deleting it meanwhile cannot truncate the body: the open handle keeps
+    the data readable. A file evicted before it was opened counts as a miss.
+    """
+    cached_file = cache_manager.get_file(cache_key)
+    if not cached_file:
+        return None
+    try:
+        handle = open(cached_file, "rb")
+    except FileNotFoundError:
+        return None
+    return handle, os.fstat(handle.fileno()).st_size
+
+
+def iter_file(handle: BinaryIO, start: int, length: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Read length bytes of an open file from start, closing it when done"""
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def cached_audio_response(cache_key: str, media_type: str, headers: dict) -> Optional[Response]:
+    """
+    Build a response for cached audio, or None on a cache miss.
+    
+    Audio in the disk cache is streamed from its file without reading it
+    into memory; audio held only in memory (e.g. after a failed disk write)
+    is sent from there.
+    """
+    if not cache_manager:
+        return None
+    cached_file = open_cached_file(cache_key)
+    if cached_file:
+        return file_range_response(*cached_file, media_type, headers, None)
+    cached_audio = cache_manager.get(cache_key)
+    if cached_audio is not None:
+        return Response(content=cached_audio, media_type=media_type, headers=headers)
+    return None
+
+
+# Reply audio stored by content: "<sha256 prefix>.<extension>"
+AUDIO_ID_RE = re.compile(r"^[0-9a-f]{32}\.([a-z0-9]+)$")
+AUDIO_MEDIA_TYPES = {output["extension"]: output["media_type"] for output in OUTPUT_FORMATS.values()}
+
+
+def store_reply_audio(audio_bytes: bytes, audio_format: str) -> str:
+    """
+    Store encoded reply audio and return a short URL for it (/api/audio/{id}).
+    
+    The audio is content-addressed, so the same reply is stored once and its
+    URL can be cached by the browser indefinitely. Without a cache to store
+    it in, the audio is returned inline as a data URI.
+    """
+    output = OUTPUT_FORMATS[audio_format]
+    if cache_manager:
+        audio_id = f"{hashlib.sha256(audio_bytes).hexdigest()[:32]}.{output['extension']}"
+        try:
+            cache_manager.set(f"audio:{audio_id}", audio_bytes, ttl=settings.TTS_CONVERSATION_AUDIO_TTL_SECONDS)
+            return f"/api/audio/{audio_id}"
+        except Exception as e:
+            logger.warning(f"Failed to store reply audio, sending it inline: {e}")
+    mime_type = output["media_type"].split(";")[0]
+    return f"data:{mime_type};base64,{base64.b64encode(audio_bytes).decode('utf-8')}"
+
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) of a single-range request, or None for the whole body.
+    
+    Multi-range and malformed Range headers get the whole body, as RFC 9110 allows.
+    
+    Raises:
+        ValueError: If the range is unsatisfiable
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (range_header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(0, size - int(last)), size - 1
+    if start >= size or start > end:
+        raise ValueError(f"Range not satisfiable: {range_header}")
+    return start, end
+
+
+def byte_range_response(data, media_type: str, headers: dict, range_header: Optional[str]) -> Response:
+    """Respond with in-memory audio, or the part of it a single-range request asks for"""
+    data = bytes(data)
+    size = len(data)
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        return Response(content=data, media_type=media_type, headers=headers)
+    start, end = byte_range
+    return Response(
+        content=data[start:end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+
+def file_range_response(handle: BinaryIO, size: int, media_type: str, headers: dict,
+                        range_header: Optional[str]) -> Response:
+    """Stream audio from an open file, or the part of it a single-range request asks for"""
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        handle.close()
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        return StreamingResponse(
+            iter_file(handle, 0, size),
+            media_type=media_type,
+            headers={**headers, "Content-Length": str(size)}
+        )
+    start, end = byte_range
+    return StreamingResponse(
+        iter_file(handle, start, end - start + 1),
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(end - start + 1), "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+
 # Initialize supporting services
 try:
-    cache_manager = CacheManager()
-    pipeline_health.record_component_check("cache_manager", ComponentStatus.HEALTHY)
+    cache_codec = None
+    if settings.CACHE_COMPRESSION_ENABLED:
+        cache_codec = CacheCodec(
+            min_size=settings.CACHE_COMPRESSION_MIN_BYTES,
+            level=settings.CACHE_COMPRESSION_LEVEL,
+            namespace_codecs=parse_namespace_codecs(settings.CACHE_COMPRESSION_CODECS),
+            dictionary_dir=os.path.join(settings.CACHE_DIR, "dictionaries")
+        )
+    cache_backend = None
+    if settings.CACHE_BACKEND_URL:
+        try:
+            cache_backend = RedisCacheBackend(
+                settings.CACHE_BACKEND_URL,
+                prefix=settings.CACHE_BACKEND_PREFIX,
+                codec=cache_codec
+            )
+        except Exception as e:
+            logger.warning(f"Shared cache backend unavailable, using local cache only: {e}")
+    cache_manager = CacheManager(
+        cache_dir=settings.CACHE_DIR,
+        ttl=settings.CACHE_TTL_SECONDS,
+        max_memory_bytes=settings.CACHE_MEMORY_MB * 1024 * 1024,
+        backend=cache_backend,
+        max_disk_bytes=settings.CACHE_DISK_QUOTA_MB * 1024 * 1024 or None,
+        codec=cache_codec
+    )
+    pipeline_health.record_component_check(
+        "cache_manager",
+        ComponentStatus.HEALTHY,
+        metadata={"backend": cache_backend.name if cache_backend else None}
+    )
 except Exception as e:
     logger.error(f"Failed to initialize Cache Manager: {e}", exc_info=True)
     cache_manager = None
@@ -190,6 +554,46 @@ except Exception as e:
     job_tracker = None
     pipeline_health.record_component_check("job_tracker", ComponentStatus.ERROR, error=str(e))
 
+def save_speech(topic: str, content: str) -> int:
+    """Store a generated speech and count it as practiced; returns its id"""
+    with get_db() as db:
+        new_speech = speeches_service.create_speech(db=db, topic=topic, content=content)
+        statistics_service.increment_speech_practiced(db)
+        statistics_service.update_goal_progress(db)
+        return new_speech.id
+
+
+# Initialize Speech Jobs (background mode of /api/speeches)
+speech_jobs = None
+if job_tracker:
+    speech_jobs = SpeechJobRunner(
+        speech_service,
+        job_tracker,
+        save_speech,
+        cache_manager=cache_manager,
+        stage_ttl=settings.SPEECH_STAGE_CACHE_TTL_SECONDS,
+        stale_after=settings.SPEECH_JOB_STALE_SECONDS
+    )
+
+# Initialize Conversation Sessions (history of interactive conversations)
+try:
+    conversation_sessions = ConversationSessionStore(
+        max_sessions=settings.CONVERSATION_SESSION_MAX,
+        path=settings.CONVERSATION_SESSION_PATH or None,
+        idle_ttl=settings.CONVERSATION_SESSION_IDLE_SECONDS,
+        max_messages=settings.CONVERSATION_SESSION_MAX_MESSAGES
+    )
+    pipeline_health.record_component_check("conversation_sessions", ComponentStatus.HEALTHY)
+except Exception as e:
+    logger.error(f"Failed to initialize Conversation Sessions: {e}", exc_info=True)
+    conversation_sessions = None
+    pipeline_health.record_component_check("conversation_sessions", ComponentStatus.ERROR, error=str(e))
+
+# Rolling summaries of older turns, so long conversations keep a bounded prompt
+session_summarizer = (
+    SessionSummarizer(conversation_sessions, interactive_conversation_service) if conversation_sessions else None
+)
+
 # Initialize Cleanup Scheduler
 cleanup_scheduler = None
 try:
@@ -199,7 +603,10 @@ try:
             cache_manager=cache_manager,
             rate_limiter=rate_limiter,
             temp_dir=settings.TEMP_DIR,
-            cleanup_interval=int(os.getenv("CLEANUP_INTERVAL", "3600"))  # 1 hour default
+            cleanup_interval=int(os.getenv("CLEANUP_INTERVAL", "3600")),  # 1 hour default
+            cache_sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+            segment_cache=tts_service.segment_cache if tts_service else None,
+            session_store=conversation_sessions
         )
         pipeline_health.record_component_check("cleanup_scheduler", ComponentStatus.HEALTHY)
 except Exception as e:
@@ -381,6 +788,7 @@ async def root():
         "docs": "/docs" if settings.DEBUG else "Documentation disabled in production",
         "endpoints": {
             "tts": "/api/tts",
+            "tts_stream": "/api/tts/stream",
             "writings": "/api/writings",
             "voices": "/api/voices",
             "health": "/api/health",
@@ -408,7 +816,17 @@ async def root():
     description="Check if the API is running and healthy."
 )
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint. Reports "warming_up" (503) until TTS warmup finishes."""
+    if not tts_ready.is_set():
+        return JSONResponse(
+            status_code=503,
+            content=HealthResponse(
+                status="warming_up",
+                timestamp=datetime.utcnow().isoformat() + "Z",
+                version="1.0.0"
+            ).dict(),
+            headers={"Retry-After": "5"}
+        )
     return HealthResponse(
         status="healthy",
         timestamp=datetime.utcnow().isoformat() + "Z",
@@ -476,7 +894,27 @@ async def get_metrics():
     """Get performance metrics from performance monitor."""
     try:
         if performance_monitor:
-            return performance_monitor.get_metrics()
+            metrics = performance_monitor.get_metrics()
+            if tts_batcher:
+                metrics["tts_batching"] = tts_batcher.get_stats()
+            if voice_registry:
+                metrics["voice_registry"] = voice_registry.get_stats()
+            if tts_service and tts_service.text_frontend:
+                metrics["g2p_cache"] = tts_service.text_frontend.get_stats()
+            metrics["single_flight"] = {
+                flights.name: flights.get_stats() for flights in (tts_flights, prompt_flights)
+            }
+            if llm_client:
+                metrics["llm_client"] = llm_client.get_stats()
+            if speech_jobs:
+                metrics["speech_jobs"] = speech_jobs.get_stats()
+            metrics["streamed_replies"] = spoken_reply_stats.get_stats()
+            if conversation_sessions:
+                metrics["conversation_sessions"] = conversation_sessions.get_stats()
+            metrics["conversation_compaction"] = interactive_conversation_service.get_stats()
+            if session_summarizer:
+                metrics["conversation_compaction"]["summarizer"] = session_summarizer.get_stats()
+            return metrics
         else:
             return {"error": "Performance monitor not available"}
     except Exception as e:
@@ -523,14 +961,15 @@ async def get_pipeline_diagnostics():
 )
 async def get_pipeline_stats_endpoint():
     """Get pipeline statistics including jobs and writings."""
+    def read_stats():
+        with get_db() as db:
+            return get_pipeline_stats(db)
+    
     try:
-        db = next(get_db())
-        try:
-            stats = get_pipeline_stats(db)
-            pipeline_health.record_component_check("database", ComponentStatus.HEALTHY)
-            return stats
-        finally:
-            db.close()
+        # The job statistics use the sync session; keep them off the event loop
+        stats = await run_in_threadpool(read_stats)
+        pipeline_health.record_component_check("database", ComponentStatus.HEALTHY)
+        return stats
     except Exception as e:
         logger.error(f"Error getting pipeline stats: {e}", exc_info=True)
         pipeline_health.record_error("database", "StatsError", str(e))
@@ -567,6 +1006,11 @@ async def get_voices():
         raise ServiceNotAvailableException("TTS")
     
     try:
+        if voice_registry:
+            # Held in memory and kept current by the registry's hot reload
+            voices = voice_registry.get_voices()
+            return VoicesResponse(voices=voices, count=len(voices), metadata=voice_registry.get_metadata())
+        
         # Try to get from cache
         cache_key = "voices_list"
         cached_voices = cache_manager.get(cache_key)
@@ -597,13 +1041,17 @@ async def get_voices():
     - **text**: Text to convert to speech (supports text of any length)
     - **voice**: Voice identifier (default: af_bella)
     - **speed**: Speech speed multiplier (0.5-2.0, default: 1.0)
+    - **format**: `wav`, `flac`, `opus` (OGG) or `mp3`; when omitted it is
+      negotiated from the Accept header
+    - **sample_rate**: Output sample rate in Hz (default: model rate)
+    - **bit_depth**: PCM bit depth for wav/flac, 16 or 24
     
-    Returns a WAV audio file. Results are cached for performance.
+    Returns an audio file. Each format variant is cached separately.
     """,
     responses={
         200: {
             "description": "Audio file generated successfully",
-            "content": {"audio/wav": {}}
+            "content": {"audio/wav": {}, "audio/flac": {}, "audio/ogg": {}, "audio/mpeg": {}}
         },
         400: {"description": "Validation error", "model": ErrorResponse},
         503: {"description": "Service unavailable", "model": ErrorResponse}
@@ -626,34 +1074,64 @@ async def generate_speech(request: Request, tts_request: TTSRequest):
         available_voices = tts_service.get_voices()
         validate_voice(tts_request.voice, available_voices)
         validate_speed(tts_request.speed)
+        audio_format = resolve_audio_format(
+            tts_request.format,
+            request.headers.get("accept"),
+            settings.TTS_DEFAULT_AUDIO_FORMAT,
+            tts_request.sample_rate,
+            tts_request.bit_depth
+        )
     except ValidationException as e:
         raise
     
     request_id = getattr(request.state, 'request_id', 'unknown')
-    logger.info(f"[{request_id}] Generating speech: text_length={len(tts_request.text)}, voice={tts_request.voice}, speed={tts_request.speed}")
+    logger.info(f"[{request_id}] Generating speech: text_length={len(tts_request.text)}, voice={tts_request.voice}, speed={tts_request.speed}, format={audio_format}")
+    
+    output = OUTPUT_FORMATS[audio_format]
+    disposition = f"attachment; filename=speech.{output['extension']}"
     
     # Generate cache key
-    cache_key = f"tts:{tts_request.text}:{tts_request.voice}:{tts_request.speed}"
+    cache_key = tts_cache_key(
+        tts_request.text, tts_request.voice, tts_request.speed,
+        audio_format, tts_request.sample_rate, tts_request.bit_depth
+    )
     
-    # Try to get from cache
-    cached_audio = cache_manager.get(cache_key)
-    if cached_audio is not None:
+    # Try to get from cache (disk and index I/O, so off the event loop)
+    cached_response = await run_in_threadpool(
+        cached_audio_response,
+        cache_key,
+        output["media_type"],
+        {"Content-Disposition": disposition, "X-Cache": "HIT", "Vary": "Accept"}
+    )
+    if cached_response is not None:
         logger.debug(f"[{request_id}] Returning cached audio")
-        return Response(
-            content=cached_audio,
-            media_type="audio/wav",
-            headers={"Content-Disposition": "attachment; filename=speech.wav", "X-Cache": "HIT"}
-        )
+        return cached_response
     
-    try:
+    async def render():
+        """Synthesize, encode and cache the audio; runs once per cache key in flight"""
         # Generate audio with error tracking
         tts_start = time.time()
+        audio_bytes = None
         try:
-            audio, sample_rate = tts_service.generate_audio(
-                tts_request.text,
-                tts_request.voice,
-                tts_request.speed
-            )
+            if (
+                audio_format == "wav"
+                and tts_request.sample_rate is None
+                and tts_request.bit_depth in (None, 16)
+                and len(tts_request.text) > tts_service.OPTIMAL_CHUNK_SIZE
+            ):
+                # Long texts render straight into a single pre-sized WAV buffer
+                audio_bytes, sample_rate = await run_in_threadpool(
+                    tts_service.generate_wav,
+                    tts_request.text,
+                    tts_request.voice,
+                    tts_request.speed
+                )
+            else:
+                audio, sample_rate = await synthesize_short(
+                    tts_request.text,
+                    tts_request.voice,
+                    tts_request.speed
+                )
             tts_duration = time.time() - tts_start
             pipeline_health.record_operation("tts_service", "generate_audio", tts_duration, success=True)
             pipeline_health.record_component_check("tts_service", ComponentStatus.HEALTHY, tts_duration)
@@ -671,27 +1149,35 @@ async def generate_speech(request: Request, tts_request: TTSRequest):
             )
             raise
         
-        # Convert to bytes
-        buffer = io.BytesIO()
-        sf.write(buffer, audio, sample_rate, format='WAV')
-        buffer.seek(0)
-        audio_bytes = buffer.getvalue()
+        # Encode to the negotiated format
+        if audio_bytes is None:
+            audio_bytes = await run_in_threadpool(
+                encode_audio, audio, sample_rate, audio_format, tts_request.sample_rate, tts_request.bit_depth
+            )
         
         # Cache the result (cache for 24 hours for TTS)
         if cache_manager:
             try:
-                cache_manager.set(cache_key, audio_bytes)
+                # Blob write, rename and index commit: keep them off the event loop
+                await run_in_threadpool(cache_manager.set, cache_key, audio_bytes)
                 pipeline_health.record_component_check("cache_manager", ComponentStatus.HEALTHY)
             except Exception as e:
                 logger.warning(f"[{request_id}] Cache set failed: {e}")
                 pipeline_health.record_component_check("cache_manager", ComponentStatus.DEGRADED, error=str(e))
-        
-        logger.info(f"[{request_id}] Speech generated successfully ({len(audio_bytes)} bytes)")
+        return audio_bytes
+    
+    try:
+        # Concurrent identical requests wait for the first one's audio
+        audio_bytes, shared = await tts_flights.do(cache_key, render)
+        if shared:
+            logger.info(f"[{request_id}] Speech shared with an identical request in flight ({len(audio_bytes)} bytes)")
+        else:
+            logger.info(f"[{request_id}] Speech generated successfully ({len(audio_bytes)} bytes)")
         
         return Response(
             content=audio_bytes,
-            media_type="audio/wav",
-            headers={"Content-Disposition": "attachment; filename=speech.wav", "X-Cache": "MISS"}
+            media_type=output["media_type"],
+            headers={"Content-Disposition": disposition, "X-Cache": "MISS", "Vary": "Accept"}
         )
     
     except NaturalSpeechException:
@@ -701,18 +1187,210 @@ async def generate_speech(request: Request, tts_request: TTSRequest):
         raise AudioGenerationException(f"Failed to generate audio: {str(e)}")
 
 
+# Streaming TTS endpoint
+@app.post(
+    "/api/tts/stream",
+    tags=["TTS"],
+    summary="Stream Speech",
+    description="""
+    Stream speech for long texts, sending each chunk as soon as it is rendered.
+    
+    - **text**: Text to convert to speech (supports text of any length)
+    - **voice**: Voice identifier (default: af_bella)
+    - **speed**: Speech speed multiplier (0.5-2.0, default: 1.0)
+    - **format**: `wav` (chunked 16-bit PCM WAV), `opus` (OGG pages encoded as
+      chunks arrive), `ndjson` or `sse` (base64 PCM16 frames, one per chunk)
+    - **sample_rate**: Output sample rate in Hz for `wav`/`opus` (default: model rate)
+    """,
+    responses={
+        200: {
+            "description": "Audio stream",
+            "content": {"audio/wav": {}, "audio/ogg": {}, "application/x-ndjson": {}, "text/event-stream": {}}
+        },
+        400: {"description": "Validation error", "model": ErrorResponse},
+        503: {"description": "Service unavailable", "model": ErrorResponse}
+    }
+)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
+async def stream_speech(request: Request, tts_request: TTSStreamRequest):
+    """
+    Stream speech from text.
+    
+    Time-to-first-audio is bounded by the first chunk rather than the whole text.
+    Fully cached WAV and Opus results are returned directly.
+    """
+    if not tts_service:
+        raise ServiceNotAvailableException("TTS")
+    
+    validate_text_input(tts_request.text)
+    validate_voice(tts_request.voice, tts_service.get_voices())
+    validate_speed(tts_request.speed)
+    if tts_request.bit_depth not in (None, 16):
+        raise ValidationException("Streamed audio is always 16-bit", field="bit_depth")
+    if tts_request.format in ("wav", "opus"):
+        resolve_audio_format(tts_request.format, None, tts_request.format, tts_request.sample_rate)
+    
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    logger.info(f"[{request_id}] Streaming speech: text_length={len(tts_request.text)}, voice={tts_request.voice}, format={tts_request.format}")
+    
+    if tts_request.format in ("wav", "opus"):
+        output = OUTPUT_FORMATS[tts_request.format]
+        cached_response = await run_in_threadpool(
+            cached_audio_response,
+            tts_cache_key(
+                tts_request.text, tts_request.voice, tts_request.speed,
+                tts_request.format, tts_request.sample_rate
+            ),
+            output["media_type"],
+            {"Content-Disposition": f"attachment; filename=speech.{output['extension']}", "X-Cache": "HIT"}
+        )
+        if cached_response is not None:
+            logger.debug(f"[{request_id}] Returning cached audio")
+            return cached_response
+    
+    def frames():
+        tts_start = time.time()
+        first_audio = None
+        encoder = None
+        index = 0
+        try:
+            for segment, sample_rate in tts_service.generate_audio_stream(
+                tts_request.text, tts_request.voice, tts_request.speed
+            ):
+                if first_audio is None:
+                    first_audio = time.time() - tts_start
+                    logger.debug(f"[{request_id}] First audio after {first_audio:.3f}s")
+                    if tts_request.format == "opus":
+                        encoder = AudioEncoder("opus", sample_rate, tts_request.sample_rate)
+                    elif tts_request.format == "wav":
+                        yield wav_header(tts_request.sample_rate or sample_rate)
+                
+                if encoder:
+                    # OGG pages are final once written, so send them straight away
+                    data = encoder.write(segment)
+                    if data:
+                        yield data
+                    index += 1
+                    continue
+                
+                if tts_request.sample_rate:
+                    segment = resample(segment, sample_rate, tts_request.sample_rate)
+                    sample_rate = tts_request.sample_rate
+                pcm = float_to_pcm16(segment)
+                if tts_request.format == "wav":
+                    yield pcm
+                else:
+                    frame = json.dumps({
+                        "index": index,
+                        "sample_rate": sample_rate,
+                        "samples": len(segment),
+                        "audio": base64.b64encode(pcm).decode("ascii")
+                    })
+                    yield _stream_frame(tts_request.format, "audio", frame)
+                index += 1
+            
+            if encoder:
+                yield encoder.close()
+            tts_duration = time.time() - tts_start
+            pipeline_health.record_operation("tts_service", "generate_audio_stream", tts_duration, success=True)
+            if tts_request.format in ("ndjson", "sse"):
+                yield _stream_frame(tts_request.format, "done", json.dumps({
+                    "done": True,
+                    "segments": index,
+                    "time_to_first_audio": first_audio
+                }))
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band where possible
+            tts_duration = time.time() - tts_start
+            logger.error(f"[{request_id}] Error streaming speech: {e}", exc_info=True)
+            pipeline_health.record_operation("tts_service", "generate_audio_stream", tts_duration, success=False)
+            pipeline_health.record_error(
+                "tts_service",
+                type(e).__name__,
+                str(e),
+                context={"request_id": request_id, "voice": tts_request.voice, "segments_sent": index}
+            )
+            if tts_request.format in ("ndjson", "sse"):
+                yield _stream_frame(tts_request.format, "error", json.dumps({
+                    "error": True,
+                    "error_code": "AUDIO_GENERATION_ERROR",
+                    "message": "Failed to generate audio"
+                }))
+    
+    media_types = {
+        "wav": "audio/wav",
+        "opus": OUTPUT_FORMATS["opus"]["media_type"],
+        "ndjson": "application/x-ndjson",
+        "sse": "text/event-stream"
+    }
+    return StreamingResponse(
+        frames(),
+        media_type=media_types[tts_request.format],
+        headers={"Cache-Control": "no-cache", "X-Cache": "MISS"}
+    )
+
+
+def _stream_frame(stream_format: str, event: str, data: str) -> str:
+    """Format a single NDJSON line or SSE event."""
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+@app.get(
+    "/api/audio/{audio_id}",
+    tags=["TTS"],
+    summary="Get Reply Audio",
+    description="Audio of a conversation reply, by the id in its `audio_url`. Supports range requests and conditional requests."
+)
+async def get_reply_audio(request: Request, audio_id: str):
+    """
+    Serve stored reply audio.
+    
+    The id is a hash of the audio, so responses never change and are cached
+    as immutable. Audio on disk is streamed from its file.
+    
+    Raises:
+        HTTPException: 404 if the id is malformed or the audio has expired
+    """
+    match = AUDIO_ID_RE.match(audio_id)
+    if not match or match.group(1) not in AUDIO_MEDIA_TYPES or not cache_manager:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    media_type = AUDIO_MEDIA_TYPES[match.group(1)]
+    etag = f'"{audio_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.TTS_CONVERSATION_AUDIO_TTL_SECONDS}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if request.headers.get("if-none-match") in (etag, f"W/{etag}", "*"):
+        return Response(status_code=304, headers=headers)
+    
+    cache_key = f"audio:{audio_id}"
+    cached_file = await run_in_threadpool(open_cached_file, cache_key)
+    if cached_file:
+        return file_range_response(*cached_file, media_type, headers, request.headers.get("range"))
+    cached_audio = await run_in_threadpool(cache_manager.get, cache_key)
+    if cached_audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return byte_range_response(cached_audio, media_type, headers, request.headers.get("range"))
+
+
 # Cache management endpoints
 @app.post("/api/cache/clear")
 async def clear_cache():
     cache_manager.clear()
+    if tts_service and tts_service.segment_cache:
+        tts_service.segment_cache.clear()
     return {"message": "Cache cleared successfully"}
 
 @app.get("/api/cache/stats")
 async def get_cache_stats():
     return {
         "cache_dir": cache_manager.cache_dir,
-        "memory_entries": len(cache_manager.memory_cache),
-        "ttl_seconds": cache_manager.ttl
+        "ttl_seconds": cache_manager.ttl,
+        **cache_manager.get_stats(),
+        "tts_chunk_cache": tts_service.segment_cache.get_stats() if tts_service and tts_service.segment_cache else None
     }
 
 # Job tracking endpoints
@@ -873,7 +1551,8 @@ async def get_writings(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     min_word_count: Optional[int] = None,
-    max_word_count: Optional[int] = None
+    max_word_count: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all writings with advanced search and filtering options.
@@ -887,55 +1566,51 @@ async def get_writings(
     - **min_word_count**: Minimum word count filter
     - **max_word_count**: Maximum word count filter
     """
-    db = next(get_db())
-    try:
-        # Parse date strings if provided
-        start_date_obj = None
-        end_date_obj = None
-        if start_date:
-            try:
-                start_date_obj = datetime.fromisoformat(start_date).date()
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD.")
-        if end_date:
-            try:
-                end_date_obj = datetime.fromisoformat(end_date).date()
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD.")
-        
-        # Use unified search method that handles all filters
-        writings = writings_service.search_writings(
-            db=db,
-            query=search,
-            skip=skip,
-            limit=limit,
-            author=author,
-            genre=genre,
-            category=category,
-            start_date=start_date_obj,
-            end_date=end_date_obj,
-            min_word_count=min_word_count,
-            max_word_count=max_word_count
+    # Parse date strings if provided
+    start_date_obj = None
+    end_date_obj = None
+    if start_date:
+        try:
+            start_date_obj = datetime.fromisoformat(start_date).date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid start_date format. Use YYYY-MM-DD.")
+    if end_date:
+        try:
+            end_date_obj = datetime.fromisoformat(end_date).date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid end_date format. Use YYYY-MM-DD.")
+    
+    # Use unified search method that handles all filters
+    writings = await async_writings_service.search_writings(
+        db=db,
+        query=search,
+        skip=skip,
+        limit=limit,
+        author=author,
+        genre=genre,
+        category=category,
+        start_date=start_date_obj,
+        end_date=end_date_obj,
+        min_word_count=min_word_count,
+        max_word_count=max_word_count
+    )
+    
+    # Convert to response format
+    writing_responses = [
+        WritingResponse(
+            id=w.id,
+            title=w.title,
+            content=w.content,
+            author=w.author,
+            category=getattr(w, 'category', 'user'),
+            genre=getattr(w, 'genre', None),
+            created_at=w.created_at.isoformat() + "Z",
+            updated_at=w.updated_at.isoformat() + "Z"
         )
-        
-        # Convert to response format
-        writing_responses = [
-            WritingResponse(
-                id=w.id,
-                title=w.title,
-                content=w.content,
-                author=w.author,
-                category=getattr(w, 'category', 'user'),
-                genre=getattr(w, 'genre', None),
-                created_at=w.created_at.isoformat() + "Z",
-                updated_at=w.updated_at.isoformat() + "Z"
-            )
-            for w in writings
-        ]
-        
-        return WritingsListResponse(writings=writing_responses, count=len(writing_responses))
-    finally:
-        db.close()
+        for w in writings
+    ]
+    
+    return WritingsListResponse(writings=writing_responses, count=len(writing_responses))
 
 
 @app.get(
@@ -945,26 +1620,22 @@ async def get_writings(
     summary="Get Writing by ID",
     description="Retrieve a specific writing by its ID."
 )
-async def get_writing(writing_id: int):
+async def get_writing(writing_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a single writing by ID."""
-    db = next(get_db())
-    try:
-        writing = writings_service.get_writing_by_id(db, writing_id)
-        if not writing:
-            raise HTTPException(status_code=404, detail="Writing not found")
-        
-        return WritingResponse(
-            id=writing.id,
-            title=writing.title,
-            content=writing.content,
-            author=writing.author,
-            category=getattr(writing, 'category', 'user'),
-            genre=getattr(writing, 'genre', None),
-            created_at=writing.created_at.isoformat() + "Z",
-            updated_at=writing.updated_at.isoformat() + "Z"
-        )
-    finally:
-        db.close()
+    writing = await async_writings_service.get_writing_by_id(db, writing_id)
+    if not writing:
+        raise HTTPException(status_code=404, detail="Writing not found")
+    
+    return WritingResponse(
+        id=writing.id,
+        title=writing.title,
+        content=writing.content,
+        author=writing.author,
+        category=getattr(writing, 'category', 'user'),
+        genre=getattr(writing, 'genre', None),
+        created_at=writing.created_at.isoformat() + "Z",
+        updated_at=writing.updated_at.isoformat() + "Z"
+    )
 
 
 @app.post(
@@ -975,11 +1646,10 @@ async def get_writing(writing_id: int):
     description="Create a new wonderful writing in the database."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def create_writing(request: Request, writing: WritingCreate):
+async def create_writing(request: Request, writing: WritingCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new writing."""
-    db = next(get_db())
     try:
-        new_writing = writings_service.create_writing(
+        new_writing = await async_writings_service.create_writing(
             db=db,
             title=writing.title,
             content=writing.content,
@@ -989,9 +1659,9 @@ async def create_writing(request: Request, writing: WritingCreate):
         # Track statistics (only for user writings, not curated)
         if getattr(new_writing, 'category', 'user') == 'user':
             word_count = statistics_service._calculate_word_count(writing.content)
-            statistics_service.increment_writing_created(db, word_count)
+            await async_statistics_service.increment_writing_created(db, word_count)
             # Update goal progress
-            statistics_service.update_goal_progress(db)
+            await async_statistics_service.update_goal_progress(db)
         
         return WritingResponse(
             id=new_writing.id,
@@ -1006,8 +1676,6 @@ async def create_writing(request: Request, writing: WritingCreate):
     except Exception as e:
         logger.error(f"Error creating writing: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to create writing")
-    finally:
-        db.close()
 
 
 @app.put(
@@ -1018,11 +1686,10 @@ async def create_writing(request: Request, writing: WritingCreate):
     description="Update an existing writing."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def update_writing(request: Request, writing_id: int, writing: WritingUpdate):
+async def update_writing(request: Request, writing_id: int, writing: WritingUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update an existing writing."""
-    db = next(get_db())
     try:
-        updated_writing = writings_service.update_writing(
+        updated_writing = await async_writings_service.update_writing(
             db=db,
             writing_id=writing_id,
             title=writing.title,
@@ -1048,8 +1715,6 @@ async def update_writing(request: Request, writing_id: int, writing: WritingUpda
     except Exception as e:
         logger.error(f"Error updating writing: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update writing")
-    finally:
-        db.close()
 
 
 @app.delete(
@@ -1059,11 +1724,10 @@ async def update_writing(request: Request, writing_id: int, writing: WritingUpda
     description="Delete a writing from the database."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def delete_writing(request: Request, writing_id: int):
+async def delete_writing(request: Request, writing_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a writing."""
-    db = next(get_db())
     try:
-        success = writings_service.delete_writing(db, writing_id)
+        success = await async_writings_service.delete_writing(db, writing_id)
         if not success:
             raise HTTPException(status_code=404, detail="Writing not found")
         
@@ -1073,8 +1737,6 @@ async def delete_writing(request: Request, writing_id: int):
     except Exception as e:
         logger.error(f"Error deleting writing: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete writing")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -1083,24 +1745,20 @@ async def delete_writing(request: Request, writing_id: int):
     summary="Get Writings Statistics",
     description="Get statistics about the writings database."
 )
-async def get_writings_stats():
+async def get_writings_stats(db: AsyncSession = Depends(get_async_db)):
     """Get statistics about writings."""
-    db = next(get_db())
-    try:
-        total_count = writings_service.get_writings_count(db)
-        curated_count = writings_service.get_writings_count(db, category="curated")
-        user_count = writings_service.get_writings_count(db, category="user")
-        genres = writings_service.get_genres(db)
-        curated_genres = writings_service.get_genres(db, category="curated")
-        return {
-            "total_writings": total_count,
-            "curated_writings": curated_count,
-            "user_writings": user_count,
-            "genres": genres,
-            "curated_genres": curated_genres
-        }
-    finally:
-        db.close()
+    total_count = await async_writings_service.get_writings_count(db)
+    curated_count = await async_writings_service.get_writings_count(db, category="curated")
+    user_count = await async_writings_service.get_writings_count(db, category="user")
+    genres = await async_writings_service.get_genres(db)
+    curated_genres = await async_writings_service.get_genres(db, category="curated")
+    return {
+        "total_writings": total_count,
+        "curated_writings": curated_count,
+        "user_writings": user_count,
+        "genres": genres,
+        "curated_genres": curated_genres
+    }
 
 
 @app.get(
@@ -1110,30 +1768,26 @@ async def get_writings_stats():
     summary="Get Curated Amazing Writings",
     description="Retrieve curated amazing writings from literature, speeches, and poetry."
 )
-async def get_curated_writings(skip: int = 0, limit: int = 100, genre: Optional[str] = None):
+async def get_curated_writings(skip: int = 0, limit: int = 100, genre: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get curated amazing writings with optional genre filter."""
-    db = next(get_db())
-    try:
-        writings = writings_service.get_curated_writings(db, skip, limit, genre=genre)
-        
-        # Convert to response format
-        writing_responses = [
-            WritingResponse(
-                id=w.id,
-                title=w.title,
-                content=w.content,
-                author=w.author,
-                category=getattr(w, 'category', 'curated'),
-                genre=getattr(w, 'genre', None),
-                created_at=w.created_at.isoformat() + "Z",
-                updated_at=w.updated_at.isoformat() + "Z"
-            )
-            for w in writings
-        ]
-        
-        return WritingsListResponse(writings=writing_responses, count=len(writing_responses))
-    finally:
-        db.close()
+    writings = await async_writings_service.get_curated_writings(db, skip, limit, genre=genre)
+    
+    # Convert to response format
+    writing_responses = [
+        WritingResponse(
+            id=w.id,
+            title=w.title,
+            content=w.content,
+            author=w.author,
+            category=getattr(w, 'category', 'curated'),
+            genre=getattr(w, 'genre', None),
+            created_at=w.created_at.isoformat() + "Z",
+            updated_at=w.updated_at.isoformat() + "Z"
+        )
+        for w in writings
+    ]
+    
+    return WritingsListResponse(writings=writing_responses, count=len(writing_responses))
 
 
 @app.get(
@@ -1142,14 +1796,10 @@ async def get_curated_writings(skip: int = 0, limit: int = 100, genre: Optional[
     summary="Get Available Genres",
     description="Get list of available genres for filtering writings."
 )
-async def get_genres(category: Optional[str] = None):
+async def get_genres(category: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get list of available genres, optionally filtered by category."""
-    db = next(get_db())
-    try:
-        genres = writings_service.get_genres(db, category=category)
-        return {"genres": genres, "count": len(genres)}
-    finally:
-        db.close()
+    genres = await async_writings_service.get_genres(db, category=category)
+    return {"genres": genres, "count": len(genres)}
 
 
 # Conversation Practice endpoints
@@ -1173,9 +1823,12 @@ async def generate_conversation_prompts(request: Request, prompt_request: Conver
     try:
         logger.info(f"[{request_id}] Generating {prompt_request.count} prompts for topic: {prompt_request.topic}")
         
-        prompts_data = conversation_service.generate_prompts(
-            topic=prompt_request.topic,
-            count=prompt_request.count
+        prompts_data, _ = await prompt_flights.do(
+            ("conversation", normalize_topic(prompt_request.topic), prompt_request.count),
+            lambda: conversation_service.generate_prompts(
+                topic=prompt_request.topic,
+                count=prompt_request.count
+            )
         )
         
         # Convert to response format
@@ -1241,16 +1894,21 @@ async def start_interactive_conversation(request: Request, conv_request: Interac
     - **topic**: The topic to practice discussing
     - **voice**: Voice identifier for TTS (default: af_bella)
     - **speed**: Speech speed multiplier (0.5-2.0, default: 1.0)
+    - **audio_format**: `wav`, `flac`, `opus` or `mp3` (default: server setting)
+    - **sample_rate**: Audio sample rate in Hz (default: model rate)
     
     Returns both text response and audio for the AI's opening message.
     """
     request_id = getattr(request.state, 'request_id', 'unknown')
     
     try:
+        audio_format = resolve_audio_format(
+            conv_request.audio_format, None, settings.TTS_CONVERSATION_AUDIO_FORMAT, conv_request.sample_rate
+        )
         logger.info(f"[{request_id}] Starting interactive conversation on topic: {conv_request.topic}")
         
         # Start conversation with GPT
-        conversation_data = interactive_conversation_service.start_conversation(conv_request.topic)
+        conversation_data = await interactive_conversation_service.start_conversation(conv_request.topic)
         ai_message = conversation_data.get("message")
         
         if not ai_message:
@@ -1266,21 +1924,17 @@ async def start_interactive_conversation(request: Request, conv_request: Interac
         if tts_service and ai_message:
             try:
                 logger.debug(f"[{request_id}] Generating TTS audio for message")
-                audio, sample_rate = tts_service.generate_audio(
+                audio, sample_rate = await synthesize_short(
                     ai_message,
                     conv_request.voice,
                     conv_request.speed
                 )
                 
-                # Convert audio to base64 for easy transmission
-                import base64
-                import io
-                buffer = io.BytesIO()
-                sf.write(buffer, audio, sample_rate, format='WAV')
-                buffer.seek(0)
-                audio_bytes = buffer.getvalue()
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                audio_url = f"data:audio/wav;base64,{audio_base64}"
+                # Encode and store it, so the response only carries its URL
+                audio_bytes = await run_in_threadpool(
+                    encode_audio, audio, sample_rate, audio_format, conv_request.sample_rate
+                )
+                audio_url = await run_in_threadpool(store_reply_audio, audio_bytes, audio_format)
                 
                 logger.debug(f"[{request_id}] TTS audio generated successfully ({len(audio_bytes)} bytes)")
                 
@@ -1294,12 +1948,15 @@ async def start_interactive_conversation(request: Request, conv_request: Interac
                     context={"request_id": request_id, "message_length": len(ai_message)}
                 )
         
+        session_id = await start_session(request_id, conv_request.topic, ai_message)
+        
         logger.info(f"[{request_id}] Conversation started successfully")
         
         return InteractiveConversationResponse(
             message=ai_message,
             topic=conv_request.topic,
-            audio_url=audio_url
+            audio_url=audio_url,
+            session_id=session_id
         )
         
     except ServiceNotAvailableException as e:
@@ -1334,35 +1991,33 @@ async def continue_interactive_conversation(request: Request, conv_request: Inte
     """
     Continue an interactive conversation.
     
-    - **topic**: The topic being discussed
+    - **session_id**: Session returned by the start endpoint; the server keeps the history
+    - **topic**: The topic being discussed (without session_id)
     - **user_message**: The user's message
-    - **conversation_history**: Previous messages in the conversation
+    - **conversation_history**: Previous messages in the conversation (without session_id)
     - **voice**: Voice identifier for TTS (default: af_bella)
     - **speed**: Speech speed multiplier (0.5-2.0, default: 1.0)
+    - **audio_format**: `wav`, `flac`, `opus` or `mp3` (default: server setting)
+    - **sample_rate**: Audio sample rate in Hz (default: model rate)
     
     Returns both text response and audio for the AI's reply.
     """
     request_id = getattr(request.state, 'request_id', 'unknown')
     
     try:
-        logger.info(f"[{request_id}] Continuing conversation on topic: {conv_request.topic}")
-        
-        # Format conversation history with validation
-        history = []
-        for msg in conv_request.conversation_history:
-            if msg.role in ["user", "assistant"] and msg.content:
-                history.append({"role": msg.role, "content": msg.content})
-        
-        # Add user's current message
-        if conv_request.user_message:
-            history.append({"role": "user", "content": conv_request.user_message})
+        audio_format = resolve_audio_format(
+            conv_request.audio_format, None, settings.TTS_CONVERSATION_AUDIO_FORMAT, conv_request.sample_rate
+        )
+        session, topic, history, summary = await conversation_turn(conv_request)
+        logger.info(f"[{request_id}] Continuing conversation on topic: {topic}")
         
         logger.debug(f"[{request_id}] Continuing conversation with {len(history)} messages in history")
         
         # Get AI response from GPT
-        ai_message = interactive_conversation_service.continue_conversation(
-            conv_request.topic,
-            history
+        ai_message = await interactive_conversation_service.continue_conversation(
+            topic,
+            history,
+            summary=summary
         )
         
         if not ai_message:
@@ -1378,21 +2033,17 @@ async def continue_interactive_conversation(request: Request, conv_request: Inte
         if tts_service and ai_message:
             try:
                 logger.debug(f"[{request_id}] Generating TTS audio for response")
-                audio, sample_rate = tts_service.generate_audio(
+                audio, sample_rate = await synthesize_short(
                     ai_message,
                     conv_request.voice,
                     conv_request.speed
                 )
                 
-                # Convert audio to base64 for easy transmission
-                import base64
-                import io
-                buffer = io.BytesIO()
-                sf.write(buffer, audio, sample_rate, format='WAV')
-                buffer.seek(0)
-                audio_bytes = buffer.getvalue()
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                audio_url = f"data:audio/wav;base64,{audio_base64}"
+                # Encode and store it, so the response only carries its URL
+                audio_bytes = await run_in_threadpool(
+                    encode_audio, audio, sample_rate, audio_format, conv_request.sample_rate
+                )
+                audio_url = await run_in_threadpool(store_reply_audio, audio_bytes, audio_format)
                 
                 logger.debug(f"[{request_id}] TTS audio generated successfully ({len(audio_bytes)} bytes)")
                 
@@ -1406,14 +2057,20 @@ async def continue_interactive_conversation(request: Request, conv_request: Inte
                     context={"request_id": request_id, "message_length": len(ai_message)}
                 )
         
+        if session is not None:
+            await save_turn(session, conv_request.user_message, ai_message)
+        
         logger.info(f"[{request_id}] Conversation continued successfully")
         
         return InteractiveConversationResponse(
             message=ai_message,
-            topic=conv_request.topic,
-            audio_url=audio_url
+            topic=topic,
+            audio_url=audio_url,
+            session_id=session["session_id"] if session is not None else None
         )
         
+    except HTTPException:
+        raise
     except ServiceNotAvailableException as e:
         logger.warning(f"[{request_id}] Interactive conversation service unavailable: {e}")
         raise HTTPException(
@@ -1434,6 +2091,285 @@ async def continue_interactive_conversation(request: Request, conv_request: Inte
         )
 
 
+def conversation_history(conv_request: InteractiveConversationContinueRequest) -> List[dict]:
+    """The request's valid history messages followed by the user's new message."""
+    history = []
+    for msg in conv_request.conversation_history:
+        if msg.role in ["user", "assistant"] and msg.content:
+            history.append({"role": msg.role, "content": msg.content})
+    
+    # Add user's current message
+    if conv_request.user_message:
+        history.append({"role": "user", "content": conv_request.user_message})
+    return history
+
+
+async def start_session(request_id: str, topic: str, ai_message: str) -> Optional[str]:
+    """Keep a new conversation's history server-side; returns the session id (None if unavailable)."""
+    if not conversation_sessions:
+        return None
+    try:
+        session = await run_in_threadpool(
+            conversation_sessions.create, topic, [{"role": "assistant", "content": ai_message}]
+        )
+        return session["session_id"]
+    except Exception as e:
+        # The client can still continue by sending the history itself
+        logger.warning(f"[{request_id}] Failed to create conversation session: {e}", exc_info=True)
+        return None
+
+
+async def conversation_turn(conv_request: InteractiveConversationContinueRequest):
+    """
+    The session (None without session_id), topic, history and summary of
+    earlier messages for a continue request.
+    
+    Raises:
+        HTTPException: 404 if the session is unknown or has expired
+        ValidationException: If neither session_id nor topic is given
+    """
+    if conv_request.session_id:
+        if not conversation_sessions:
+            raise ServiceNotAvailableException("Conversation sessions")
+        session = await run_in_threadpool(conversation_sessions.get, conv_request.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Conversation session not found or expired")
+        summary, history = SessionSummarizer.pending(session)
+        history = history + [{"role": "user", "content": conv_request.user_message}]
+        return session, session["topic"], history, summary
+    if not conv_request.topic:
+        raise ValidationException("Either session_id or topic is required", field="topic")
+    summary, history = await interactive_conversation_service.summarize_overflow(
+        conv_request.topic, conversation_history(conv_request)
+    )
+    return None, conv_request.topic, history, summary
+
+
+async def save_turn(session: dict, user_message: str, ai_message: str):
+    """
+    Add a completed turn to its session and bring its summary up to date.
+    
+    Raises:
+        HTTPException: 409 if another turn on the session completed meanwhile
+    """
+    saved = await run_in_threadpool(conversation_sessions.append, session, [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": ai_message}
+    ])
+    if saved is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Conversation session changed during this turn; fetch it and try again"
+        )
+    if session_summarizer:
+        session_summarizer.schedule(session["session_id"])
+
+
+def spoken_reply_response(
+    request_id: str,
+    deltas,
+    conv_request,
+    audio_format: str,
+    topic: str,
+    on_reply=None
+) -> StreamingResponse:
+    """
+    Stream a conversation reply as Server-Sent Events.
+    
+    Text is sent as it is generated; each sentence is synthesized as soon as
+    it is complete and its audio sent in order, so the first audio arrives
+    about one sentence into the reply. on_reply, if given, is awaited with
+    the complete reply and returns fields to add to the done event.
+    """
+    async def synthesize(sentence: str) -> dict:
+        audio, sample_rate = await synthesize_short(sentence, conv_request.voice, conv_request.speed)
+        audio_bytes = await run_in_threadpool(encode_audio, audio, sample_rate, audio_format, conv_request.sample_rate)
+        return {"audio_url": await run_in_threadpool(store_reply_audio, audio_bytes, audio_format)}
+    
+    async def events():
+        try:
+            reply = stream_spoken_reply(deltas, synthesize if tts_service else None)
+            async with aclosing(reply) as reply_events:
+                async for event, data in reply_events:
+                    if event == "done":
+                        spoken_reply_stats.record(data)
+                        first_audio = data["time_to_first_audio"]
+                        logger.info(
+                            f"[{request_id}] Streamed reply: {data['sentences']} sentences"
+                            + (f", first audio after {first_audio:.3f}s" if first_audio is not None else "")
+                        )
+                        data = {**data, "topic": topic}
+                        if on_reply is not None:
+                            data.update(await on_reply(data["message"]))
+                    yield _stream_frame("sse", event, json.dumps(data))
+        except HTTPException as e:
+            spoken_reply_stats.record_error()
+            logger.warning(f"[{request_id}] Streamed reply not saved: {e.detail}")
+            yield _stream_frame("sse", "error", json.dumps({
+                "error": True,
+                "error_code": f"HTTP_{e.status_code}",
+                "message": e.detail
+            }))
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            spoken_reply_stats.record_error()
+            logger.error(f"[{request_id}] Error streaming conversation reply: {e}", exc_info=True)
+            yield _stream_frame("sse", "error", json.dumps({
+                "error": True,
+                "error_code": "CONVERSATION_ERROR",
+                "message": "Failed to generate reply"
+            }))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.post(
+    "/api/conversation/interactive/start/stream",
+    tags=["Conversation"],
+    summary="Start Interactive Conversation (Streamed)",
+    description="Start a new interactive conversation, streaming the AI's opening message and its audio sentence by sentence as Server-Sent Events."
+)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
+async def stream_start_interactive_conversation(request: Request, conv_request: InteractiveConversationStartRequest):
+    """
+    Start a new interactive conversation with a streamed reply.
+    
+    Takes the same parameters as `/api/conversation/interactive/start`. Events:
+    
+    - **text**: `{"delta"}` for each piece of the reply as it is generated
+    - **audio**: `{"index", "text", "audio_url"}` for each sentence, in order
+    - **done**: `{"message", "topic", "session_id", "sentences", "time_to_first_token", "time_to_first_audio"}`
+    - **error**: sent instead of `done` if the reply fails midway
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    
+    try:
+        audio_format = resolve_audio_format(
+            conv_request.audio_format, None, settings.TTS_CONVERSATION_AUDIO_FORMAT, conv_request.sample_rate
+        )
+        deltas = interactive_conversation_service.stream_start_conversation(conv_request.topic)
+    except ServiceNotAvailableException as e:
+        logger.warning(f"[{request_id}] Interactive conversation service unavailable: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValidationException as e:
+        logger.warning(f"[{request_id}] Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def on_reply(message: str) -> dict:
+        return {"session_id": await start_session(request_id, conv_request.topic, message)}
+    
+    logger.info(f"[{request_id}] Streaming conversation start on topic: {conv_request.topic}")
+    return spoken_reply_response(request_id, deltas, conv_request, audio_format, conv_request.topic, on_reply=on_reply)
+
+
+@app.post(
+    "/api/conversation/interactive/continue/stream",
+    tags=["Conversation"],
+    summary="Continue Interactive Conversation (Streamed)",
+    description="Continue an interactive conversation, streaming the AI's reply and its audio sentence by sentence as Server-Sent Events."
+)
+@limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
+async def stream_continue_interactive_conversation(request: Request, conv_request: InteractiveConversationContinueRequest):
+    """
+    Continue an interactive conversation with a streamed reply.
+    
+    Takes the same parameters as `/api/conversation/interactive/continue` and
+    sends the same events as `/api/conversation/interactive/start/stream`.
+    """
+    request_id = getattr(request.state, 'request_id', 'unknown')
+    
+    try:
+        audio_format = resolve_audio_format(
+            conv_request.audio_format, None, settings.TTS_CONVERSATION_AUDIO_FORMAT, conv_request.sample_rate
+        )
+        session, topic, history, summary = await conversation_turn(conv_request)
+        deltas = interactive_conversation_service.stream_continue_conversation(topic, history, summary=summary)
+    except ServiceNotAvailableException as e:
+        logger.warning(f"[{request_id}] Interactive conversation service unavailable: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValidationException as e:
+        logger.warning(f"[{request_id}] Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def on_reply(message: str) -> dict:
+        if session is None:
+            return {"session_id": None}
+        await save_turn(session, conv_request.user_message, message)
+        return {"session_id": session["session_id"]}
+    
+    logger.info(f"[{request_id}] Streaming conversation reply on topic: {topic}")
+    return spoken_reply_response(request_id, deltas, conv_request, audio_format, topic, on_reply=on_reply)
+
+
+@app.get(
+    "/api/conversation/interactive/sessions/{session_id}",
+    tags=["Conversation"],
+    summary="Get Interactive Conversation Session",
+    description="Get the topic and messages of a conversation session."
+)
+async def get_interactive_conversation_session(session_id: str):
+    """Get a conversation session, e.g. to restore it in a new tab."""
+    session = await run_in_threadpool(conversation_sessions.get, session_id) if conversation_sessions else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="Conversation session not found or expired")
+    return {
+        "session_id": session["session_id"],
+        "topic": session["topic"],
+        "messages": session["messages"],
+        "summary": session.get("summary"),
+        "created_at": datetime.utcfromtimestamp(session["created_at"]).isoformat() + "Z",
+        "updated_at": datetime.utcfromtimestamp(session["updated_at"]).isoformat() + "Z"
+    }
+
+
+@app.delete(
+    "/api/conversation/interactive/sessions/{session_id}",
+    tags=["Conversation"],
+    summary="End Interactive Conversation Session",
+    description="Discard a conversation session and its history."
+)
+async def delete_interactive_conversation_session(session_id: str):
+    """End a conversation session."""
+    if not conversation_sessions or not await run_in_threadpool(conversation_sessions.delete, session_id):
+        raise HTTPException(status_code=404, detail="Conversation session not found or expired")
+    return {"message": "Conversation session ended"}
+
+
+@app.websocket("/ws/conversation")
+async def conversation_websocket(websocket: WebSocket):
+    """
+    Real-time conversation practice: one connection per practice session.
+    
+    User messages come in as JSON frames; the reply's text deltas go out as
+    JSON frames and each sentence's audio as a binary frame, and a new
+    message or a cancel frame interrupts the reply in flight. See
+    conversation_socket.py for the protocol.
+    """
+    origin = websocket.headers.get("origin")
+    if origin and "*" not in settings.cors_origins_list and origin not in settings.cors_origins_list:
+        await websocket.close(code=1008)
+        return
+    if not conversation_sessions:
+        await websocket.close(code=1011, reason="Conversation sessions unavailable")
+        return
+    
+    await ConversationSocket(
+        websocket,
+        interactive_conversation_service,
+        conversation_sessions,
+        synthesize_short if tts_service else None,
+        default_format=settings.TTS_CONVERSATION_AUDIO_FORMAT,
+        summarizer=session_summarizer,
+        stats=spoken_reply_stats,
+        idle_timeout=settings.CONVERSATION_SOCKET_IDLE_SECONDS,
+        max_turns_per_minute=settings.RATE_LIMIT_PER_MINUTE if settings.RATE_LIMIT_ENABLED else None
+    ).run()
+
+
 @app.get(
     "/api/conversation/interactive/status",
     tags=["Conversation"],
@@ -1486,10 +2422,18 @@ async def generate_rhetorical_device_prompts(request: Request, practice_request:
     try:
         logger.info(f"[{request_id}] Generating {practice_request.count} prompts for topic: {practice_request.topic} with devices: {practice_request.devices}")
         
-        prompts_data = rhetorical_device_service.generate_prompts(
-            topic=practice_request.topic,
-            devices=practice_request.devices,
-            count=practice_request.count
+        prompts_data, _ = await prompt_flights.do(
+            (
+                "rhetorical_devices",
+                normalize_topic(practice_request.topic),
+                tuple(sorted(normalize_topic(device) for device in practice_request.devices)),
+                practice_request.count
+            ),
+            lambda: rhetorical_device_service.generate_prompts(
+                topic=practice_request.topic,
+                devices=practice_request.devices,
+                count=practice_request.count
+            )
         )
         
         # Convert to response format
@@ -1553,11 +2497,13 @@ async def get_rhetorical_device_status():
     description="Generate a sophisticated practice speech for a given topic using a 5-prompt system."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def create_speech(request: Request, speech_request: SpeechCreate):
+async def create_speech(request: Request, speech_request: SpeechCreate, background: bool = False):
     """
     Generate a practice speech for a topic.
     
     - **topic**: The topic to generate a speech about
+    - **background**: Return 202 with a job id right away and generate in the
+      background; poll `/api/speeches/jobs/{job_id}` for per-stage progress
     
     This endpoint uses a sophisticated 5-prompt system to generate an eloquent,
     intellectually sophisticated, and deeply engaging speech that can be practiced
@@ -1566,23 +2512,45 @@ async def create_speech(request: Request, speech_request: SpeechCreate):
     request_id = getattr(request.state, 'request_id', 'unknown')
     
     try:
+        if background:
+            if not speech_jobs:
+                raise HTTPException(status_code=503, detail="Job tracker not available")
+            if not speech_service.is_available():
+                raise ServiceNotAvailableException(
+                    "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
+                )
+            if not speech_request.topic.strip():
+                raise ValidationException("Topic cannot be empty")
+            job_id = speech_jobs.submit(speech_request.topic)
+            logger.info(f"[{request_id}] Speech job {job_id} started for topic: {speech_request.topic}")
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "job_id": job_id,
+                    "status": JobStatus.PENDING.value,
+                    "status_url": f"/api/speeches/jobs/{job_id}",
+                }
+            )
+        
         logger.info(f"[{request_id}] Generating speech for topic: {speech_request.topic}")
         
-        # Generate speech content using the 5-prompt system
-        speech_content = speech_service.generate_speech(speech_request.topic)
+        # Generate speech content using the 5-prompt system, reusing cached rounds
+        if speech_jobs:
+            speech_content = await speech_jobs.generate(speech_request.topic)
+        else:
+            speech_content = await speech_service.generate_speech(speech_request.topic)
         
-        # Save to database
-        db = next(get_db())
-        try:
-            new_speech = speeches_service.create_speech(
+        # Save to database (opened only now, so no connection is held during generation)
+        async with async_db_session() as db:
+            new_speech = await async_speeches_service.create_speech(
                 db=db,
                 topic=speech_request.topic,
                 content=speech_content
             )
             
             # Track statistics
-            statistics_service.increment_speech_practiced(db)
-            statistics_service.update_goal_progress(db)
+            await async_statistics_service.increment_speech_practiced(db)
+            await async_statistics_service.update_goal_progress(db)
             
             logger.info(f"[{request_id}] Speech generated successfully with ID {new_speech.id}")
             
@@ -1593,8 +2561,6 @@ async def create_speech(request: Request, speech_request: SpeechCreate):
                 created_at=new_speech.created_at.isoformat() + "Z",
                 updated_at=new_speech.updated_at.isoformat() + "Z"
             )
-        finally:
-            db.close()
             
     except ServiceNotAvailableException as e:
         logger.warning(f"[{request_id}] Speech service unavailable: {e}")
@@ -1608,6 +2574,8 @@ async def create_speech(request: Request, speech_request: SpeechCreate):
             status_code=400,
             detail=str(e)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"[{request_id}] Error generating speech: {e}", exc_info=True)
         raise HTTPException(
@@ -1616,6 +2584,41 @@ async def create_speech(request: Request, speech_request: SpeechCreate):
         )
 
 
+@app.get(
+    "/api/speeches/jobs/{job_id}",
+    tags=["Speeches"],
+    summary="Get Speech Job",
+    description="Get the status and per-stage progress of a background speech job."
+)
+async def get_speech_job(job_id: str):
+    """Get a speech job with its stages."""
+    if not speech_jobs:
+        raise HTTPException(status_code=503, detail="Job tracker not available")
+    
+    status = speech_jobs.get_status(job_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Speech job not found")
+    return status
+
+
+@app.post(
+    "/api/speeches/jobs/{job_id}/resume",
+    tags=["Speeches"],
+    summary="Resume Speech Job",
+    description="Restart a failed or interrupted speech job from its last completed stage."
+)
+async def resume_speech_job(job_id: str):
+    """Resume a speech job from its last checkpoint."""
+    if not speech_jobs:
+        raise HTTPException(status_code=503, detail="Job tracker not available")
+    
+    if not speech_jobs.get_status(job_id):
+        raise HTTPException(status_code=404, detail="Speech job not found")
+    if not speech_jobs.resume(job_id):
+        raise HTTPException(status_code=409, detail="Speech job is completed or still running")
+    return JSONResponse(status_code=202, content=speech_jobs.get_status(job_id))
+
+
 @app.get(
     "/api/speeches",
     response_model=SpeechesListResponse,
@@ -1623,30 +2626,26 @@ async def create_speech(request: Request, speech_request: SpeechCreate):
     summary="Get All Speeches",
     description="Retrieve all practice speeches, ordered by most recent first."
 )
-async def get_speeches(skip: int = 0, limit: int = 100, search: Optional[str] = None):
+async def get_speeches(skip: int = 0, limit: int = 100, search: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get all speeches with optional search."""
-    db = next(get_db())
-    try:
-        if search:
-            speeches = speeches_service.search_speeches(db, search, skip, limit)
-        else:
-            speeches = speeches_service.get_all_speeches(db, skip, limit)
-        
-        # Convert to response format
-        speech_responses = [
-            SpeechResponse(
-                id=s.id,
-                topic=s.topic,
-                content=s.content,
-                created_at=s.created_at.isoformat() + "Z",
-                updated_at=s.updated_at.isoformat() + "Z"
-            )
-            for s in speeches
-        ]
-        
-        return SpeechesListResponse(speeches=speech_responses, count=len(speech_responses))
-    finally:
-        db.close()
+    if search:
+        speeches = await async_speeches_service.search_speeches(db, search, skip, limit)
+    else:
+        speeches = await async_speeches_service.get_all_speeches(db, skip, limit)
+    
+    # Convert to response format
+    speech_responses = [
+        SpeechResponse(
+            id=s.id,
+            topic=s.topic,
+            content=s.content,
+            created_at=s.created_at.isoformat() + "Z",
+            updated_at=s.updated_at.isoformat() + "Z"
+        )
+        for s in speeches
+    ]
+    
+    return SpeechesListResponse(speeches=speech_responses, count=len(speech_responses))
 
 
 @app.get(
@@ -1656,23 +2655,19 @@ async def get_speeches(skip: int = 0, limit: int = 100, search: Optional[str] =
     summary="Get Speech by ID",
     description="Retrieve a specific speech by its ID."
 )
-async def get_speech(speech_id: int):
+async def get_speech(speech_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a single speech by ID."""
-    db = next(get_db())
-    try:
-        speech = speeches_service.get_speech_by_id(db, speech_id)
-        if not speech:
-            raise HTTPException(status_code=404, detail="Speech not found")
-        
-        return SpeechResponse(
-            id=speech.id,
-            topic=speech.topic,
-            content=speech.content,
-            created_at=speech.created_at.isoformat() + "Z",
-            updated_at=speech.updated_at.isoformat() + "Z"
-        )
-    finally:
-        db.close()
+    speech = await async_speeches_service.get_speech_by_id(db, speech_id)
+    if not speech:
+        raise HTTPException(status_code=404, detail="Speech not found")
+    
+    return SpeechResponse(
+        id=speech.id,
+        topic=speech.topic,
+        content=speech.content,
+        created_at=speech.created_at.isoformat() + "Z",
+        updated_at=speech.updated_at.isoformat() + "Z"
+    )
 
 
 @app.delete(
@@ -1682,11 +2677,10 @@ async def get_speech(speech_id: int):
     description="Delete a speech from the database."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def delete_speech(request: Request, speech_id: int):
+async def delete_speech(request: Request, speech_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a speech."""
-    db = next(get_db())
     try:
-        success = speeches_service.delete_speech(db, speech_id)
+        success = await async_speeches_service.delete_speech(db, speech_id)
         if not success:
             raise HTTPException(status_code=404, detail="Speech not found")
         
@@ -1696,8 +2690,6 @@ async def delete_speech(request: Request, speech_id: int):
     except Exception as e:
         logger.error(f"Error deleting speech: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete speech")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -1706,14 +2698,10 @@ async def delete_speech(request: Request, speech_id: int):
     summary="Get Speeches Statistics",
     description="Get statistics about the speeches database."
 )
-async def get_speeches_stats():
+async def get_speeches_stats(db: AsyncSession = Depends(get_async_db)):
     """Get statistics about speeches."""
-    db = next(get_db())
-    try:
-        count = speeches_service.get_speeches_count(db)
-        return {"total_speeches": count}
-    finally:
-        db.close()
+    count = await async_speeches_service.get_speeches_count(db)
+    return {"total_speeches": count}
 
 
 @app.get(
@@ -1793,32 +2781,28 @@ async def get_poetry_styles():
     summary="Get All Poems",
     description="Retrieve all user-created poems, ordered by most recent first."
 )
-async def get_poems(skip: int = 0, limit: int = 100, search: Optional[str] = None):
+async def get_poems(skip: int = 0, limit: int = 100, search: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get all poems with optional search."""
-    db = next(get_db())
-    try:
-        if search:
-            poems = poems_service.search_poems(db, search, skip, limit)
-        else:
-            poems = poems_service.get_all_poems(db, skip, limit)
-        
-        # Convert to response format
-        poem_responses = [
-            PoemResponse(
-                id=p.id,
-                title=p.title,
-                content=p.content,
-                style=p.style,
-                audio_url=p.audio_url,
-                created_at=p.created_at.isoformat() + "Z",
-                updated_at=p.updated_at.isoformat() + "Z"
-            )
-            for p in poems
-        ]
-        
-        return PoemsListResponse(poems=poem_responses, count=len(poem_responses))
-    finally:
-        db.close()
+    if search:
+        poems = await async_poems_service.search_poems(db, search, skip, limit)
+    else:
+        poems = await async_poems_service.get_all_poems(db, skip, limit)
+    
+    # Convert to response format
+    poem_responses = [
+        PoemResponse(
+            id=p.id,
+            title=p.title,
+            content=p.content,
+            style=p.style,
+            audio_url=p.audio_url,
+            created_at=p.created_at.isoformat() + "Z",
+            updated_at=p.updated_at.isoformat() + "Z"
+        )
+        for p in poems
+    ]
+    
+    return PoemsListResponse(poems=poem_responses, count=len(poem_responses))
 
 
 @app.get(
@@ -1828,25 +2812,21 @@ async def get_poems(skip: int = 0, limit: int = 100, search: Optional[str] = Non
     summary="Get Poem by ID",
     description="Retrieve a specific poem by its ID."
 )
-async def get_poem(poem_id: int):
+async def get_poem(poem_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a single poem by ID."""
-    db = next(get_db())
-    try:
-        poem = poems_service.get_poem_by_id(db, poem_id)
-        if not poem:
-            raise HTTPException(status_code=404, detail="Poem not found")
-        
-        return PoemResponse(
-            id=poem.id,
-            title=poem.title,
-            content=poem.content,
-            style=poem.style,
-            audio_url=poem.audio_url,
-            created_at=poem.created_at.isoformat() + "Z",
-            updated_at=poem.updated_at.isoformat() + "Z"
-        )
-    finally:
-        db.close()
+    poem = await async_poems_service.get_poem_by_id(db, poem_id)
+    if not poem:
+        raise HTTPException(status_code=404, detail="Poem not found")
+    
+    return PoemResponse(
+        id=poem.id,
+        title=poem.title,
+        content=poem.content,
+        style=poem.style,
+        audio_url=poem.audio_url,
+        created_at=poem.created_at.isoformat() + "Z",
+        updated_at=poem.updated_at.isoformat() + "Z"
+    )
 
 
 @app.post(
@@ -1857,11 +2837,10 @@ async def get_poem(poem_id: int):
     description="Create a new poem with optional title, style, and audio recording."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def create_poem(request: Request, poem: PoemCreate):
+async def create_poem(request: Request, poem: PoemCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new poem."""
-    db = next(get_db())
     try:
-        new_poem = poems_service.create_poem(
+        new_poem = await async_poems_service.create_poem(
             db=db,
             title=poem.title,
             content=poem.content,
@@ -1871,8 +2850,8 @@ async def create_poem(request: Request, poem: PoemCreate):
         
         # Track statistics
         word_count = statistics_service._calculate_word_count(poem.content)
-        statistics_service.increment_poem_created(db, word_count)
-        statistics_service.update_goal_progress(db)
+        await async_statistics_service.increment_poem_created(db, word_count)
+        await async_statistics_service.update_goal_progress(db)
         
         return PoemResponse(
             id=new_poem.id,
@@ -1886,8 +2865,6 @@ async def create_poem(request: Request, poem: PoemCreate):
     except Exception as e:
         logger.error(f"Error creating poem: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to create poem")
-    finally:
-        db.close()
 
 
 @app.put(
@@ -1898,11 +2875,10 @@ async def create_poem(request: Request, poem: PoemCreate):
     description="Update an existing poem."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def update_poem(request: Request, poem_id: int, poem: PoemUpdate):
+async def update_poem(request: Request, poem_id: int, poem: PoemUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update an existing poem."""
-    db = next(get_db())
     try:
-        updated_poem = poems_service.update_poem(
+        updated_poem = await async_poems_service.update_poem(
             db=db,
             poem_id=poem_id,
             title=poem.title,
@@ -1928,8 +2904,6 @@ async def update_poem(request: Request, poem_id: int, poem: PoemUpdate):
     except Exception as e:
         logger.error(f"Error updating poem: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update poem")
-    finally:
-        db.close()
 
 
 @app.delete(
@@ -1939,11 +2913,10 @@ async def update_poem(request: Request, poem_id: int, poem: PoemUpdate):
     description="Delete a poem from the database."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def delete_poem(request: Request, poem_id: int):
+async def delete_poem(request: Request, poem_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a poem."""
-    db = next(get_db())
     try:
-        success = poems_service.delete_poem(db, poem_id)
+        success = await async_poems_service.delete_poem(db, poem_id)
         if not success:
             raise HTTPException(status_code=404, detail="Poem not found")
         
@@ -1953,8 +2926,6 @@ async def delete_poem(request: Request, poem_id: int):
     except Exception as e:
         logger.error(f"Error deleting poem: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete poem")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -1963,14 +2934,10 @@ async def delete_poem(request: Request, poem_id: int):
     summary="Get Poems Statistics",
     description="Get statistics about the poems database."
 )
-async def get_poems_stats():
+async def get_poems_stats(db: AsyncSession = Depends(get_async_db)):
     """Get statistics about poems."""
-    db = next(get_db())
-    try:
-        count = poems_service.get_poems_count(db)
-        return {"total_poems": count}
-    finally:
-        db.close()
+    count = await async_poems_service.get_poems_count(db)
+    return {"total_poems": count}
 
 
 # Statistics endpoints
@@ -1981,9 +2948,8 @@ async def get_poems_stats():
     summary="Get Daily Statistics",
     description="Get daily statistics for a specific date or today."
 )
-async def get_daily_stats(date: Optional[str] = None):
+async def get_daily_stats(date: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get daily statistics."""
-    db = next(get_db())
     try:
         target_date = None
         if date:
@@ -1992,15 +2958,13 @@ async def get_daily_stats(date: Optional[str] = None):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DD).")
         
-        stats = statistics_service.get_daily_stats(db, target_date)
+        stats = await async_statistics_service.get_daily_stats(db, target_date)
         return DailyStatisticsResponse(**stats)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting daily stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get daily statistics")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -2010,9 +2974,8 @@ async def get_daily_stats(date: Optional[str] = None):
     summary="Get Weekly Statistics",
     description="Get weekly statistics for the last 7 days ending on a specific date or today."
 )
-async def get_weekly_stats(end_date: Optional[str] = None):
+async def get_weekly_stats(end_date: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Get weekly statistics."""
-    db = next(get_db())
     try:
         target_end_date = None
         if end_date:
@@ -2021,15 +2984,13 @@ async def get_weekly_stats(end_date: Optional[str] = None):
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (YYYY-MM-DD).")
         
-        stats = statistics_service.get_weekly_stats(db, target_end_date)
+        stats = await async_statistics_service.get_weekly_stats(db, target_end_date)
         return WeeklyStatisticsResponse(**stats)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting weekly stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get weekly statistics")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -2039,24 +3000,21 @@ async def get_weekly_stats(end_date: Optional[str] = None):
     summary="Get Monthly Statistics",
     description="Get monthly statistics for a specific month and year or current month."
 )
-async def get_monthly_stats(month: Optional[int] = None, year: Optional[int] = None):
+async def get_monthly_stats(month: Optional[int] = None, year: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     """Get monthly statistics."""
-    db = next(get_db())
     try:
         if month is not None and (month < 1 or month > 12):
             raise HTTPException(status_code=400, detail="Month must be between 1 and 12.")
         if year is not None and year < 2000:
             raise HTTPException(status_code=400, detail="Year must be 2000 or later.")
         
-        stats = statistics_service.get_monthly_stats(db, month, year)
+        stats = await async_statistics_service.get_monthly_stats(db, month, year)
         return MonthlyStatisticsResponse(**stats)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting monthly stats: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get monthly statistics")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -2066,17 +3024,14 @@ async def get_monthly_stats(month: Optional[int] = None, year: Optional[int] = N
     summary="Get Streak Information",
     description="Get the current consecutive days streak."
 )
-async def get_streak():
+async def get_streak(db: AsyncSession = Depends(get_async_db)):
     """Get streak information."""
-    db = next(get_db())
     try:
-        streak = statistics_service.calculate_streak(db)
+        streak = await async_statistics_service.calculate_streak(db)
         return StreakResponse(streak_days=streak)
     except Exception as e:
         logger.error(f"Error getting streak: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get streak information")
-    finally:
-        db.close()
 
 
 @app.get(
@@ -2086,18 +3041,17 @@ async def get_streak():
     summary="Get Statistics Summary",
     description="Get a summary of all statistics including streak, today's stats, weekly stats, and goals."
 )
-async def get_stats_summary():
+async def get_stats_summary(db: AsyncSession = Depends(get_async_db)):
     """Get comprehensive statistics summary."""
-    db = next(get_db())
     try:
         # Update goal progress first
-        statistics_service.update_goal_progress(db)
+        await async_statistics_service.update_goal_progress(db)
         
         # Get all statistics
-        streak = statistics_service.calculate_streak(db)
-        today_stats = statistics_service.get_daily_stats(db)
-        weekly_stats = statistics_service.get_weekly_stats(db)
-        goals = statistics_service.get_all_goals(db, active_only=True)
+        streak = await async_statistics_service.calculate_streak(db)
+        today_stats = await async_statistics_service.get_daily_stats(db)
+        weekly_stats = await async_statistics_service.get_weekly_stats(db)
+        goals = await async_statistics_service.get_all_goals(db, active_only=True)
         
         return StatisticsSummaryResponse(
             streak=StreakResponse(streak_days=streak),
@@ -2108,8 +3062,6 @@ async def get_stats_summary():
     except Exception as e:
         logger.error(f"Error getting stats summary: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get statistics summary")
-    finally:
-        db.close()
 
 
 # Goal endpoints
@@ -2120,11 +3072,10 @@ async def get_stats_summary():
     summary="Get All User Goals",
     description="Get all user goals, optionally filtered by active status."
 )
-async def get_goals(active_only: bool = True):
+async def get_goals(active_only: bool = True, db: AsyncSession = Depends(get_async_db)):
     """Get all user goals."""
-    db = next(get_db())
     try:
-        goals = statistics_service.get_all_goals(db, active_only=active_only)
+        goals = await async_statistics_service.get_all_goals(db, active_only=active_only)
         return UserGoalsListResponse(
             goals=[UserGoalResponse(**goal) for goal in goals],
             count=len(goals)
@@ -2132,8 +3083,6 @@ async def get_goals(active_only: bool = True):
     except Exception as e:
         logger.error(f"Error getting goals: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to get goals")
-    finally:
-        db.close()
 
 
 @app.post(
@@ -2144,11 +3093,10 @@ async def get_goals(active_only: bool = True):
     description="Create a new user training goal."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def create_goal(request: Request, goal_data: UserGoalCreate):
+async def create_goal(request: Request, goal_data: UserGoalCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user goal."""
-    db = next(get_db())
     try:
-        goal = statistics_service.create_goal(
+        goal = await async_statistics_service.create_goal(
             db,
             goal_data.goal_type,
             goal_data.target_value,
@@ -2156,9 +3104,9 @@ async def create_goal(request: Request, goal_data: UserGoalCreate):
         )
         
         # Update goal progress
-        statistics_service.update_goal_progress(db)
+        await async_statistics_service.update_goal_progress(db)
         
-        goal_dict = statistics_service.get_all_goals(db, active_only=False)
+        goal_dict = await async_statistics_service.get_all_goals(db, active_only=False)
         goal_dict = next((g for g in goal_dict if g["id"] == goal.id), None)
         
         if not goal_dict:
@@ -2170,8 +3118,6 @@ async def create_goal(request: Request, goal_data: UserGoalCreate):
     except Exception as e:
         logger.error(f"Error creating goal: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to create goal")
-    finally:
-        db.close()
 
 
 @app.put(
@@ -2182,11 +3128,10 @@ async def create_goal(request: Request, goal_data: UserGoalCreate):
     description="Update an existing user goal."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def update_goal(request: Request, goal_id: int, goal_data: UserGoalUpdate):
+async def update_goal(request: Request, goal_id: int, goal_data: UserGoalUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a user goal."""
-    db = next(get_db())
     try:
-        goal = statistics_service.update_goal(
+        goal = await async_statistics_service.update_goal(
             db,
             goal_id,
             goal_data.target_value,
@@ -2197,9 +3142,9 @@ async def update_goal(request: Request, goal_id: int, goal_data: UserGoalUpdate)
             raise HTTPException(status_code=404, detail="Goal not found")
         
         # Update goal progress
-        statistics_service.update_goal_progress(db)
+        await async_statistics_service.update_goal_progress(db)
         
-        goal_dict = statistics_service.get_all_goals(db, active_only=False)
+        goal_dict = await async_statistics_service.get_all_goals(db, active_only=False)
         goal_dict = next((g for g in goal_dict if g["id"] == goal.id), None)
         
         if not goal_dict:
@@ -2211,8 +3156,6 @@ async def update_goal(request: Request, goal_id: int, goal_data: UserGoalUpdate)
     except Exception as e:
         logger.error(f"Error updating goal: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to update goal")
-    finally:
-        db.close()
 
 
 @app.delete(
@@ -2222,11 +3165,10 @@ async def update_goal(request: Request, goal_id: int, goal_data: UserGoalUpdate)
     description="Delete a user goal."
 )
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute" if settings.RATE_LIMIT_ENABLED else None)
-async def delete_goal(request: Request, goal_id: int):
+async def delete_goal(request: Request, goal_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a user goal."""
-    db = next(get_db())
     try:
-        success = statistics_service.delete_goal(db, goal_id)
+        success = await async_statistics_service.delete_goal(db, goal_id)
         if not success:
             raise HTTPException(status_code=404, detail="Goal not found")
         
@@ -2236,8 +3178,6 @@ async def delete_goal(request: Request, goal_id: int):
     except Exception as e:
         logger.error(f"Error deleting goal: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to delete goal")
-    finally:
-        db.close()
 
 
 # Startup event
@@ -2263,6 +3203,18 @@ async def startup_event():
     logger.info(f"Cleanup Scheduler: {'✓ Available' if cleanup_scheduler else '✗ Unavailable'}")
     logger.info(f"Debug mode: {'Enabled' if settings.DEBUG else 'Disabled'}")
     
+    if not tts_ready.is_set():
+        logger.info(f"TTS session profile: {tts_service.session_profile.to_dict() if tts_service.session_profile else 'defaults'}")
+        threading.Thread(target=warmup_tts_service, name="tts-warmup", daemon=True).start()
+    
+    if tts_batcher:
+        tts_batcher.start()
+        logger.info(f"TTS micro-batching: window={settings.TTS_BATCH_WINDOW_MS}ms, max_batch={settings.TTS_MAX_BATCH_SIZE}")
+    
+    # Take over speech jobs interrupted by a restart
+    if speech_jobs:
+        asyncio.ensure_future(speech_jobs.watch())
+    
     # Start cleanup scheduler
     if cleanup_scheduler:
         try:
@@ -2287,6 +3239,13 @@ async def shutdown_event():
         except Exception as e:
             logger.error(f"Error stopping cleanup scheduler: {e}", exc_info=True)
     
+    if tts_batcher:
+        tts_batcher.stop()
+    if tts_service:
+        tts_service.shutdown()
+    if llm_client:
+        await llm_client.aclose()
+    
     logger.info("Shutdown complete.")
 
 if __name__ == "__main__":
@@ -6,6 +6,17 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional
 import re
 
+AUDIO_FORMATS = ("wav", "flac", "opus", "mp3")
+
+
+def _validate_audio_format(v):
+    if v is None:
+        return v
+    v = v.lower()
+    if v not in AUDIO_FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(AUDIO_FORMATS)}")
+    return v
+
 
 class ErrorResponse(BaseModel):
     """Standard error response model."""
@@ -30,6 +41,9 @@ class TTSRequest(BaseModel):
     text: str = Field(..., min_length=1, description="Text to convert to speech (supports text of any length)")
     voice: str = Field(default="af_bella", description="Voice identifier to use")
     speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier (0.5-2.0)")
+    format: Optional[str] = Field(default=None, description="Audio format: 'wav', 'flac', 'opus' or 'mp3' (default: from Accept header)")
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000, description="Output sample rate in Hz (default: model rate)")
+    bit_depth: Optional[int] = Field(default=None, description="PCM bit depth for wav/flac: 16 or 24")
 
     @validator('text')
     def validate_text(cls, v):
@@ -37,6 +51,16 @@ class TTSRequest(BaseModel):
             raise ValueError("Text cannot be empty or only whitespace")
         return v.strip()
 
+    @validator('format')
+    def validate_format(cls, v):
+        return _validate_audio_format(v)
+
+    @validator('bit_depth')
+    def validate_bit_depth(cls, v):
+        if v is not None and v not in (16, 24):
+            raise ValueError("Bit depth must be 16 or 24")
+        return v
+
     @validator('speed')
     def validate_speed(cls, v):
         if not isinstance(v, (int, float)):
@@ -55,6 +79,28 @@ class TTSRequest(BaseModel):
         }
 
 
+class TTSStreamRequest(TTSRequest):
+    """Request model for streaming text-to-speech generation."""
+    format: str = Field(default="wav", description="Stream format: 'wav', 'opus', 'ndjson' or 'sse'")
+
+    @validator('format')
+    def validate_format(cls, v):
+        v = v.lower()
+        if v not in ("wav", "opus", "ndjson", "sse"):
+            raise ValueError("Format must be one of: wav, opus, ndjson, sse")
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "text": "A long reading that should start playing before it finishes rendering.",
+                "voice": "af_bella",
+                "speed": 1.0,
+                "format": "wav"
+            }
+        }
+
+
 class WritingCreate(BaseModel):
     """Request model for creating a new writing."""
     title: Optional[str] = Field(None, max_length=200, description="Optional title for the writing")
@@ -162,12 +208,14 @@ class VoicesResponse(BaseModel):
     """Response model for available voices."""
     voices: list[str]
     count: int
+    metadata: Optional[dict] = Field(None, description="Language, gender and style shape per voice")
 
     class Config:
         schema_extra = {
             "example": {
                 "voices": ["af_bella", "af_sarah", "am_michael"],
-                "count": 3
+                "count": 3,
+                "metadata": {"af_bella": {"language": "en-us", "gender": "female", "shape": [511, 1, 256]}}
             }
         }
 
@@ -210,6 +258,12 @@ class InteractiveConversationStartRequest(BaseModel):
     topic: str = Field(..., min_length=1, max_length=200, description="Topic to practice discussing")
     voice: str = Field(default="af_bella", description="Voice identifier for TTS responses")
     speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier (0.5-2.0)")
+    audio_format: Optional[str] = Field(default=None, description="Audio format for the response: 'wav', 'flac', 'opus' or 'mp3' (default: server setting)")
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000, description="Audio sample rate in Hz (default: model rate)")
+
+    @validator('audio_format')
+    def validate_audio_format(cls, v):
+        return _validate_audio_format(v)
 
     @validator('topic')
     def validate_topic(cls, v):
@@ -235,17 +289,24 @@ class ConversationMessage(BaseModel):
 
 class InteractiveConversationContinueRequest(BaseModel):
     """Request model for continuing an interactive conversation."""
-    topic: str = Field(..., min_length=1, max_length=200, description="Topic being discussed")
+    session_id: Optional[str] = Field(default=None, max_length=64, description="Session returned when the conversation started; history is then kept by the server")
+    topic: Optional[str] = Field(default=None, min_length=1, max_length=200, description="Topic being discussed (required without session_id)")
     user_message: str = Field(..., min_length=1, description="User's message")
-    conversation_history: list[ConversationMessage] = Field(default_factory=list, description="Previous conversation messages")
+    conversation_history: list[ConversationMessage] = Field(default_factory=list, description="Previous conversation messages (ignored with session_id)")
     voice: str = Field(default="af_bella", description="Voice identifier for TTS responses")
     speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier (0.5-2.0)")
+    audio_format: Optional[str] = Field(default=None, description="Audio format for the response: 'wav', 'flac', 'opus' or 'mp3' (default: server setting)")
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000, description="Audio sample rate in Hz (default: model rate)")
+
+    @validator('audio_format')
+    def validate_audio_format(cls, v):
+        return _validate_audio_format(v)
 
     @validator('topic')
     def validate_topic(cls, v):
-        if not v or not v.strip():
+        if v is not None and not v.strip():
             raise ValueError("Topic cannot be empty or only whitespace")
-        return v.strip()
+        return v.strip() if v is not None else v
 
     @validator('user_message')
     def validate_user_message(cls, v):
@@ -256,9 +317,8 @@ class InteractiveConversationContinueRequest(BaseModel):
     class Config:
         schema_extra = {
             "example": {
-                "topic": "climate change",
+                "session_id": "3f2b9c0e8d7a4e6f9b1c2d3e4f5a6b7c",
                 "user_message": "I think renewable energy is the key to solving climate change.",
-                "conversation_history": [],
                 "voice": "af_bella",
                 "speed": 1.0
             }
@@ -269,7 +329,28 @@ class InteractiveConversationResponse(BaseModel):
     """Response model for interactive conversation."""
     message: str = Field(..., description="AI's text response")
     topic: str = Field(..., description="The conversation topic")
-    audio_url: Optional[str] = Field(None, description="URL or base64 audio data for the voice response")
+    audio_url: Optional[str] = Field(None, description="URL of the voice response audio (/api/audio/{id}), or a data URI if it could not be stored")
+    session_id: Optional[str] = Field(None, description="Session to continue the conversation with")
+
+
+class ConversationSocketStart(BaseModel):
+    """First frame of a /ws/conversation connection: a new conversation, or a session to resume."""
+    session_id: Optional[str] = Field(default=None, max_length=64, description="Session to resume; no opening message is generated")
+    topic: Optional[str] = Field(default=None, min_length=1, max_length=200, description="Topic of a new conversation (required without session_id)")
+    voice: str = Field(default="af_bella", description="Voice identifier for TTS responses")
+    speed: float = Field(default=1.0, ge=0.5, le=2.0, description="Speech speed multiplier (0.5-2.0)")
+    audio_format: Optional[str] = Field(default=None, description="Audio format of the binary frames: 'wav', 'flac', 'opus' or 'mp3' (default: server setting)")
+    sample_rate: Optional[int] = Field(default=None, ge=8000, le=48000, description="Audio sample rate in Hz (default: model rate)")
+
+    @validator('audio_format')
+    def validate_audio_format(cls, v):
+        return _validate_audio_format(v)
+
+    @validator('topic')
+    def validate_topic(cls, v):
+        if v is not None and not v.strip():
+            raise ValueError("Topic cannot be empty or only whitespace")
+        return v.strip() if v is not None else v
 
 
 class SpeechCreate(BaseModel):
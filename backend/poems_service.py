@@ -1,13 +1,16 @@
 """
 Poems Service Module
 Handles CRUD operations for user-created poems.
+
+PoemsService works on sync sessions (get_db); AsyncPoemsService has the same
+methods for async sessions (get_async_db), for use in request handlers.
 """
 
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select
 from datetime import datetime
-from database import Poem, get_db
+from database import AsyncSession, Poem, get_db
 from logger_config import logger
 
 
@@ -107,6 +110,106 @@ class PoemsService:
         return db.query(Poem).count()
 
 
-# Create singleton instance
+class AsyncPoemsService:
+    """Service for managing poems, on async sessions"""
+    
+    async def get_all_poems(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Poem]:
+        """Get all poems, ordered by most recent first."""
+        statement = select(Poem).order_by(desc(Poem.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def get_poem_by_id(self, db: AsyncSession, poem_id: int) -> Optional[Poem]:
+        """Get a single poem by ID."""
+        return await db.get(Poem, poem_id)
+    
+    async def get_poems_by_style(self, db: AsyncSession, style: str, skip: int = 0, limit: int = 100) -> List[Poem]:
+        """Get poems by style."""
+        statement = select(Poem).where(Poem.style.ilike(f"%{style}%")).order_by(desc(Poem.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def create_poem(
+        self,
+        db: AsyncSession,
+        title: Optional[str],
+        content: str,
+        style: Optional[str] = None,
+        audio_url: Optional[str] = None
+    ) -> Poem:
+        """Create a new poem."""
+        poem = Poem(
+            title=title,
+            content=content,
+            style=style,
+            audio_url=audio_url
+        )
+        db.add(poem)
+        await db.commit()
+        await db.refresh(poem)
+        logger.info(f"Created poem with ID {poem.id}, style: {style}")
+        return poem
+    
+    async def update_poem(
+        self,
+        db: AsyncSession,
+        poem_id: int,
+        title: Optional[str] = None,
+        content: Optional[str] = None,
+        style: Optional[str] = None,
+        audio_url: Optional[str] = None
+    ) -> Optional[Poem]:
+        """Update an existing poem."""
+        poem = await db.get(Poem, poem_id)
+        if not poem:
+            return None
+        
+        if title is not None:
+            poem.title = title
+        if content is not None:
+            poem.content = content
+        if style is not None:
+            poem.style = style
+        if audio_url is not None:
+            poem.audio_url = audio_url
+        
+        poem.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(poem)
+        logger.info(f"Updated poem with ID {poem_id}")
+        return poem
+    
+    async def delete_poem(self, db: AsyncSession, poem_id: int) -> bool:
+        """Delete a poem."""
+        poem = await db.get(Poem, poem_id)
+        if not poem:
+            return False
+        
+        await db.delete(poem)
+        await db.commit()
+        logger.info(f"Deleted poem with ID {poem_id}")
+        return True
+    
+    async def search_poems(
+        self,
+        db: AsyncSession,
+        query: str,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Poem]:
+        """Search poems by title, content, or style."""
+        search_term = f"%{query}%"
+        statement = select(Poem).where(
+            (Poem.title.ilike(search_term)) |
+            (Poem.content.ilike(search_term)) |
+            (Poem.style.ilike(search_term))
+        ).order_by(desc(Poem.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def get_poems_count(self, db: AsyncSession) -> int:
+        """Get total count of poems."""
+        return await db.scalar(select(func.count(Poem.id))) or 0
+
+
+# Create singleton instances
 poems_service = PoemsService()
+async_poems_service = AsyncPoemsService()
 
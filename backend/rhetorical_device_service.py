@@ -7,7 +7,7 @@ to generate writing practice prompts that incorporate specific rhetorical device
 
 import os
 from typing import Optional, List, Dict
-from openai import OpenAI
+from llm_client import llm_client
 from loguru import logger
 from exceptions import ServiceNotAvailableException, ValidationException
 
@@ -60,13 +60,10 @@ class RhetoricalDeviceService:
     """Service for generating rhetorical device practice prompts."""
     
     def __init__(self):
-        """Initialize the rhetorical device service with OpenAI client."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        """Initialize the rhetorical device service with the shared async LLM client."""
+        self.client = llm_client
+        if self.client is None:
             logger.warning("OPENAI_API_KEY not set. Rhetorical device practice will be limited.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
         
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     
@@ -111,7 +108,7 @@ class RhetoricalDeviceService:
         
         return validated
     
-    def generate_prompts(
+    async def generate_prompts(
         self, 
         topic: str, 
         devices: List[str], 
@@ -179,7 +176,7 @@ For each prompt:
 
 Format: Each prompt should be a clear, inspiring instruction that guides the user to write about "{topic}" while naturally incorporating the specified rhetorical devices. Make it feel like an exciting creative challenge, not a technical exercise."""
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
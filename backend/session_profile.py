@@ -0,0 +1,183 @@
+"""
+ONNX Runtime session profile for the Kokoro TTS model.
+
+Collects the session options that matter for CPU inference (thread counts,
+execution mode, graph optimisation level, memory arena behaviour) and an
+optional on-disk cache of the optimised graph, so that restarts skip graph
+optimisation. Values come from config.Settings via SessionProfile.from_settings().
+"""
+import hashlib
+import os
+import uuid
+from typing import Dict, Optional
+
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+EXECUTION_MODES = ("sequential", "parallel")
+
+
+class SessionProfile:
+    """Describes how ONNX Runtime sessions for the TTS model are built"""
+
+    def __init__(
+        self,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+        execution_mode: str = "sequential",
+        graph_optimization: str = "all",
+        optimized_model_dir: Optional[str] = None,
+        enable_cpu_mem_arena: bool = True,
+        enable_mem_pattern: bool = True
+    ):
+        """
+        Args:
+            intra_op_threads: Threads used inside a single operator (0 = ONNX Runtime default)
+            inter_op_threads: Threads used across operators in parallel mode (0 = default)
+            execution_mode: "sequential" or "parallel"
+            graph_optimization: "disable", "basic", "extended" or "all"
+            optimized_model_dir: Directory for the serialized optimised model (None = off)
+            enable_cpu_mem_arena: Use the CPU memory arena allocator
+            enable_mem_pattern: Pre-plan allocations from observed memory patterns
+        """
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Execution mode must be one of: {', '.join(EXECUTION_MODES)}")
+        if graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(f"Graph optimization must be one of: {', '.join(GRAPH_OPTIMIZATION_LEVELS)}")
+
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.execution_mode = execution_mode
+        self.graph_optimization = graph_optimization
+        self.optimized_model_dir = optimized_model_dir
+        self.enable_cpu_mem_arena = enable_cpu_mem_arena
+        self.enable_mem_pattern = enable_mem_pattern
+
+    @classmethod
+    def from_settings(cls, settings, sessions_per_process: int = 1, processes: Optional[int] = None) -> "SessionProfile":
+        """
+        Build a profile from application settings.
+
+        When no intra-op thread count is configured, the cores are divided
+        between all processes that load the model (the Gunicorn workers by
+        default, or just the inference sidecar) and all sessions within each
+        process so that they do not oversubscribe the CPU.
+        """
+        intra_op_threads = settings.TTS_INTRA_OP_THREADS
+        if not intra_op_threads:
+            processes = settings.WORKERS if processes is None else processes
+            sessions = max(1, processes) * max(1, sessions_per_process)
+            intra_op_threads = max(1, (os.cpu_count() or 1) // sessions)
+
+        return cls(
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=settings.TTS_INTER_OP_THREADS,
+            execution_mode=settings.TTS_EXECUTION_MODE,
+            graph_optimization=settings.TTS_GRAPH_OPTIMIZATION,
+            optimized_model_dir=settings.TTS_OPTIMIZED_MODEL_DIR or None,
+            enable_cpu_mem_arena=settings.TTS_CPU_MEM_ARENA,
+            enable_mem_pattern=settings.TTS_MEM_PATTERN
+        )
+
+    def optimized_model_path(self, model_path: str, model_version: str) -> Optional[str]:
+        """
+        Path of the cached optimised model for this model, profile and runtime.
+
+        The name includes a hash of everything that affects the optimised
+        graph, so a model update or ONNX Runtime upgrade never reuses a stale file.
+        """
+        if not self.optimized_model_dir:
+            return None
+        import onnxruntime as rt
+
+        fingerprint = f"{model_version}|{rt.__version__}|{self.graph_optimization}"
+        digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        return os.path.join(self.optimized_model_dir, f"{name}.{digest}.optimized.onnx")
+
+    def build_options(self, intra_op_threads: Optional[int] = None, load_optimized: bool = False):
+        """
+        Create onnxruntime.SessionOptions for this profile.
+
+        Args:
+            intra_op_threads: Override for the intra-op thread count
+            load_optimized: The session loads an already-optimised model, so
+                graph optimisation is skipped
+        """
+        import onnxruntime as rt
+
+        levels = {
+            "disable": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }
+
+        options = rt.SessionOptions()
+        threads = intra_op_threads or self.intra_op_threads
+        if threads:
+            options.intra_op_num_threads = threads
+        if self.inter_op_threads:
+            options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = (
+            rt.ExecutionMode.ORT_PARALLEL if self.execution_mode == "parallel"
+            else rt.ExecutionMode.ORT_SEQUENTIAL
+        )
+        options.graph_optimization_level = (
+            rt.GraphOptimizationLevel.ORT_DISABLE_ALL if load_optimized
+            else levels[self.graph_optimization]
+        )
+        options.enable_cpu_mem_arena = self.enable_cpu_mem_arena
+        options.enable_mem_pattern = self.enable_mem_pattern
+        return options
+
+    def create_session(self, model_path: str, model_version: str, intra_op_threads: Optional[int] = None):
+        """
+        Create an InferenceSession, using or populating the optimised model cache.
+
+        Returns:
+            onnxruntime.InferenceSession
+        """
+        import onnxruntime as rt
+
+        # Match Kokoro's own provider selection
+        providers = [os.getenv("ONNX_PROVIDER", "CPUExecutionProvider")]
+        cached_path = self.optimized_model_path(model_path, model_version)
+
+        if cached_path and os.path.exists(cached_path):
+            try:
+                options = self.build_options(intra_op_threads, load_optimized=True)
+                return rt.InferenceSession(cached_path, sess_options=options, providers=providers)
+            except Exception:
+                # Unreadable cache entry: rebuild it from the original model below
+                try:
+                    os.remove(cached_path)
+                except OSError:
+                    pass
+
+        options = self.build_options(intra_op_threads)
+        tmp_path = None
+        if cached_path and self.graph_optimization != "disable":
+            os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+            tmp_path = f"{cached_path}.{uuid.uuid4().hex}.tmp"
+            options.optimized_model_filepath = tmp_path
+
+        session = rt.InferenceSession(model_path, sess_options=options, providers=providers)
+        if tmp_path:
+            try:
+                os.replace(tmp_path, cached_path)
+            except OSError:
+                # Cache is an optimisation only; a failed write is not an error
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return session
+
+    def to_dict(self) -> Dict:
+        """Describe the profile (for status endpoints and logs)"""
+        return {
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "execution_mode": self.execution_mode,
+            "graph_optimization": self.graph_optimization,
+            "optimized_model_dir": self.optimized_model_dir,
+            "enable_cpu_mem_arena": self.enable_cpu_mem_arena,
+            "enable_mem_pattern": self.enable_mem_pattern,
+        }
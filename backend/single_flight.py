@@ -0,0 +1,64 @@
+"""
+Single-flight deduplication of identical in-flight requests.
+
+When several clients ask for the same expensive result at once (the same
+text in the same voice, the same prompt topic), only the first caller runs
+the computation; the others await the same task. The work runs as its own
+task, so a caller that disconnects does not cancel it for the others.
+Deduplication is per event loop (per worker); across workers the shared
+cache serves results once the first computation has stored them.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        # Metrics
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await func() for the key, or join the call already in flight.
+
+        Args:
+            key: Normalized identity of the request
+            func: Coroutine function computing the result
+
+        Returns:
+            (result, True if the result came from another caller's computation)
+
+        Raises:
+            Whatever func() raised, in every caller sharing the computation
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key: Hashable, task: asyncio.Future):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    def get_stats(self) -> dict:
+        total = self.calls + self.shared
+        return {
+            "in_flight": len(self._tasks),
+            "calls": self.calls,
+            "shared": self.shared,
+            "shared_ratio": self.shared / total if total else 0.0,
+        }
@@ -0,0 +1,265 @@
+"""
+Background speech generation with per-stage checkpoints.
+
+A speech takes five sequential completions (SPEECH_STAGES), long enough to
+hit proxy timeouts when run inside one request. In job mode the request only
+creates a job; the rounds then run as a task in the worker's event loop:
+
+- each completed round is checkpointed in the job tracker, so progress can
+  be polled per stage and a failed or interrupted job resumes with the next
+  round instead of starting over;
+- each round's output is also cached by (topic, previous output) until the
+  speech is finished, so a retry after a failure or timeout for the same
+  topic, in job mode or not, skips the rounds that already completed; a
+  finished speech drops its rounds, so the next request for the topic
+  gets a new speech;
+- jobs left processing by a worker that died are taken over by another
+  worker once they have not been updated for stale_after seconds (longer
+  than one round can take, including LLM retries).
+"""
+import asyncio
+import hashlib
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+
+from cache_manager import CacheManager
+from job_tracker import JobStatus, JobTracker
+from speech_service import SPEECH_STAGES, SpeechService
+
+JOB_TYPE = "speech"
+
+
+class SpeechJobRunner:
+    """Runs speech generation as resumable background jobs"""
+
+    def __init__(
+        self,
+        speech_service: SpeechService,
+        job_tracker: JobTracker,
+        save_speech: Callable[[str, str], int],
+        cache_manager: Optional[CacheManager] = None,
+        stage_ttl: int = 86400,
+        stale_after: int = 600
+    ):
+        """
+        Args:
+            speech_service: Service running the rounds
+            job_tracker: Where jobs and stage checkpoints are persisted
+            save_speech: Stores a finished speech (topic, content) and returns its id
+            cache_manager: Cache for round outputs (None = no caching)
+            stage_ttl: Seconds round outputs stay cached
+            stale_after: Seconds without progress after which a processing
+                job is considered interrupted
+        """
+        self.speech_service = speech_service
+        self.job_tracker = job_tracker
+        self.save_speech = save_speech
+        self.cache_manager = cache_manager
+        self.stage_ttl = stage_ttl
+        self.stale_after = stale_after
+        # Jobs running in this worker
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Metrics
+        self.stages_run = 0
+        self.stages_cached = 0
+        self.resumed = 0
+
+    @staticmethod
+    def _stage_key(topic: str, stage: int, previous: Optional[str]) -> str:
+        """
+        Cache key of a round: its output depends on the topic and the previous round's.
+
+        Rounds are LLM output, so they are kept (and counted) in the "llm" namespace.
+        """
+        digest = hashlib.sha256()
+        for part in (" ".join(topic.split()).casefold(), str(stage), previous or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"llm:speech_stage:{digest.hexdigest()}"
+
+    async def generate(
+        self,
+        topic: str,
+        completed: Optional[List[str]] = None,
+        checkpoint: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> str:
+        """
+        Run the remaining rounds for a topic, reusing those cached by an
+        unfinished earlier attempt. The rounds are dropped from the cache
+        once the speech is complete.
+
+        Args:
+            topic: The topic to generate a speech about
+            completed: Outputs of rounds already completed
+            checkpoint: Awaited with (stage index, output) for every round
+                completed here, whether run or taken from the cache
+
+        Returns:
+            The generated speech content
+        """
+        completed = list(completed or [])
+        # Keys of the rounds cached for this speech, dropped once it is complete
+        keys = []
+        if self.cache_manager is not None:
+            while len(completed) < len(SPEECH_STAGES):
+                previous = completed[-1] if completed else None
+                key = self._stage_key(topic, len(completed), previous)
+                cached = await run_in_threadpool(self.cache_manager.get, key)
+                if cached is None:
+                    break
+                keys.append(key)
+                completed.append(cached)
+                self.stages_cached += 1
+                if checkpoint is not None:
+                    await checkpoint(len(completed) - 1, cached)
+
+        previous = completed[-1] if completed else None
+
+        async def on_stage(stage: int, output: str):
+            nonlocal previous
+            self.stages_run += 1
+            if self.cache_manager is not None:
+                key = self._stage_key(topic, stage, previous)
+                await run_in_threadpool(self.cache_manager.set, key, output, self.stage_ttl)
+                keys.append(key)
+            previous = output
+            if checkpoint is not None:
+                await checkpoint(stage, output)
+
+        if len(completed) == len(SPEECH_STAGES):
+            speech = completed[-1]
+        else:
+            speech = await self.speech_service.generate_speech(topic, completed_stages=completed, on_stage=on_stage)
+        for key in keys:
+            await run_in_threadpool(self.cache_manager.invalidate, key)
+        return speech
+
+    def submit(self, topic: str) -> str:
+        """Create a job for a topic and start it; returns the job id"""
+        job_id = str(uuid.uuid4())
+        self.job_tracker.create_job(
+            job_id,
+            metadata={"type": JOB_TYPE, "topic": topic, "stages": len(SPEECH_STAGES)}
+        )
+        self._start(job_id)
+        return job_id
+
+    def resume(self, job_id: str) -> bool:
+        """
+        Restart a failed or interrupted job from its last checkpoint.
+
+        Returns:
+            False if the job is unknown, not a speech job, already completed
+            or running (here or, judging by recent progress, elsewhere)
+        """
+        job = self.job_tracker.get_job(job_id)
+        if not job or (job.get("metadata") or {}).get("type") != JOB_TYPE:
+            return False
+        if job["status"] == JobStatus.COMPLETED.value or job_id in self._tasks:
+            return False
+        if job["status"] in (JobStatus.PENDING.value, JobStatus.PROCESSING.value) and not self._is_stale(job):
+            return False
+        if not self.job_tracker.claim_job(job_id, job["updated_at"]):
+            return False
+        self.resumed += 1
+        self._start(job_id)
+        return True
+
+    def resume_interrupted(self) -> int:
+        """Take over speech jobs left pending or processing by a worker that stopped"""
+        resumed = 0
+        for status in (JobStatus.PENDING, JobStatus.PROCESSING):
+            for job in self.job_tracker.get_jobs(status=status):
+                if (job.get("metadata") or {}).get("type") == JOB_TYPE and self._is_stale(job):
+                    if self.resume(job["job_id"]):
+                        logger.info(f"Resuming interrupted speech job {job['job_id']}")
+                        resumed += 1
+        return resumed
+
+    async def watch(self, interval: Optional[float] = None):
+        """Resume interrupted jobs now and then periodically (runs until cancelled)"""
+        interval = interval or self.stale_after / 2
+        while True:
+            try:
+                self.resume_interrupted()
+            except Exception as e:
+                logger.error(f"Error resuming speech jobs: {e}", exc_info=True)
+            await asyncio.sleep(interval)
+
+    def _is_stale(self, job: dict) -> bool:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        return datetime.fromisoformat(job["updated_at"]) < cutoff
+
+    def _start(self, job_id: str):
+        task = asyncio.ensure_future(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str):
+        job = self.job_tracker.get_job(job_id)
+        topic = job["metadata"]["topic"]
+        completed = [stage["output"] for stage in self.job_tracker.get_stages(job_id)]
+        total = len(SPEECH_STAGES) + 1  # The rounds, then saving the speech
+        self.job_tracker.update_job_status(
+            job_id, JobStatus.PROCESSING, progress=len(completed) / total, error_message=""
+        )
+
+        async def checkpoint(stage: int, output: str):
+            name, _ = SPEECH_STAGES[stage]
+            self.job_tracker.save_stage(job_id, stage, name, output)
+            self.job_tracker.update_job_status(job_id, JobStatus.PROCESSING, progress=(stage + 1) / total)
+
+        try:
+            speech = await self.generate(topic, completed, checkpoint)
+            speech_id = await run_in_threadpool(self.save_speech, topic, speech)
+            self.job_tracker.update_job_status(
+                job_id, JobStatus.COMPLETED, progress=1.0, result_path=f"/api/speeches/{speech_id}"
+            )
+            logger.info(f"Speech job {job_id} completed (speech {speech_id})")
+        except asyncio.CancelledError:
+            # Worker shutting down; the job is picked up again once stale
+            raise
+        except Exception as e:
+            logger.error(f"Speech job {job_id} failed: {e}", exc_info=True)
+            self.job_tracker.update_job_status(job_id, JobStatus.FAILED, error_message=str(e)[:1000])
+
+    def get_status(self, job_id: str) -> Optional[dict]:
+        """A speech job with per-stage progress (None if unknown)"""
+        job = self.job_tracker.get_job(job_id)
+        if not job or (job.get("metadata") or {}).get("type") != JOB_TYPE:
+            return None
+        done = {stage["stage"]: stage for stage in self.job_tracker.get_stages(job_id)}
+        result_path = job.get("result_path")
+        return {
+            "job_id": job_id,
+            "topic": job["metadata"]["topic"],
+            "status": job["status"],
+            "progress": job["progress"],
+            "error_message": job.get("error_message") or None,
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "stages": [
+                {
+                    "stage": index + 1,
+                    "name": name,
+                    "status": "completed" if index in done else "pending",
+                    "chars": len(done[index]["output"]) if index in done else None,
+                    "completed_at": done[index]["completed_at"] if index in done else None,
+                }
+                for index, (name, _) in enumerate(SPEECH_STAGES)
+            ],
+            "speech_id": int(result_path.rsplit("/", 1)[1]) if result_path else None,
+            "result_url": result_path,
+        }
+
+    def get_stats(self) -> dict:
+        return {
+            "running": len(self._tasks),
+            "stages_run": self.stages_run,
+            "stages_cached": self.stages_cached,
+            "resumed": self.resumed,
+        }
@@ -6,31 +6,46 @@ to generate sophisticated, human-like speeches based on topics using a 5-prompt
 """
 
 import os
-from typing import Optional
-from openai import OpenAI
+from typing import Awaitable, Callable, List, Optional
+from llm_client import llm_client
 from loguru import logger
 from exceptions import ServiceNotAvailableException, ValidationException
 
+# (name, temperature) of each round; every round rewrites the previous output
+SPEECH_STAGES = [
+    ("foundation", 0.9),
+    ("depth_and_style", 0.8),
+    ("frameworks", 0.8),
+    ("humanize", 0.8),
+    ("polish", 0.7),
+]
+
+
 class SpeechService:
     """Service for generating practice speeches."""
     
     def __init__(self):
-        """Initialize the speech service with OpenAI client."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
+        """Initialize the speech service with the shared async LLM client."""
+        self.client = llm_client
+        if self.client is None:
             logger.warning("OPENAI_API_KEY not set. Speech generation will be unavailable.")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
         
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     
-    def generate_speech(self, topic: str) -> str:
+    async def generate_speech(
+        self,
+        topic: str,
+        completed_stages: Optional[List[str]] = None,
+        on_stage: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> str:
         """
         Generate a sophisticated speech for a given topic using a 5-prompt system.
         
         Args:
             topic: The topic to generate a speech about
+            completed_stages: Outputs of rounds already completed (e.g. restored
+                from a checkpoint); generation resumes with the next round
+            on_stage: Awaited with (stage index, output) after each round
             
         Returns:
             The generated speech content
@@ -47,11 +62,63 @@ class SpeechService:
                 "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable."
             )
         
+        completed_stages = list(completed_stages or [])
+        if len(completed_stages) > len(SPEECH_STAGES):
+            raise ValidationException(f"A speech has only {len(SPEECH_STAGES)} stages")
+        speech_content = completed_stages[-1] if completed_stages else None
+        
         try:
-            logger.info(f"Generating speech for topic: {topic}")
+            if completed_stages:
+                logger.info(f"Resuming speech for topic: {topic} after stage {len(completed_stages)}")
+            else:
+                logger.info(f"Generating speech for topic: {topic}")
+            
+            for stage in range(len(completed_stages), len(SPEECH_STAGES)):
+                speech_content = await self._run_stage(stage, topic, speech_content)
+                if on_stage is not None:
+                    await on_stage(stage, speech_content)
             
+            logger.info(f"Successfully generated speech for topic: {topic} (length: {len(speech_content)} chars)")
+            
+            return speech_content
+            
+        except ServiceNotAvailableException:
+            raise
+        except ValidationException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating speech: {e}", exc_info=True)
+            raise ServiceNotAvailableException(f"Failed to generate speech: {str(e)}")
+    
+    async def _run_stage(self, stage: int, topic: str, speech_content: Optional[str]) -> str:
+        """Run one round of the 5-prompt system and return its output."""
+        _, temperature = SPEECH_STAGES[stage]
+        response = await self.client.chat_completion(
+            model=self.model,
+            messages=[
+                {"role": "user", "content": self._build_prompt(stage, topic, speech_content)}
+            ],
+            temperature=temperature,
+            max_tokens=4000,
+        )
+        
+        # Validate response
+        if not response.choices or not response.choices[0].message:
+            raise ServiceNotAvailableException(f"Empty response from OpenAI API in Prompt {stage + 1}")
+        
+        content = response.choices[0].message.content
+        if not content or not content.strip():
+            raise ServiceNotAvailableException(f"Empty speech content from OpenAI API in Prompt {stage + 1}")
+        
+        content = content.strip()
+        logger.debug(f"Completed Prompt {stage + 1} (length: {len(content)} chars)")
+        return content
+    
+    def _build_prompt(self, stage: int, topic: str, speech_content: Optional[str]) -> str:
+        """The prompt of a round; rounds after the first rewrite the previous output."""
+        if stage == 0:
             # Prompt 1: Initial generation
-            prompt_1 = f"""PROMPT 1: CREATE FOUNDATIONAL SPEECH
+            return f"""PROMPT 1: CREATE FOUNDATIONAL SPEECH
 
 Objective: Generate an eloquent, intellectually sophisticated, and deeply engaging script on '{topic}' that feels authentically human-written, not AI-generated.
 
@@ -291,28 +358,9 @@ Encourage active thinking and personal connection to the material.
 
 Foster a sense of shared exploration and discovery. Remember to sound intimate throughout and not like someone removed, giving a speech. If you think your output is good, try to make it even more dense with the fields insights, and advances in concepts, and connect the dots fluidly, and only then give it to me."""
 
-            response_1 = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt_1}
-                ],
-                temperature=0.9,
-                max_tokens=4000,
-            )
-            
-            # Validate response
-            if not response_1.choices or not response_1.choices[0].message:
-                raise ServiceNotAvailableException("Empty response from OpenAI API in Prompt 1")
-            
-            speech_content = response_1.choices[0].message.content
-            if not speech_content or not speech_content.strip():
-                raise ServiceNotAvailableException("Empty speech content from OpenAI API in Prompt 1")
-            
-            speech_content = speech_content.strip()
-            logger.debug(f"Completed Prompt 1 (length: {len(speech_content)} chars)")
-            
+        if stage == 1:
             # Prompt 2: Enhancement
-            prompt_2 = f"""PROMPT 2: ENHANCE INTELLECTUAL DEPTH & STYLE
+            return f"""PROMPT 2: ENHANCE INTELLECTUAL DEPTH & STYLE
 
 Preserve ALL existing content while enhancing using these strategies:
 
@@ -453,28 +501,9 @@ Here is the current speech content:
 
 {speech_content}"""
 
-            response_2 = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt_2}
-                ],
-                temperature=0.8,
-                max_tokens=4000,
-            )
-            
-            # Validate response
-            if not response_2.choices or not response_2.choices[0].message:
-                raise ServiceNotAvailableException("Empty response from OpenAI API in Prompt 2")
-            
-            speech_content = response_2.choices[0].message.content
-            if not speech_content or not speech_content.strip():
-                raise ServiceNotAvailableException("Empty speech content from OpenAI API in Prompt 2")
-            
-            speech_content = speech_content.strip()
-            logger.debug(f"Completed Prompt 2 (length: {len(speech_content)} chars)")
-            
+        if stage == 2:
             # Prompt 3: Add theoretical frameworks and discoveries
-            prompt_3 = f"""PROMPT 3: INTEGRATE THEORETICAL FRAMEWORKS & DISCOVERIES
+            return f"""PROMPT 3: INTEGRATE THEORETICAL FRAMEWORKS & DISCOVERIES
 
 Preserve ALL existing content while expanding the script with:
 
@@ -494,28 +523,9 @@ Here is the current speech content:
 
 {speech_content}"""
 
-            response_3 = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt_3}
-                ],
-                temperature=0.8,
-                max_tokens=4000,
-            )
-            
-            # Validate response
-            if not response_3.choices or not response_3.choices[0].message:
-                raise ServiceNotAvailableException("Empty response from OpenAI API in Prompt 3")
-            
-            speech_content = response_3.choices[0].message.content
-            if not speech_content or not speech_content.strip():
-                raise ServiceNotAvailableException("Empty speech content from OpenAI API in Prompt 3")
-            
-            speech_content = speech_content.strip()
-            logger.debug(f"Completed Prompt 3 (length: {len(speech_content)} chars)")
-            
+        if stage == 3:
             # Prompt 4: Humanize the text
-            prompt_4 = f"""PROMPT 4: HUMANIZE & POLISH THE TEXT
+            return f"""PROMPT 4: HUMANIZE & POLISH THE TEXT
 
 Apply these strategies to refine the text and make it feel authentically human-written:
 
@@ -628,28 +638,8 @@ Here is the current speech content:
 
 {speech_content}"""
 
-            response_4 = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt_4}
-                ],
-                temperature=0.8,
-                max_tokens=4000,
-            )
-            
-            # Validate response
-            if not response_4.choices or not response_4.choices[0].message:
-                raise ServiceNotAvailableException("Empty response from OpenAI API in Prompt 4")
-            
-            speech_content = response_4.choices[0].message.content
-            if not speech_content or not speech_content.strip():
-                raise ServiceNotAvailableException("Empty speech content from OpenAI API in Prompt 4")
-            
-            speech_content = speech_content.strip()
-            logger.debug(f"Completed Prompt 4 (length: {len(speech_content)} chars)")
-            
-            # Prompt 5: Final polish
-            prompt_5 = f"""PROMPT 5: FINAL LINE-BY-LINE POLISH
+        # Prompt 5: Final polish
+        return f"""PROMPT 5: FINAL LINE-BY-LINE POLISH
 
 Review the entire text line by line and make subtle refinements:
 
@@ -664,36 +654,6 @@ Critical: DO NOT remove any content. Restore and emphasize all key theories, bre
 Here is the current speech content:
 
 {speech_content}"""
-
-            response_5 = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": prompt_5}
-                ],
-                temperature=0.7,
-                max_tokens=4000,
-            )
-            
-            # Validate final response
-            if not response_5.choices or not response_5.choices[0].message:
-                raise ServiceNotAvailableException("Empty response from OpenAI API in Prompt 5")
-            
-            final_speech = response_5.choices[0].message.content
-            if not final_speech or not final_speech.strip():
-                raise ServiceNotAvailableException("Empty final speech content from OpenAI API")
-            
-            final_speech = final_speech.strip()
-            logger.info(f"Successfully generated speech for topic: {topic} (length: {len(final_speech)} chars)")
-            
-            return final_speech
-            
-        except ServiceNotAvailableException:
-            raise
-        except ValidationException:
-            raise
-        except Exception as e:
-            logger.error(f"Error generating speech: {e}", exc_info=True)
-            raise ServiceNotAvailableException(f"Failed to generate speech: {str(e)}")
     
     def is_available(self) -> bool:
         """Check if the speech service is available."""
@@ -1,13 +1,16 @@
 """
 Speeches Service Module
 Handles CRUD operations for practice speeches.
+
+SpeechesService works on sync sessions (get_db); AsyncSpeechesService has the
+same methods for async sessions (get_async_db), for use in request handlers.
 """
 
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, select
 from datetime import datetime
-from database import Speech, get_db
+from database import AsyncSession, Speech, get_db
 from logger_config import logger
 
 
@@ -73,6 +76,72 @@ class SpeechesService:
         return db.query(Speech).count()
 
 
-# Create singleton instance
+class AsyncSpeechesService:
+    """Service for managing speeches, on async sessions"""
+    
+    async def get_all_speeches(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Speech]:
+        """Get all speeches, ordered by most recent first."""
+        statement = select(Speech).order_by(desc(Speech.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def get_speech_by_id(self, db: AsyncSession, speech_id: int) -> Optional[Speech]:
+        """Get a single speech by ID."""
+        return await db.get(Speech, speech_id)
+    
+    async def get_speeches_by_topic(self, db: AsyncSession, topic: str, skip: int = 0, limit: int = 100) -> List[Speech]:
+        """Get speeches by topic."""
+        statement = select(Speech).where(Speech.topic.ilike(f"%{topic}%")).order_by(desc(Speech.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def create_speech(
+        self,
+        db: AsyncSession,
+        topic: str,
+        content: str
+    ) -> Speech:
+        """Create a new speech."""
+        speech = Speech(
+            topic=topic,
+            content=content
+        )
+        db.add(speech)
+        await db.commit()
+        await db.refresh(speech)
+        logger.info(f"Created speech with ID {speech.id} for topic: {topic}")
+        return speech
+    
+    async def delete_speech(self, db: AsyncSession, speech_id: int) -> bool:
+        """Delete a speech."""
+        speech = await db.get(Speech, speech_id)
+        if not speech:
+            return False
+        
+        await db.delete(speech)
+        await db.commit()
+        logger.info(f"Deleted speech with ID {speech_id}")
+        return True
+    
+    async def search_speeches(
+        self,
+        db: AsyncSession,
+        query: str,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Speech]:
+        """Search speeches by topic or content."""
+        search_term = f"%{query}%"
+        statement = select(Speech).where(
+            (Speech.topic.ilike(search_term)) |
+            (Speech.content.ilike(search_term))
+        ).order_by(desc(Speech.created_at)).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    async def get_speeches_count(self, db: AsyncSession) -> int:
+        """Get total count of speeches."""
+        return await db.scalar(select(func.count(Speech.id))) or 0
+
+
+# Create singleton instances
 speeches_service = SpeechesService()
+async_speeches_service = AsyncSpeechesService()
 
@@ -0,0 +1,175 @@
+"""
+Sentence-pipelined speech for streamed LLM replies.
+
+stream_spoken_reply() consumes the text deltas of a streamed completion and
+yields an ordered series of events for the client:
+
+- ("text", {"delta"}) for every delta, as soon as it arrives;
+- ("audio", {"index", "text", ...}) for every sentence: each sentence is
+  handed to TTS the moment it is complete, while the model keeps
+  generating, and the audio is delivered in sentence order;
+- ("done", {"message", "sentences", "time_to_first_token",
+  "time_to_first_audio"}) at the end.
+
+Time-to-first-audio is thus about one sentence of generation plus one
+sentence of synthesis, rather than the whole completion followed by
+synthesis of the whole reply. The transport (SSE, WebSocket) is up to the
+caller; leaving the iteration early (client gone, barge-in) cancels the
+completion and any synthesis still running.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from text_frontend import SentenceBuffer
+
+_FINISHED = "_finished"
+_FAILED = "_failed"
+
+
+@asynccontextmanager
+async def aclosing(agen: AsyncGenerator) -> AsyncIterator[AsyncGenerator]:
+    """contextlib.aclosing(), which needs Python 3.10: close agen on exit"""
+    try:
+        yield agen
+    finally:
+        await agen.aclose()
+
+
+async def stream_spoken_reply(
+    deltas: AsyncIterator[str],
+    synthesize: Optional[Callable[[str], Awaitable[Dict]]],
+    sentences: Optional[SentenceBuffer] = None
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Turn streamed reply text into text and per-sentence audio events.
+
+    Args:
+        deltas: Async generator of text deltas (closed if iteration stops early)
+        synthesize: Renders one sentence and returns the audio fields of its
+            event (None = text only)
+        sentences: Sentence splitter (default: SentenceBuffer())
+
+    Yields:
+        (event, data) tuples as described in the module docstring
+
+    Raises:
+        Whatever the delta stream raised; a sentence whose synthesis fails is
+        logged and skipped instead
+    """
+    sentences = sentences or SentenceBuffer()
+    events: asyncio.Queue = asyncio.Queue()
+    # (index, sentence, synthesis task) in sentence order; None after the last
+    rendering: asyncio.Queue = asyncio.Queue()
+    tasks = []
+    start = time.perf_counter()
+    timings = {"time_to_first_token": None, "time_to_first_audio": None}
+    reply = []
+
+    def render(sentence: str):
+        task = asyncio.ensure_future(synthesize(sentence))
+        tasks.append(task)
+        rendering.put_nowait((len(tasks) - 1, sentence, task))
+
+    async def read():
+        try:
+            async with aclosing(deltas) as stream:
+                async for delta in stream:
+                    if timings["time_to_first_token"] is None:
+                        timings["time_to_first_token"] = time.perf_counter() - start
+                    reply.append(delta)
+                    events.put_nowait(("text", {"delta": delta}))
+                    if synthesize is not None:
+                        for sentence in sentences.feed(delta):
+                            render(sentence)
+            if synthesize is not None:
+                for sentence in sentences.flush():
+                    render(sentence)
+        finally:
+            rendering.put_nowait(None)
+
+    async def deliver():
+        while True:
+            item = await rendering.get()
+            if item is None:
+                return
+            index, sentence, task = item
+            try:
+                audio = await task
+            except Exception as e:
+                logger.warning(f"Failed to synthesize sentence {index} of a streamed reply: {e}", exc_info=True)
+                continue
+            if timings["time_to_first_audio"] is None:
+                timings["time_to_first_audio"] = time.perf_counter() - start
+            events.put_nowait(("audio", {"index": index, "text": sentence, **audio}))
+
+    async def run(step):
+        try:
+            await step()
+        except Exception as e:
+            events.put_nowait((_FAILED, e))
+        finally:
+            events.put_nowait((_FINISHED, None))
+
+    workers = [asyncio.ensure_future(run(read)), asyncio.ensure_future(run(deliver))]
+    try:
+        finished = 0
+        while finished < len(workers):
+            event, data = await events.get()
+            if event == _FINISHED:
+                finished += 1
+            elif event == _FAILED:
+                raise data
+            else:
+                yield event, data
+        yield "done", {
+            "message": "".join(reply).strip(),
+            "sentences": len(tasks),
+            **timings,
+        }
+    finally:
+        for task in workers + tasks:
+            task.cancel()
+
+
+class SpokenReplyStats:
+    """Latency of streamed replies, for /api/metrics"""
+
+    def __init__(self):
+        self.replies = 0
+        self.errors = 0
+        self.sentences = 0
+        self.first_tokens = 0
+        self.total_first_token_seconds = 0.0
+        self.first_audios = 0
+        self.total_first_audio_seconds = 0.0
+
+    def record(self, done: Dict):
+        """Record the "done" event of a reply"""
+        self.replies += 1
+        self.sentences += done["sentences"]
+        if done["time_to_first_token"] is not None:
+            self.first_tokens += 1
+            self.total_first_token_seconds += done["time_to_first_token"]
+        if done["time_to_first_audio"] is not None:
+            self.first_audios += 1
+            self.total_first_audio_seconds += done["time_to_first_audio"]
+
+    def record_error(self):
+        self.errors += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "replies": self.replies,
+            "errors": self.errors,
+            "avg_sentences": self.sentences / self.replies if self.replies else 0.0,
+            "avg_time_to_first_token_ms": (
+                self.total_first_token_seconds / self.first_tokens * 1000 if self.first_tokens else 0.0
+            ),
+            "avg_time_to_first_audio_ms": (
+                self.total_first_audio_seconds / self.first_audios * 1000 if self.first_audios else 0.0
+            ),
+        }
@@ -19,6 +19,12 @@ if [ ! -f natural_speech.db ]; then
     python -c "from database import init_db; init_db()"
 fi
 
+# Start the shared TTS inference sidecar when the workers are configured to use it
+if [ -n "${TTS_SIDECAR_SOCKET}" ]; then
+    echo "Starting TTS inference sidecar on ${TTS_SIDECAR_SOCKET}..."
+    python tts_sidecar.py &
+fi
+
 # Start with Gunicorn
 echo "Starting Gunicorn with Uvicorn workers..."
 exec gunicorn main:app \
@@ -6,15 +6,18 @@ This module provides:
 - Weekly/monthly statistics calculation
 - Goal tracking and progress calculation
 - Streak calculation
+
+StatisticsService works on sync sessions (get_db); AsyncStatisticsService has
+the same methods for async sessions (get_async_db), for use in request handlers.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, extract
+from sqlalchemy import func, and_, extract, select
 from datetime import datetime, timedelta, date
 from typing import Dict, Any, Optional, List
 import json
 
-from database import DailyStatistics, UserGoal, Writing, Speech, Poem, Job
+from database import AsyncSession, DailyStatistics, UserGoal, Writing, Speech, Poem, Job
 from logger_config import logger
 
 
@@ -30,12 +33,7 @@ class StatisticsService:
     @staticmethod
     def _get_or_create_daily_stats(db: Session, target_date: Optional[datetime] = None) -> DailyStatistics:
         """Get or create daily statistics for a given date."""
-        if target_date is None:
-            target_date = StatisticsService._get_today_date()
-        
-        # Ensure we're using the date part only (midnight)
-        if isinstance(target_date, datetime):
-            target_date = datetime.combine(target_date.date(), datetime.min.time())
+        target_date = StatisticsService._midnight(target_date)
         
         stats = db.query(DailyStatistics).filter(
             func.date(DailyStatistics.date) == target_date.date()
@@ -58,6 +56,128 @@ class StatisticsService:
         # Simple word count - split by whitespace
         return len(text.split())
     
+    @staticmethod
+    def _midnight(target_date: Optional[datetime]) -> datetime:
+        """A date at midnight (default: today)"""
+        if target_date is None:
+            return StatisticsService._get_today_date()
+        # Ensure we're using the date part only
+        if isinstance(target_date, datetime):
+            return datetime.combine(target_date.date(), datetime.min.time())
+        return target_date
+    
+    @staticmethod
+    def _daily_stats_dict(stats: Optional[DailyStatistics], target_date: datetime) -> Dict[str, Any]:
+        """A day's statistics, all zero if there is no record"""
+        if not stats:
+            # Return empty stats if no record exists
+            return {
+                "date": target_date.date().isoformat(),
+                "writings_created": 0,
+                "speeches_practiced": 0,
+                "poems_created": 0,
+                "conversations_completed": 0,
+                "audio_minutes_listened": 0.0,
+                "total_words_written": 0
+            }
+        
+        return {
+            "date": stats.date.date().isoformat(),
+            "writings_created": stats.writings_created,
+            "speeches_practiced": stats.speeches_practiced,
+            "poems_created": stats.poems_created,
+            "conversations_completed": stats.conversations_completed,
+            "audio_minutes_listened": round(stats.audio_minutes_listened, 2),
+            "total_words_written": stats.total_words_written
+        }
+    
+    @staticmethod
+    def _totals(stats: List[DailyStatistics]) -> Dict[str, Any]:
+        """Totals of a period's daily statistics"""
+        return {
+            "total_writings_created": sum(s.writings_created for s in stats),
+            "total_speeches_practiced": sum(s.speeches_practiced for s in stats),
+            "total_poems_created": sum(s.poems_created for s in stats),
+            "total_conversations_completed": sum(s.conversations_completed for s in stats),
+            "total_audio_minutes_listened": round(sum(s.audio_minutes_listened for s in stats), 2),
+            "total_words_written": sum(s.total_words_written for s in stats)
+        }
+    
+    @staticmethod
+    def _month_bounds(target_month: Optional[int], target_year: Optional[int]):
+        """(month, year, first day, end of last day) of a month (default: this month)"""
+        now = datetime.utcnow()
+        if target_month is None:
+            target_month = now.month
+        if target_year is None:
+            target_year = now.year
+        
+        start_date = datetime(target_year, target_month, 1)
+        # Get last day of month
+        if target_month == 12:
+            end_date = datetime(target_year + 1, 1, 1) - timedelta(days=1)
+        else:
+            end_date = datetime(target_year, target_month + 1, 1) - timedelta(days=1)
+        
+        end_date = datetime.combine(end_date.date(), datetime.max.time())
+        return target_month, target_year, start_date, end_date
+    
+    @staticmethod
+    def _week_totals(week_start: datetime, week_end: datetime, stats: List[DailyStatistics]) -> Dict[str, Any]:
+        """A week of a monthly breakdown"""
+        return {
+            "week_start": week_start.date().isoformat(),
+            "week_end": week_end.date().isoformat(),
+            "writings_created": sum(s.writings_created for s in stats),
+            "speeches_practiced": sum(s.speeches_practiced for s in stats),
+            "poems_created": sum(s.poems_created for s in stats),
+            "conversations_completed": sum(s.conversations_completed for s in stats),
+            "audio_minutes_listened": round(sum(s.audio_minutes_listened for s in stats), 2),
+            "total_words_written": sum(s.total_words_written for s in stats)
+        }
+    
+    @staticmethod
+    def _has_activity(stats: Optional[DailyStatistics]) -> bool:
+        return bool(stats) and (
+            stats.writings_created > 0 or
+            stats.speeches_practiced > 0 or
+            stats.poems_created > 0 or
+            stats.conversations_completed > 0
+        )
+    
+    @staticmethod
+    def _goal_dict(goal: UserGoal) -> Dict[str, Any]:
+        return {
+            "id": goal.id,
+            "goal_type": goal.goal_type,
+            "target_value": goal.target_value,
+            "current_value": goal.current_value,
+            "period": goal.period,
+            "is_active": goal.is_active,
+            "progress_percentage": min(100, int((goal.current_value / goal.target_value * 100))) if goal.target_value > 0 else 0,
+            "created_at": goal.created_at.isoformat() if goal.created_at else None,
+            "updated_at": goal.updated_at.isoformat() if goal.updated_at else None
+        }
+    
+    @staticmethod
+    def _apply_goal_progress(goals: List[UserGoal], today_stats: Dict[str, Any]) -> None:
+        """Set the progress of daily goals from today's statistics"""
+        for goal in goals:
+            if goal.period == "daily":
+                # Update based on today's stats
+                if goal.goal_type == "words":
+                    goal.current_value = today_stats["total_words_written"]
+                elif goal.goal_type == "writings":
+                    goal.current_value = today_stats["writings_created"]
+                elif goal.goal_type == "speeches":
+                    goal.current_value = today_stats["speeches_practiced"]
+                elif goal.goal_type == "poems":
+                    goal.current_value = today_stats["poems_created"]
+                elif goal.goal_type == "conversations":
+                    goal.current_value = today_stats["conversations_completed"]
+                
+                goal.updated_at = datetime.utcnow()
+    
     @staticmethod
     def increment_writing_created(db: Session, word_count: int = 0) -> None:
         """Increment writing created count and update word count."""
@@ -110,38 +230,13 @@ class StatisticsService:
     @staticmethod
     def get_daily_stats(db: Session, target_date: Optional[datetime] = None) -> Dict[str, Any]:
         """Get daily statistics for a specific date."""
-        if target_date is None:
-            target_date = StatisticsService._get_today_date()
-        
-        # Ensure we're using the date part only
-        if isinstance(target_date, datetime):
-            target_date = datetime.combine(target_date.date(), datetime.min.time())
+        target_date = StatisticsService._midnight(target_date)
         
         stats = db.query(DailyStatistics).filter(
             func.date(DailyStatistics.date) == target_date.date()
         ).first()
         
-        if not stats:
-            # Return empty stats if no record exists
-            return {
-                "date": target_date.date().isoformat(),
-                "writings_created": 0,
-                "speeches_practiced": 0,
-                "poems_created": 0,
-                "conversations_completed": 0,
-                "audio_minutes_listened": 0.0,
-                "total_words_written": 0
-            }
-        
-        return {
-            "date": stats.date.date().isoformat(),
-            "writings_created": stats.writings_created,
-            "speeches_practiced": stats.speeches_practiced,
-            "poems_created": stats.poems_created,
-            "conversations_completed": stats.conversations_completed,
-            "audio_minutes_listened": round(stats.audio_minutes_listened, 2),
-            "total_words_written": stats.total_words_written
-        }
+        return StatisticsService._daily_stats_dict(stats, target_date)
     
     @staticmethod
     def get_weekly_stats(db: Session, end_date: Optional[datetime] = None) -> Dict[str, Any]:
@@ -158,58 +253,19 @@ class StatisticsService:
             )
         ).all()
         
-        # Aggregate statistics
-        total_writings = sum(s.writings_created for s in stats)
-        total_speeches = sum(s.speeches_practiced for s in stats)
-        total_poems = sum(s.poems_created for s in stats)
-        total_conversations = sum(s.conversations_completed for s in stats)
-        total_audio_minutes = sum(s.audio_minutes_listened for s in stats)
-        total_words = sum(s.total_words_written for s in stats)
-        
-        # Daily breakdown
-        daily_breakdown = [
-            {
-                "date": s.date.date().isoformat(),
-                "writings_created": s.writings_created,
-                "speeches_practiced": s.speeches_practiced,
-                "poems_created": s.poems_created,
-                "conversations_completed": s.conversations_completed,
-                "audio_minutes_listened": round(s.audio_minutes_listened, 2),
-                "total_words_written": s.total_words_written
-            }
-            for s in stats
-        ]
-        
         return {
             "period": "weekly",
             "start_date": start_date.date().isoformat(),
             "end_date": end_date.date().isoformat(),
-            "total_writings_created": total_writings,
-            "total_speeches_practiced": total_speeches,
-            "total_poems_created": total_poems,
-            "total_conversations_completed": total_conversations,
-            "total_audio_minutes_listened": round(total_audio_minutes, 2),
-            "total_words_written": total_words,
-            "daily_breakdown": daily_breakdown
+            **StatisticsService._totals(stats),
+            # Daily breakdown
+            "daily_breakdown": [StatisticsService._daily_stats_dict(s, s.date) for s in stats]
         }
     
     @staticmethod
     def get_monthly_stats(db: Session, target_month: Optional[int] = None, target_year: Optional[int] = None) -> Dict[str, Any]:
         """Get monthly statistics for a specific month."""
-        now = datetime.utcnow()
-        if target_month is None:
-            target_month = now.month
-        if target_year is None:
-            target_year = now.year
-        
-        start_date = datetime(target_year, target_month, 1)
-        # Get last day of month
-        if target_month == 12:
-            end_date = datetime(target_year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(target_year, target_month + 1, 1) - timedelta(days=1)
-        
-        end_date = datetime.combine(end_date.date(), datetime.max.time())
+        target_month, target_year, start_date, end_date = StatisticsService._month_bounds(target_month, target_year)
         
         stats = db.query(DailyStatistics).filter(
             and_(
@@ -218,14 +274,6 @@ class StatisticsService:
             )
         ).all()
         
-        # Aggregate statistics
-        total_writings = sum(s.writings_created for s in stats)
-        total_speeches = sum(s.speeches_practiced for s in stats)
-        total_poems = sum(s.poems_created for s in stats)
-        total_conversations = sum(s.conversations_completed for s in stats)
-        total_audio_minutes = sum(s.audio_minutes_listened for s in stats)
-        total_words = sum(s.total_words_written for s in stats)
-        
         # Weekly breakdown
         weekly_breakdown = []
         current_week_start = start_date
@@ -238,16 +286,7 @@ class StatisticsService:
                 )
             ).all()
             
-            weekly_breakdown.append({
-                "week_start": current_week_start.date().isoformat(),
-                "week_end": week_end.date().isoformat(),
-                "writings_created": sum(s.writings_created for s in week_stats),
-                "speeches_practiced": sum(s.speeches_practiced for s in week_stats),
-                "poems_created": sum(s.poems_created for s in week_stats),
-                "conversations_completed": sum(s.conversations_completed for s in week_stats),
-                "audio_minutes_listened": round(sum(s.audio_minutes_listened for s in week_stats), 2),
-                "total_words_written": sum(s.total_words_written for s in week_stats)
-            })
+            weekly_breakdown.append(StatisticsService._week_totals(current_week_start, week_end, week_stats))
             
             current_week_start = week_end + timedelta(days=1)
         
@@ -257,12 +296,7 @@ class StatisticsService:
             "year": target_year,
             "start_date": start_date.date().isoformat(),
             "end_date": end_date.date().isoformat(),
-            "total_writings_created": total_writings,
-            "total_speeches_practiced": total_speeches,
-            "total_poems_created": total_poems,
-            "total_conversations_completed": total_conversations,
-            "total_audio_minutes_listened": round(total_audio_minutes, 2),
-            "total_words_written": total_words,
+            **StatisticsService._totals(stats),
             "weekly_breakdown": weekly_breakdown
         }
     
@@ -279,12 +313,7 @@ class StatisticsService:
                 func.date(DailyStatistics.date) == current_date
             ).first()
             
-            if stats and (
-                stats.writings_created > 0 or
-                stats.speeches_practiced > 0 or
-                stats.poems_created > 0 or
-                stats.conversations_completed > 0
-            ):
+            if StatisticsService._has_activity(stats):
                 streak += 1
                 current_date -= timedelta(days=1)
             elif current_date == today:
@@ -305,20 +334,7 @@ class StatisticsService:
             query = query.filter(UserGoal.is_active == True)
         
         goals = query.all()
-        return [
-            {
-                "id": goal.id,
-                "goal_type": goal.goal_type,
-                "target_value": goal.target_value,
-                "current_value": goal.current_value,
-                "period": goal.period,
-                "is_active": goal.is_active,
-                "progress_percentage": min(100, int((goal.current_value / goal.target_value * 100))) if goal.target_value > 0 else 0,
-                "created_at": goal.created_at.isoformat() if goal.created_at else None,
-                "updated_at": goal.updated_at.isoformat() if goal.updated_at else None
-            }
-            for goal in goals
-        ]
+        return [StatisticsService._goal_dict(goal) for goal in goals]
     
     @staticmethod
     def create_goal(db: Session, goal_type: str, target_value: int, period: str = "daily") -> UserGoal:
@@ -372,26 +388,236 @@ class StatisticsService:
         today_stats = StatisticsService.get_daily_stats(db)
         
         goals = db.query(UserGoal).filter(UserGoal.is_active == True).all()
+        StatisticsService._apply_goal_progress(goals, today_stats)
+        db.commit()
+
+
+class AsyncStatisticsService:
+    """Service for managing user statistics and goals, on async sessions."""
+    
+    _calculate_word_count = staticmethod(StatisticsService._calculate_word_count)
+    
+    @staticmethod
+    async def _get_or_create_daily_stats(db: AsyncSession, target_date: Optional[datetime] = None) -> DailyStatistics:
+        """Get or create daily statistics for a given date."""
+        target_date = StatisticsService._midnight(target_date)
         
-        for goal in goals:
-            if goal.period == "daily":
-                # Update based on today's stats
-                if goal.goal_type == "words":
-                    goal.current_value = today_stats["total_words_written"]
-                elif goal.goal_type == "writings":
-                    goal.current_value = today_stats["writings_created"]
-                elif goal.goal_type == "speeches":
-                    goal.current_value = today_stats["speeches_practiced"]
-                elif goal.goal_type == "poems":
-                    goal.current_value = today_stats["poems_created"]
-                elif goal.goal_type == "conversations":
-                    goal.current_value = today_stats["conversations_completed"]
-                
-                goal.updated_at = datetime.utcnow()
+        stats = await AsyncStatisticsService._find_daily_stats(db, target_date)
         
-        db.commit()
+        if not stats:
+            stats = DailyStatistics(date=target_date)
+            db.add(stats)
+            await db.commit()
+            await db.refresh(stats)
+            logger.debug(f"Created daily statistics for {target_date.date()}")
+        
+        return stats
+    
+    @staticmethod
+    async def _find_daily_stats(db: AsyncSession, target_date: datetime) -> Optional[DailyStatistics]:
+        return await db.scalar(
+            select(DailyStatistics).where(func.date(DailyStatistics.date) == target_date.date()).limit(1)
+        )
+    
+    @staticmethod
+    async def _stats_between(db: AsyncSession, start_date: datetime, end_date: datetime) -> List[DailyStatistics]:
+        return list((await db.scalars(
+            select(DailyStatistics).where(
+                and_(
+                    DailyStatistics.date >= start_date,
+                    DailyStatistics.date <= end_date
+                )
+            )
+        )).all())
+    
+    @staticmethod
+    async def increment_writing_created(db: AsyncSession, word_count: int = 0) -> None:
+        """Increment writing created count and update word count."""
+        stats = await AsyncStatisticsService._get_or_create_daily_stats(db)
+        stats.writings_created += 1
+        stats.total_words_written += word_count
+        stats.updated_at = datetime.utcnow()
+        await db.commit()
+        logger.debug(f"Incremented writings_created, new count: {stats.writings_created}")
+    
+    @staticmethod
+    async def increment_speech_practiced(db: AsyncSession) -> None:
+        """Increment speech practiced count."""
+        stats = await AsyncStatisticsService._get_or_create_daily_stats(db)
+        stats.speeches_practiced += 1
+        stats.updated_at = datetime.utcnow()
+        await db.commit()
+        logger.debug(f"Incremented speeches_practiced, new count: {stats.speeches_practiced}")
+    
+    @staticmethod
+    async def increment_poem_created(db: AsyncSession, word_count: int = 0) -> None:
+        """Increment poem created count and update word count."""
+        stats = await AsyncStatisticsService._get_or_create_daily_stats(db)
+        stats.poems_created += 1
+        stats.total_words_written += word_count
+        stats.updated_at = datetime.utcnow()
+        await db.commit()
+        logger.debug(f"Incremented poems_created, new count: {stats.poems_created}")
+    
+    @staticmethod
+    async def increment_conversation_completed(db: AsyncSession) -> None:
+        """Increment conversation completed count."""
+        stats = await AsyncStatisticsService._get_or_create_daily_stats(db)
+        stats.conversations_completed += 1
+        stats.updated_at = datetime.utcnow()
+        await db.commit()
+        logger.debug(f"Incremented conversations_completed, new count: {stats.conversations_completed}")
+    
+    @staticmethod
+    async def add_audio_minutes(db: AsyncSession, minutes: float) -> None:
+        """Add audio minutes listened."""
+        if minutes <= 0:
+            return
+        stats = await AsyncStatisticsService._get_or_create_daily_stats(db)
+        stats.audio_minutes_listened += minutes
+        stats.updated_at = datetime.utcnow()
+        await db.commit()
+        logger.debug(f"Added {minutes} minutes of audio, total: {stats.audio_minutes_listened}")
+    
+    @staticmethod
+    async def get_daily_stats(db: AsyncSession, target_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get daily statistics for a specific date."""
+        target_date = StatisticsService._midnight(target_date)
+        stats = await AsyncStatisticsService._find_daily_stats(db, target_date)
+        return StatisticsService._daily_stats_dict(stats, target_date)
+    
+    @staticmethod
+    async def get_weekly_stats(db: AsyncSession, end_date: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get weekly statistics (last 7 days)."""
+        if end_date is None:
+            end_date = StatisticsService._get_today_date()
+        
+        start_date = end_date - timedelta(days=6)  # Include today, so 7 days total
+        
+        stats = await AsyncStatisticsService._stats_between(db, start_date, end_date)
+        
+        return {
+            "period": "weekly",
+            "start_date": start_date.date().isoformat(),
+            "end_date": end_date.date().isoformat(),
+            **StatisticsService._totals(stats),
+            # Daily breakdown
+            "daily_breakdown": [StatisticsService._daily_stats_dict(s, s.date) for s in stats]
+        }
+    
+    @staticmethod
+    async def get_monthly_stats(db: AsyncSession, target_month: Optional[int] = None, target_year: Optional[int] = None) -> Dict[str, Any]:
+        """Get monthly statistics for a specific month."""
+        target_month, target_year, start_date, end_date = StatisticsService._month_bounds(target_month, target_year)
+        
+        stats = await AsyncStatisticsService._stats_between(db, start_date, end_date)
+        
+        # Weekly breakdown, from the month's records rather than a query per week
+        weekly_breakdown = []
+        current_week_start = start_date
+        while current_week_start <= end_date:
+            week_end = min(current_week_start + timedelta(days=6), end_date)
+            week_stats = [s for s in stats if current_week_start <= s.date <= week_end]
+            weekly_breakdown.append(StatisticsService._week_totals(current_week_start, week_end, week_stats))
+            current_week_start = week_end + timedelta(days=1)
+        
+        return {
+            "period": "monthly",
+            "month": target_month,
+            "year": target_year,
+            "start_date": start_date.date().isoformat(),
+            "end_date": end_date.date().isoformat(),
+            **StatisticsService._totals(stats),
+            "weekly_breakdown": weekly_breakdown
+        }
+    
+    @staticmethod
+    async def calculate_streak(db: AsyncSession) -> int:
+        """Calculate consecutive days with activity."""
+        today = StatisticsService._get_today_date().date()
+        # Days with activity, most recent first, in one query
+        active_days = set()
+        for stats in (await db.scalars(
+            select(DailyStatistics).order_by(DailyStatistics.date.desc())
+        )).all():
+            if StatisticsService._has_activity(stats):
+                active_days.add(stats.date.date())
+        
+        streak = 0
+        # No activity today does not break the streak (the day is not over)
+        current_date = today if today in active_days else today - timedelta(days=1)
+        while current_date in active_days:
+            streak += 1
+            current_date -= timedelta(days=1)
+        return streak
+    
+    @staticmethod
+    async def get_all_goals(db: AsyncSession, active_only: bool = True) -> List[Dict[str, Any]]:
+        """Get all user goals."""
+        statement = select(UserGoal)
+        if active_only:
+            statement = statement.where(UserGoal.is_active == True)
+        
+        goals = (await db.scalars(statement)).all()
+        return [StatisticsService._goal_dict(goal) for goal in goals]
+    
+    @staticmethod
+    async def create_goal(db: AsyncSession, goal_type: str, target_value: int, period: str = "daily") -> UserGoal:
+        """Create a new user goal."""
+        goal = UserGoal(
+            goal_type=goal_type,
+            target_value=target_value,
+            period=period,
+            current_value=0,
+            is_active=True
+        )
+        db.add(goal)
+        await db.commit()
+        await db.refresh(goal)
+        logger.info(f"Created goal: {goal_type} {target_value} ({period})")
+        return goal
+    
+    @staticmethod
+    async def update_goal(db: AsyncSession, goal_id: int, target_value: Optional[int] = None, 
+                          is_active: Optional[bool] = None) -> Optional[UserGoal]:
+        """Update a user goal."""
+        goal = await db.get(UserGoal, goal_id)
+        if not goal:
+            return None
+        
+        if target_value is not None:
+            goal.target_value = target_value
+        if is_active is not None:
+            goal.is_active = is_active
+        
+        goal.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(goal)
+        return goal
+    
+    @staticmethod
+    async def delete_goal(db: AsyncSession, goal_id: int) -> bool:
+        """Delete a user goal."""
+        goal = await db.get(UserGoal, goal_id)
+        if not goal:
+            return False
+        
+        await db.delete(goal)
+        await db.commit()
+        logger.info(f"Deleted goal {goal_id}")
+        return True
+    
+    @staticmethod
+    async def update_goal_progress(db: AsyncSession) -> None:
+        """Update progress for all active goals based on current statistics."""
+        today_stats = await AsyncStatisticsService.get_daily_stats(db)
+        
+        goals = (await db.scalars(select(UserGoal).where(UserGoal.is_active == True))).all()
+        StatisticsService._apply_goal_progress(goals, today_stats)
+        await db.commit()
 
 
-# Create singleton instance
+# Create singleton instances
 statistics_service = StatisticsService()
+async_statistics_service = AsyncStatisticsService()
 
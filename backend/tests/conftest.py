@@ -6,10 +6,24 @@ from unittest.mock import Mock, MagicMock
 from fastapi.testclient import TestClient
 import sys
 import os
+import tempfile
 
 # Add backend directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Databases and caches the app creates on import go to a scratch directory, not the tree
+_state_dir = tempfile.mkdtemp(prefix="natural_speech_tests_")
+for _name, _value in {
+    "CACHE_DIR": os.path.join(_state_dir, "cache"),
+    "TTS_CHUNK_CACHE_DIR": os.path.join(_state_dir, "cache", "tts_chunks"),
+    "TTS_G2P_CACHE_PATH": os.path.join(_state_dir, "cache", "g2p.db"),
+    "TTS_OPTIMIZED_MODEL_DIR": os.path.join(_state_dir, "cache", "onnx"),
+    "CONVERSATION_SESSION_PATH": os.path.join(_state_dir, "cache", "sessions.db"),
+    "DATABASE_URL": f"sqlite:///{os.path.join(_state_dir, 'natural_speech.db')}",
+    "JOB_TRACKER_DB": os.path.join(_state_dir, "jobs.db"),
+}.items():
+    os.environ.setdefault(_name, _value)
+
 from main import app
 
 
@@ -0,0 +1,601 @@
+"""
+Unit tests for the CacheManager memory tier.
+"""
+import pytest
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import CacheManager
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestCacheManagerMemoryTier:
+    """Tests for byte-bounded LRU eviction and per-entry TTLs."""
+
+    def test_evicts_least_recently_used_beyond_budget(self, tmp_path):
+        """The byte budget is enforced by evicting the coldest entries."""
+        cache = CacheManager(cache_dir=str(tmp_path), max_memory_bytes=100)
+        cache.set("a", "x" * 40)
+        cache.set("b", "y" * 40)
+        cache.get("a")
+        cache.set("c", "z" * 40)
+
+        assert list(cache.memory_cache) == ["a", "c"]
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] == 80
+        assert stats["evictions"] == 1
+
+    def test_oversized_values_skip_memory(self, tmp_path):
+        """A value larger than the whole budget is not held in memory."""
+        cache = CacheManager(cache_dir=str(tmp_path), max_memory_bytes=10)
+        cache.set("big", "x" * 50)
+        assert "big" not in cache.memory_cache
+        assert cache.get("big") == "x" * 50  # Still served from the file tier
+
+    def test_binary_values_are_sized_by_length(self, tmp_path):
+        """Audio payloads count their byte length against the budget."""
+        cache = CacheManager(cache_dir=str(tmp_path), max_memory_bytes=1000)
+        cache._remember("wav", memoryview(bytearray(300)), float("inf"))
+        assert cache.get_stats()["memory_bytes"] == 300
+
+    def test_per_entry_ttl(self, tmp_path):
+        """Each entry expires after its own TTL."""
+        cache = CacheManager(cache_dir=str(tmp_path), ttl=100)
+        with patch("cache_manager.time.time", return_value=1000.0):
+            cache.set("short", "a", ttl=10)
+            cache.set("default", "b")
+        with patch("cache_manager.time.time", return_value=1050.0):
+            assert cache.get("short") is None
+            assert cache.get("default") == "b"
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["memory_bytes"] == cache._sizeof("b")
+
+    def test_cache_result_keeps_default_ttl(self, tmp_path):
+        """The decorator passes its TTL per entry instead of changing the cache's."""
+        cache = CacheManager(cache_dir=str(tmp_path), ttl=100)
+        calls = []
+
+        @cache.cache_result(ttl=5)
+        def lookup(x):
+            calls.append(x)
+            return x * 2
+
+        with patch("cache_manager.time.time", return_value=1000.0):
+            assert lookup(2) == 4
+            assert lookup(2) == 4
+        with patch("cache_manager.time.time", return_value=1010.0):
+            assert lookup(2) == 4
+        assert calls == [2, 2]
+        assert cache.ttl == 100
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestCacheManagerDiskTier:
+    """Tests for the content-addressed disk tier."""
+
+    def test_binary_values_round_trip_through_disk(self, tmp_path):
+        """Audio is stored as a raw blob under a hashed, sharded name."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        key = "tts:" + "a long text with / slashes and more " * 20 + ":af_bella:1.0"
+        audio = b"RIFF" + bytes(range(256)) * 10
+        cache.set(key, memoryview(bytearray(audio)))
+
+        # Audio on disk is not duplicated in the worker's memory tier
+        assert key not in cache.memory_cache
+        path = cache.get_file(key)
+        assert path.endswith(".bin")
+        assert os.path.dirname(os.path.dirname(path)) == str(tmp_path)
+        assert len(os.path.basename(path)) == 64 + len(".bin")
+        with open(path, "rb") as f:
+            assert f.read() == audio
+
+        cached = cache.get(key)
+        assert isinstance(cached, memoryview)
+        assert bytes(cached) == audio
+
+    def test_entries_survive_restart(self, tmp_path):
+        """A new manager on the same directory serves earlier entries."""
+        CacheManager(cache_dir=str(tmp_path)).set("voices_list", ["af_bella", "am_adam"])
+        CacheManager(cache_dir=str(tmp_path)).set("audio", b"\x00\x01")
+
+        cache = CacheManager(cache_dir=str(tmp_path))
+        assert cache.get("voices_list") == ["af_bella", "am_adam"]
+        assert bytes(cache.get("audio")) == b"\x00\x01"
+        assert cache.get_file("voices_list") is None
+
+    def test_expired_disk_entries_are_removed(self, tmp_path):
+        """Expired blobs and headers are deleted on lookup."""
+        cache = CacheManager(cache_dir=str(tmp_path), ttl=100)
+        with patch("cache_manager.time.time", return_value=1000.0):
+            cache.set("audio", b"abc")
+        blob_path, meta_path = cache._disk_paths("audio")
+        with patch("cache_manager.time.time", return_value=1200.0):
+            assert cache.get_file("audio") is None
+        assert not os.path.exists(blob_path) and not os.path.exists(meta_path)
+
+    def test_blob_without_matching_header_is_a_miss(self, tmp_path):
+        """A blob whose size disagrees with its header (a write in progress) is not served."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        cache.set("audio", b"abc")
+        blob_path, _ = cache._disk_paths("audio")
+        with open(blob_path, "wb") as f:
+            f.write(b"abcdef")
+        assert cache.get_file("audio") is None
+
+    def test_clear_removes_all_layouts(self, tmp_path):
+        """Clearing removes sharded entries and flat files from the old layout."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        cache.set("audio", b"abc")
+        with open(tmp_path / "old.cache", "w") as f:
+            json.dump({"value": "v", "timestamp": 0}, f)
+        cache.clear()
+        assert cache.get("audio") is None
+        assert not os.path.exists(tmp_path / "old.cache")
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestSharedCacheBackend:
+    """Tests for the Redis-protocol shared backend (against fakeredis)."""
+
+    @staticmethod
+    def _backend(server):
+        fakeredis = pytest.importorskip("fakeredis")
+        from cache_backends import RedisCacheBackend
+        return RedisCacheBackend(client=fakeredis.FakeRedis(server=server), prefix="test:")
+
+    def test_incomplete_backend_cannot_be_constructed(self):
+        """A backend missing part of the interface fails at construction, not on first use."""
+        from cache_backends import CacheBackend
+
+        class GetOnlyBackend(CacheBackend):
+            def get_many(self, keys):
+                return [None] * len(keys)
+
+        with pytest.raises(TypeError):
+            GetOnlyBackend()
+
+    def test_hits_are_shared_between_workers(self, tmp_path):
+        """A result stored by one worker is a hit for another, and is then cached locally."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        worker_1 = CacheManager(cache_dir=str(tmp_path / "w1"), backend=self._backend(server))
+        worker_2 = CacheManager(cache_dir=str(tmp_path / "w2"), backend=self._backend(server))
+
+        worker_1.set("tts:hello", b"RIFF\x00\x01", ttl=60)
+        worker_1.set("voices_list", ["af_bella"])
+
+        assert worker_2.get_file("tts:hello") is None
+        assert bytes(worker_2.get("tts:hello")) == b"RIFF\x00\x01"
+        assert worker_2.get("voices_list") == ["af_bella"]
+        # Adopted into the local disk tier with the remaining TTL
+        assert worker_2.get_file("tts:hello") is not None
+        with open(worker_2._disk_paths("tts:hello")[1]) as f:
+            header = json.load(f)
+        assert 0 < header["expires_at"] - header["created_at"] <= 60
+
+    def test_get_many_uses_one_pipeline(self, tmp_path):
+        """Local misses are fetched from the backend in a single round trip."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        CacheManager(cache_dir=str(tmp_path / "w1"), backend=self._backend(server)).set("a", "1")
+        CacheManager(cache_dir=str(tmp_path / "w1"), backend=self._backend(server)).set("b", b"2")
+
+        backend = self._backend(server)
+        cache = CacheManager(cache_dir=str(tmp_path / "w2"), backend=backend)
+        with patch.object(backend.client, "pipeline", wraps=backend.client.pipeline) as pipeline:
+            found = cache.get_many(["a", "b", "c"])
+        assert pipeline.call_count == 1
+        assert found["a"] == "1" and bytes(found["b"]) == b"2" and "c" not in found
+        assert cache.get_stats()["misses"] == 1
+
+    def test_invalidate_and_clear_reach_the_backend(self, tmp_path):
+        """Removing an entry removes it for every worker."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        cache = CacheManager(cache_dir=str(tmp_path), backend=self._backend(server))
+        other = self._backend(server)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.invalidate("a")
+        assert other.get("a") is None and other.get("b") == "2"
+        cache.clear()
+        assert other.get("b") is None
+
+    def test_unavailable_backend_degrades_to_local_tiers(self, tmp_path):
+        """Backend errors are counted once and the backend is skipped during the cool-down."""
+        from cache_backends import RedisCacheBackend
+
+        client = Mock()
+        client.pipeline.side_effect = ConnectionError("connection refused")
+        backend = RedisCacheBackend(client=client, retry_interval=60)
+        cache = CacheManager(cache_dir=str(tmp_path), backend=backend)
+
+        cache.set("voices_list", ["af_bella"])
+        assert cache.get("voices_list") == ["af_bella"]
+        assert cache.get("missing") is None
+        assert client.pipeline.call_count == 1
+        stats = cache.get_stats()["backend"]
+        assert stats["available"] is False and stats["errors"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestCacheIndex:
+    """Tests for the disk quota, sweeper and per-namespace statistics."""
+
+    def test_disk_quota_evicts_least_recently_used(self, tmp_path):
+        """Beyond the quota, the entry accessed longest ago is evicted."""
+        cache = CacheManager(cache_dir=str(tmp_path), max_disk_bytes=10)
+        with patch("cache_manager.time.time", return_value=1000.0):
+            cache.set("tts:a", b"aaaa")
+        with patch("cache_manager.time.time", return_value=1001.0):
+            cache.set("tts:b", b"bbbb")
+        with patch("cache_manager.time.time", return_value=1002.0):
+            assert cache.get_file("tts:a") is not None
+        with patch("cache_manager.time.time", return_value=1003.0):
+            cache.set("tts:c", b"cccc")
+            assert cache.get_file("tts:b") is None
+            assert cache.get_file("tts:a") is not None
+
+        stats = cache.get_stats()
+        assert stats["disk_bytes"] == 8
+        assert stats["disk_evictions"] == 1
+
+    def test_sweep_removes_expired_entries_without_lookups(self, tmp_path):
+        """Expired entries are deleted from disk and memory by the sweeper."""
+        cache = CacheManager(cache_dir=str(tmp_path), ttl=100)
+        with patch("cache_manager.time.time", return_value=1000.0):
+            cache.set("tts:old", b"abc", ttl=10)
+            cache.set("voices_list", ["af_bella"], ttl=10)
+            cache.set("tts:fresh", b"def")
+        with patch("cache_manager.time.time", return_value=1050.0):
+            assert cache.sweep() == {"expired": 3, "evicted": 0}
+        blob_path, _ = cache._disk_paths("tts:old")
+        assert not os.path.exists(blob_path)
+        assert "voices_list" not in cache.memory_cache
+        assert cache.get_stats()["disk_entries"] == 1
+
+    def test_stats_per_namespace(self, tmp_path):
+        """Hits, misses and disk usage are reported per namespace."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        cache.set("tts:hello:af_bella:1.0", b"abcd")
+        cache.set("voices_list", ["af_bella"])
+        cache.get_file("tts:hello:af_bella:1.0")
+        cache.get("tts:other:af_bella:1.0")
+        cache.get("voices_list")
+
+        namespaces = cache.get_stats()["namespaces"]
+        assert namespaces["tts"] == {
+            "hits": 1, "misses": 1, "hit_ratio": 0.5, "disk_entries": 1, "disk_bytes": 4
+        }
+        assert namespaces["voices"]["hits"] == 1
+
+    def test_existing_entries_are_indexed(self, tmp_path):
+        """Entries on disk without an index (e.g. after an upgrade) are indexed at startup."""
+        CacheManager(cache_dir=str(tmp_path)).set("tts:a", b"abcd")
+        for name in os.listdir(tmp_path):
+            if name.startswith("index.db"):
+                os.remove(tmp_path / name)
+
+        cache = CacheManager(cache_dir=str(tmp_path))
+        assert cache.get_stats()["disk_bytes"] == 4
+
+    def test_index_reconnects_after_fork(self, tmp_path):
+        """A forked worker opens its own SQLite connection instead of the parent's."""
+        from cache_index import CacheIndex
+
+        index = CacheIndex(str(tmp_path / "index.db"))
+        index.record("abc", "tts", 4, 1000.0, 2000.0)
+        parent_db = index.db
+        with patch("cache_index.os.getpid", return_value=os.getpid() + 1):
+            assert index.total_bytes() == 4
+            assert index.db is not parent_db
+        assert parent_db in index._inherited
+
+    def test_forked_process_uses_index(self, tmp_path):
+        """Parent and forked child can both write the index through their own connections."""
+        if not hasattr(os, "fork"):
+            pytest.skip("fork not available")
+        cache = CacheManager(cache_dir=str(tmp_path))
+        cache.set("tts:parent", b"abcd")
+        pid = os.fork()
+        if pid == 0:
+            try:
+                cache.set("tts:child", b"efgh")
+                os._exit(0 if cache.index.total_bytes() == 8 else 1)
+            except BaseException:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+        assert cache.index.total_bytes() == 8
+
+    def test_cleanup_scheduler_sweeps_cache(self):
+        """The cleanup scheduler runs the cache sweep and survives its errors."""
+        from cleanup_scheduler import CleanupScheduler
+
+        cache_manager = Mock()
+        cache_manager.sweep.return_value = {"expired": 2, "evicted": 0}
+        scheduler = CleanupScheduler(job_tracker=Mock(), cache_manager=cache_manager)
+        scheduler._sweep_cache()
+        cache_manager.sweep.side_effect = OSError("disk gone")
+        scheduler._sweep_cache()
+        assert cache_manager.sweep.call_count == 2
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestCacheManagerConcurrency:
+    """Tests for striped locking, off-lock disk I/O and miss coalescing."""
+
+    def test_concurrent_misses_compute_once(self, tmp_path):
+        """Concurrent get_or_set() misses for one key share a single loader call."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"voices": ["af_bella"]}
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: cache.get_or_set("voices_list", loader), range(16)))
+
+        assert len(calls) == 1
+        assert all(result == {"voices": ["af_bella"]} for result in results)
+        assert cache.get_stats()["coalesced"] > 0
+
+    def test_loader_errors_reach_every_waiter(self, tmp_path):
+        """A failing computation raises in all coalesced callers and is not cached."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+
+        def loader():
+            time.sleep(0.05)
+            raise RuntimeError("model unavailable")
+
+        def call():
+            try:
+                cache.get_or_set("voices_list", loader)
+            except RuntimeError:
+                return "raised"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(lambda _: call(), range(8))) == ["raised"] * 8
+        assert cache.get_or_set("voices_list", lambda: ["af_bella"]) == ["af_bella"]
+
+    def test_cache_result_coalesces_misses(self, tmp_path):
+        """The cache_result decorator computes a missing value once."""
+        cache = CacheManager(cache_dir=str(tmp_path))
+        calls = []
+
+        @cache.cache_result(ttl=60)
+        def slow_square(x):
+            calls.append(x)
+            time.sleep(0.05)
+            return x * x
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(lambda _: slow_square(3), range(8))) == [9] * 8
+        assert calls == [3]
+
+    def test_memory_tier_is_striped(self, tmp_path):
+        """Large budgets are split into stripes; small ones keep a single exact LRU."""
+        assert CacheManager(cache_dir=str(tmp_path / "a")).get_stats()["memory_stripes"] == 16
+        assert CacheManager(cache_dir=str(tmp_path / "b"), max_memory_bytes=1000).get_stats()["memory_stripes"] == 1
+
+        cache = CacheManager(cache_dir=str(tmp_path / "c"), memory_stripes=4)
+        for i in range(100):
+            cache.set(f"key{i}", i)
+        assert all(cache.get(f"key{i}") == i for i in range(100))
+        stats = cache.get_stats()
+        assert stats["memory_entries"] == 100 and stats["hits"] == 100
+
+    def test_racing_disk_read_does_not_repopulate_memory(self, tmp_path):
+        """A disk read that started before a write to its stripe is not cached in memory."""
+        cache = CacheManager(cache_dir=str(tmp_path), memory_stripes=1)
+        cache.set("voices_list", ["af_bella"])
+        stripe = cache._stripe("voices_list")
+        stripe.forget("voices_list")
+
+        now = time.time()
+        _, generation, _ = cache._get_memory("voices_list", now)
+        cache.set("voices_other", ["af_sky"])
+        assert cache._get_disk("voices_list", now, generation) == ["af_bella"]
+        assert "voices_list" not in cache.memory_cache
+
+        _, generation, _ = cache._get_memory("voices_list", now)
+        cache._get_disk("voices_list", now, generation)
+        assert "voices_list" in cache.memory_cache
+
+
+def _speech(topic):
+    """A speech-sized JSON value like the ones cached for /api/speeches"""
+    paragraph = (
+        f"Today I want to talk about {topic}. When we think about {topic}, we often "
+        "overlook how much it shapes the way we live, work and speak to one another. "
+    )
+    return {"topic": topic, "text": paragraph * 40, "voice": "af_bella"}
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestCacheCompression:
+    """Tests for the per-namespace codec layer."""
+
+    @pytest.fixture(autouse=True)
+    def _zstd(self):
+        pytest.importorskip("zstandard")
+
+    def _codec(self, tmp_path, **kwargs):
+        from cache_codecs import CacheCodec
+        return CacheCodec(dictionary_dir=str(tmp_path / "dictionaries"), **kwargs)
+
+    def test_large_values_are_compressed(self, tmp_path):
+        """Large JSON is stored compressed, round-trips and reports its ratio."""
+        cache = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path))
+        cache.set("speech:climate", _speech("climate"))
+
+        blob_path, meta_path = cache._disk_paths("speech:climate")
+        with open(meta_path) as f:
+            assert json.load(f)["codec"] == "zstd"
+        assert os.path.getsize(blob_path) < len(json.dumps(_speech("climate"))) / 5
+
+        fresh = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path))
+        assert fresh.get("speech:climate") == _speech("climate")
+        stats = cache.get_stats()["compression"]["namespaces"]["speech"]
+        assert stats["ratio"] > 5 and stats["encode_ms"] > 0
+
+    def test_audio_and_raw_namespaces_are_not_compressed(self, tmp_path):
+        """Audio stays a raw file, and namespaces configured raw are left alone."""
+        codec = self._codec(tmp_path, namespace_codecs={"voices": "raw"})
+        cache = CacheManager(cache_dir=str(tmp_path), codec=codec)
+        cache.set("tts:hello", b"RIFF" + bytes(4096))
+        cache.set("voices:list", _speech("voices"))
+
+        assert cache.get_file("tts:hello") is not None
+        for key in ("tts:hello", "voices:list"):
+            with open(cache._disk_paths(key)[1]) as f:
+                assert "codec" not in json.load(f)
+        assert "tts" not in codec.get_stats()["namespaces"]
+
+    def test_small_values_use_a_trained_dictionary(self, tmp_path):
+        """Once enough samples are seen, small values use a dictionary other workers can load."""
+        cache = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path, dictionary_samples=64))
+        for i in range(64):
+            cache.set(f"prompts:{i}", {"topic": f"topic {i}", "prompts": [f"Describe topic {i}", "Argue for it"]})
+        cache.set("prompts:new", {"topic": "new", "prompts": ["Describe new", "Argue for it"]})
+
+        with open(cache._disk_paths("prompts:new")[1]) as f:
+            header = json.load(f)
+        assert header["codec"] == "zstd-dict"
+        assert cache.get_stats()["compression"]["namespaces"]["prompts"]["dictionary"] is True
+
+        worker_2 = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path))
+        assert worker_2.get("prompts:new") == {"topic": "new", "prompts": ["Describe new", "Argue for it"]}
+
+    def test_undecodable_entry_is_a_miss(self, tmp_path):
+        """A corrupt compressed entry is dropped instead of raising."""
+        cache = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path))
+        cache.set("speech:climate", _speech("climate"))
+        blob_path, _ = cache._disk_paths("speech:climate")
+        with open(blob_path, "r+b") as f:
+            f.write(bytes(os.path.getsize(blob_path)))
+
+        fresh = CacheManager(cache_dir=str(tmp_path), codec=self._codec(tmp_path))
+        assert fresh.get("speech:climate") is None
+        assert not os.path.exists(blob_path)
+
+    def test_backend_values_are_compressed(self, tmp_path):
+        """Large JSON is compressed in the shared backend too."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from cache_backends import RedisCacheBackend
+
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeRedis(server=server)
+        codec = self._codec(tmp_path)
+        backend = RedisCacheBackend(client=client, codec=codec)
+        CacheManager(cache_dir=str(tmp_path / "w1"), backend=backend, codec=codec).set("speech:climate", _speech("climate"))
+
+        raw = client.get(backend.prefix + "speech:climate")
+        assert raw[:1] == b"Z" and len(raw) < len(json.dumps(_speech("climate"))) / 5
+        worker_2 = CacheManager(cache_dir=str(tmp_path / "w2"), backend=RedisCacheBackend(client=client, codec=codec))
+        assert worker_2.get("speech:climate") == _speech("climate")
+
+    def test_backend_respects_raw_namespaces(self, tmp_path):
+        """A namespace set to raw is stored uncompressed in the shared backend as on disk."""
+        fakeredis = pytest.importorskip("fakeredis")
+        from cache_backends import RedisCacheBackend
+
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        codec = self._codec(tmp_path, namespace_codecs={"speech": "raw"})
+        backend = RedisCacheBackend(client=client, codec=codec)
+        cache = CacheManager(cache_dir=str(tmp_path / "w1"), backend=backend, codec=codec)
+        cache.set("speech:climate", _speech("climate"))
+        cache.set("prompts:climate", _speech("climate"))
+
+        assert client.get(backend.prefix + "speech:climate")[:1] == b"J"
+        assert client.get(backend.prefix + "prompts:climate")[:1] == b"Z"
+        worker_2 = CacheManager(cache_dir=str(tmp_path / "w2"), backend=RedisCacheBackend(client=client, codec=codec))
+        assert worker_2.get("speech:climate") == _speech("climate")
+
+
+class _GlobalLockCacheManager(CacheManager):
+    """CacheManager behind one lock held across disk I/O, as before lock striping"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.global_lock = threading.Lock()
+
+    def get(self, key):
+        with self.global_lock:
+            return super().get(key)
+
+    def set(self, key, value, ttl=None):
+        with self.global_lock:
+            super().set(key, value, ttl)
+
+
+@pytest.mark.performance
+@pytest.mark.cache
+class TestCacheManagerContention:
+    """Contention benchmark: 64 threads mixing hot reads with slow disk writes."""
+
+    THREADS = 64
+    WRITERS = 8
+    DISK_DELAY = 0.01
+    DURATION = 0.5
+
+    def _run(self, cache):
+        """Read hot keys from 56 threads while 8 threads write; returns reads completed"""
+        for i in range(32):
+            cache.set(f"hot{i}", {"value": i})
+        stop = threading.Event()
+        reads = [0] * (self.THREADS - self.WRITERS)
+
+        def reader(slot):
+            while not stop.is_set():
+                assert cache.get(f"hot{reads[slot] % 32}") is not None
+                reads[slot] += 1
+                time.sleep(0.0005)
+
+        def writer(slot):
+            n = 0
+            while not stop.is_set():
+                cache.set(f"cold{slot}:{n}", {"value": n})
+                n += 1
+
+        real_write = CacheManager._write_atomically
+
+        def slow_write(path, data):
+            time.sleep(self.DISK_DELAY)
+            real_write(path, data)
+
+        with patch.object(CacheManager, "_write_atomically", staticmethod(slow_write)):
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(len(reads))]
+            threads += [threading.Thread(target=writer, args=(i,)) for i in range(self.WRITERS)]
+            for thread in threads:
+                thread.start()
+            time.sleep(self.DURATION)
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return sum(reads)
+
+    def test_reads_do_not_wait_for_disk_writes(self, tmp_path):
+        """Striped, off-lock I/O serves far more reads than one lock around disk I/O."""
+        striped = self._run(CacheManager(cache_dir=str(tmp_path / "striped")))
+        global_lock = self._run(_GlobalLockCacheManager(cache_dir=str(tmp_path / "global")))
+
+        print(f"\nreads in {self.DURATION}s with {self.THREADS} threads: "
+              f"striped={striped}, global lock={global_lock}")
+        assert striped > 5 * global_lock
@@ -0,0 +1,237 @@
+"""
+Unit tests for server-side conversation sessions and history compaction.
+"""
+import asyncio
+import pytest
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, Mock
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cleanup_scheduler import CleanupScheduler
+from conversation_sessions import ConversationSessionStore, SessionSummarizer
+
+OPENING = {"role": "assistant", "content": "What draws you to the topic?"}
+
+
+def _turn(text):
+    return [{"role": "user", "content": text}, {"role": "assistant", "content": f"Reply to {text}"}]
+
+
+@pytest.mark.unit
+class TestConversationSessions:
+    """Tests for the session LRU, its SQLite tier and idle expiry."""
+
+    def test_turns_are_appended(self, tmp_path):
+        """A session accumulates turns and keeps its topic."""
+        store = ConversationSessionStore(path=str(tmp_path / "sessions.db"))
+        session = store.create("public speaking", [OPENING])
+
+        session = store.append(session, _turn("one"))
+        session = store.append(store.get(session["session_id"]), _turn("two"))
+
+        stored = store.get(session["session_id"])
+        assert stored["topic"] == "public speaking"
+        assert [m["content"] for m in stored["messages"]] == [
+            OPENING["content"], "one", "Reply to one", "two", "Reply to two"
+        ]
+        assert stored["version"] == 3
+        assert store.get_stats()["hits"] == 2
+
+    def test_returned_sessions_are_copies(self):
+        """Changing a fetched session does not change the stored one."""
+        store = ConversationSessionStore()
+        session = store.create("topic", [OPENING])
+        session["messages"].append({"role": "user", "content": "unsaved"})
+
+        assert store.get(session["session_id"])["messages"] == [OPENING]
+
+    def test_spilled_sessions_are_loaded_back(self, tmp_path):
+        """Sessions pushed out of memory are read back from SQLite."""
+        store = ConversationSessionStore(max_sessions=2, path=str(tmp_path / "sessions.db"))
+        sessions = [store.create(f"topic {i}", [OPENING]) for i in range(3)]
+
+        stats = store.get_stats()
+        assert stats["sessions_in_memory"] == 2 and stats["spilled"] == 1
+        assert store.get(sessions[0]["session_id"])["topic"] == "topic 0"
+        assert store.get_stats()["loads"] == 1
+
+    def test_memory_only_store_drops_spilled_sessions(self):
+        """Without SQLite, sessions beyond max_sessions are gone."""
+        store = ConversationSessionStore(max_sessions=1)
+        first = store.create("topic 1")
+        store.create("topic 2")
+
+        assert store.get(first["session_id"]) is None
+
+    def test_workers_share_sessions(self, tmp_path):
+        """A turn taken in one worker is seen by another."""
+        path = str(tmp_path / "sessions.db")
+        worker_1, worker_2 = ConversationSessionStore(path=path), ConversationSessionStore(path=path)
+        session = worker_1.create("topic", [OPENING])
+        worker_1.get(session["session_id"])
+
+        worker_2.append(worker_2.get(session["session_id"]), _turn("one"))
+
+        assert len(worker_1.get(session["session_id"])["messages"]) == 3
+
+    def test_concurrent_turns_conflict(self, tmp_path):
+        """Of two turns started from the same version, only the first is stored."""
+        store = ConversationSessionStore(path=str(tmp_path / "sessions.db"))
+        session = store.create("topic", [OPENING])
+
+        assert store.append(session, _turn("one")) is not None
+        assert store.append(session, _turn("two")) is None
+        assert [m["content"] for m in store.get(session["session_id"])["messages"]][1] == "one"
+        assert store.get_stats()["conflicts"] == 1
+
+    def test_summary_update_does_not_conflict_with_turn(self):
+        """A turn started before a summary was stored is still saved."""
+        store = ConversationSessionStore()
+        session = store.create("topic", [OPENING])
+        store.update(store.get(session["session_id"]), summary="Opening", summarized=1)
+
+        saved = store.append(session, _turn("one"))
+
+        assert saved is not None and saved["summary"] == "Opening"
+        assert len(saved["messages"]) == 3
+
+    def test_history_is_bounded(self):
+        """Only the last max_messages messages are kept."""
+        store = ConversationSessionStore(max_messages=4)
+        session = store.create("topic", [OPENING])
+        for i in range(3):
+            session = store.append(session, _turn(str(i)))
+
+        assert [m["content"] for m in session["messages"]] == ["1", "Reply to 1", "2", "Reply to 2"]
+
+    def test_idle_sessions_expire(self, tmp_path):
+        """Sessions idle past idle_ttl are not returned and are removed by evict_idle()."""
+        store = ConversationSessionStore(path=str(tmp_path / "sessions.db"), idle_ttl=60)
+        idle = store.create("idle")
+        active = store.create("active")
+        store._sessions[idle["session_id"]]["updated_at"] -= 120
+        db = store._connection()
+        db.execute(
+            "UPDATE conversation_sessions SET updated_at = updated_at - 120 WHERE session_id = ?",
+            (idle["session_id"],)
+        )
+        db.commit()
+
+        assert store.evict_idle() == 1
+        assert store.get(idle["session_id"]) is None
+        assert store.get(active["session_id"]) is not None
+        assert store.get_stats()["expired"] == 1
+
+    def test_expired_session_is_not_returned_before_sweep(self):
+        """An idle session is treated as gone even before it is evicted."""
+        store = ConversationSessionStore(idle_ttl=60)
+        session = store.create("topic")
+        store._sessions[session["session_id"]]["updated_at"] = time.time() - 120
+
+        assert store.get(session["session_id"]) is None
+
+    def test_delete(self, tmp_path):
+        """Ending a session removes it from both tiers."""
+        path = str(tmp_path / "sessions.db")
+        store = ConversationSessionStore(path=path)
+        session = store.create("topic")
+
+        assert store.delete(session["session_id"]) is True
+        assert store.delete(session["session_id"]) is False
+        assert ConversationSessionStore(path=path).get(session["session_id"]) is None
+
+    def test_cleanup_scheduler_evicts_idle_sessions(self):
+        """The cleanup scheduler's sweep removes idle sessions."""
+        store = ConversationSessionStore(idle_ttl=60)
+        session = store.create("topic")
+        store._sessions[session["session_id"]]["updated_at"] -= 120
+        scheduler = CleanupScheduler(Mock(), Mock(), session_store=store)
+
+        scheduler._sweep_sessions()
+
+        assert store.get_stats()["sessions_in_memory"] == 0
+
+
+@pytest.mark.unit
+class TestHistoryCompaction:
+    """Tests for the token budget and rolling summaries of long conversations."""
+
+    @staticmethod
+    def _service(budget, recent=2):
+        from interactive_conversation_service import InteractiveConversationService
+
+        service = InteractiveConversationService()
+        service.prompt_budget = budget
+        service.recent_messages = recent
+        return service
+
+    def test_recent_messages_are_kept_within_budget(self):
+        """Older messages are dropped once the prompt would exceed the budget."""
+        service = self._service(budget=10, recent=2)
+        history = [m for i in range(5) for m in _turn(f"message {i}")]
+
+        kept = service.compact_history("topic", history)
+
+        assert [m["content"] for m in kept] == ["message 4", "Reply to message 4"]
+        assert service.get_stats()["dropped_messages"] == 8
+
+    def test_short_history_is_sent_whole(self):
+        """Nothing is dropped or summarized while the history fits."""
+        service = self._service(budget=100000)
+        history = [m for i in range(5) for m in _turn(str(i))]
+
+        assert service.compact_history("topic", history) == history
+        assert service.summary_due(history) == 0
+
+    def test_client_history_overflow_is_summarized(self):
+        """Without a session, messages that do not fit are summarized rather than dropped."""
+        service = self._service(budget=10, recent=2)
+        service.summarize = AsyncMock(return_value="They discussed 0 to 3")
+        history = [m for i in range(5) for m in _turn(f"message {i}")]
+
+        summary, recent = asyncio.run(service.summarize_overflow("topic", history))
+
+        assert summary == "They discussed 0 to 3"
+        assert service.summarize.await_args.args == ("topic", None, history[:8])
+        assert [m["content"] for m in recent] == ["message 4", "Reply to message 4"]
+        assert asyncio.run(self._service(budget=100000).summarize_overflow("topic", history)) == (None, history)
+
+    def test_pending_skips_summarized_messages(self):
+        """A session's summary replaces the messages it covers, even after trimming."""
+        store = ConversationSessionStore(max_messages=4)
+        session = store.create("topic", [OPENING])
+        for i in range(3):
+            session = store.append(session, _turn(str(i)))
+        session = store.update(session, summary="Earlier turns", summarized=5)
+
+        summary, history = SessionSummarizer.pending(session)
+
+        assert session["message_offset"] == 3
+        assert summary == "Earlier turns"
+        assert [m["content"] for m in history] == ["2", "Reply to 2"]
+
+    def test_summarizer_folds_older_messages(self):
+        """After a turn, messages beyond the recent ones are folded into the summary."""
+        store = ConversationSessionStore()
+        session = store.create("topic", [OPENING])
+        session = store.append(session, _turn("one") + _turn("two"))
+        service = Mock()
+        service.summary_due.return_value = 3
+        service.summarize = AsyncMock(return_value="They discussed one")
+        summarizer = SessionSummarizer(store, service)
+
+        async def run():
+            summarizer.schedule(session["session_id"])
+            await asyncio.gather(*summarizer._tasks.values())
+
+        asyncio.run(run())
+
+        stored = store.get(session["session_id"])
+        assert stored["summary"] == "They discussed one"
+        assert stored["summarized"] == 3
+        assert [m["content"] for m in SessionSummarizer.pending(stored)[1]] == ["two", "Reply to two"]
+        assert summarizer.get_stats()["refreshed"] == 1
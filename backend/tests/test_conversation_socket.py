@@ -0,0 +1,133 @@
+"""
+Unit tests for the /ws/conversation protocol.
+"""
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_sessions import ConversationSessionStore
+from conversation_socket import ConversationSocket
+
+
+class FakeConversationService:
+    """Streams a fixed reply word by word."""
+
+    def __init__(self, reply="Nice to meet you, fellow traveller. What do you think?", delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.histories = []
+
+    def stream_start_conversation(self, topic):
+        return self._stream()
+
+    def stream_continue_conversation(self, topic, history, summary=None):
+        self.histories.append(history)
+        return self._stream()
+
+    async def _stream(self):
+        for word in self.reply.split(" "):
+            await asyncio.sleep(self.delay)
+            yield word + " "
+
+
+async def _synthesize(text, voice, speed):
+    return np.zeros(2400, dtype=np.float32), 24000
+
+
+def _client(service, store, synthesize=_synthesize):
+    app = FastAPI()
+
+    @app.websocket("/ws/conversation")
+    async def endpoint(websocket: WebSocket):
+        await ConversationSocket(websocket, service, store, synthesize).run()
+
+    return TestClient(app)
+
+
+def _receive_turn(ws):
+    """Frames of one reply up to its done frame; audio frames get their bytes"""
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] == "audio":
+            frame["audio"] = ws.receive_bytes()
+        frames.append(frame)
+        if frame["type"] in ("done", "error"):
+            return frames
+
+
+@pytest.mark.unit
+class TestConversationSocket:
+    """Tests for turns, audio frames and barge-in over the WebSocket."""
+
+    def test_opening_message_is_streamed(self):
+        """A start frame creates a session and streams text, audio and done."""
+        store = ConversationSessionStore()
+        with _client(FakeConversationService(), store).websocket_connect("/ws/conversation") as ws:
+            ws.send_json({"type": "start", "topic": "travel"})
+            session = ws.receive_json()
+            frames = _receive_turn(ws)
+
+        assert session["type"] == "session" and session["topic"] == "travel"
+        done = frames[-1]
+        assert done["type"] == "done" and done["message"] == "Nice to meet you, fellow traveller. What do you think?"
+        audio = [f for f in frames if f["type"] == "audio"]
+        assert [f["index"] for f in audio] == [0, 1]
+        assert all(len(f["audio"]) == f["size"] and f["audio"].startswith(b"RIFF") for f in audio)
+        assert store.get(session["session_id"])["messages"] == [{"role": "assistant", "content": done["message"]}]
+
+    def test_turns_are_saved(self):
+        """A message frame gets a reply and both are added to the session."""
+        store = ConversationSessionStore()
+        service = FakeConversationService()
+        with _client(service, store, synthesize=None).websocket_connect("/ws/conversation") as ws:
+            ws.send_json({"type": "start", "topic": "travel"})
+            session_id = ws.receive_json()["session_id"]
+            _receive_turn(ws)
+            ws.send_json({"type": "message", "text": "I love trains."})
+            frames = _receive_turn(ws)
+
+        assert frames[-1]["turn"] == 2
+        assert service.histories[0][-1] == {"role": "user", "content": "I love trains."}
+        assert [m["role"] for m in store.get(session_id)["messages"]] == ["assistant", "user", "assistant"]
+
+    def test_cancel_stops_the_reply(self):
+        """Cancelling keeps the text sent so far and stops the reply."""
+        store = ConversationSessionStore()
+        service = FakeConversationService(reply=" ".join(["word"] * 200), delay=0.01)
+        with _client(service, store, synthesize=None).websocket_connect("/ws/conversation") as ws:
+            ws.send_json({"type": "start", "topic": "travel"})
+            session_id = ws.receive_json()["session_id"]
+            assert ws.receive_json()["type"] == "text"
+            ws.send_json({"type": "cancel"})
+            frame = ws.receive_json()
+            while frame["type"] == "text":
+                frame = ws.receive_json()
+
+        assert frame == {"type": "cancelled", "turn": 1}
+        messages = store.get(session_id)["messages"]
+        assert len(messages) == 1 and 0 < len(messages[0]["content"].split()) < 200
+
+    def test_message_before_start_is_rejected(self):
+        """Messages need a started conversation."""
+        with _client(FakeConversationService(), ConversationSessionStore()).websocket_connect("/ws/conversation") as ws:
+            ws.send_json({"type": "message", "text": "Hello"})
+            frame = ws.receive_json()
+
+        assert frame["type"] == "error" and frame["error_code"] == "NOT_STARTED"
+
+    def test_unknown_session_is_rejected(self):
+        """Resuming an unknown session reports an error."""
+        with _client(FakeConversationService(), ConversationSessionStore()).websocket_connect("/ws/conversation") as ws:
+            ws.send_json({"type": "start", "session_id": "missing"})
+            frame = ws.receive_json()
+
+        assert frame["error_code"] == "SESSION_NOT_FOUND"
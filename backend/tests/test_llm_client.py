@@ -0,0 +1,217 @@
+"""
+Unit tests for the shared async LLM client, against a local mock
+OpenAI-compatible server.
+"""
+import pytest
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import LLMClient
+
+
+class MockOpenAIServer:
+    """Answers /v1/chat/completions after a delay (streamed if asked), recording connections and concurrency"""
+
+    def __init__(self, delay: float = 0.0, reply: str = "Hello there."):
+        self.delay = delay
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = set()
+        self.active = 0
+        self.max_active = 0
+        # stream=True requests get the reply in word chunks
+        self.chunk_delay = 0.0
+        self.chunks_sent = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests.append(body)
+                    server.connections.add(self.client_address)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                time.sleep(server.delay)
+                with server.lock:
+                    server.active -= 1
+                if body.get("stream"):
+                    self._stream(body)
+                    return
+                payload = json.dumps({
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.reply},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, body):
+                """Send the reply word by word as SSE chunks, chunk_delay apart"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for word in server.reply.split(" "):
+                    time.sleep(server.chunk_delay)
+                    server.chunks_sent += 1
+                    chunk = json.dumps({
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": body["model"],
+                        "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                    })
+                    try:
+                        self.wfile.write(f"data: {chunk}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    except OSError:
+                        return
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def mock_server():
+    server = MockOpenAIServer()
+    yield server
+    server.close()
+
+
+def _client(server, **kwargs):
+    return LLMClient(api_key="test", base_url=server.url, max_retries=0, **kwargs)
+
+
+@pytest.mark.unit
+class TestLLMClient:
+    """Tests for pooling, concurrency limits and the async services."""
+
+    def test_connections_are_reused(self, mock_server):
+        """Sequential completions share one keep-alive connection."""
+        client = _client(mock_server)
+
+        async def run():
+            for _ in range(5):
+                response = await client.chat_completion(model="gpt-test", messages=[{"role": "user", "content": "hi"}])
+                assert response.choices[0].message.content == "Hello there."
+            await client.aclose()
+
+        asyncio.run(run())
+        assert len(mock_server.requests) == 5
+        assert len(mock_server.connections) == 1
+        assert client.get_stats()["calls"] == 5
+
+    def test_concurrency_is_limited(self, mock_server):
+        """No more than max_concurrency completions reach the server at once."""
+        mock_server.delay = 0.1
+        client = _client(mock_server, max_concurrency=2)
+
+        async def run():
+            await asyncio.gather(*(
+                client.chat_completion(model="gpt-test", messages=[{"role": "user", "content": str(i)}])
+                for i in range(6)
+            ))
+            await client.aclose()
+
+        asyncio.run(run())
+        assert len(mock_server.requests) == 6
+        assert mock_server.max_active == 2
+        assert client.get_stats()["avg_wait_ms"] > 0
+
+    def test_event_loop_is_not_blocked(self, mock_server):
+        """Other coroutines keep running while a completion is awaited."""
+        mock_server.delay = 0.3
+        client = _client(mock_server)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            await client.chat_completion(model="gpt-test", messages=[{"role": "user", "content": "hi"}])
+            task.cancel()
+            await client.aclose()
+            return ticks
+
+        assert asyncio.run(run()) >= 10
+
+    def test_timeout_raises(self, mock_server):
+        """A completion slower than the timeout fails instead of hanging."""
+        import openai
+
+        mock_server.delay = 0.5
+        client = _client(mock_server, timeout=0.1)
+
+        async def run():
+            try:
+                await client.chat_completion(model="gpt-test", messages=[{"role": "user", "content": "hi"}])
+            finally:
+                await client.aclose()
+
+        with pytest.raises(openai.APITimeoutError):
+            asyncio.run(run())
+        assert client.get_stats()["errors"] == 1
+
+    def test_services_await_the_shared_client(self, mock_server):
+        """The LLM-backed services produce results from the mock server."""
+        from conversation_service import ConversationService
+        from interactive_conversation_service import InteractiveConversationService
+        from speech_service import SpeechService
+
+        mock_server.reply = "1. What first drew you to public speaking?\n\n2. How has speaking changed the way you think?"
+        client = _client(mock_server)
+        conversation, interactive, speech = ConversationService(), InteractiveConversationService(), SpeechService()
+        for service in (conversation, interactive, speech):
+            service.client = client
+
+        async def run():
+            prompts = await conversation.generate_prompts("public speaking", count=2)
+            start = await interactive.start_conversation("public speaking")
+            speech_text = await speech.generate_speech("public speaking")
+            await client.aclose()
+            return prompts, start, speech_text
+
+        prompts, start, speech_text = asyncio.run(run())
+        assert prompts[0]["question"] == "What first drew you to public speaking?"
+        assert start["message"].startswith("1. What first drew you")
+        assert speech_text
+        # One request for the prompts, one to start, five for the speech
+        assert len(mock_server.requests) == 7
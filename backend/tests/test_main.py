@@ -148,6 +148,72 @@ class TestAvatarEndpoint:
             assert response.status_code in [200, 422, 500]
 
 
+@pytest.mark.integration
+class TestReplyAudioEndpoint:
+    """Tests for reply audio served by reference from /api/audio."""
+    
+    AUDIO = b"RIFF" + bytes(range(256)) * 4
+    
+    @pytest.fixture(autouse=True)
+    def _isolated(self, tmp_path, monkeypatch):
+        """A cache of this test's own, and rate limits that other tests did not use up"""
+        import main
+        from cache_manager import CacheManager
+        monkeypatch.setattr(main, "cache_manager", CacheManager(cache_dir=str(tmp_path / "cache")))
+        if main.rate_limiter is not None:
+            main.rate_limiter.buckets.clear()
+        main.limiter.reset()
+    
+    def _store(self):
+        import main
+        return main.store_reply_audio(self.AUDIO, "wav")
+    
+    def test_reply_audio_is_stored_by_reference(self, client):
+        """Stored audio gets a short content-addressed URL that serves it."""
+        audio_url = self._store()
+        assert audio_url.startswith("/api/audio/") and audio_url.endswith(".wav")
+        
+        response = client.get(audio_url)
+        assert response.status_code == 200
+        assert response.content == self.AUDIO
+        assert response.headers["content-type"].startswith("audio/wav")
+        assert "immutable" in response.headers["cache-control"]
+    
+    def test_reply_audio_range_request(self, client):
+        """A byte range of the audio is returned as partial content."""
+        audio_url = self._store()
+        
+        response = client.get(audio_url, headers={"Range": "bytes=4-11"})
+        assert response.status_code == 206
+        assert response.content == self.AUDIO[4:12]
+        assert response.headers["content-range"] == f"bytes 4-11/{len(self.AUDIO)}"
+    
+    def test_reply_audio_not_modified(self, client):
+        """A request with a matching ETag gets 304."""
+        audio_url = self._store()
+        etag = client.get(audio_url).headers["etag"]
+        
+        response = client.get(audio_url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+    
+    def test_reply_audio_evicted_before_send(self, client, monkeypatch):
+        """A disk entry evicted after its lookup falls back to memory, else 404."""
+        import main
+        audio_url = self._store()
+        monkeypatch.setattr(main.cache_manager, "get_file", lambda key: "/nonexistent/evicted.wav")
+        
+        response = client.get(audio_url)
+        assert response.status_code == 200 and response.content == self.AUDIO
+        
+        monkeypatch.setattr(main.cache_manager, "get", lambda key: None)
+        assert client.get(audio_url).status_code == 404
+    
+    def test_unknown_reply_audio(self, client):
+        """Unknown and malformed ids are not found."""
+        assert client.get("/api/audio/" + "0" * 32 + ".wav").status_code == 404
+        assert client.get("/api/audio/..%2Fsecret.wav").status_code == 404
+
+
 @pytest.mark.integration
 class TestErrorHandling:
     """Tests for error handling."""
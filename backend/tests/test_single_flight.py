@@ -0,0 +1,93 @@
+"""
+Unit tests for single-flight request deduplication.
+"""
+import pytest
+import asyncio
+import os
+import sys
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Tests for sharing one computation between concurrent identical calls."""
+
+    def test_concurrent_calls_run_once(self):
+        """N concurrent calls with one key run func once and all get its result."""
+        flights = SingleFlight("test")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "audio"
+
+        async def run():
+            return await asyncio.gather(*(flights.do("key", compute) for _ in range(10)))
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert [result for result, _ in results] == ["audio"] * 10
+        assert sum(shared for _, shared in results) == 9
+        assert flights.get_stats()["calls"] == 1 and flights.get_stats()["shared"] == 9
+
+    def test_exception_reaches_every_caller(self):
+        """A failing computation raises in all callers sharing it."""
+        flights = SingleFlight("test")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise RuntimeError("model unavailable")
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do("key", compute) for _ in range(5)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    def test_cancelled_caller_does_not_cancel_shared_task(self):
+        """The first caller going away leaves the computation running for the others."""
+        flights = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "audio"
+
+        async def run():
+            first = asyncio.ensure_future(flights.do("key", compute))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(flights.do("key", compute))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        assert asyncio.run(run()) == ("audio", True)
+
+    def test_entry_removed_after_completion(self):
+        """A finished key is forgotten, so the next call computes afresh."""
+        flights = SingleFlight("test")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            first = await flights.do("key", compute)
+            assert flights.get_stats()["in_flight"] == 0
+            second = await flights.do("key", compute)
+            return first, second
+
+        assert asyncio.run(run()) == ((1, False), (2, False))
+        assert flights.get_stats()["in_flight"] == 0
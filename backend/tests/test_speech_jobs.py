@@ -0,0 +1,162 @@
+"""
+Unit tests for background speech jobs with per-stage checkpoints.
+"""
+import pytest
+import asyncio
+import os
+import sqlite3
+import sys
+from types import SimpleNamespace
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache_manager import CacheManager
+from job_tracker import JobStatus, JobTracker
+from speech_jobs import SpeechJobRunner
+from speech_service import SPEECH_STAGES, SpeechService
+
+
+class FakeLLMClient:
+    """Answers each round with "draft <n>", failing once at the given rounds"""
+
+    def __init__(self, fail_stages=()):
+        self.fail_stages = set(fail_stages)
+        self.stages = []
+
+    async def chat_completion(self, model, messages, **kwargs):
+        stage = int(messages[0]["content"].split(":", 1)[0].rsplit(" ", 1)[1])
+        self.stages.append(stage)
+        if stage in self.fail_stages:
+            self.fail_stages.discard(stage)
+            raise RuntimeError(f"timeout in round {stage}")
+        message = SimpleNamespace(content=f"draft {stage}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _runner(tmp_path, client, cache=None):
+    service = SpeechService()
+    service.client = client
+    saved = []
+
+    def save_speech(topic, content):
+        saved.append((topic, content))
+        return len(saved)
+
+    runner = SpeechJobRunner(
+        service, JobTracker(db_path=str(tmp_path / "jobs.db")), save_speech, cache_manager=cache
+    )
+    return runner, saved
+
+
+async def _finish(runner, job_id):
+    while job_id in runner._tasks:
+        await runner._tasks[job_id]
+
+
+@pytest.mark.unit
+class TestSpeechJobs:
+    """Tests for checkpointing, resuming and caching speech rounds."""
+
+    def test_job_checkpoints_every_stage(self, tmp_path):
+        """A job runs all rounds, checkpoints each and stores the speech."""
+        runner, saved = _runner(tmp_path, FakeLLMClient())
+
+        async def run():
+            job_id = runner.submit("The Ocean")
+            await _finish(runner, job_id)
+            return job_id
+
+        status = runner.get_status(asyncio.run(run()))
+        assert status["status"] == JobStatus.COMPLETED.value and status["progress"] == 1.0
+        assert [stage["status"] for stage in status["stages"]] == ["completed"] * len(SPEECH_STAGES)
+        assert status["speech_id"] == 1 and status["result_url"] == "/api/speeches/1"
+        assert saved == [("The Ocean", f"draft {len(SPEECH_STAGES)}")]
+
+    def test_failed_job_resumes_after_last_checkpoint(self, tmp_path):
+        """A job failing in round 4 reruns only rounds 4 and 5 when resumed."""
+        client = FakeLLMClient(fail_stages={4})
+        runner, saved = _runner(tmp_path, client)
+
+        async def run():
+            job_id = runner.submit("The Ocean")
+            await _finish(runner, job_id)
+            failed = runner.get_status(job_id)
+            assert runner.resume(job_id)
+            await _finish(runner, job_id)
+            return failed, runner.get_status(job_id)
+
+        failed, status = asyncio.run(run())
+        assert failed["status"] == JobStatus.FAILED.value and "round 4" in failed["error_message"]
+        assert [stage["status"] for stage in failed["stages"]].count("completed") == 3
+        assert failed["progress"] == pytest.approx(3 / (len(SPEECH_STAGES) + 1))
+        assert client.stages == [1, 2, 3, 4, 4, 5]
+        assert status["status"] == JobStatus.COMPLETED.value and status["error_message"] is None
+        assert len(saved) == 1
+
+    def test_rounds_are_cached_until_the_speech_is_finished(self, tmp_path):
+        """Retrying a topic after a failure skips completed rounds; a finished speech is not reused."""
+        client = FakeLLMClient(fail_stages={3})
+        runner, _ = _runner(tmp_path, client, cache=CacheManager(cache_dir=str(tmp_path / "cache")))
+
+        async def run():
+            with pytest.raises(Exception):
+                await runner.generate("The Ocean")
+            speech = await runner.generate("the  ocean")
+            job_id = runner.submit("THE OCEAN")
+            await _finish(runner, job_id)
+            return speech, runner.get_status(job_id)
+
+        speech, status = asyncio.run(run())
+        assert speech == f"draft {len(SPEECH_STAGES)}"
+        # The retry resumed at round 3; the later job for the topic ran every round afresh
+        assert client.stages == [1, 2, 3, 3, 4, 5, 1, 2, 3, 4, 5]
+        assert status["status"] == JobStatus.COMPLETED.value
+        assert all(stage["status"] == "completed" for stage in status["stages"])
+        assert runner.get_stats()["stages_cached"] == 2
+        assert runner.cache_manager.get_stats()["namespaces"]["llm"]["hits"] == 2
+
+    def test_interrupted_job_is_taken_over_once(self, tmp_path):
+        """Of two workers finding a stale job, only one resumes it."""
+        client = FakeLLMClient()
+        worker_1, saved = _runner(tmp_path, client)
+        worker_2 = SpeechJobRunner(worker_1.speech_service, worker_1.job_tracker, worker_1.save_speech)
+        tracker = worker_1.job_tracker
+        tracker.create_job("job-1", metadata={"type": "speech", "topic": "The Ocean", "stages": 5})
+        tracker.update_job_status("job-1", JobStatus.PROCESSING)
+        tracker.save_stage("job-1", 0, SPEECH_STAGES[0][0], "draft 1")
+        # Last progress long ago
+        conn = sqlite3.connect(tracker.db_path)
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE job_id = 'job-1'", ("2000-01-01T00:00:00",))
+        conn.commit()
+        conn.close()
+
+        async def run():
+            resumed = worker_1.resume_interrupted() + worker_2.resume_interrupted()
+            await _finish(worker_1, "job-1")
+            await _finish(worker_2, "job-1")
+            return resumed
+
+        assert asyncio.run(run()) == 1
+        assert client.stages == [2, 3, 4, 5]
+        assert tracker.get_job("job-1")["status"] == JobStatus.COMPLETED.value
+        assert len(saved) == 1
+
+    def test_claim_is_exclusive(self, tmp_path):
+        """Claiming a job compares its last update, so only one claim succeeds."""
+        tracker = JobTracker(db_path=str(tmp_path / "jobs.db"))
+        tracker.create_job("job-1")
+        seen = tracker.get_job("job-1")["updated_at"]
+
+        assert tracker.claim_job("job-1", seen) is True
+        assert tracker.claim_job("job-1", seen) is False
+        assert tracker.get_job("job-1")["status"] == JobStatus.PROCESSING.value
+
+    def test_running_job_is_not_resumed(self, tmp_path):
+        """A job making progress is left to its worker."""
+        runner, _ = _runner(tmp_path, FakeLLMClient())
+        runner.job_tracker.create_job("job-1", metadata={"type": "speech", "topic": "The Ocean", "stages": 5})
+        runner.job_tracker.update_job_status("job-1", JobStatus.PROCESSING)
+
+        assert runner.resume_interrupted() == 0
+        assert runner.resume("job-1") is False
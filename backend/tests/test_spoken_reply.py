@@ -0,0 +1,222 @@
+"""
+Unit tests for streamed conversation replies with sentence-pipelined TTS.
+"""
+import pytest
+import asyncio
+import os
+import sys
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spoken_reply import SpokenReplyStats, stream_spoken_reply
+from text_frontend import SentenceBuffer
+from tests.test_llm_client import MockOpenAIServer, _client
+
+
+async def _deltas(text, delay=0.0):
+    for word in text.split(" "):
+        await asyncio.sleep(delay)
+        yield word + " "
+
+
+async def _collect(reply):
+    return [event async for event in reply]
+
+
+@pytest.mark.unit
+class TestSentenceBuffer:
+    """Tests for splitting streamed text into sentences."""
+
+    def test_sentences_are_released_when_complete(self):
+        """A sentence is released once the next one starts, not before."""
+        buffer = SentenceBuffer(min_chars=10)
+        assert buffer.feed("Public speaking is a skill. ") == []
+        assert buffer.feed("Practice ") == ["Public speaking is a skill."]
+        assert buffer.feed("makes it easier") == []
+        assert buffer.flush() == ["Practice makes it easier"]
+        assert buffer.flush() == []
+
+    def test_abbreviations_and_short_sentences_are_kept_together(self):
+        """Short fragments are merged into the following sentence."""
+        buffer = SentenceBuffer(min_chars=20)
+        sentences = buffer.feed("Hi! Dr. Smith told me about this. It was great, really? Yes. And then")
+        assert sentences == ["Hi! Dr. Smith told me about this.", "It was great, really?"]
+        assert buffer.flush() == ["Yes. And then"]
+
+    def test_long_runs_are_split_at_clause_breaks(self):
+        """Text without sentence ends is released at max_chars."""
+        buffer = SentenceBuffer(min_chars=10, max_chars=60)
+        sentences = buffer.feed("word " * 10 + "and, " + "word " * 20)
+        assert sentences
+        assert all(len(sentence) <= 60 for sentence in sentences)
+        assert " ".join(sentences + buffer.flush()).split() == ("word " * 10 + "and, " + "word " * 20).split()
+
+
+@pytest.mark.unit
+class TestSpokenReply:
+    """Tests for pipelining synthesis with generation."""
+
+    TEXT = "That is a great point to start with. What made you think of it first? Tell me more about it."
+
+    def test_first_audio_arrives_before_generation_ends(self):
+        """The first sentence is synthesized while later ones are still generated."""
+        async def synthesize(sentence):
+            await asyncio.sleep(0.01)
+            return {"audio": sentence.upper()}
+
+        async def run():
+            seen = []
+            async for event, data in stream_spoken_reply(_deltas(self.TEXT, delay=0.02), synthesize):
+                seen.append((event, data))
+            return seen
+
+        events = asyncio.run(run())
+        kinds = [event for event, _ in events]
+        assert kinds.index("audio") < max(i for i, kind in enumerate(kinds) if kind == "text")
+        audio = [data for event, data in events if event == "audio"]
+        assert [data["index"] for data in audio] == [0, 1, 2]
+        assert [data["audio"] for data in audio] == [data["text"].upper() for data in audio]
+        done = events[-1][1]
+        assert events[-1][0] == "done"
+        assert done["message"] == self.TEXT and done["sentences"] == 3
+        # One sentence (8 words) of generation plus synthesis, far less than the 20-word reply
+        assert done["time_to_first_audio"] < 20 * 0.02
+
+    def test_audio_is_delivered_in_sentence_order(self):
+        """Sentences synthesized out of order are still sent in order."""
+        async def synthesize(sentence):
+            # Earlier sentences take longer
+            await asyncio.sleep(0.1 if sentence.startswith("That") else 0.0)
+            return {}
+
+        events = asyncio.run(_collect(stream_spoken_reply(_deltas(self.TEXT), synthesize)))
+        assert [data["index"] for event, data in events if event == "audio"] == [0, 1, 2]
+
+    def test_failed_sentence_is_skipped(self):
+        """A sentence that fails to synthesize does not end the reply."""
+        async def synthesize(sentence):
+            if sentence.startswith("What"):
+                raise RuntimeError("TTS failed")
+            return {}
+
+        events = asyncio.run(_collect(stream_spoken_reply(_deltas(self.TEXT), synthesize)))
+        assert [data["index"] for event, data in events if event == "audio"] == [0, 2]
+        assert events[-1][0] == "done"
+
+    def test_text_only_without_synthesis(self):
+        """Without a synthesizer only text is streamed."""
+        events = asyncio.run(_collect(stream_spoken_reply(_deltas(self.TEXT), None)))
+        assert {event for event, _ in events} == {"text", "done"}
+        assert events[-1][1]["time_to_first_audio"] is None
+
+    def test_stream_errors_are_raised(self):
+        """A failing completion surfaces to the caller."""
+        async def failing():
+            yield "Hello "
+            raise RuntimeError("connection lost")
+
+        async def run():
+            async for _ in stream_spoken_reply(failing(), None):
+                pass
+
+        with pytest.raises(RuntimeError, match="connection lost"):
+            asyncio.run(run())
+
+    def test_closing_early_cancels_generation_and_synthesis(self):
+        """Leaving the stream stops the completion and pending synthesis."""
+        cancelled = []
+        closed = []
+
+        async def endless():
+            try:
+                while True:
+                    await asyncio.sleep(0.005)
+                    yield "More words follow here. "
+            finally:
+                closed.append(True)
+
+        async def synthesize(sentence):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(sentence)
+                raise
+            return {}
+
+        async def run():
+            reply = stream_spoken_reply(endless(), synthesize)
+            async for event, _ in reply:
+                if event == "text":
+                    await asyncio.sleep(0.05)
+                    break
+            await reply.aclose()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert closed and cancelled
+
+    def test_stats(self):
+        """Replies record their sentence counts and latencies."""
+        stats = SpokenReplyStats()
+        stats.record({"sentences": 3, "time_to_first_token": 0.1, "time_to_first_audio": 0.4})
+        stats.record({"sentences": 1, "time_to_first_token": 0.3, "time_to_first_audio": None})
+        stats.record_error()
+        result = stats.get_stats()
+        assert result["replies"] == 2 and result["errors"] == 1
+        assert result["avg_sentences"] == 2
+        assert result["avg_time_to_first_token_ms"] == pytest.approx(200)
+        assert result["avg_time_to_first_audio_ms"] == pytest.approx(400)
+
+
+@pytest.mark.unit
+class TestStreamedConversation:
+    """Tests for streaming conversation replies from an OpenAI-compatible server."""
+
+    def test_reply_is_spoken_while_streaming(self):
+        """Audio for the first sentence is ready before the server finishes the reply."""
+        from interactive_conversation_service import InteractiveConversationService
+
+        server = MockOpenAIServer(reply=TestSpokenReply.TEXT)
+        server.chunk_delay = 0.02
+        client = _client(server)
+        service = InteractiveConversationService()
+        service.client = client
+
+        async def synthesize(sentence):
+            return {"chunks_sent": server.chunks_sent}
+
+        async def run():
+            events = await _collect(stream_spoken_reply(service.stream_start_conversation("public speaking"), synthesize))
+            await client.aclose()
+            return events
+
+        try:
+            events = asyncio.run(run())
+        finally:
+            server.close()
+
+        audio = [data for event, data in events if event == "audio"]
+        assert len(audio) == 3
+        words = len(TestSpokenReply.TEXT.split(" "))
+        assert audio[0]["chunks_sent"] < words
+        assert events[-1][1]["message"] == TestSpokenReply.TEXT
+        assert server.requests[0]["stream"] is True
+        assert client.get_stats()["streams"] == 1
+
+    def test_streaming_failure_is_service_error(self):
+        """A failed streamed completion raises ServiceNotAvailableException."""
+        from exceptions import ServiceNotAvailableException
+        from interactive_conversation_service import InteractiveConversationService
+
+        server = MockOpenAIServer()
+        server.close()
+        service = InteractiveConversationService()
+        service.client = _client(server)
+
+        async def run():
+            async for _ in service.stream_continue_conversation("topic", [{"role": "user", "content": "hi"}]):
+                pass
+
+        with pytest.raises(ServiceNotAvailableException):
+            asyncio.run(run())
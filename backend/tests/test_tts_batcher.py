@@ -0,0 +1,119 @@
+"""
+Unit tests for the TTS micro-batching scheduler.
+"""
+import pytest
+import asyncio
+import threading
+from unittest.mock import Mock
+import os
+import sys
+
+import numpy as np
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tts_batcher import TTSMicroBatcher
+
+
+def _fake_service():
+    """TTS service stub whose generate_batch records the groups it receives."""
+    service = Mock()
+    service.calls = []
+    lock = threading.Lock()
+
+    def generate_batch(texts, voice, speed):
+        with lock:
+            service.calls.append((list(texts), voice, speed))
+        results = []
+        for text in texts:
+            if text == "boom":
+                results.append(RuntimeError("render failed"))
+            else:
+                results.append((np.full(len(text), speed, dtype=np.float32), 24000))
+        return results
+
+    service.generate_batch.side_effect = generate_batch
+    return service
+
+
+@pytest.mark.unit
+class TestTTSMicroBatcher:
+    """Unit tests for TTSMicroBatcher."""
+
+    def test_concurrent_requests_are_grouped_by_voice_and_speed(self):
+        """Requests inside one window are batched and split per voice/speed."""
+        service = _fake_service()
+        batcher = TTSMicroBatcher(service, batch_window_ms=50, max_batch_size=8)
+        batcher.start()
+        try:
+            futures = [
+                batcher.submit("hello", "af_bella", 1.0),
+                batcher.submit("hi", "af_sarah", 1.0),
+                batcher.submit("howdy", "af_bella", 1.0),
+                batcher.submit("hey", "af_bella", 1.5),
+            ]
+            results = [f.result(timeout=5) for f in futures]
+        finally:
+            batcher.stop()
+
+        assert [len(audio) for audio, _ in results] == [5, 2, 5, 3]
+        assert results[3][0][0] == pytest.approx(1.5)
+        groups = sorted(service.calls, key=lambda c: (c[1], c[2]))
+        assert groups == [
+            (["hello", "howdy"], "af_bella", 1.0),
+            (["hey"], "af_bella", 1.5),
+            (["hi"], "af_sarah", 1.0),
+        ]
+
+        stats = batcher.get_stats()
+        assert stats["batches"] == 1
+        assert stats["requests"] == 4
+        assert stats["batch_size_histogram"] == {4: 1}
+        assert stats["avg_queue_wait_ms"] >= 0
+
+    def test_max_batch_size_caps_batches(self):
+        """No batch is larger than max_batch_size."""
+        service = _fake_service()
+        batcher = TTSMicroBatcher(service, batch_window_ms=50, max_batch_size=2)
+        batcher.start()
+        try:
+            futures = [batcher.submit(f"text {i}", "af_bella", 1.0) for i in range(5)]
+            for f in futures:
+                f.result(timeout=5)
+        finally:
+            batcher.stop()
+
+        assert batcher.get_stats()["max_batch_size_seen"] == 2
+        assert batcher.get_stats()["requests"] == 5
+
+    def test_failure_only_affects_its_request(self):
+        """A failing text raises for its caller while the rest succeed."""
+        service = _fake_service()
+        batcher = TTSMicroBatcher(service, batch_window_ms=50)
+        batcher.start()
+        try:
+            ok = batcher.submit("fine", "af_bella", 1.0)
+            bad = batcher.submit("boom", "af_bella", 1.0)
+            assert ok.result(timeout=5)[1] == 24000
+            with pytest.raises(RuntimeError, match="render failed"):
+                bad.result(timeout=5)
+        finally:
+            batcher.stop()
+
+    def test_generate_audio_is_awaitable(self):
+        """Async callers await results without blocking the event loop."""
+        service = _fake_service()
+        batcher = TTSMicroBatcher(service, batch_window_ms=10)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.generate_audio("one", "af_bella", 1.0),
+                batcher.generate_audio("three", "af_bella", 1.0),
+            )
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            batcher.stop()
+        assert [len(audio) for audio, _ in results] == [3, 5]
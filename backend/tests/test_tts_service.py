@@ -170,3 +170,909 @@ class TestTTSService:
             os.unlink(model_path)
             os.unlink(voices_path)
 
+    
+    @patch('tts_service.Kokoro')
+    def test_generate_audio_stream(self, mock_kokoro):
+        """Test streaming generation yields chunks and pauses in order."""
+        import numpy as np
+        mock_kokoro_instance = Mock()
+        mock_kokoro_instance.create.side_effect = [
+            (np.array([0.1, 0.2, 0.3], dtype=np.float32), 22050),
+            (np.array([0.4, 0.5, 0.6], dtype=np.float32), 22050),
+        ]
+        mock_kokoro.return_value = mock_kokoro_instance
+        
+        import tempfile
+        with tempfile.NamedTemporaryFile(suffix='.onnx', delete=False) as model_file:
+            model_path = model_file.name
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as voices_file:
+            voices_file.write('{"af_bella": {}}')
+            voices_path = voices_file.name
+        
+        try:
+            service = TTSService(model_path=model_path, voices_path=voices_path)
+            service._split_text_intelligently = Mock(return_value=["First chunk.", "Second chunk."])
+            stream = service.generate_audio_stream("First chunk. Second chunk.", "af_bella", 1.0)
+            
+            # Nothing is rendered until the consumer asks for audio
+            assert mock_kokoro_instance.create.call_count == 0
+            segments = list(stream)
+            
+            assert len(segments) == 3  # chunk, pause, chunk (no trailing pause)
+            assert list(segments[0][0]) == pytest.approx([0.1, 0.2, 0.3])
+            assert len(segments[1][0]) == int(service.CHUNK_PAUSE_SECONDS * 22050)
+            assert not segments[1][0].any()
+            assert all(rate == 22050 for _, rate in segments)
+        finally:
+            os.unlink(model_path)
+            os.unlink(voices_path)
+    
+    def test_wav_stream_header(self):
+        """Test streaming WAV header layout."""
+        import struct
+        import numpy as np
+        from audio_encoding import wav_header, float_to_pcm16
+        
+        header = wav_header(24000)
+        assert len(header) == 44
+        assert header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+        assert struct.unpack("<I", header[24:28])[0] == 24000
+        assert struct.unpack("<I", header[4:8])[0] == 0xFFFFFFFF
+        
+        pcm = float_to_pcm16(np.array([0.0, 1.0, -2.0]))
+        assert struct.unpack("<3h", pcm) == (0, 32767, -32767)
+
+
+class _SleepingKokoro:
+    """Stand-in for a Kokoro session: blocks outside the GIL like ONNX Runtime does."""
+    
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+    
+    def create(self, text, voice, speed, lang):
+        import time
+        import numpy as np
+        time.sleep(self.delay)
+        # Encode the chunk number in the audio so ordering can be checked
+        return np.full(4, float(text.split()[-1]) + 1, dtype=np.float32), 22050
+
+
+def _make_parallel_service(workers: int, delay: float = 0.0) -> TTSService:
+    import tempfile
+    with tempfile.NamedTemporaryFile(suffix='.onnx', delete=False) as model_file:
+        model_path = model_file.name
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as voices_file:
+        voices_file.write('{"af_bella": {}}')
+        voices_path = voices_file.name
+    try:
+        with patch.object(TTSService, '_create_kokoro', side_effect=lambda *a, **k: _SleepingKokoro(delay)), \
+                patch('tts_service.Kokoro'):
+            return TTSService(model_path=model_path, voices_path=voices_path, parallel_workers=workers)
+    finally:
+        os.unlink(model_path)
+        os.unlink(voices_path)
+
+
+@pytest.mark.unit
+class TestTTSServiceParallel:
+    """Tests for parallel long-text rendering."""
+    
+    def test_parallel_output_is_in_chunk_order(self):
+        """Chunks rendered on the pool are reassembled in order."""
+        service = _make_parallel_service(workers=4, delay=0.01)
+        try:
+            chunks = [f"chunk {i}" for i in range(10)]
+            service._split_text_intelligently = Mock(return_value=chunks)
+            audio, sample_rate = service.generate_audio("long text", "af_bella", 1.0)
+            
+            assert sample_rate == 22050
+            values = [v for v in dict.fromkeys(audio.tolist()) if v != 0.0]
+            assert values == [float(i) for i in range(1, 11)]
+            pause = int(service.CHUNK_PAUSE_SECONDS * 22050)
+            assert len(audio) == 10 * 4 + 9 * pause
+        finally:
+            service.shutdown()
+    
+    def test_parallel_chunk_error_reports_position(self):
+        """A failing chunk surfaces as a RuntimeError naming the chunk."""
+        service = _make_parallel_service(workers=2)
+        try:
+            service._split_text_intelligently = Mock(return_value=["chunk 1", "chunk oops"])
+            with pytest.raises(RuntimeError, match="chunk 2/2"):
+                service.generate_audio("long text", "af_bella", 1.0)
+        finally:
+            service.shutdown()
+    
+    def test_intra_op_threads_default_splits_cores(self):
+        """Each session gets a share of the cores by default."""
+        service = _make_parallel_service(workers=2)
+        try:
+            assert service.intra_op_threads == max(1, (os.cpu_count() or 1) // 2)
+        finally:
+            service.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_count", [2, 4, 8])
+def test_parallel_matches_sequential_by_chunk_count(chunk_count):
+    """Rendering on 4 sessions gives the same audio, in chunk order, as 1 session."""
+    import numpy as np
+    chunks = [f"chunk {i}" for i in range(chunk_count)]
+    rendered = {}
+    for workers in (1, 4):
+        service = _make_parallel_service(workers=workers, delay=0.005)
+        if workers == 1:
+            service.kokoro = _SleepingKokoro()
+        service._split_text_intelligently = Mock(return_value=chunks)
+        try:
+            rendered[workers] = service.generate_audio("long text", "af_bella", 1.0)
+        finally:
+            service.shutdown()
+    
+    (sequential, sequential_rate), (parallel, parallel_rate) = rendered[1], rendered[4]
+    assert parallel_rate == sequential_rate == 22050
+    np.testing.assert_array_equal(parallel, sequential)
+    values = [v for v in dict.fromkeys(parallel.tolist()) if v != 0.0]
+    assert values == [float(i) for i in range(1, chunk_count + 1)]
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("chunk_count", [2, 4, 8])
+def test_parallel_speedup_by_chunk_count(chunk_count):
+    """Benchmark: wall-clock time of sequential vs 4-session rendering on the real model."""
+    import time
+    from config import settings
+    if not (os.path.exists(settings.TTS_MODEL_PATH) and os.path.exists(settings.VOICES_PATH)):
+        pytest.skip("Kokoro model and voices files are needed for this benchmark")
+    
+    chunks = [f"This is sentence number {i} of a long passage read aloud for the benchmark." for i in range(chunk_count)]
+    timings = {}
+    for workers in (1, 4):
+        service = TTSService(model_path=settings.TTS_MODEL_PATH, voices_path=settings.VOICES_PATH, parallel_workers=workers)
+        service._split_text_intelligently = Mock(return_value=chunks)
+        try:
+            service.generate_audio(chunks[0], "af_bella", 1.0)  # warm up
+            start = time.perf_counter()
+            service.generate_audio("long text", "af_bella", 1.0)
+            timings[workers] = time.perf_counter() - start
+        finally:
+            service.shutdown()
+    
+    speedup = timings[1] / timings[4]
+    print(f"\n{chunk_count} chunks: sequential {timings[1]:.3f}s, parallel {timings[4]:.3f}s, speedup {speedup:.2f}x")
+    assert speedup > 1.0
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestTTSServiceSegmentCache:
+    """Tests for chunk-level audio caching."""
+    
+    def _make_service(self, mock_kokoro, segment_cache):
+        import tempfile
+        with tempfile.NamedTemporaryFile(suffix='.onnx', delete=False) as model_file:
+            model_path = model_file.name
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as voices_file:
+            voices_file.write('{"af_bella": {}}')
+            voices_path = voices_file.name
+        try:
+            return TTSService(model_path=model_path, voices_path=voices_path, segment_cache=segment_cache)
+        finally:
+            os.unlink(model_path)
+            os.unlink(voices_path)
+    
+    @patch('tts_service.Kokoro')
+    def test_only_changed_chunks_are_rendered(self, mock_kokoro, tmp_path):
+        """Editing one chunk re-renders just that chunk."""
+        import numpy as np
+        from audio_segment_cache import AudioSegmentCache
+        mock_kokoro.return_value.create.side_effect = lambda text, **kwargs: (
+            np.full(3, float(len(text)), dtype=np.float32), 22050
+        )
+        service = self._make_service(mock_kokoro, AudioSegmentCache(cache_dir=str(tmp_path)))
+        
+        service._split_text_intelligently = Mock(return_value=["One.", "Two two.", "Three."])
+        first, _ = service.generate_audio("draft", "af_bella", 1.0)
+        assert mock_kokoro.return_value.create.call_count == 3
+        
+        service._split_text_intelligently = Mock(return_value=["One.", "Two  edited.", "Three."])
+        second, _ = service.generate_audio("draft", "af_bella", 1.0)
+        assert mock_kokoro.return_value.create.call_count == 4
+        assert mock_kokoro.return_value.create.call_args[0][0] == "Two  edited."
+        assert len(second) == len(first)
+        
+        # Whitespace-only changes and a fresh process (disk tier) still hit
+        fresh_cache = AudioSegmentCache(cache_dir=str(tmp_path))
+        service.segment_cache = fresh_cache
+        service._split_text_intelligently = Mock(return_value=["One.", "Two edited.", "Three.\n"])
+        third, _ = service.generate_audio("draft", "af_bella", 1.0)
+        assert mock_kokoro.return_value.create.call_count == 4
+        assert np.array_equal(third, second)
+        assert fresh_cache.get_stats()["hits"] == 3
+    
+    def test_key_depends_on_voice_speed_and_model(self):
+        """Voice, speed and model version are part of the content address."""
+        from audio_segment_cache import AudioSegmentCache
+        cache = AudioSegmentCache()
+        base = cache.make_key("Hello there.", "af_bella", 1.0, "model:1")
+        assert base == cache.make_key(" Hello   there. ", "af_bella", 1.0, "model:1")
+        assert base != cache.make_key("Hello there.", "af_sarah", 1.0, "model:1")
+        assert base != cache.make_key("Hello there.", "af_bella", 1.2, "model:1")
+        assert base != cache.make_key("Hello there.", "af_bella", 1.0, "model:2")
+    
+    def test_memory_tier_is_byte_bounded(self):
+        """Least recently used segments are evicted past the byte budget."""
+        import numpy as np
+        from audio_segment_cache import AudioSegmentCache
+        cache = AudioSegmentCache(max_memory_bytes=100)
+        for i in range(3):
+            cache.set(f"k{i}", np.zeros(10, dtype=np.float32), 22050)  # 40 bytes each
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["memory_bytes"] == 80
+        assert cache.get("k0") is None
+        assert cache.get("k2") is not None
+
+    
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """The disk tier evicts least recently used chunks beyond its quota."""
+        import numpy as np
+        from audio_segment_cache import AudioSegmentCache
+        rng = np.random.default_rng(0)
+        cache = AudioSegmentCache(max_memory_bytes=0, cache_dir=str(tmp_path), max_disk_bytes=10000)
+        for i in range(4):
+            cache.set(f"k{i}", rng.standard_normal(1000).astype(np.float32), 24000)  # ~4 KB each
+        stats = cache.get_stats()
+        assert stats["disk_bytes"] <= 10000
+        assert stats["disk_evictions"] >= 1
+        assert cache.get("k0") is None
+        assert cache.get("k3") is not None
+    
+    def test_sweep_removes_expired_chunks(self, tmp_path):
+        """Expired chunks are deleted by sweep() and missed on lookup; audio round-trips losslessly."""
+        import numpy as np
+        from audio_segment_cache import AudioSegmentCache
+        audio = np.linspace(-1.5, 1.5, 500, dtype=np.float32)
+        with patch("audio_segment_cache.time.time", return_value=1000.0):
+            AudioSegmentCache(cache_dir=str(tmp_path), ttl=60).set("old", audio, 24000)
+        cache = AudioSegmentCache(cache_dir=str(tmp_path), ttl=60)
+        cache.set("fresh", audio, 24000)
+        
+        restored, sample_rate = AudioSegmentCache(cache_dir=str(tmp_path), ttl=60).get("fresh")
+        assert np.array_equal(restored, audio) and sample_rate == 24000
+        assert cache.sweep() == {"expired": 1, "evicted": 0}
+        assert cache.get_stats()["disk_entries"] == 1
+    
+    def test_cleanup_scheduler_sweeps_chunk_cache(self):
+        """The cleanup scheduler sweeps the chunk cache along with the response cache."""
+        from cleanup_scheduler import CleanupScheduler
+        cache_manager = Mock()
+        cache_manager.sweep.return_value = {"expired": 0, "evicted": 0}
+        segment_cache = Mock()
+        segment_cache.sweep.return_value = {"expired": 1, "evicted": 0}
+        CleanupScheduler(job_tracker=Mock(), cache_manager=cache_manager, segment_cache=segment_cache)._sweep_cache()
+        assert segment_cache.sweep.call_count == 1
+
+@pytest.mark.unit
+def test_generate_batch_reassembles_per_text():
+    """generate_batch renders all texts' chunks together and splits them back."""
+    service = _make_parallel_service(workers=2)
+    try:
+        service._split_text_intelligently = Mock(side_effect=lambda text: text.split("|"))
+        results = service.generate_batch(["chunk 0|chunk 1", "", "chunk 2", "chunk x"], "af_bella", 1.0)
+        
+        pause = int(service.CHUNK_PAUSE_SECONDS * 22050)
+        audio, sample_rate = results[0]
+        assert sample_rate == 22050
+        assert len(audio) == 4 + pause + 4
+        assert isinstance(results[1], ValueError)
+        assert results[2][0].tolist() == [3.0] * 4
+        assert isinstance(results[3], RuntimeError)
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.unit
+class TestSessionProfile:
+    """Tests for ONNX Runtime session profiles and warmup."""
+    
+    def test_build_options(self):
+        """Profile values map onto ONNX Runtime session options."""
+        import onnxruntime as rt
+        from session_profile import SessionProfile
+        profile = SessionProfile(
+            intra_op_threads=3,
+            inter_op_threads=2,
+            execution_mode="parallel",
+            graph_optimization="extended",
+            enable_cpu_mem_arena=False,
+            enable_mem_pattern=False
+        )
+        options = profile.build_options()
+        assert options.intra_op_num_threads == 3
+        assert options.inter_op_num_threads == 2
+        assert options.execution_mode == rt.ExecutionMode.ORT_PARALLEL
+        assert options.graph_optimization_level == rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        assert options.enable_cpu_mem_arena is False
+        assert options.enable_mem_pattern is False
+        
+        # Loading an already-optimised graph skips optimisation
+        loaded = profile.build_options(intra_op_threads=1, load_optimized=True)
+        assert loaded.intra_op_num_threads == 1
+        assert loaded.graph_optimization_level == rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+    
+    def test_invalid_values_rejected(self):
+        """Unknown execution modes and optimisation levels are rejected."""
+        from session_profile import SessionProfile
+        with pytest.raises(ValueError):
+            SessionProfile(execution_mode="turbo")
+        with pytest.raises(ValueError):
+            SessionProfile(graph_optimization="max")
+    
+    def test_from_settings_divides_cores(self):
+        """Without an explicit thread count, cores are split across workers and sessions."""
+        from types import SimpleNamespace
+        from session_profile import SessionProfile
+        settings = SimpleNamespace(
+            TTS_INTRA_OP_THREADS=0, TTS_INTER_OP_THREADS=0, WORKERS=2,
+            TTS_EXECUTION_MODE="sequential", TTS_GRAPH_OPTIMIZATION="all",
+            TTS_OPTIMIZED_MODEL_DIR="", TTS_CPU_MEM_ARENA=True, TTS_MEM_PATTERN=True
+        )
+        with patch('session_profile.os.cpu_count', return_value=16):
+            profile = SessionProfile.from_settings(settings, sessions_per_process=4)
+        assert profile.intra_op_threads == 2
+        assert profile.optimized_model_dir is None
+    
+    def test_optimized_model_cache(self, tmp_path):
+        """The optimised graph is written once and reused on the next start."""
+        from session_profile import SessionProfile
+        model_path = tmp_path / "model.onnx"
+        model_path.write_bytes(b"model")
+        loaded = []
+        
+        def fake_session(path, sess_options=None, providers=None):
+            loaded.append(path)
+            if sess_options.optimized_model_filepath:
+                with open(sess_options.optimized_model_filepath, "wb") as f:
+                    f.write(b"optimized")
+            return Mock()
+        
+        profile = SessionProfile(optimized_model_dir=str(tmp_path / "onnx"))
+        with patch('onnxruntime.InferenceSession', side_effect=fake_session):
+            profile.create_session(str(model_path), "model.onnx:5:1")
+            profile.create_session(str(model_path), "model.onnx:5:1")
+            profile.create_session(str(model_path), "model.onnx:6:2")
+        
+        cached = profile.optimized_model_path(str(model_path), "model.onnx:5:1")
+        assert loaded[0] == str(model_path)
+        assert loaded[1] == cached
+        # A different model version never reuses the old optimised graph
+        assert loaded[2] == str(model_path)
+        assert len(list((tmp_path / "onnx").glob("*.optimized.onnx"))) == 2
+    
+    @patch('tts_service.Kokoro')
+    def test_warmup_renders_every_voice_on_every_session(self, mock_kokoro):
+        """Warmup touches each session with each voice and marks the service warm."""
+        service = _make_parallel_service(workers=2)
+        try:
+            sessions = [Mock(), Mock()]
+            service._sessions = sessions
+            assert service.warmed_up is False
+            summary = service.warmup(voices=["af_bella", "af_sarah"])
+            
+            per_session = len(service.WARMUP_TEXTS) + 1
+            assert summary["renders"] == 2 * per_session
+            for session in sessions:
+                assert session.create.call_count == per_session
+                voices_used = {c.kwargs["voice"] for c in session.create.call_args_list}
+                assert voices_used == {"af_bella", "af_sarah"}
+            assert service.warmed_up is True
+        finally:
+            service.shutdown()
+
+
+@pytest.mark.unit
+class TestAudioEncoding:
+    """Unit tests for compressed output formats and negotiation."""
+    
+    @pytest.mark.parametrize("audio_format,subtype", [
+        ("wav", "PCM_16"), ("flac", "PCM_16"), ("opus", "OPUS"), ("mp3", "MPEG_LAYER_III")
+    ])
+    def test_encode_round_trip(self, audio_format, subtype):
+        """Every output format decodes back to the requested rate and length."""
+        import io
+        import numpy as np
+        import soundfile as sf
+        from audio_encoding import encode_audio
+        
+        audio = (0.3 * np.sin(np.arange(24000) / 10.0)).astype(np.float32)
+        encoded = encode_audio(audio, 24000, audio_format, sample_rate=16000)
+        info = sf.info(io.BytesIO(encoded))
+        assert info.samplerate == 16000
+        assert info.subtype == subtype
+        if audio_format in ("wav", "flac"):
+            assert info.frames == 16000
+    
+    def test_compressed_formats_are_smaller_than_wav(self):
+        """Lossy formats cut the payload several-fold."""
+        import numpy as np
+        from audio_encoding import encode_audio
+        
+        audio = (0.3 * np.sin(np.arange(48000) / 10.0)).astype(np.float32)
+        wav = encode_audio(audio, 24000, "wav")
+        assert len(encode_audio(audio, 24000, "opus")) * 4 < len(wav)
+        assert len(encode_audio(audio, 24000, "mp3")) * 4 < len(wav)
+    
+    def test_opus_encoder_streams_pages(self):
+        """Opus output is sent as segments are written, not only on close."""
+        import io
+        import numpy as np
+        import soundfile as sf
+        from audio_encoding import AudioEncoder
+        
+        encoder = AudioEncoder("opus", 24000)
+        segment = (0.3 * np.sin(np.arange(24000) / 10.0)).astype(np.float32)
+        parts = [encoder.write(segment) for _ in range(3)]
+        parts.append(encoder.close())
+        assert all(parts[:3])
+        assert sf.info(io.BytesIO(b"".join(parts))).frames == 72000
+    
+    def test_negotiate_format(self):
+        """Explicit format wins; otherwise the best Accept entry, else the default."""
+        from audio_encoding import negotiate_format, validate_output_options
+        
+        assert negotiate_format("FLAC", "audio/mpeg", "wav") == "flac"
+        assert negotiate_format(None, "audio/mpeg;q=0.5, audio/ogg; codecs=opus", "wav") == "opus"
+        assert negotiate_format(None, "audio/ogg; codecs=vorbis, audio/flac;q=0.1", "wav") == "flac"
+        assert negotiate_format(None, "*/*", "wav") == "wav"
+        assert negotiate_format(None, None, "mp3") == "mp3"
+        with pytest.raises(ValueError):
+            negotiate_format("aac", None, "wav")
+        with pytest.raises(ValueError):
+            validate_output_options("opus", 22050, None)
+        with pytest.raises(ValueError):
+            validate_output_options("mp3", None, 24)
+    
+    def test_resample_uses_polyphase_ratio(self):
+        """Resampling preserves duration for integer-ratio rate changes."""
+        import numpy as np
+        from audio_encoding import resample
+        
+        audio = np.random.default_rng(0).uniform(-0.5, 0.5, 24000).astype(np.float32)
+        assert len(resample(audio, 24000, 16000)) == 16000
+        assert len(resample(audio, 24000, 44100)) == 44100
+        assert resample(audio, 24000, 24000) is audio
+
+
+class _LargeChunkKokoro:
+    """Stand-in for a Kokoro session that returns long, distinct chunks."""
+    
+    def __init__(self, samples: int):
+        self.samples = samples
+    
+    def create(self, text, voice, speed, lang):
+        import numpy as np
+        value = (float(text.split()[-1]) + 1) / 100.0
+        return np.full(self.samples, value, dtype=np.float32), 24000
+
+
+@pytest.mark.unit
+class TestWavAssembly:
+    """Tests for the pre-sized WAV assembly path."""
+    
+    def test_assemble_wav_places_segments_and_pauses(self):
+        """Segments land at their offsets with zeroed pauses between them."""
+        import io
+        import numpy as np
+        import soundfile as sf
+        from audio_encoding import assemble_wav
+        
+        wav = assemble_wav([np.full(3, 0.5, dtype=np.float32), np.array([-1.0, 2.0])], 16000, pause_samples=2)
+        assert isinstance(wav, memoryview)
+        samples, sample_rate = sf.read(io.BytesIO(wav), dtype="int16")
+        assert sample_rate == 16000
+        assert samples.tolist() == [16383, 16383, 16383, 0, 0, -32767, 32767]
+    
+    def test_generate_wav_matches_generate_audio(self):
+        """The WAV path produces the same PCM as encoding generate_audio()."""
+        from audio_encoding import float_to_pcm16
+        
+        service = _make_parallel_service(workers=1)
+        service.kokoro = _LargeChunkKokoro(1000)
+        service._split_text_intelligently = Mock(return_value=[f"chunk {i}" for i in range(3)])
+        try:
+            audio, sample_rate = service.generate_audio("long text", "af_bella", 1.0)
+            wav, wav_rate = service.generate_wav("long text", "af_bella", 1.0)
+        finally:
+            service.shutdown()
+        
+        assert wav_rate == sample_rate == 24000
+        assert len(audio) == 3 * 1000 + 2 * int(service.CHUNK_PAUSE_SECONDS * 24000)
+        assert bytes(wav[44:]) == float_to_pcm16(audio)
+
+
+@pytest.mark.performance
+def test_wav_assembly_peak_memory():
+    """Benchmark: peak allocations of the WAV path vs concatenate + sf.write."""
+    import io
+    import tracemalloc
+    import soundfile as sf
+    
+    chunk_count, samples = 8, 1_000_000  # ~5.5 minutes of 24 kHz audio
+    service = _make_parallel_service(workers=1)
+    service.kokoro = _LargeChunkKokoro(samples)
+    service._split_text_intelligently = Mock(return_value=[f"chunk {i}" for i in range(chunk_count)])
+    
+    def legacy():
+        audio, sample_rate = service.generate_audio("long text", "af_bella", 1.0)
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, sample_rate, format='WAV')
+        return buffer.getvalue()
+    
+    def presized():
+        return service.generate_wav("long text", "af_bella", 1.0)[0]
+    
+    peaks = {}
+    try:
+        for name, path in (("legacy", legacy), ("presized", presized)):
+            tracemalloc.start()
+            result = path()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            output_bytes = len(result)
+            del result
+    finally:
+        service.shutdown()
+    
+    output_mb = output_bytes / 2**20
+    print(f"\nWAV of {output_mb:.1f} MB: legacy peak {peaks['legacy'] / 2**20:.1f} MB, "
+          f"pre-sized peak {peaks['presized'] / 2**20:.1f} MB")
+    assert peaks["presized"] < peaks["legacy"] * 0.6
+
+
+def _write_registry(tmp_path, voices):
+    from convert_voices import write_voice_packs
+    data_path, index_path = str(tmp_path / "voices.f32"), str(tmp_path / "voices.index.json")
+    write_voice_packs(voices, data_path, index_path)
+    return data_path, index_path
+
+
+@pytest.mark.unit
+class TestVoiceRegistry:
+    """Tests for the memory-mapped voice registry."""
+    
+    def test_convert_and_map_voice_packs(self, tmp_path):
+        """Converted voices.json round-trips through the mapped file with metadata."""
+        import json
+        import numpy as np
+        from convert_voices import convert_voice_packs
+        from voice_registry import VoiceRegistry
+        
+        styles = {
+            "af_bella": np.arange(24, dtype=np.float32).reshape(3, 1, 8),
+            "bm_george": -np.arange(24, dtype=np.float32).reshape(3, 1, 8),
+        }
+        source = tmp_path / "voices.json"
+        source.write_text(json.dumps({name: style.tolist() for name, style in styles.items()}))
+        data_path, index_path = str(tmp_path / "voices.f32"), str(tmp_path / "voices.index.json")
+        convert_voice_packs(str(source), data_path, index_path)
+        
+        registry = VoiceRegistry(data_path, index_path)
+        assert registry.get_voices() == ["af_bella", "bm_george"]
+        assert registry.get_metadata("bm_george")["language"] == "en-gb"
+        assert registry.get_metadata("bm_george")["gender"] == "male"
+        style = registry.get_style("bm_george")
+        assert isinstance(style, np.memmap)
+        assert np.array_equal(style, styles["bm_george"])
+        # Kokoro reads voice names from its voices file, and the index is keyed by name
+        assert list(json.load(open(index_path))) == ["af_bella", "bm_george"]
+    
+    def test_hot_reload_picks_up_new_voices(self, tmp_path):
+        """A rewritten index is loaded on the next check; lookups never hit disk in between."""
+        import numpy as np
+        from voice_registry import VoiceRegistry
+        
+        data_path, index_path = _write_registry(tmp_path, {"af_bella": np.zeros((2, 1, 4))})
+        registry = VoiceRegistry(data_path, index_path, reload_interval=3600)
+        _write_registry(tmp_path, {"af_bella": np.zeros((2, 1, 4)), "af_sky": np.ones((2, 1, 4))})
+        
+        with patch('voice_registry.os.stat') as mock_stat:
+            assert "af_sky" not in registry
+            mock_stat.assert_not_called()
+        
+        registry._next_check = 0.0
+        assert "af_sky" in registry
+        assert registry.reloads == 1
+        assert registry.get_style("af_sky").sum() == 8
+    
+    def test_inconsistent_update_keeps_previous_mapping(self, tmp_path):
+        """An index pointing past the data file is ignored until it is fixed."""
+        import json
+        import numpy as np
+        from voice_registry import VoiceRegistry
+        
+        data_path, index_path = _write_registry(tmp_path, {"af_bella": np.ones((2, 1, 4))})
+        registry = VoiceRegistry(data_path, index_path, reload_interval=1)
+        with open(index_path, "w") as f:
+            json.dump({"af_bella": {"offset": 100, "shape": [2, 1, 4]}}, f)
+        
+        registry._next_check = 0.0
+        assert registry.refresh() is False
+        assert registry.get_style("af_bella").sum() == 8
+    
+    @patch('tts_service.Kokoro')
+    def test_service_uses_registry_styles(self, mock_kokoro, tmp_path):
+        """The service renders with mapped style arrays and lists voices from memory."""
+        import numpy as np
+        from voice_registry import VoiceRegistry
+        
+        data_path, index_path = _write_registry(tmp_path, {"af_bella": np.full((2, 1, 4), 0.5)})
+        registry = VoiceRegistry(data_path, index_path)
+        model_path = tmp_path / "model.onnx"
+        model_path.write_bytes(b"onnx")
+        mock_kokoro.return_value.create.return_value = (np.zeros(10, dtype=np.float32), 24000)
+        
+        service = TTSService(model_path=str(model_path), voices_path=index_path, voice_registry=registry)
+        assert service.get_voices() == ["af_bella"]
+        service.generate_audio("Hello.", "af_bella", 1.0)
+        
+        style = mock_kokoro.return_value.create.call_args.kwargs["voice"]
+        assert isinstance(style, np.ndarray) and style.shape == (2, 1, 4)
+
+
+@pytest.fixture
+def tts_sidecar():
+    """A sidecar serving a two-session stub service on a temporary socket."""
+    import shutil
+    import tempfile
+    from tts_sidecar import TTSSidecarServer
+    
+    # Unix socket paths are limited to ~100 characters, so avoid pytest's long tmp_path
+    socket_dir = tempfile.mkdtemp(prefix="tts-")
+    service = _make_parallel_service(workers=2, delay=0.01)
+    server = TTSSidecarServer(service, os.path.join(socket_dir, "tts.sock"))
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+        service.shutdown()
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def _wait_for_requests(server, count: int, timeout: float = 2.0):
+    """The sidecar frees a block after the client returns; wait for it to finish."""
+    import time
+    deadline = time.monotonic() + timeout
+    while server.get_stats()["requests"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return server.get_stats()["requests"]
+
+
+@pytest.mark.unit
+class TestTTSSidecar:
+    """Tests for the out-of-process inference sidecar and TTSService client mode."""
+    
+    def test_create_returns_audio_through_shared_memory(self, tts_sidecar):
+        """Audio comes back intact and the shared block is freed afterwards."""
+        from multiprocessing import shared_memory
+        from tts_sidecar import TTSSidecarClient
+        
+        client = TTSSidecarClient(tts_sidecar.socket_path)
+        created = []
+        original = shared_memory.SharedMemory.__init__
+        
+        def track(self, name=None, create=False, size=0, **kwargs):
+            original(self, name, create, size, **kwargs)
+            created.append(self.name)
+        
+        with patch.object(shared_memory.SharedMemory, '__init__', track):
+            audio, sample_rate = client.create("chunk 6", voice="af_bella", speed=1.0, lang="en-us")
+        
+        assert sample_rate == 22050
+        assert audio.tolist() == [7.0] * 4
+        assert created
+        assert _wait_for_requests(tts_sidecar, 1) == 1
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=created[0])
+    
+    def test_render_errors_are_raised_in_the_client(self, tts_sidecar):
+        """A failed render is reported to the client without closing the sidecar."""
+        from tts_sidecar import TTSSidecarClient
+        
+        client = TTSSidecarClient(tts_sidecar.socket_path)
+        with pytest.raises(RuntimeError, match="oops"):
+            client.create("chunk oops", voice="af_bella")
+        assert client.create("chunk 1", voice="af_bella")[0].tolist() == [2.0] * 4
+        assert tts_sidecar.get_stats()["errors"] == 1
+    
+    def test_client_mode_service_renders_in_the_sidecar(self, tts_sidecar):
+        """A client-mode service loads no model and fans chunks out to the sidecar."""
+        from tts_sidecar import TTSSidecarClient
+        
+        service = TTSService.from_sidecar(TTSSidecarClient(tts_sidecar.socket_path))
+        try:
+            assert service.model_version == tts_sidecar.tts_service.model_version
+            assert service.parallel_workers == 2
+            assert service.get_voices() == tts_sidecar.tts_service.get_voices()
+            assert service.warmup()["renders"] == 0
+            
+            service._split_text_intelligently = Mock(return_value=[f"chunk {i}" for i in range(6)])
+            audio, sample_rate = service.generate_audio("long text", "af_bella", 1.0)
+            values = [v for v in dict.fromkeys(audio.tolist()) if v != 0.0]
+            assert values == [float(i) for i in range(1, 7)]
+            assert _wait_for_requests(tts_sidecar, 6) == 6
+        finally:
+            service.shutdown()
+    
+    def test_unreachable_sidecar(self):
+        """Waiting for a sidecar that never starts fails with ConnectionError."""
+        from tts_sidecar import TTSSidecarClient
+        
+        client = TTSSidecarClient("/tmp/no-such-tts-sidecar.sock")
+        with pytest.raises(ConnectionError):
+            client.wait_until_ready(timeout=0.2, interval=0.05)
+
+    
+    def test_client_mode_waits_for_a_starting_sidecar(self):
+        """A client created before the sidecar is up connects once it reports ready."""
+        import shutil
+        import tempfile
+        from tts_sidecar import TTSSidecarClient, TTSSidecarServer
+        
+        socket_dir = tempfile.mkdtemp(prefix="tts-")
+        socket_path = os.path.join(socket_dir, "tts.sock")
+        backend = _make_parallel_service(workers=2, delay=0.01)
+        server = TTSSidecarServer(backend, socket_path, ready=False)
+        service = TTSService.from_sidecar(TTSSidecarClient(socket_path))
+        try:
+            assert service.model_version is None and service.parallel_workers == 1
+            
+            server.start()
+            assert service.sidecar.get_info()["ready"] is False
+            with pytest.raises(ConnectionError, match="warming up"):
+                service.warmup(sidecar_timeout=0.2)
+            
+            server.ready = True
+            assert service.warmup(sidecar_timeout=2)["sessions"] == 2
+            assert service.model_version == backend.model_version
+            assert service.parallel_workers == 2
+        finally:
+            service.shutdown()
+            server.stop()
+            backend.shutdown()
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+class _CountingTokenizer:
+    """Stand-in for Kokoro's tokenizer that records which sentences it phonemized."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def phonemize(self, text, lang="en-us"):
+        self.calls.append(text)
+        return f"/{text.lower()}/"
+
+
+@pytest.mark.unit
+@pytest.mark.cache
+class TestTextFrontend:
+    """Tests for sentence splitting and the phoneme cache."""
+    
+    def test_split_sentences(self):
+        """Sentences break after terminal punctuation followed by a capital."""
+        from text_frontend import split_sentences
+        assert split_sentences("Hi there. How are you?  Fine.") == ["Hi there.", "How are you?", "Fine."]
+        assert split_sentences("e.g. this stays whole") == ["e.g. this stays whole"]
+    
+    def test_repeated_chunks_skip_g2p(self):
+        """Only chunks that were never seen are phonemized, whole."""
+        from text_frontend import TextFrontend
+        tokenizer = _CountingTokenizer()
+        frontend = TextFrontend()
+        
+        first = frontend.phonemize("Welcome back. Let's begin.", tokenizer)
+        second = frontend.phonemize("Welcome back. Let's begin.", tokenizer)
+        
+        assert first == second == "/welcome back. let's begin./"
+        assert tokenizer.calls == ["Welcome back. Let's begin."]
+        assert frontend.get_stats()["hits"] == 1
+    
+    def test_matches_kokoro_tokenizer(self):
+        """Cached phonemes equal Kokoro's own G2P, including abbreviations before a name."""
+        tokenizer_module = pytest.importorskip("kokoro_onnx.tokenizer")
+        from text_frontend import TextFrontend
+        try:
+            tokenizer = tokenizer_module.Tokenizer()
+            expected = tokenizer.phonemize("Dr. Smith went home. Mr. Jones stayed.", "en-us")
+        except Exception as e:
+            pytest.skip(f"espeak not available: {e}")
+        frontend = TextFrontend()
+        for _ in range(2):
+            assert frontend.phonemize("Dr. Smith went home. Mr. Jones stayed.", tokenizer) == expected
+        assert "dˈɑːktɚ smˈɪθ" in expected
+    
+    def test_sqlite_tier_across_threads(self, tmp_path):
+        """Each thread uses its own SQLite connection to the shared file."""
+        import threading
+        from text_frontend import PhonemeCache
+        cache = PhonemeCache(path=str(tmp_path / "g2p.db"))
+        
+        def work(i):
+            cache.set(f"key{i}", f"value{i}")
+        
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reopened = PhonemeCache(path=str(tmp_path / "g2p.db"))
+        assert [reopened.get(f"key{i}") for i in range(8)] == [f"value{i}" for i in range(8)]
+    
+    def test_memory_tier_is_bounded(self):
+        """The least recently used sentence is evicted first."""
+        from text_frontend import PhonemeCache
+        cache = PhonemeCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1" and cache.get("c") == "3"
+    
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        """A new cache on the same file serves earlier entries."""
+        from text_frontend import PhonemeCache, TextFrontend
+        path = str(tmp_path / "g2p.db")
+        TextFrontend(PhonemeCache(path=path)).phonemize("Good morning.", _CountingTokenizer())
+        
+        tokenizer = _CountingTokenizer()
+        assert TextFrontend(PhonemeCache(path=path)).phonemize("Good morning.", tokenizer) == "/good morning./"
+        assert tokenizer.calls == []
+    
+    @patch('tts_service.Kokoro')
+    def test_service_passes_cached_phonemes(self, mock_kokoro, tmp_path):
+        """With a front-end, Kokoro receives phonemes and G2P runs once per chunk."""
+        import numpy as np
+        from text_frontend import TextFrontend
+        
+        model_path = tmp_path / "model.onnx"
+        model_path.write_bytes(b"onnx")
+        voices_path = tmp_path / "voices.json"
+        voices_path.write_text('{"af_bella": {}}')
+        kokoro = mock_kokoro.return_value
+        kokoro.tokenizer = _CountingTokenizer()
+        kokoro.create.return_value = (np.zeros(10, dtype=np.float32), 24000)
+        
+        service = TTSService(model_path=str(model_path), voices_path=str(voices_path), text_frontend=TextFrontend())
+        service.generate_audio("Hello there.", "af_bella", 1.0)
+        service.generate_audio("Hello there.", "af_bella", 1.0)
+        
+        assert kokoro.tokenizer.calls == ["Hello there."]
+        assert kokoro.create.call_args.args == ("/hello there./",)
+        assert kokoro.create.call_args.kwargs["is_phonemes"] is True
+    
+    @patch('tts_service.Kokoro')
+    def test_phoneme_call_matches_kokoro_signature(self, mock_kokoro, tmp_path):
+        """The phoneme call is accepted by the installed Kokoro.create."""
+        from unittest.mock import create_autospec
+        import numpy as np
+        from text_frontend import TextFrontend
+        kokoro_onnx = pytest.importorskip("kokoro_onnx")
+        
+        model_path = tmp_path / "model.onnx"
+        model_path.write_bytes(b"onnx")
+        voices_path = tmp_path / "voices.json"
+        voices_path.write_text('{"af_bella": {}}')
+        # Calls that do not fit the real signature raise TypeError
+        kokoro = create_autospec(kokoro_onnx.Kokoro, instance=True)
+        kokoro.tokenizer = _CountingTokenizer()
+        kokoro.create.return_value = (np.zeros(10, dtype=np.float32), 24000)
+        mock_kokoro.return_value = kokoro
+        
+        service = TTSService(model_path=str(model_path), voices_path=str(voices_path), text_frontend=TextFrontend())
+        audio, sample_rate = service.generate_audio("Hello there.", "af_bella", 1.0)
+        
+        assert sample_rate == 24000
+        kokoro.create.assert_called_once()
@@ -0,0 +1,241 @@
+"""
+Text front-end for the TTS pipeline.
+
+Splits text into sentences with precompiled patterns and turns each TTS
+chunk into phonemes through a bounded LRU cache (optionally persisted to
+SQLite), so that phrases the service speaks over and over, such as
+conversation openers and curated writing titles, skip grapheme-to-phoneme
+conversion entirely. The phoneme string is passed straight to Kokoro's
+create(phonemes=...).
+
+Chunks are phonemized whole, exactly as Kokoro would: its normalization
+expands abbreviations such as "Dr." using the following word, so splitting
+a chunk into sentences first would change the audio.
+"""
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+# Sentence endings (. ! ?) followed by whitespace and a capital, or by the end of the text
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])|(?<=[.!?])\s*$")
+_WHITESPACE_RE = re.compile(r"\s+")
+# In streamed text a sentence is only known to be complete once the next one starts
+STREAM_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+_CLAUSE_BREAK_RE = re.compile(r"[,;:]\s+|\s+")
+
+
+def normalize_sentence(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences (the whole text if there is no break)"""
+    sentences = [s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+    return sentences if sentences else [text]
+
+
+class SentenceBuffer:
+    """
+    Releases complete sentences from text that arrives in pieces (LLM tokens).
+    
+    A sentence is released as soon as the next one starts, by the same rule
+    as split_sentences(). Sentences shorter than min_chars are held and
+    joined to the next one, so "Dr." or "Yes!" are not voiced on their own.
+    Text running past max_chars without a sentence break is released at the
+    last clause break or space.
+    """
+    
+    def __init__(self, min_chars: int = 20, max_chars: int = 300):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._text = ""
+    
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences it completed"""
+        self._text += text
+        sentences = []
+        start = 0
+        for match in STREAM_BOUNDARY_RE.finditer(self._text):
+            sentence = self._text[start:match.start()].strip()
+            if len(sentence) >= self.min_chars:
+                sentences.append(sentence)
+                start = match.end()
+        self._text = self._text[start:]
+        while len(self._text) > self.max_chars:
+            cut = self.max_chars
+            for match in _CLAUSE_BREAK_RE.finditer(self._text, 0, self.max_chars):
+                cut = match.end()
+            sentence = self._text[:cut].strip()
+            if sentence:
+                sentences.append(sentence)
+            self._text = self._text[cut:]
+        return sentences
+    
+    def flush(self) -> List[str]:
+        """The rest of the text once the stream has ended"""
+        text, self._text = self._text.strip(), ""
+        return [text] if text else []
+
+
+class PhonemeCache:
+    """LRU of (language, text) -> phoneme string with an optional SQLite tier"""
+
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Entries kept in memory
+            path: SQLite file that persists entries across restarts and
+                workers (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Connections are per thread and per process: the cache is built before
+        # gunicorn forks its workers, and a connection must not cross a fork
+        self._local = threading.local()
+        self._inherited: List[sqlite3.Connection] = []
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            try:
+                db.execute("CREATE TABLE IF NOT EXISTS phonemes (key TEXT PRIMARY KEY, phonemes TEXT NOT NULL)")
+                db.commit()
+            finally:
+                db.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection in this process, opened on first use"""
+        if not self.path:
+            return None
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            inherited = getattr(self._local, "db", None)
+            if inherited is not None:
+                # Closing the parent's connection could touch its WAL; keep it unused
+                with self.lock:
+                    self._inherited.append(inherited)
+            self._local.db = self._connect()
+            self._local.pid = pid
+        return self._local.db
+
+    @staticmethod
+    def make_key(text: str, lang: str) -> str:
+        return f"{lang}\x1f{text}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached phonemes, checking memory first and then the SQLite tier"""
+        with self.lock:
+            phonemes = self._entries.get(key)
+            if phonemes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return phonemes
+
+        row = None
+        db = self._connection()
+        if db is not None:
+            try:
+                row = db.execute("SELECT phonemes FROM phonemes WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                row = None
+
+        with self.lock:
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, phonemes: str):
+        """Store phonemes for a text"""
+        with self.lock:
+            self._remember(key, phonemes)
+        db = self._connection()
+        if db is not None:
+            try:
+                db.execute("INSERT OR REPLACE INTO phonemes (key, phonemes) VALUES (?, ?)", (key, phonemes))
+                db.commit()
+            except sqlite3.Error:
+                # Persistence is an optimisation only; the memory tier still has it
+                pass
+
+    def _remember(self, key: str, phonemes: str):
+        """Insert into the memory tier, evicting least recently used entries (lock held)"""
+        self._entries[key] = phonemes
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Clear both tiers"""
+        with self.lock:
+            self._entries.clear()
+        db = self._connection()
+        if db is not None:
+            db.execute("DELETE FROM phonemes")
+            db.commit()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "path": self.path,
+            }
+
+
+class TextFrontend:
+    """Sentence splitting and cached grapheme-to-phoneme conversion"""
+
+    def __init__(self, cache: Optional[PhonemeCache] = None):
+        self.cache = cache if cache is not None else PhonemeCache()
+
+    def phonemize(self, text: str, tokenizer, lang: str = "en-us") -> str:
+        """
+        Phonemize a TTS chunk, converting it only if it is not cached.
+
+        Args:
+            text: Text of one TTS chunk
+            tokenizer: Object with Kokoro's phonemize(text, lang) method, used for misses
+            lang: Language code
+
+        Returns:
+            Phoneme string for the whole text, identical to tokenizer.phonemize(text, lang)
+        """
+        key = self.cache.make_key(text, lang)
+        phonemes = self.cache.get(key)
+        if phonemes is None:
+            phonemes = tokenizer.phonemize(text, lang)
+            self.cache.set(key, phonemes)
+        return phonemes
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["TextFrontend"]:
+        """Build the front-end configured in application settings (None when disabled)"""
+        if not settings.TTS_G2P_CACHE_ENABLED:
+            return None
+        return cls(PhonemeCache(settings.TTS_G2P_CACHE_SIZE, settings.TTS_G2P_CACHE_PATH or None))
+
+    def get_stats(self) -> dict:
+        return self.cache.get_stats()
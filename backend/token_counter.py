@@ -0,0 +1,72 @@
+"""
+Token counting for chat prompts.
+
+Uses the model's tiktoken encoding when tiktoken is installed and the
+encoding can be loaded (it is downloaded on first use); otherwise falls back
+to an estimate of one token per four characters, which is close enough for
+budgeting English prompts.
+"""
+import math
+import threading
+from typing import Dict, List
+
+from loguru import logger
+
+# Try to import tiktoken (optional, for exact counts)
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# Each chat message costs a few tokens on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+
+
+class TokenCounter:
+    """Counts the tokens of texts and chat messages for one model"""
+
+    def __init__(self, model: str = "gpt-4o-mini"):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self.lock = threading.Lock()
+
+    def _get_encoding(self):
+        """The model's encoding, loaded on first use (None = estimate)"""
+        if not self._loaded:
+            with self.lock:
+                if not self._loaded:
+                    if HAS_TIKTOKEN:
+                        try:
+                            try:
+                                self._encoding = tiktoken.encoding_for_model(self.model)
+                            except KeyError:
+                                self._encoding = tiktoken.get_encoding("o200k_base")
+                        except Exception as e:
+                            logger.warning(f"Could not load tiktoken encoding for {self.model}, estimating tokens: {e}")
+                    self._loaded = True
+        return self._encoding
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's tokenizer"""
+        return self._get_encoding() is not None
+
+    def count(self, text: str) -> int:
+        """Tokens in a text"""
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding is None:
+            return math.ceil(len(text) / CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        """Tokens a chat message adds to a prompt"""
+        return self.count(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Tokens of a whole chat prompt"""
+        return sum(self.count_message(message) for message in messages)
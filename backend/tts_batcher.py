@@ -0,0 +1,186 @@
+"""
+Micro-batching scheduler for short TTS requests.
+
+Conversation turns and prompt read-outs are short utterances that often arrive
+at the same time. Instead of each request rendering on its own, requests are
+collected for a few milliseconds, grouped by voice and speed, and rendered
+together with TTSService.generate_batch() on a dedicated thread. Async callers
+await the result, so the event loop is never blocked by synthesis.
+
+The Kokoro ONNX export runs with a batch dimension of 1 and does not output
+per-token durations, so padded outputs could not be split back per request.
+A "batch" is therefore one scheduling unit that shares a voice and speed and
+is spread over the session pool, not a single padded inference call.
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tts_service import TTSService
+
+
+class _PendingRequest:
+    """A queued synthesis request"""
+
+    __slots__ = ("text", "voice", "speed", "future", "enqueued_at")
+
+    def __init__(self, text: str, voice: str, speed: float):
+        self.text = text
+        self.voice = voice
+        self.speed = speed
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class TTSMicroBatcher:
+    """Collects concurrent short TTS requests and renders them in batches"""
+
+    def __init__(
+        self,
+        tts_service: TTSService,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 8,
+        max_history: int = 1000
+    ):
+        self.tts_service = tts_service
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.queue: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.stats_lock = threading.Lock()
+        self.batch_count = 0
+        self.request_count = 0
+        self.batch_sizes: deque = deque(maxlen=max_history)
+        self.queue_waits: deque = deque(maxlen=max_history)
+        self.batch_size_histogram: Dict[int, int] = defaultdict(int)
+
+    def start(self):
+        """Start the batching thread"""
+        with self.lock:
+            if self.running:
+                return
+
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="tts-batcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop the batching thread, failing any requests still queued"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            self.queue.put(None)
+            if self.thread:
+                self.thread.join(timeout=5)
+
+        while True:
+            try:
+                request = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None and not request.future.done():
+                request.future.set_exception(RuntimeError("TTS batcher stopped"))
+
+    def submit(self, text: str, voice: str, speed: float) -> Future:
+        """
+        Queue a request for the next batch.
+
+        Returns:
+            Future resolving to (audio_data, sample_rate)
+        """
+        if not self.running:
+            self.start()
+        request = _PendingRequest(text, voice, speed)
+        self.queue.put(request)
+        return request.future
+
+    async def generate_audio(self, text: str, voice: str, speed: float) -> Tuple[np.ndarray, int]:
+        """Async equivalent of TTSService.generate_audio() routed through the batcher"""
+        return await asyncio.wrap_future(self.submit(text, voice, speed))
+
+    def _collect_batch(self, first: _PendingRequest) -> List[_PendingRequest]:
+        """Gather requests arriving within the batch window after the first one"""
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                # Stop signal: finish this batch, then exit
+                self.running = False
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        """Main batching loop"""
+        while self.running:
+            first = self.queue.get()
+            if first is None:
+                break
+
+            batch = self._collect_batch(first)
+            started = time.perf_counter()
+
+            groups: Dict[Tuple[str, float], List[_PendingRequest]] = defaultdict(list)
+            for request in batch:
+                groups[(request.voice, request.speed)].append(request)
+
+            for (voice, speed), requests in groups.items():
+                try:
+                    results = self.tts_service.generate_batch(
+                        [request.text for request in requests], voice, speed
+                    )
+                except Exception as e:
+                    results = [e] * len(requests)
+
+                for request, result in zip(requests, results):
+                    if request.future.set_running_or_notify_cancel():
+                        if isinstance(result, Exception):
+                            request.future.set_exception(result)
+                        else:
+                            request.future.set_result(result)
+
+            with self.stats_lock:
+                self.batch_count += 1
+                self.request_count += len(batch)
+                self.batch_sizes.append(len(batch))
+                self.batch_size_histogram[len(batch)] += 1
+                for request in batch:
+                    self.queue_waits.append(started - request.enqueued_at)
+
+    def get_stats(self) -> Dict:
+        """Get batching metrics"""
+        with self.stats_lock:
+            waits = sorted(self.queue_waits)
+            sizes = list(self.batch_sizes)
+            p95_index = int(len(waits) * 0.95)
+            return {
+                "running": self.running,
+                "batch_window_ms": self.batch_window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": self.queue.qsize(),
+                "batches": self.batch_count,
+                "requests": self.request_count,
+                "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0,
+                "max_batch_size_seen": max(sizes) if sizes else 0,
+                "batch_size_histogram": dict(self.batch_size_histogram),
+                "avg_queue_wait_ms": (sum(waits) / len(waits) * 1000.0) if waits else 0,
+                "p95_queue_wait_ms": (waits[min(p95_index, len(waits) - 1)] * 1000.0) if waits else 0,
+            }
@@ -21,22 +21,60 @@ import soundfile as sf
 from kokoro_onnx import Kokoro
 import numpy as np
 import os
-import re
-from typing import List
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from audio_encoding import assemble_wav, resample, to_pcm16
+from audio_segment_cache import AudioSegmentCache
+from session_profile import SessionProfile
+from text_frontend import PARAGRAPH_SPLIT_RE, TextFrontend, split_sentences
+from voice_registry import VoiceRegistry
 
 class TTSService:
     # Optimal chunk size for Kokoro model (characters per chunk)
     # This balances quality and memory usage
     OPTIMAL_CHUNK_SIZE = 1000  # Characters per chunk
     MAX_CHUNK_SIZE = 2000  # Maximum safe chunk size
+    CHUNK_PAUSE_SECONDS = 0.2  # Silence inserted between chunks
+    # Representative utterances used to warm up sessions at startup
+    WARMUP_TEXTS = [
+        "Hello.",
+        "Welcome back. Let's pick up where we left off and read the next passage aloud.",
+    ]
     
-    def __init__(self, model_path="kokoro-v0_19.onnx", voices_path="voices.json"):
+    def __init__(
+        self,
+        model_path="kokoro-v0_19.onnx",
+        voices_path="voices.json",
+        parallel_workers: int = 1,
+        intra_op_threads: Optional[int] = None,
+        segment_cache: Optional[AudioSegmentCache] = None,
+        session_profile: Optional[SessionProfile] = None,
+        voice_registry: Optional[VoiceRegistry] = None,
+        text_frontend: Optional[TextFrontend] = None
+    ):
         """
         Initialize the TTS service.
         
         Args:
             model_path: Path to the Kokoro ONNX model file
             voices_path: Path to the voices JSON configuration file
+            parallel_workers: Number of ONNX sessions used to render chunks of
+                long texts in parallel. 1 disables parallel mode.
+            intra_op_threads: ONNX Runtime intra-op threads per session
+                (default: the session profile's value, or in parallel mode the
+                CPU count divided by parallel_workers)
+            segment_cache: Optional chunk-level audio cache. When set, only
+                chunks that are not already cached are rendered.
+            session_profile: Optional ONNX Runtime session settings. Without one,
+                sessions use ONNX Runtime defaults.
+            voice_registry: Optional memory-mapped voice registry. When set,
+                voice styles and the voice list come from it instead of the
+                voices file.
+            text_frontend: Optional text front-end. When set, chunks are
+                phonemized through its cache and Kokoro skips G2P.
             
         Raises:
             FileNotFoundError: If model or voices file doesn't exist
@@ -45,9 +83,192 @@ class TTSService:
             raise FileNotFoundError(f"Model file not found: {model_path}")
         if not os.path.exists(voices_path):
             raise FileNotFoundError(f"Voices file not found: {voices_path}")
-            
-        self.kokoro = Kokoro(model_path, voices_path)
+        
+        self._model_path = model_path
         self._voices_path = voices_path  # Store for get_voices()
+        self.segment_cache = segment_cache
+        self.voice_registry = voice_registry
+        self.text_frontend = text_frontend
+        self.session_profile = session_profile
+        self.sidecar = None
+        self.warmed_up = False
+        # Cached audio is only valid for the model that rendered it
+        model_stat = os.stat(model_path)
+        self.model_version = f"{os.path.basename(model_path)}:{model_stat.st_size}:{int(model_stat.st_mtime)}"
+        self.parallel_workers = max(1, int(parallel_workers or 1))
+        
+        if not intra_op_threads and session_profile:
+            intra_op_threads = session_profile.intra_op_threads
+        
+        if self.parallel_workers > 1:
+            # Each session gets its own slice of the cores so that sessions
+            # running side by side don't oversubscribe the CPU
+            if not intra_op_threads:
+                intra_op_threads = max(1, (os.cpu_count() or 1) // self.parallel_workers)
+            self.intra_op_threads = intra_op_threads
+            sessions = [self._create_kokoro(intra_op_threads) for _ in range(self.parallel_workers)]
+        else:
+            self.intra_op_threads = intra_op_threads
+            if session_profile:
+                sessions = [self._create_kokoro(intra_op_threads)]
+            else:
+                sessions = [Kokoro(model_path, voices_path)]
+        self._use_sessions(sessions)
+
+    @classmethod
+    def from_sidecar(cls, client, segment_cache: Optional[AudioSegmentCache] = None) -> "TTSService":
+        """
+        Create a TTS service in client mode, rendering in the inference sidecar.
+        
+        No model is loaded in this process. The sidecar client stands in for
+        the Kokoro sessions: chunking, the segment cache and audio assembly
+        still happen here, and parallel mode fans chunks out to as many
+        sidecar connections as the sidecar has sessions.
+        
+        The sidecar does not need to be up yet: until it answers, the
+        service has a single connection and no model version (so nothing is
+        cached), and warmup() waits for the sidecar to finish starting.
+        
+        Args:
+            client: tts_sidecar.TTSSidecarClient for the sidecar's socket
+            segment_cache: Optional chunk-level audio cache
+        """
+        service = cls.__new__(cls)
+        service._model_path = None
+        service._voices_path = None
+        service.sidecar = client
+        service.segment_cache = segment_cache
+        service.voice_registry = None  # The sidecar resolves voice names itself
+        service.text_frontend = None  # and phonemizes through its own front-end
+        service.session_profile = None
+        service.warmed_up = False
+        service.model_version = None
+        service.parallel_workers = 1
+        service.intra_op_threads = None
+        service._use_sessions([client])
+        try:
+            service._apply_sidecar_info(client.get_info())
+        except (OSError, ConnectionError):
+            pass
+        return service
+
+    def _apply_sidecar_info(self, info: dict):
+        """Adopt the sidecar's model version, readiness and pool size"""
+        self.model_version = info["model_version"]
+        self.warmed_up = bool(info.get("ready", True) and info.get("warmed_up"))
+        parallel_workers = max(1, int(info.get("parallel_workers") or 1))
+        if parallel_workers != self.parallel_workers:
+            self.parallel_workers = parallel_workers
+            # Renders already running on the old pool finish before it goes away
+            self.shutdown()
+            self._use_sessions([self.sidecar] * parallel_workers)
+
+    def _use_sessions(self, sessions: list):
+        """Serve renders from the given sessions, pooling them when there are several."""
+        self._sessions = sessions
+        self.kokoro = sessions[0]
+        self._session_pool = None
+        self._executor = None
+        if len(sessions) > 1:
+            self._session_pool = queue.Queue()
+            for session in sessions:
+                self._session_pool.put(session)
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(sessions),
+                thread_name_prefix="tts-session"
+            )
+
+    def _create_kokoro(self, intra_op_threads: Optional[int] = None) -> Kokoro:
+        """
+        Create a Kokoro instance backed by its own ONNX Runtime session.
+        
+        Args:
+            intra_op_threads: Intra-op thread budget for the session
+            
+        Returns:
+            Kokoro instance wrapping the new session
+        """
+        if self.session_profile:
+            session = self.session_profile.create_session(
+                self._model_path, self.model_version, intra_op_threads
+            )
+            return Kokoro.from_session(session, self._voices_path)
+        
+        import onnxruntime as rt
+        
+        options = rt.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        # Match Kokoro's own provider selection
+        providers = [os.getenv("ONNX_PROVIDER", "CPUExecutionProvider")]
+        session = rt.InferenceSession(self._model_path, sess_options=options, providers=providers)
+        return Kokoro.from_session(session, self._voices_path)
+
+    def warmup(
+        self,
+        voices: Optional[List[str]] = None,
+        texts: Optional[List[str]] = None,
+        sidecar_timeout: Optional[float] = None
+    ) -> dict:
+        """
+        Run representative utterances through every session before serving.
+        
+        The first inference on a session pays for memory arena growth and
+        kernel setup, and each voice's style vector is loaded on first use.
+        Every session renders the short utterance once per voice and the
+        longer utterances once, so none of that happens on a real request.
+        Warmup bypasses the segment cache.
+        
+        In client mode the sidecar warms its own sessions; this waits until
+        it reports its startup as complete.
+        
+        Args:
+            voices: Voices to warm (default: all available voices)
+            texts: Utterances to render; the first is used for every voice
+            sidecar_timeout: Seconds to wait for the sidecar (None = indefinitely)
+            
+        Returns:
+            dict: Summary with timings and the number of renders
+            
+        Raises:
+            ConnectionError: If the sidecar is not ready within sidecar_timeout
+        """
+        import time
+        
+        if self.sidecar is not None:
+            start = time.time()
+            self._apply_sidecar_info(self.sidecar.wait_until_ready(timeout=sidecar_timeout, require_ready=True))
+            return {
+                "sessions": self.parallel_workers,
+                "voices": 0,
+                "renders": 0,
+                "duration_seconds": time.time() - start,
+            }
+        
+        voices = voices or self.get_voices()
+        texts = texts or self.WARMUP_TEXTS
+        start = time.time()
+        renders = 0
+        
+        for kokoro in self._sessions:
+            for n, voice in enumerate(voices):
+                for text in (texts if n == 0 else texts[:1]):
+                    self._synthesize(kokoro, text, voice, 1.0)
+                    renders += 1
+        
+        self.warmed_up = True
+        return {
+            "sessions": len(self._sessions),
+            "voices": len(voices),
+            "renders": renders,
+            "duration_seconds": time.time() - start,
+        }
+
+    def shutdown(self):
+        """Stop the parallel rendering pool, if any."""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def _split_text_intelligently(self, text: str) -> List[str]:
         """
@@ -69,7 +290,7 @@ class TTSService:
         chunks = []
         
         # First, try to split by paragraphs (double newlines)
-        paragraphs = re.split(r'\n\s*\n', text)
+        paragraphs = PARAGRAPH_SPLIT_RE.split(text)
         
         current_chunk = ""
         for paragraph in paragraphs:
@@ -115,14 +336,7 @@ class TTSService:
         Returns:
             List of sentences
         """
-        # Pattern to match sentence endings (. ! ?) followed by space or end of string
-        sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])|(?<=[.!?])\s*$'
-        sentences = re.split(sentence_pattern, text)
-        
-        # Filter out empty sentences and clean up
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        return sentences if sentences else [text]
+        return split_sentences(text)
 
     def generate_audio(self, text, voice, speed):
         """
@@ -147,68 +361,282 @@ class TTSService:
         chunks = self._split_text_intelligently(text)
         
         # If single chunk, process directly
-        if len(chunks) == 1:
-            audio, sample_rate = self.kokoro.create(
-                chunks[0], 
-                voice=voice, 
-                speed=speed, 
-                lang="en-us"
-            )
-            return audio, sample_rate
+        if len(chunks) == 1 and self.segment_cache is None:
+            return self._synthesize(self.kokoro, chunks[0], voice, speed)
+        
+        # Process multiple chunks and assemble them into one pre-sized buffer
+        segments = []
+        sample_rate = None
+        for segment, sample_rate in self._normalize_rates(self._render_chunks(chunks, voice, speed), len(chunks)):
+            segments.append(segment)
+        
+        if not segments:
+            raise RuntimeError("No audio segments were generated")
+        
+        pause_samples = int(self.CHUNK_PAUSE_SECONDS * sample_rate)
+        total = sum(len(segment) for segment in segments) + pause_samples * (len(segments) - 1)
+        final_audio = np.zeros(total, dtype=np.result_type(*segments))
+        position = 0
+        for i, segment in enumerate(segments):
+            final_audio[position:position + len(segment)] = segment
+            position += len(segment) + pause_samples
+            segments[i] = None  # Let each chunk go as soon as it is copied
+        return final_audio, sample_rate
+
+    def generate_wav(self, text, voice, speed) -> Tuple[memoryview, int]:
+        """
+        Generate a complete 16-bit PCM WAV file for text of any length.
+        
+        Each chunk is converted to int16 as soon as it is rendered and the
+        chunks are then written, with their pauses, into one pre-sized WAV
+        buffer. Compared with generate_audio() followed by a WAV writer, this
+        avoids the full-length float concatenation and the encoder's copies.
+        
+        Args:
+            text: Text to convert to speech (can be of any length)
+            voice: Voice identifier (e.g., "af_bella")
+            speed: Speech speed multiplier (0.5-2.0)
+            
+        Returns:
+            tuple: (wav_data, sample_rate) where wav_data is a memoryview
+                   over the WAV file bytes
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError("Text cannot be empty")
         
-        # Process multiple chunks and concatenate
-        audio_segments = []
+        chunks = self._split_text_intelligently(text)
+        pcm_segments = []
         sample_rate = None
+        for segment, sample_rate in self._normalize_rates(self._render_chunks(chunks, voice, speed), len(chunks)):
+            pcm_segments.append(to_pcm16(segment))
         
-        for i, chunk in enumerate(chunks):
+        if not pcm_segments:
+            raise RuntimeError("No audio segments were generated")
+        
+        pause_samples = int(self.CHUNK_PAUSE_SECONDS * sample_rate)
+        return assemble_wav(pcm_segments, sample_rate, pause_samples), sample_rate
+
+    def generate_audio_stream(self, text, voice, speed) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Generate audio incrementally, yielding each chunk as soon as it is rendered.
+        
+        Uses the same chunking as generate_audio(), so concatenating everything
+        this yields produces the same audio (including the pauses between chunks).
+        
+        Args:
+            text: Text to convert to speech (can be of any length)
+            voice: Voice identifier (e.g., "af_bella")
+            speed: Speech speed multiplier (0.5-2.0)
+            
+        Yields:
+            tuple: (audio_segment, sample_rate) for each chunk and each pause
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError("Text cannot be empty")
+        
+        chunks = self._split_text_intelligently(text)
+        yield from self._iter_chunk_audio(chunks, voice, speed)
+
+    def generate_batch(self, texts: List[str], voice, speed) -> List[object]:
+        """
+        Render several texts that share a voice and speed in one pass.
+        
+        The chunks of all texts are rendered together, spread over the session
+        pool in parallel mode, and reassembled per text. A failure affects only
+        the text it belongs to.
+        
+        Args:
+            texts: Texts to convert to speech
+            voice: Voice identifier shared by all texts
+            speed: Speech speed multiplier shared by all texts
+            
+        Returns:
+            list: One entry per text, in order: either an (audio_data, sample_rate)
+                  tuple or the exception raised while rendering that text
+        """
+        chunk_lists: List[Optional[List[str]]] = []
+        results: List[object] = []
+        for text in texts:
+            text = (text or "").strip()
+            if not text:
+                chunk_lists.append(None)
+                results.append(ValueError("Text cannot be empty"))
+            else:
+                chunk_lists.append(self._split_text_intelligently(text))
+                results.append(None)
+        
+        # Submit every chunk of every text before waiting on any of them
+        rendered: List[Optional[list]] = []
+        for chunks in chunk_lists:
+            if chunks is None:
+                rendered.append(None)
+            elif self._executor:
+                rendered.append([
+                    self._executor.submit(self._render_chunk, i, chunks, voice, speed)
+                    for i in range(len(chunks))
+                ])
+            else:
+                rendered.append(list(range(len(chunks))))
+        
+        for n, chunks in enumerate(chunk_lists):
+            if chunks is None:
+                continue
             try:
-                # Generate audio for this chunk
-                chunk_audio, chunk_sample_rate = self.kokoro.create(
-                    chunk, 
-                    voice=voice, 
-                    speed=speed, 
-                    lang="en-us"
-                )
-                
-                # Store sample rate from first chunk
-                if sample_rate is None:
-                    sample_rate = chunk_sample_rate
-                elif chunk_sample_rate != sample_rate:
-                    # Resample if needed (shouldn't happen with Kokoro, but be safe)
-                    try:
-                        from scipy import signal
-                        num_samples = int(len(chunk_audio) * sample_rate / chunk_sample_rate)
-                        chunk_audio = signal.resample(chunk_audio, num_samples)
-                    except ImportError:
-                        # If scipy not available, raise error (sample rates should match anyway)
-                        raise RuntimeError(
-                            f"Sample rate mismatch: {chunk_sample_rate} vs {sample_rate}. "
-                            "This should not happen with Kokoro model."
-                        )
-                
-                audio_segments.append(chunk_audio)
-                
-                # Add small pause between chunks for natural speech flow
-                # 0.2 seconds of silence at the sample rate
-                pause_samples = int(0.2 * sample_rate)
-                pause = np.zeros(pause_samples, dtype=chunk_audio.dtype)
-                audio_segments.append(pause)
-                
+                if self._executor:
+                    parts = (future.result() for future in rendered[n])
+                else:
+                    parts = (self._render_chunk(i, chunks, voice, speed, self.kokoro) for i in rendered[n])
+                segments = list(self._join_segments(parts, len(chunks)))
+                results[n] = (np.concatenate([audio for audio, _ in segments]), segments[0][1])
             except Exception as e:
-                raise RuntimeError(
-                    f"Error processing text chunk {i+1}/{len(chunks)}: {str(e)}"
-                )
-        
-        # Concatenate all audio segments
-        if audio_segments:
-            # Remove the last pause (no pause after final chunk)
-            if len(audio_segments) > 1:
-                audio_segments.pop()
-            final_audio = np.concatenate(audio_segments)
+                results[n] = e
+        
+        return results
+
+    def _iter_chunk_audio(self, chunks: List[str], voice, speed) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Render chunks in order, yielding audio followed by a short pause.
+        
+        In parallel mode, chunks are rendered ahead of the consumer on the
+        session pool; output order is always the chunk order. No pause is
+        yielded after the final chunk.
+        """
+        yield from self._join_segments(self._render_chunks(chunks, voice, speed), len(chunks))
+
+    def _render_chunks(self, chunks: List[str], voice, speed) -> Iterator[Tuple[np.ndarray, int]]:
+        """Render chunks in order, on the session pool when parallel mode is on."""
+        if self._executor and len(chunks) > 1:
+            return self._render_chunks_parallel(chunks, voice, speed)
+        return (self._render_chunk(i, chunks, voice, speed, self.kokoro) for i in range(len(chunks)))
+
+    def _join_segments(self, rendered, chunk_count: int) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Normalize sample rates of rendered chunks and interleave pauses.
+        
+        Args:
+            rendered: Iterable of (audio, sample_rate) per chunk, in order
+            chunk_count: Total number of chunks (for pause placement and errors)
+        """
+        for i, (chunk_audio, sample_rate) in enumerate(self._normalize_rates(rendered, chunk_count)):
+            yield chunk_audio, sample_rate
+            
+            # Add small pause between chunks for natural speech flow
+            # 0.2 seconds of silence at the sample rate
+            if i < chunk_count - 1:
+                pause_samples = int(self.CHUNK_PAUSE_SECONDS * sample_rate)
+                yield np.zeros(pause_samples, dtype=chunk_audio.dtype), sample_rate
+
+    def _normalize_rates(self, rendered, chunk_count: int) -> Iterator[Tuple[np.ndarray, int]]:
+        """Bring every rendered chunk to the sample rate of the first one."""
+        sample_rate = None
+        
+        for i, (chunk_audio, chunk_sample_rate) in enumerate(rendered):
+            # Store sample rate from first chunk
+            if sample_rate is None:
+                sample_rate = chunk_sample_rate
+            elif chunk_sample_rate != sample_rate:
+                # Resample if needed (shouldn't happen with Kokoro, but be safe)
+                try:
+                    chunk_audio = resample(chunk_audio, chunk_sample_rate, sample_rate)
+                except ImportError:
+                    # If scipy not available, raise error (sample rates should match anyway)
+                    raise RuntimeError(
+                        f"Error processing text chunk {i+1}/{chunk_count}: "
+                        f"Sample rate mismatch: {chunk_sample_rate} vs {sample_rate}. "
+                        "This should not happen with Kokoro model."
+                    )
+            
+            yield chunk_audio, sample_rate
+
+    def _voice_style(self, voice):
+        """Resolve a voice name to its style array when a registry is available."""
+        if self.voice_registry is not None and voice in self.voice_registry:
+            return self.voice_registry.get_style(voice)
+        return voice
+
+    def _synthesize(self, kokoro, text: str, voice, speed) -> Tuple[np.ndarray, int]:
+        """Render text on a session, passing cached phonemes when a text front-end is set."""
+        tokenizer = getattr(kokoro, "tokenizer", None)
+        if self.text_frontend is None or tokenizer is None:
+            return kokoro.create(text, voice=self._voice_style(voice), speed=speed, lang="en-us")
+        phonemes = self.text_frontend.phonemize(text, tokenizer, lang="en-us")
+        return kokoro.create(phonemes, voice=self._voice_style(voice), speed=speed, lang="en-us", is_phonemes=True)
+
+    def _render_chunk_safely(self, kokoro, index: int, chunks: List[str], voice, speed) -> Tuple[np.ndarray, int]:
+        """Render one chunk, wrapping failures with the chunk position."""
+        try:
+            return self._synthesize(kokoro, chunks[index], voice, speed)
+        except Exception as e:
+            raise RuntimeError(
+                f"Error processing text chunk {index+1}/{len(chunks)}: {str(e)}"
+            )
+
+    def render_chunk(self, text: str, voice, speed) -> Tuple[np.ndarray, int]:
+        """
+        Render a single chunk of text on one of this process's sessions.
+        
+        Used by the inference sidecar, which receives text that has already
+        been chunked by its clients. Bypasses the segment cache.
+        """
+        if self._session_pool is None:
+            return self._synthesize(self.kokoro, text, voice, speed)
+        kokoro = self._session_pool.get()
+        try:
+            return self._synthesize(kokoro, text, voice, speed)
+        finally:
+            self._session_pool.put(kokoro)
+
+    def _render_chunk(self, index: int, chunks: List[str], voice, speed, kokoro=None) -> Tuple[np.ndarray, int]:
+        """
+        Render one chunk, serving it from the segment cache when possible.
+        
+        If no session is given, one is checked out from the pool for the
+        duration of the render (cache hits never touch the pool).
+        """
+        key = None
+        # A sidecar that never answered yet has no known model version to key on
+        if self.segment_cache and self.model_version is not None:
+            key = self.segment_cache.make_key(chunks[index], voice, speed, self.model_version)
+            cached = self.segment_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        if kokoro is not None:
+            result = self._render_chunk_safely(kokoro, index, chunks, voice, speed)
         else:
-            raise RuntimeError("No audio segments were generated")
+            kokoro = self._session_pool.get()
+            try:
+                result = self._render_chunk_safely(kokoro, index, chunks, voice, speed)
+            finally:
+                self._session_pool.put(kokoro)
         
-        return final_audio, sample_rate
+        if key is not None:
+            self.segment_cache.set(key, result[0], result[1])
+        return result
+
+    def _render_chunks_parallel(self, chunks: List[str], voice, speed) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Render chunks on the session pool and yield results in chunk order.
+        
+        At most twice the pool size is in flight, which keeps every session
+        busy without holding the whole text's audio in memory ahead of a
+        slow consumer.
+        """
+        window = self.parallel_workers * 2
+        pending = deque()
+        next_index = 0
+        try:
+            while next_index < len(chunks) or pending:
+                while next_index < len(chunks) and len(pending) < window:
+                    pending.append(self._executor.submit(self._render_chunk, next_index, chunks, voice, speed))
+                    next_index += 1
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early or a chunk failed: drop queued work
+            for future in pending:
+                future.cancel()
 
     def get_voices(self):
         """
@@ -217,6 +645,12 @@ class TTSService:
         Returns:
             list: List of voice identifier strings (e.g., ["af_bella", "af_sarah"])
         """
+        if getattr(self, 'sidecar', None) is not None:
+            return self.sidecar.get_voices()
+        voice_registry = getattr(self, 'voice_registry', None)
+        if voice_registry is not None:
+            return voice_registry.get_voices()
+        
         import json
         # Try to use the voices_path from initialization
         voices_path = getattr(self, '_voices_path', "voices.json")
@@ -0,0 +1,386 @@
+"""
+Out-of-process TTS inference sidecar.
+
+One process owns the Kokoro model and its pool of ONNX Runtime sessions and
+serves synthesis for every HTTP worker on the host over a Unix socket. Only a
+small JSON header crosses the socket; the rendered audio is handed over in a
+shared-memory block that the client copies out and then releases. Workers run
+TTSService in client mode (TTSService.from_sidecar) and load no model, so
+memory stays flat as HTTP workers are added, and the sidecar's session pool
+can be sized to the physical cores without workers competing for them.
+
+Protocol: every message is a 4-byte big-endian length followed by UTF-8 JSON.
+    {"op": "info"}          -> model version, pool size, voices
+    {"op": "synthesize", "text", "voice", "speed", "lang"}
+                            -> {"shm", "samples", "sample_rate"}; the client
+                               replies {"op": "release"} once it has copied
+                               the audio, and the server frees the block
+
+Run with:
+    python tts_sidecar.py
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+def _send_message(sock: socket.socket, message: Dict):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        part = sock.recv(size - len(data))
+        if not part:
+            return None
+        data.extend(part)
+    return bytes(data)
+
+
+def _recv_message(sock: socket.socket) -> Optional[Dict]:
+    """Read one message; None when the peer closed the connection"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message too large: {size} bytes")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+
+class _SidecarHandler(socketserver.BaseRequestHandler):
+    """Serves requests on one client connection until it closes"""
+
+    def handle(self):
+        sidecar: "TTSSidecarServer" = self.server.sidecar
+        sock: socket.socket = self.request
+        sock.settimeout(sidecar.release_timeout)
+        while True:
+            try:
+                message = _recv_message(sock)
+            except (OSError, ValueError):
+                return
+            if message is None:
+                return
+            if not sidecar.handle_message(sock, message):
+                return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TTSSidecarServer:
+    """Serves a TTSService to local clients over a Unix socket"""
+
+    def __init__(self, tts_service, socket_path: str, release_timeout: float = 30.0, ready: bool = True):
+        """
+        Args:
+            tts_service: In-process TTSService that owns the model and sessions
+            socket_path: Filesystem path of the Unix socket
+            release_timeout: Seconds to wait for a client to release a shared
+                audio block before freeing it anyway
+            ready: Whether startup (e.g. warmup) is complete; reported to
+                clients, which keep their health at "warming_up" until it is
+        """
+        self.tts_service = tts_service
+        self.socket_path = socket_path
+        self.release_timeout = release_timeout
+        self.ready = ready
+        self.server: Optional[_UnixServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.render_seconds = 0.0
+
+    def start(self, background: bool = True):
+        """Bind the socket and start serving (in a thread unless background=False)"""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+        self.server = _UnixServer(self.socket_path, _SidecarHandler)
+        self.server.sidecar = self
+        if background:
+            self.thread = threading.Thread(target=self.server.serve_forever, name="tts-sidecar", daemon=True)
+            self.thread.start()
+        else:
+            self.server.serve_forever()
+
+    def stop(self):
+        """Stop serving and remove the socket"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def handle_message(self, sock: socket.socket, message: Dict) -> bool:
+        """Handle one request; returns False to close the connection"""
+        op = message.get("op")
+        if op == "info":
+            _send_message(sock, {"ok": True, **self.get_info()})
+            return True
+        if op == "synthesize":
+            return self._synthesize(sock, message)
+        _send_message(sock, {"ok": False, "error": f"Unknown operation: {op}"})
+        return True
+
+    def get_info(self) -> Dict:
+        service = self.tts_service
+        return {
+            "model_version": service.model_version,
+            "parallel_workers": service.parallel_workers,
+            "voices": service.get_voices(),
+            "ready": self.ready,
+            "warmed_up": service.warmed_up,
+        }
+
+    def _synthesize(self, sock: socket.socket, message: Dict) -> bool:
+        start = time.time()
+        try:
+            audio, sample_rate = self.tts_service.render_chunk(
+                message["text"], message["voice"], float(message.get("speed", 1.0))
+            )
+        except Exception as e:
+            with self.stats_lock:
+                self.requests += 1
+                self.errors += 1
+            _send_message(sock, {"ok": False, "error": str(e)})
+            return True
+
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        block = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+        try:
+            view = np.ndarray(audio.shape, dtype=np.float32, buffer=block.buf)
+            view[:] = audio
+            del view  # The block cannot be closed while a view exports its buffer
+            _send_message(sock, {
+                "ok": True,
+                "shm": block.name,
+                "samples": int(audio.size),
+                "sample_rate": int(sample_rate),
+                "pid": os.getpid(),
+            })
+            # Any reply (or a closed connection) means the client is done with the block
+            try:
+                reply = _recv_message(sock)
+            except (OSError, ValueError):
+                reply = None
+        finally:
+            block.close()
+            block.unlink()
+
+        with self.stats_lock:
+            self.requests += 1
+            self.render_seconds += time.time() - start
+        if reply is None:
+            return False
+        if reply.get("op") != "release":
+            return self.handle_message(sock, reply)
+        return True
+
+    def get_stats(self) -> Dict:
+        with self.stats_lock:
+            return {
+                "socket_path": self.socket_path,
+                "requests": self.requests,
+                "errors": self.errors,
+                "avg_request_seconds": self.render_seconds / self.requests if self.requests else 0,
+            }
+
+
+class TTSSidecarClient:
+    """
+    Client for the inference sidecar.
+
+    Exposes create() with Kokoro's signature, so TTSService can use it in
+    place of a local session. Safe to share between threads: each call uses
+    its own connection.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 300.0, voices_ttl: float = 5.0):
+        """
+        Args:
+            socket_path: Filesystem path of the sidecar's Unix socket
+            timeout: Seconds to wait for a synthesis result
+            voices_ttl: Seconds the voice list is cached in this process
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.voices_ttl = voices_ttl
+        self._voices: Optional[List[str]] = None
+        self._voices_expire = 0.0
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _call(self, message: Dict) -> Tuple[socket.socket, Dict]:
+        sock = self._connect()
+        try:
+            _send_message(sock, message)
+            response = _recv_message(sock)
+        except Exception:
+            sock.close()
+            raise
+        if response is None:
+            sock.close()
+            raise ConnectionError("TTS sidecar closed the connection")
+        if not response.get("ok"):
+            sock.close()
+            raise RuntimeError(response.get("error", "TTS sidecar request failed"))
+        return sock, response
+
+    def get_info(self) -> Dict:
+        """Get the sidecar's model version, pool size and voices"""
+        sock, response = self._call({"op": "info"})
+        sock.close()
+        self._voices = response["voices"]
+        self._voices_expire = time.monotonic() + self.voices_ttl
+        return response
+
+    def wait_until_ready(
+        self,
+        timeout: Optional[float] = 30.0,
+        interval: float = 0.5,
+        require_ready: bool = False
+    ) -> Dict:
+        """
+        Poll the sidecar until it answers.
+
+        Args:
+            timeout: Seconds to wait (None = indefinitely)
+            interval: Seconds between attempts
+            require_ready: Also wait until the sidecar reports its startup
+                (warmup) as complete
+
+        Raises:
+            ConnectionError: If it is not reachable (or not ready) within the timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            try:
+                info = self.get_info()
+                if not require_ready or info.get("ready", True):
+                    return info
+                error = "still warming up"
+            except (OSError, ConnectionError) as e:
+                error = str(e)
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ConnectionError(f"TTS sidecar not ready at {self.socket_path}: {error}")
+            time.sleep(interval)
+
+    def get_voices(self) -> List[str]:
+        """Get the voice list, refreshed at most once per voices_ttl"""
+        if self._voices is None or time.monotonic() >= self._voices_expire:
+            self.get_info()
+        return list(self._voices)
+
+    def create(self, text: str, voice, speed: float = 1.0, lang: str = "en-us", is_phonemes: bool = False,
+               trim: bool = True):
+        """
+        Synthesize one chunk in the sidecar (Kokoro.create's signature; the
+        sidecar runs G2P itself, so it takes text, not phonemes).
+
+        Returns:
+            tuple: (audio_data, sample_rate)
+        """
+        if not isinstance(voice, str):
+            raise TypeError("The TTS sidecar takes voice names, not style arrays")
+        if is_phonemes:
+            raise TypeError("The TTS sidecar takes text, not phonemes")
+        sock, response = self._call({
+            "op": "synthesize", "text": text, "voice": voice, "speed": speed, "lang": lang
+        })
+        try:
+            block = shared_memory.SharedMemory(name=response["shm"])
+            if response.get("pid") != os.getpid():
+                # The server owns the block; keep this process's tracker from unlinking it at exit
+                resource_tracker.unregister(block._name, "shared_memory")
+            try:
+                audio = np.ndarray((response["samples"],), dtype=np.float32, buffer=block.buf).copy()
+            finally:
+                block.close()
+            _send_message(sock, {"op": "release"})
+        finally:
+            sock.close()
+        return audio, response["sample_rate"]
+
+
+def main():
+    """Run the sidecar with settings from config.Settings"""
+    import signal
+
+    import psutil
+
+    from config import settings
+    from logger_config import logger
+    from session_profile import SessionProfile
+    from text_frontend import TextFrontend
+    from tts_service import TTSService
+    from voice_registry import VoiceRegistry
+
+    sessions = settings.TTS_SIDECAR_SESSIONS or psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    voice_registry = None
+    if settings.VOICE_REGISTRY_ENABLED:
+        try:
+            voice_registry = VoiceRegistry.from_settings(settings)
+        except Exception as e:
+            logger.warning(f"Voice registry unavailable, using {settings.VOICES_PATH} directly: {e}")
+
+    service = TTSService(
+        model_path=settings.MODEL_PATH,
+        voices_path=voice_registry.index_path if voice_registry else settings.VOICES_PATH,
+        parallel_workers=sessions,
+        session_profile=SessionProfile.from_settings(settings, sessions_per_process=sessions, processes=1),
+        voice_registry=voice_registry,
+        text_frontend=TextFrontend.from_settings(settings)
+    )
+    # Serve (and answer info requests) right away; clients report "warming_up"
+    # until ready is set, instead of timing out while the sessions warm up
+    server = TTSSidecarServer(service, settings.TTS_SIDECAR_SOCKET, ready=False)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.stop).start())
+    server.start()
+    logger.info(f"TTS sidecar serving {sessions} sessions on {settings.TTS_SIDECAR_SOCKET}")
+    try:
+        if settings.TTS_WARMUP_ENABLED:
+            try:
+                summary = service.warmup(voices=settings.TTS_WARMUP_VOICES or None)
+                logger.info(f"TTS sidecar warmed up: {summary}")
+            except Exception as e:
+                # A failed warmup only costs latency on the first requests
+                logger.error(f"TTS sidecar warmup failed: {e}", exc_info=True)
+        server.ready = True
+        server.thread.join()
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Memory-mapped voice registry.
+
+Voice style packs are stored as one flat float32 file plus a JSON index
+(written by convert_voices.py). The data file is memory-mapped read-only, so
+every Gunicorn worker shares the same page-cache pages instead of holding its
+own parsed copy, and the voice list and metadata live in memory. Voice
+lookups and validation therefore never touch disk. The index is re-checked
+at most once per reload interval and the mapping is swapped when it changes.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from logger_config import logger
+
+
+class VoiceRegistry:
+    """Voice styles served from a memory-mapped float32 file"""
+
+    def __init__(self, data_path: str = "voices.f32", index_path: str = "voices.index.json", reload_interval: float = 5.0):
+        """
+        Args:
+            data_path: Flat float32 file with all voice styles
+            index_path: JSON index of voice offsets, shapes and metadata
+            reload_interval: Seconds between checks for a changed index (0 = never reload)
+
+        Raises:
+            FileNotFoundError: If either file does not exist
+            ValueError: If the index does not match the data file
+        """
+        self.data_path = data_path
+        self.index_path = index_path
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.reloads = 0
+        self._next_check = 0.0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._index: Dict[str, Dict] = {}
+        self._voices: List[str] = []
+        self._data: Optional[np.memmap] = None
+        self._load()
+        self._next_check = time.monotonic() + reload_interval
+
+    @classmethod
+    def from_settings(cls, settings) -> "VoiceRegistry":
+        """
+        Open the registry configured in application settings.
+
+        The voices file is converted first if there is no index yet or the
+        voices file is newer than the index.
+        """
+        if os.path.exists(settings.VOICES_PATH) and (
+            not os.path.exists(settings.VOICE_INDEX_PATH)
+            or os.path.getmtime(settings.VOICES_PATH) > os.path.getmtime(settings.VOICE_INDEX_PATH)
+        ):
+            from convert_voices import convert_voice_packs
+
+            logger.info(f"Converting {settings.VOICES_PATH} for the voice registry")
+            convert_voice_packs(settings.VOICES_PATH, settings.VOICE_DATA_PATH, settings.VOICE_INDEX_PATH)
+        return cls(
+            settings.VOICE_DATA_PATH,
+            settings.VOICE_INDEX_PATH,
+            reload_interval=settings.VOICE_RELOAD_INTERVAL
+        )
+
+    def _index_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.index_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Read the index and map the data file, replacing the current mapping"""
+        signature = self._index_signature()
+        with open(self.index_path, "r") as f:
+            index = json.load(f)
+        data = np.memmap(self.data_path, dtype="<f4", mode="r")
+
+        for name, entry in index.items():
+            end = entry["offset"] + int(np.prod(entry["shape"]))
+            if end > len(data):
+                raise ValueError(f"Voice index does not match {self.data_path} (voice {name})")
+
+        with self.lock:
+            self._index = index
+            self._voices = list(index)
+            self._data = data
+            self._signature = signature
+
+    def refresh(self) -> bool:
+        """
+        Reload the registry if the index changed on disk.
+
+        Checks at most once per reload interval. A half-written or inconsistent
+        update is ignored and retried on the next check; lookups keep using
+        the previous mapping meanwhile.
+
+        Returns:
+            True if a new index was loaded
+        """
+        if not self.reload_interval:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_interval
+
+        try:
+            if self._index_signature() == self._signature:
+                return False
+            self._load()
+        except (OSError, ValueError, KeyError):
+            return False
+        self.reloads += 1
+        return True
+
+    def get_voices(self) -> List[str]:
+        """Get the list of voice identifiers"""
+        self.refresh()
+        return list(self._voices)
+
+    def __contains__(self, name: str) -> bool:
+        self.refresh()
+        return name in self._index
+
+    def get_metadata(self, name: Optional[str] = None) -> Dict:
+        """
+        Get voice metadata (language, gender, shape).
+
+        Args:
+            name: Voice identifier, or None for all voices keyed by name
+        """
+        self.refresh()
+        if name is None:
+            return {voice: self._describe(entry) for voice, entry in self._index.items()}
+        return self._describe(self._index[name])
+
+    @staticmethod
+    def _describe(entry: Dict) -> Dict:
+        return {"language": entry.get("language"), "gender": entry.get("gender"), "shape": entry["shape"]}
+
+    def get_style(self, name: str) -> np.ndarray:
+        """
+        Get a voice style array as a read-only view of the mapped file.
+
+        Raises:
+            KeyError: If the voice does not exist
+        """
+        self.refresh()
+        with self.lock:
+            entry = self._index[name]
+            data = self._data
+        size = int(np.prod(entry["shape"]))
+        return data[entry["offset"]:entry["offset"] + size].reshape(entry["shape"])
+
+    def get_stats(self) -> Dict:
+        """Get registry statistics"""
+        with self.lock:
+            return {
+                "voices": len(self._voices),
+                "data_path": self.data_path,
+                "data_bytes": self._data.nbytes if self._data is not None else 0,
+                "reload_interval": self.reload_interval,
+                "reloads": self.reloads,
+            }
@@ -1,13 +1,16 @@
 """
 Writings Service Module
 Handles CRUD operations for wonderful writings.
+
+WritingsService works on sync sessions (get_db); AsyncWritingsService has the
+same methods for async sessions (get_async_db), for use in request handlers.
 """
 
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy import desc, func, and_, or_, select
 from datetime import datetime, date
-from database import Writing, get_db
+from database import AsyncSession, Writing, get_db
 from logger_config import logger
 
 
@@ -203,6 +206,199 @@ class WritingsService:
         return sorted(genres)
 
 
-# Create singleton instance
+class AsyncWritingsService:
+    """Service for managing writings, on async sessions"""
+    
+    async def get_all_writings(
+        self, 
+        db: AsyncSession, 
+        skip: int = 0, 
+        limit: int = 100,
+        category: Optional[str] = None,
+        genre: Optional[str] = None,
+        author: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_word_count: Optional[int] = None,
+        max_word_count: Optional[int] = None
+    ) -> List[Writing]:
+        """
+        Get all writings, ordered by most recent first. 
+        Can filter by category, genre, author, date range, and word count.
+        """
+        return await self.search_writings(
+            db=db,
+            query=None,
+            skip=skip,
+            limit=limit,
+            author=author,
+            genre=genre,
+            category=category,
+            start_date=start_date,
+            end_date=end_date,
+            min_word_count=min_word_count,
+            max_word_count=max_word_count
+        )
+    
+    async def get_writing_by_id(self, db: AsyncSession, writing_id: int) -> Optional[Writing]:
+        """Get a single writing by ID."""
+        return await db.get(Writing, writing_id)
+    
+    async def create_writing(
+        self,
+        db: AsyncSession,
+        title: Optional[str],
+        content: str,
+        author: Optional[str],
+        category: str = "user",
+        genre: Optional[str] = None
+    ) -> Writing:
+        """Create a new writing."""
+        writing = Writing(
+            title=title,
+            content=content,
+            author=author,
+            category=category,
+            genre=genre
+        )
+        db.add(writing)
+        await db.commit()
+        await db.refresh(writing)
+        logger.info(f"Created writing with ID {writing.id}")
+        return writing
+    
+    async def update_writing(
+        self,
+        db: AsyncSession,
+        writing_id: int,
+        title: Optional[str] = None,
+        content: Optional[str] = None,
+        author: Optional[str] = None
+    ) -> Optional[Writing]:
+        """Update an existing writing."""
+        writing = await db.get(Writing, writing_id)
+        if not writing:
+            return None
+        
+        if title is not None:
+            writing.title = title
+        if content is not None:
+            writing.content = content
+        if author is not None:
+            writing.author = author
+        
+        writing.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(writing)
+        logger.info(f"Updated writing with ID {writing.id}")
+        return writing
+    
+    async def delete_writing(self, db: AsyncSession, writing_id: int) -> bool:
+        """Delete a writing."""
+        writing = await db.get(Writing, writing_id)
+        if not writing:
+            return False
+        
+        await db.delete(writing)
+        await db.commit()
+        logger.info(f"Deleted writing with ID {writing_id}")
+        return True
+    
+    async def search_writings(
+        self,
+        db: AsyncSession,
+        query: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        author: Optional[str] = None,
+        genre: Optional[str] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_word_count: Optional[int] = None,
+        max_word_count: Optional[int] = None
+    ) -> List[Writing]:
+        """
+        Advanced search writings with multiple filters.
+        Supports search by text, author, genre, date range, and word count.
+        """
+        statement = select(Writing)
+        
+        # Text search (title, content, or author)
+        if query:
+            search_term = f"%{query}%"
+            statement = statement.where(
+                (Writing.title.ilike(search_term)) |
+                (Writing.content.ilike(search_term)) |
+                (Writing.author.ilike(search_term))
+            )
+        
+        # Author filter
+        if author:
+            statement = statement.where(Writing.author.ilike(f"%{author}%"))
+        
+        # Genre filter
+        if genre:
+            statement = statement.where(Writing.genre == genre)
+        
+        # Category filter
+        if category:
+            statement = statement.where(Writing.category == category)
+        
+        # Date range filter
+        if start_date:
+            statement = statement.where(Writing.created_at >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            statement = statement.where(Writing.created_at <= datetime.combine(end_date, datetime.max.time()))
+        
+        statement = statement.order_by(desc(Writing.created_at))
+        
+        # Word count filter (calculate word count from content)
+        if min_word_count is not None or max_word_count is not None:
+            # Filter by word count in Python, then paginate
+            # (SQLite doesn't have great text processing functions)
+            all_writings = (await db.scalars(statement)).all()
+            filtered_writings = []
+            for writing in all_writings:
+                word_count = len(writing.content.split()) if writing.content else 0
+                if min_word_count is not None and word_count < min_word_count:
+                    continue
+                if max_word_count is not None and word_count > max_word_count:
+                    continue
+                filtered_writings.append(writing)
+            return filtered_writings[skip:skip + limit]
+        
+        return list((await db.scalars(statement.offset(skip).limit(limit))).all())
+    
+    async def get_writings_count(self, db: AsyncSession, category: Optional[str] = None, genre: Optional[str] = None) -> int:
+        """Get total count of writings. Can filter by category and genre."""
+        statement = select(func.count(Writing.id))
+        if category:
+            statement = statement.where(Writing.category == category)
+        if genre:
+            statement = statement.where(Writing.genre == genre)
+        return await db.scalar(statement) or 0
+    
+    async def get_curated_writings(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        genre: Optional[str] = None
+    ) -> List[Writing]:
+        """Get curated amazing writings."""
+        return await self.get_all_writings(db, skip, limit, category="curated", genre=genre)
+    
+    async def get_genres(self, db: AsyncSession, category: Optional[str] = None) -> List[str]:
+        """Get list of unique genres. Can filter by category."""
+        statement = select(Writing.genre).distinct()
+        if category:
+            statement = statement.where(Writing.category == category)
+        genres = [g for g in (await db.scalars(statement)).all() if g is not None]
+        return sorted(genres)
+
+
+# Create singleton instances
 writings_service = WritingsService()
+async_writings_service = AsyncWritingsService()
 
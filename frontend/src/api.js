@@ -844,7 +844,9 @@ export const startInteractiveConversation = async (topic, voice = 'af_bella', sp
     }
 };
 
-export const continueInteractiveConversation = async (topic, userMessage, conversationHistory, voice = 'af_bella', speed = 1.0) => {
+// With the session_id returned by startInteractiveConversation, the server keeps the
+// history and only the new message is sent
+export const continueInteractiveConversation = async (topic, userMessage, conversationHistory, voice = 'af_bella', speed = 1.0, sessionId = null) => {
     try {
         return await apiClient.request(
             `${API_BASE_URL}/conversation/interactive/continue`,
@@ -853,7 +855,12 @@ export const continueInteractiveConversation = async (topic, userMessage, conver
                 headers: {
                     "Content-Type": "application/json",
                 },
-                body: JSON.stringify({
+                body: JSON.stringify(sessionId ? {
+                    session_id: sessionId,
+                    user_message: userMessage,
+                    voice,
+                    speed
+                } : {
                     topic,
                     user_message: userMessage,
                     conversation_history: conversationHistory,
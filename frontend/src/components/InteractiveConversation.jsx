@@ -3,14 +3,21 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { Video, VideoOff, Mic, MicOff, Send, Loader2, MessageCircle, X, Volume2, VolumeX } from 'lucide-react';
 import { useToast } from '../hooks/useToast';
 import TypingText from './TypingText';
+import { startInteractiveConversation, continueInteractiveConversation } from '../api';
 import logger from '../utils/logger';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000/api";
 
+// Reply audio comes as a path on the API server (/api/audio/...) or a data URI
+const resolveAudioUrl = (audioUrl) =>
+    audioUrl.startsWith('/') ? new URL(audioUrl, new URL(API_BASE_URL, window.location.href)).href : audioUrl;
+
 const InteractiveConversation = () => {
     const [topic, setTopic] = useState('');
     const [isConversationActive, setIsConversationActive] = useState(false);
     const [messages, setMessages] = useState([]);
+    // Set when the server keeps the history; otherwise each message carries it
+    const [sessionId, setSessionId] = useState(null);
     const [userMessage, setUserMessage] = useState('');
     const [isLoading, setIsLoading] = useState(false);
     const [error, setError] = useState(null);
@@ -93,26 +100,11 @@ const InteractiveConversation = () => {
         setIsLoading(true);
         setError(null);
         setMessages([]);
+        setSessionId(null);
 
         try {
-            const response = await fetch(`${API_BASE_URL}/conversation/interactive/start`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    topic: topic.trim(),
-                    voice: 'af_bella',
-                    speed: 1.0
-                }),
-            });
-
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.detail || 'Failed to start conversation');
-            }
-
-            const data = await response.json();
+            const data = await startInteractiveConversation(topic.trim(), 'af_bella', 1.0);
+            setSessionId(data.session_id || null);
 
             // Add AI's opening message with typing animation
             const aiMessage = {
@@ -163,32 +155,15 @@ const InteractiveConversation = () => {
         setIsLoading(true);
 
         try {
-            // Format conversation history for API
-            const conversationHistory = messages.map(msg => ({
+            // Only needed when the server could not keep a session
+            const conversationHistory = sessionId ? null : messages.map(msg => ({
                 role: msg.role,
                 content: msg.content
             }));
 
-            const response = await fetch(`${API_BASE_URL}/conversation/interactive/continue`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    topic: topic.trim(),
-                    user_message: messageToSend,
-                    conversation_history: conversationHistory,
-                    voice: 'af_bella',
-                    speed: 1.0
-                }),
-            });
-
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.detail || 'Failed to get response');
-            }
-
-            const data = await response.json();
+            const data = await continueInteractiveConversation(
+                topic.trim(), messageToSend, conversationHistory, 'af_bella', 1.0, sessionId
+            );
 
             // Add AI's response with typing animation
             const aiMessage = {
@@ -231,7 +206,7 @@ const InteractiveConversation = () => {
         }
 
         // Create new audio element
-        const audio = new Audio(audioUrl);
+        const audio = new Audio(resolveAudioUrl(audioUrl));
         audioRef.current = audio;
 
         audio.onended = () => {
@@ -252,6 +227,7 @@ const InteractiveConversation = () => {
     const stopConversation = () => {
         setIsConversationActive(false);
         setMessages([]);
+        setSessionId(null);
         setUserMessage('');
         stopVideo();
         if (audioRef.current) {